@@ -0,0 +1,28 @@
+"""added inventory_shards on event table
+
+Revision ID: 4c1d8e2a9b37
+Revises: f71b7f69f1f4
+Create Date: 2026-10-18 17:20:41.512034
+
+"""
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "4c1d8e2a9b37"
+down_revision = "f71b7f69f1f4"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "events",
+        sa.Column("inventory_shards", sa.Integer(), server_default="0", nullable=False),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("events", "inventory_shards")
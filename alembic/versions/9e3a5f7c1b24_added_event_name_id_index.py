@@ -0,0 +1,23 @@
+"""added event name id index
+
+Revision ID: 9e3a5f7c1b24
+Revises: 4c1d8e2a9b37
+Create Date: 2026-10-18 18:02:13.402118
+
+"""
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "9e3a5f7c1b24"
+down_revision = "4c1d8e2a9b37"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index("event_name_id_idx", "events", ["name", "id"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index("event_name_id_idx", table_name="events")
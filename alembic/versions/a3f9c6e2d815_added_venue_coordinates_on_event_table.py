@@ -0,0 +1,27 @@
+"""added venue coordinates on event table
+
+Revision ID: a3f9c6e2d815
+Revises: e5a1d3f8b6c2
+Create Date: 2026-10-18 20:05:41.903518
+
+"""
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "a3f9c6e2d815"
+down_revision = "e5a1d3f8b6c2"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("events", sa.Column("venue_lat", sa.Float(), nullable=True))
+    op.add_column("events", sa.Column("venue_long", sa.Float(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("events", "venue_long")
+    op.drop_column("events", "venue_lat")
@@ -0,0 +1,26 @@
+"""added refund required payment status
+
+Revision ID: a4c6e1f8b237
+Revises: f3b8d2a6c914
+Create Date: 2026-10-18 23:12:40.516233
+
+"""
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "a4c6e1f8b237"
+down_revision = "f3b8d2a6c914"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute("ALTER TYPE paymentstatus ADD VALUE IF NOT EXISTS 'REFUND_REQUIRED'")
+
+
+def downgrade() -> None:
+    # Postgres cannot drop an enum value, only stop using it
+    op.execute(
+        "UPDATE payments SET status = 'COMPLETED' WHERE status = 'REFUND_REQUIRED'"
+    )
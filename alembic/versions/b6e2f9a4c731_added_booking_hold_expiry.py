@@ -0,0 +1,53 @@
+"""added booking hold expiry
+
+Revision ID: b6e2f9a4c731
+Revises: d8c4b1f7e293
+Create Date: 2026-10-18 21:12:05.418326
+
+"""
+
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "b6e2f9a4c731"
+down_revision = "d8c4b1f7e293"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    booking_status = postgresql.ENUM(
+        "HELD", "CONFIRMED", "RELEASED", name="bookingstatus"
+    )
+    booking_status.create(op.get_bind())
+    # Existing bookings predate holds and count as confirmed
+    op.add_column(
+        "bookings",
+        sa.Column(
+            "status",
+            booking_status,
+            server_default="CONFIRMED",
+            nullable=False,
+        ),
+    )
+    op.add_column(
+        "bookings",
+        sa.Column("expires_at", sa.DateTime(timezone=True), nullable=True),
+    )
+    op.create_index(
+        "booking_hold_expiry_idx",
+        "bookings",
+        ["expires_at"],
+        unique=False,
+        postgresql_where="status = 'HELD'",
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("booking_hold_expiry_idx", table_name="bookings")
+    op.drop_column("bookings", "expires_at")
+    op.drop_column("bookings", "status")
+    postgresql.ENUM(name="bookingstatus").drop(op.get_bind())
@@ -0,0 +1,61 @@
+"""added webhook inbox retries
+
+Revision ID: c5d9a2e7f418
+Revises: a4c6e1f8b237
+Create Date: 2026-10-18 23:41:08.274915
+
+"""
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "c5d9a2e7f418"
+down_revision = "a4c6e1f8b237"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "webhook_inbox",
+        sa.Column("attempts", sa.Integer(), server_default="0", nullable=False),
+    )
+    op.add_column(
+        "webhook_inbox",
+        sa.Column(
+            "next_attempt_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+    )
+    op.add_column("webhook_inbox", sa.Column("last_error", sa.String(), nullable=True))
+    op.add_column(
+        "webhook_inbox",
+        sa.Column("parked_at", sa.DateTime(timezone=True), nullable=True),
+    )
+    op.drop_index("webhook_inbox_unprocessed_idx", table_name="webhook_inbox")
+    op.create_index(
+        "webhook_inbox_unprocessed_idx",
+        "webhook_inbox",
+        ["received_at"],
+        unique=False,
+        postgresql_where="processed_at IS NULL AND parked_at IS NULL",
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("webhook_inbox_unprocessed_idx", table_name="webhook_inbox")
+    op.create_index(
+        "webhook_inbox_unprocessed_idx",
+        "webhook_inbox",
+        ["received_at"],
+        unique=False,
+        postgresql_where="processed_at IS NULL",
+    )
+    op.drop_column("webhook_inbox", "parked_at")
+    op.drop_column("webhook_inbox", "last_error")
+    op.drop_column("webhook_inbox", "next_attempt_at")
+    op.drop_column("webhook_inbox", "attempts")
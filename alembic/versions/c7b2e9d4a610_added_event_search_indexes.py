@@ -0,0 +1,65 @@
+"""added event search indexes
+
+Revision ID: c7b2e9d4a610
+Revises: 9e3a5f7c1b24
+Create Date: 2026-10-18 18:47:55.160932
+
+"""
+
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "c7b2e9d4a610"
+down_revision = "9e3a5f7c1b24"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.add_column(
+        "events",
+        sa.Column(
+            "search_vector",
+            postgresql.TSVECTOR(),
+            sa.Computed(
+                "setweight(to_tsvector('simple', coalesce(name, '')), 'A') || "
+                "setweight(to_tsvector('simple', coalesce(venue, '')), 'B')",
+                persisted=True,
+            ),
+            nullable=True,
+        ),
+    )
+    op.create_index(
+        "event_search_vector_idx",
+        "events",
+        ["search_vector"],
+        unique=False,
+        postgresql_using="gin",
+    )
+    op.create_index(
+        "event_name_trgm_idx",
+        "events",
+        ["name"],
+        unique=False,
+        postgresql_using="gin",
+        postgresql_ops={"name": "gin_trgm_ops"},
+    )
+    op.create_index(
+        "event_venue_trgm_idx",
+        "events",
+        ["venue"],
+        unique=False,
+        postgresql_using="gin",
+        postgresql_ops={"venue": "gin_trgm_ops"},
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("event_venue_trgm_idx", table_name="events")
+    op.drop_index("event_name_trgm_idx", table_name="events")
+    op.drop_index("event_search_vector_idx", table_name="events")
+    op.drop_column("events", "search_vector")
@@ -0,0 +1,29 @@
+"""added idempotency keys finished index
+
+Revision ID: d2f7b3c9e605
+Revises: c5d9a2e7f418
+Create Date: 2026-10-19 00:06:52.391704
+
+"""
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "d2f7b3c9e605"
+down_revision = "c5d9a2e7f418"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "idempotency_keys_finished_idx",
+        "idempotency_keys",
+        ["created_at"],
+        unique=False,
+        postgresql_where="response_status IS NOT NULL",
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("idempotency_keys_finished_idx", table_name="idempotency_keys")
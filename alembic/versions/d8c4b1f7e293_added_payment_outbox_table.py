@@ -0,0 +1,74 @@
+"""added payment outbox table
+
+Revision ID: d8c4b1f7e293
+Revises: a3f9c6e2d815
+Create Date: 2026-10-18 20:41:27.630194
+
+"""
+
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "d8c4b1f7e293"
+down_revision = "a3f9c6e2d815"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "payment_outbox",
+        sa.Column("booking_id", sa.Integer(), nullable=False),
+        sa.Column("amount", sa.Float(), nullable=False),
+        sa.Column("idempotency_key", sa.String(), nullable=False),
+        sa.Column(
+            "status",
+            postgresql.ENUM("PENDING", "DISPATCHED", "FAILED", name="outboxstatus"),
+            nullable=False,
+        ),
+        sa.Column("attempts", sa.Integer(), nullable=False),
+        sa.Column(
+            "next_attempt_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.Column("last_error", sa.String(), nullable=True),
+        sa.Column("transaction_id", sa.String(), nullable=True),
+        sa.Column("client_secret", sa.String(), nullable=True),
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(
+            ["booking_id"],
+            ["bookings.id"],
+        ),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("booking_id"),
+        sa.UniqueConstraint("idempotency_key"),
+    )
+    op.create_index(
+        op.f("ix_payment_outbox_id"), "payment_outbox", ["id"], unique=False
+    )
+    op.create_index(
+        "payment_outbox_due_idx",
+        "payment_outbox",
+        ["next_attempt_at"],
+        unique=False,
+        postgresql_where="status = 'PENDING'",
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("payment_outbox_due_idx", table_name="payment_outbox")
+    op.drop_index(op.f("ix_payment_outbox_id"), table_name="payment_outbox")
+    op.drop_table("payment_outbox")
+    outbox_status = sa.Enum("PENDING", "DISPATCHED", "FAILED", name="outboxstatus")
+    outbox_status.drop(op.get_bind())
@@ -0,0 +1,42 @@
+"""added event location indexes
+
+Revision ID: e5a1d3f8b6c2
+Revises: c7b2e9d4a610
+Create Date: 2026-10-18 19:32:10.482716
+
+"""
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "e5a1d3f8b6c2"
+down_revision = "c7b2e9d4a610"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS earthdistance CASCADE")
+    # "location_lat" only ever indexed location_long
+    op.drop_index("location_lat", table_name="events")
+    op.create_index(
+        "event_location_idx",
+        "events",
+        ["location_lat", "location_long"],
+        unique=False,
+    )
+    op.create_index(
+        "event_location_earth_idx",
+        "events",
+        [sa.text("ll_to_earth(location_lat, location_long)")],
+        unique=False,
+        postgresql_using="gist",
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("event_location_earth_idx", table_name="events")
+    op.drop_index("event_location_idx", table_name="events")
+    op.create_index("location_lat", "events", ["location_long"], unique=False)
@@ -0,0 +1,82 @@
+"""added inventory allotments table
+
+Revision ID: e8b1c4d6a973
+Revises: d2f7b3c9e605
+Create Date: 2026-10-19 10:24:37.108526
+
+"""
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "e8b1c4d6a973"
+down_revision = "d2f7b3c9e605"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "inventory_allotments",
+        sa.Column("worker_id", sa.String(), nullable=False),
+        sa.Column("event_id", sa.Integer(), nullable=False),
+        sa.Column("tickets", sa.Integer(), nullable=False),
+        sa.Column(
+            "heartbeat_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(
+            ["event_id"],
+            ["events.id"],
+        ),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        op.f("ix_inventory_allotments_id"),
+        "inventory_allotments",
+        ["id"],
+        unique=False,
+    )
+    op.create_index(
+        op.f("ix_inventory_allotments_worker_id"),
+        "inventory_allotments",
+        ["worker_id"],
+        unique=False,
+    )
+    op.create_index(
+        op.f("ix_inventory_allotments_heartbeat_at"),
+        "inventory_allotments",
+        ["heartbeat_at"],
+        unique=False,
+    )
+    op.add_column("bookings", sa.Column("allotment_id", sa.Integer(), nullable=True))
+    op.create_index(
+        op.f("ix_bookings_allotment_id"), "bookings", ["allotment_id"], unique=False
+    )
+    op.create_foreign_key(
+        "bookings_allotment_id_fkey",
+        "bookings",
+        "inventory_allotments",
+        ["allotment_id"],
+        ["id"],
+        ondelete="SET NULL",
+    )
+
+
+def downgrade() -> None:
+    op.drop_constraint("bookings_allotment_id_fkey", "bookings", type_="foreignkey")
+    op.drop_index(op.f("ix_bookings_allotment_id"), table_name="bookings")
+    op.drop_column("bookings", "allotment_id")
+    op.drop_index(
+        op.f("ix_inventory_allotments_heartbeat_at"), table_name="inventory_allotments"
+    )
+    op.drop_index(
+        op.f("ix_inventory_allotments_worker_id"), table_name="inventory_allotments"
+    )
+    op.drop_index(op.f("ix_inventory_allotments_id"), table_name="inventory_allotments")
+    op.drop_table("inventory_allotments")
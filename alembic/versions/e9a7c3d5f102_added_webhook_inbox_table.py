@@ -0,0 +1,52 @@
+"""added webhook inbox table
+
+Revision ID: e9a7c3d5f102
+Revises: b6e2f9a4c731
+Create Date: 2026-10-18 22:03:41.275904
+
+"""
+
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "e9a7c3d5f102"
+down_revision = "b6e2f9a4c731"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "webhook_inbox",
+        sa.Column("event_id", sa.String(), nullable=False),
+        sa.Column("event_type", sa.String(), nullable=False),
+        sa.Column("payment_intent_id", sa.String(), nullable=True),
+        sa.Column("payload", postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+        sa.Column(
+            "received_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.Column("processed_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("event_id"),
+    )
+    op.create_index(op.f("ix_webhook_inbox_id"), "webhook_inbox", ["id"], unique=False)
+    op.create_index(
+        "webhook_inbox_unprocessed_idx",
+        "webhook_inbox",
+        ["received_at"],
+        unique=False,
+        postgresql_where="processed_at IS NULL",
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("webhook_inbox_unprocessed_idx", table_name="webhook_inbox")
+    op.drop_index(op.f("ix_webhook_inbox_id"), table_name="webhook_inbox")
+    op.drop_table("webhook_inbox")
@@ -0,0 +1,53 @@
+"""added idempotency keys table
+
+Revision ID: f3b8d2a6c914
+Revises: e9a7c3d5f102
+Create Date: 2026-10-18 22:47:13.804512
+
+"""
+
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "f3b8d2a6c914"
+down_revision = "e9a7c3d5f102"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "idempotency_keys",
+        sa.Column("key", sa.String(), nullable=False),
+        sa.Column("fingerprint", sa.String(), nullable=False),
+        sa.Column("response_status", sa.Integer(), nullable=True),
+        sa.Column(
+            "response_body", postgresql.JSONB(astext_type=sa.Text()), nullable=True
+        ),
+        sa.Column(
+            "locked_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("key"),
+    )
+    op.create_index(
+        op.f("ix_idempotency_keys_id"), "idempotency_keys", ["id"], unique=False
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(op.f("ix_idempotency_keys_id"), table_name="idempotency_keys")
+    op.drop_table("idempotency_keys")
@@ -0,0 +1,67 @@
+"""
+Measure the per-request cost of the authorization check.
+
+Times `IsAuthorized(...)(parsed_token)`, i.e. picking the role out of the
+token and checking it against the permission class, next to the raw
+`has_all` lookup it is built on. No database or Keycloak is needed.
+
+    python -m benchmarks.authorization --number 200000
+"""
+
+import argparse
+import timeit
+
+from event_manager.keycloak.permission_definitions import (
+    Permission,
+    has_all,
+    permission_mask,
+)
+from event_manager.keycloak.permissions import CanCreateEvent, SimplePermissionClass
+from event_manager.keycloak.security import IsAuthorized
+
+
+class CanManageEvents(SimplePermissionClass):
+    required_permissions = (
+        Permission.VIEW_EVENT,
+        Permission.CREATE_EVENT,
+        Permission.DELETE_EVENT,
+    )
+
+
+# Keycloak adds its own default roles next to the application ones
+PARSED_TOKEN = {
+    "realm_access": {
+        "roles": [
+            "offline_access",
+            "default-roles-event-manager",
+            "uma_authorization",
+            "admin",
+        ]
+    }
+}
+
+
+def report(label: str, statement, number: int) -> None:
+    best = min(timeit.repeat(statement, number=number, repeat=5))
+    print(f"{label:<40} {best / number * 1e9:>10.1f}")
+
+
+def main(args) -> None:
+    single = IsAuthorized(CanCreateEvent)
+    multiple = IsAuthorized(CanManageEvents)
+    mask = permission_mask(CanManageEvents.required_permissions)
+
+    print(f"{'check':<40} {'ns/call':>10}")
+    report("has_all (3 permissions)", lambda: has_all("admin", mask), args.number)
+    report("IsAuthorized, one permission", lambda: single(PARSED_TOKEN), args.number)
+    report(
+        "IsAuthorized, three permissions",
+        lambda: multiple(PARSED_TOKEN),
+        args.number,
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--number", type=int, default=100000)
+    main(parser.parse_args())
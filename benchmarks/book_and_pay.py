@@ -0,0 +1,161 @@
+"""
+Measure book-and-pay throughput with the in-process fake payment gateway.
+
+Requests go through the FastAPI app (ASGI transport, no sockets) against a
+scratch database. Each request books and queues its payment intent; an
+outbox dispatcher running alongside creates the intents, with the gateway
+answering after `--latency-ms`. `--blocking` replaces the await with a
+`time.sleep`, as the synchronous Stripe SDK calls used to do, to show what a
+blocked event loop costs. "intents/s" counts until the last intent is ready.
+
+    python -m benchmarks.book_and_pay --dsn postgresql+asyncpg://... \\
+        --requests 500 --concurrency 50 --latency-ms 50
+
+`--shards 0` books through `--strategy` instead of the in-memory inventory.
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+from datetime import datetime
+
+import pytz
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import func, select, update
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from benchmarks.booking_strategies import setup
+from event_manager.core.config import settings
+from event_manager.core.database import create_sessionmaker, with_session
+from event_manager.inventory import get_inventory_engine
+from event_manager.inventory.sharded_inventory import InventoryEngine
+from event_manager.main import app
+from event_manager.models import Base, Booking, Event, OutboxStatus, PaymentOutbox
+from event_manager.payment_gateway import get_outbox_dispatcher
+from event_manager.payment_gateway.fake_payment import FakePaymentGateway
+from event_manager.payment_gateway.outbox import PaymentOutboxDispatcher
+from event_manager.schemas.booking import BookingStrategy
+
+
+class BlockingFakePaymentGateway(FakePaymentGateway):
+    async def _round_trip(self) -> None:
+        time.sleep(self.latency)
+
+
+async def pending_intents(session_maker, event_id: int) -> int:
+    async with session_maker() as session:
+        return await session.scalar(
+            select(func.count())
+            .select_from(PaymentOutbox)
+            .join(Booking, Booking.id == PaymentOutbox.booking_id)
+            .where(
+                Booking.event_id == event_id,
+                PaymentOutbox.status == OutboxStatus.PENDING,
+            )
+        )
+
+
+async def run(args) -> None:
+    # The inventory engine checks the event in a session of its own
+    engine = create_async_engine(
+        args.dsn, pool_size=2 * args.concurrency, max_overflow=0
+    )
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.create_all)
+    session_maker = create_sessionmaker(engine)
+
+    async def session_override():
+        async with session_maker() as session:
+            try:
+                yield session
+                await session.commit()
+            except Exception:
+                await session.rollback()
+                raise
+
+    gateway_class = BlockingFakePaymentGateway if args.blocking else FakePaymentGateway
+    gateway = gateway_class(latency=args.latency_ms / 1000)
+    inventory_engine = InventoryEngine(session_factory=session_maker, shard_capacity=50)
+    app.dependency_overrides[with_session] = session_override
+    dispatcher = PaymentOutboxDispatcher(
+        session_factory=session_maker,
+        gateway=gateway,
+        batch_size=settings.PAYMENT_OUTBOX_BATCH_SIZE,
+        max_attempts=settings.PAYMENT_OUTBOX_MAX_ATTEMPTS,
+        retry_backoff=settings.PAYMENT_OUTBOX_RETRY_BACKOFF,
+        lease=settings.PAYMENT_OUTBOX_LEASE,
+    )
+    app.dependency_overrides[get_outbox_dispatcher] = lambda: dispatcher
+    app.dependency_overrides[get_inventory_engine] = lambda: inventory_engine
+
+    async with session_maker() as session:
+        user_id, event_id = await setup(session, args.requests)
+        await session.execute(
+            update(Event)
+            .where(Event.id == event_id)
+            .values(inventory_shards=args.shards)
+        )
+        await session.commit()
+    payload = {
+        "event_id": event_id,
+        "user_id": user_id,
+        "booking_time": datetime.now(pytz.UTC).isoformat(),
+        "quantity": 1,
+        "total_cost": 100,
+    }
+
+    latencies: list[float] = []
+    pending = iter(range(args.requests))
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://bench") as client:
+
+        async def worker() -> None:
+            for _ in pending:
+                started = time.perf_counter()
+                response = await client.post(
+                    f"/payments/book_and_pay?strategy={args.strategy.value}",
+                    json=payload,
+                )
+                assert response.status_code == 200, response.text
+                latencies.append(time.perf_counter() - started)
+
+        dispatching = asyncio.create_task(
+            dispatcher.run(settings.PAYMENT_OUTBOX_INTERVAL)
+        )
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+        elapsed = time.perf_counter() - started
+        while await pending_intents(session_maker, event_id):
+            await asyncio.sleep(0.01)
+        dispatched = time.perf_counter() - started
+        dispatching.cancel()
+
+    app.dependency_overrides.clear()
+    await engine.dispose()
+
+    quantiles = statistics.quantiles(latencies, n=100)
+    mode = "blocking" if args.blocking else "async"
+    print(
+        f"{mode} gateway, {args.latency_ms} ms per call, "
+        f"{args.concurrency} concurrent clients, {args.shards} inventory shards"
+    )
+    print(f"{'requests/s':>10} {'p50 ms':>9} {'p99 ms':>9} {'intents/s':>10}")
+    print(
+        f"{len(latencies) / elapsed:>10.1f} {quantiles[49] * 1000:>9.2f} "
+        f"{quantiles[98] * 1000:>9.2f} {len(latencies) / dispatched:>10.1f}"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--dsn", default=settings.TEST_DATABASE_URL)
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--latency-ms", type=float, default=50)
+    parser.add_argument("--blocking", action="store_true")
+    parser.add_argument("--shards", type=int, default=4)
+    parser.add_argument(
+        "--strategy", type=BookingStrategy, default=BookingStrategy.ATOMIC
+    )
+    asyncio.run(run(parser.parse_args()))
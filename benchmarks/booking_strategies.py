@@ -0,0 +1,184 @@
+"""
+Compare the optimistic, pessimistic and atomic booking strategies under
+concurrent load.
+
+Every worker books one ticket per transaction until the event is sold out,
+optionally keeping the transaction open for `--hold-ms` to mimic the payment
+provider call made inside `book_and_pay`.
+
+    python -m benchmarks.booking_strategies --dsn postgresql+asyncpg://... \\
+        --tickets 2000 --concurrency 50 --hold-ms 5
+
+Run it against a scratch database: tables are created if missing and one
+event per strategy is inserted.
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+from datetime import date, datetime
+from datetime import time as dt_time
+from uuid import uuid4
+
+import pytz
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from event_manager.core.config import settings
+from event_manager.core.database import create_sessionmaker
+from event_manager.dal.booking import booking_manager
+from event_manager.dal.event import event_manager
+from event_manager.errors.all_errors import InsufficientTickets
+from event_manager.keycloak.permission_definitions import Roles
+from event_manager.models import Base, Booking, Event, User
+from event_manager.schemas.booking import BookingCreate, BookingStrategy
+
+
+async def setup(session: AsyncSession, tickets: int) -> tuple[int, int]:
+    suffix = uuid4().hex[:10]
+    user = User(
+        name=f"bench-{suffix}",
+        email=f"bench-{suffix}@example.com",
+        country_code="IN",
+        phone_number=suffix,
+        role=Roles.USER,
+        username=f"bench-{suffix}",
+    )
+    event = Event(
+        name=f"bench-{suffix}",
+        event_date=date(2030, 1, 1),
+        event_time=dt_time(20, 0, tzinfo=pytz.UTC),
+        venue="Benchmark Hall",
+        location_lat=0.0,
+        location_long=0.0,
+        available_tickets=tickets,
+        base_price=100,
+        surge_price=0,
+        surge_threshold=0,
+        version=0,
+    )
+    session.add_all([user, event])
+    await session.commit()
+    return user.id, event.id
+
+
+async def book_once(
+    session: AsyncSession, strategy: BookingStrategy, booking_in: BookingCreate
+) -> None:
+    if strategy == BookingStrategy.ATOMIC:
+        await booking_manager.create_booking_atomic(session, booking_in)
+    elif strategy == BookingStrategy.OPTIMISTIC:
+        event = await event_manager.get(session, booking_in.event_id)
+        await booking_manager.create_booking_optimistic(session, booking_in, event)
+    else:
+        event = await event_manager.get_pessimistic_event(booking_in.event_id, session)
+        await booking_manager.create_booking_pessimistic(session, booking_in, event)
+
+
+async def worker(
+    session_maker,
+    strategy: BookingStrategy,
+    booking_in: BookingCreate,
+    hold: float,
+    latencies: list[float],
+    conflicts: list[int],
+) -> None:
+    while True:
+        started = time.perf_counter()
+        async with session_maker() as session:
+            try:
+                await book_once(session, strategy, booking_in)
+                if hold:
+                    await asyncio.sleep(hold)
+                await session.commit()
+            except InsufficientTickets:
+                return
+            except RuntimeError:
+                # Optimistic version clash or pessimistic deadlock, retry
+                await session.rollback()
+                conflicts[0] += 1
+                continue
+        latencies.append(time.perf_counter() - started)
+
+
+async def run_strategy(session_maker, strategy: BookingStrategy, args) -> None:
+    async with session_maker() as session:
+        user_id, event_id = await setup(session, args.tickets)
+
+    booking_in = BookingCreate(
+        event_id=event_id,
+        user_id=user_id,
+        booking_time=datetime.now(pytz.UTC),
+        quantity=1,
+        total_cost=100,
+    )
+    latencies: list[float] = []
+    conflicts = [0]
+    started = time.perf_counter()
+    await asyncio.gather(
+        *(
+            worker(
+                session_maker,
+                strategy,
+                booking_in,
+                args.hold_ms / 1000,
+                latencies,
+                conflicts,
+            )
+            for _ in range(args.concurrency)
+        )
+    )
+    elapsed = time.perf_counter() - started
+
+    async with session_maker() as session:
+        remaining = await session.scalar(
+            select(Event.available_tickets).where(Event.id == event_id)
+        )
+        booked = await session.scalar(
+            select(func.coalesce(func.sum(Booking.quantity), 0)).where(
+                Booking.event_id == event_id
+            )
+        )
+    assert booked == args.tickets and remaining == 0, "inventory drifted"
+
+    quantiles = statistics.quantiles(latencies, n=100)
+    print(
+        f"{strategy.value:<12} {len(latencies) / elapsed:>10.1f} "
+        f"{quantiles[49] * 1000:>9.2f} {quantiles[98] * 1000:>9.2f} "
+        f"{conflicts[0]:>10}"
+    )
+
+
+async def main(args) -> None:
+    engine = create_async_engine(args.dsn, pool_size=args.concurrency, max_overflow=0)
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.create_all)
+    session_maker = create_sessionmaker(engine)
+
+    print(
+        f"{args.tickets} tickets, {args.concurrency} concurrent buyers, "
+        f"{args.hold_ms} ms held per transaction"
+    )
+    print(
+        f"{'strategy':<12} {'bookings/s':>10} {'p50 ms':>9} {'p99 ms':>9} "
+        f"{'conflicts':>10}"
+    )
+    for strategy in args.strategies:
+        await run_strategy(session_maker, strategy, args)
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--dsn", default=settings.TEST_DATABASE_URL)
+    parser.add_argument("--tickets", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--hold-ms", type=float, default=0)
+    parser.add_argument(
+        "--strategies",
+        type=BookingStrategy,
+        nargs="+",
+        default=list(BookingStrategy),
+    )
+    asyncio.run(main(parser.parse_args()))
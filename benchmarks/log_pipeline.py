@@ -0,0 +1,210 @@
+"""
+Measure what logging adds to request latency at a fixed request rate.
+
+Requests arrive open loop, `--rate` a second for `--seconds`, at a route
+that awaits `--work-ms` (standing in for the database) and logs the way
+book_and_pay and the webhook used to: INFO f-strings of the whole payment
+intent and webhook event, through `logging.basicConfig(DEBUG)` writing to
+the sink on the event loop ("sync"). "queue" logs the same requests with
+lazy %-style arguments through `configure_logging()`'s defaults, and
+"unlimited" does so without its rate limit. "off" logs nothing. Latency is
+counted from when a request was due, so a stalled loop shows up in it.
+
+The route is a bare Starlette one: FastAPI's own ~150us a request would
+leave one worker little headroom at 5k req/s, hiding what logging costs.
+
+    python -m benchmarks.log_pipeline --rate 5000 --seconds 10 \\
+        --write-latency-ms 0.05
+
+`--write-latency-ms` makes every write to the sink take that long, like a
+stdout pipe a log shipper drains slowly. Records are written to a
+temporary file.
+"""
+
+import argparse
+import asyncio
+import logging
+import math
+import statistics
+import tempfile
+import time
+import uuid
+from typing import Callable, TextIO
+
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+from event_manager.core.logs import TEXT_FORMAT, configure_logging
+
+logger = logging.getLogger("benchmarks.log_pipeline")
+
+INTENT = {
+    "id": "pi_3PqA8bLkdIwHu7ix0rS1jYt2",
+    "object": "payment_intent",
+    "amount": 12000,
+    "currency": "usd",
+    "status": "requires_payment_method",
+    "client_secret": "pi_3PqA8bLkdIwHu7ix0rS1jYt2_secret_" + "x" * 25,
+    "metadata": {"booking_id": "4821", "user_id": "77", "event_id": "12"},
+    "payment_method_types": ["card"],
+    "created": 1723000000,
+    "livemode": False,
+}
+
+
+class SlowStream:
+    """A text stream whose writes take `latency` seconds."""
+
+    def __init__(self, stream: TextIO, latency: float):
+        self.stream = stream
+        self.latency = latency
+
+    def write(self, text: str) -> int:
+        if self.latency:
+            time.sleep(self.latency)
+        return self.stream.write(text)
+
+    def flush(self) -> None:
+        self.stream.flush()
+
+
+def before(booking_id: int) -> None:
+    intent = {**INTENT, "metadata": {**INTENT["metadata"], "booking_id": booking_id}}
+    logger.info("Pessimistic Booking!!")
+    logger.info(f"Payment intent created --> {intent}")
+    event = {"id": f"evt_{uuid.uuid4().hex}", "data": {"object": intent}}
+    logger.debug(f"Webhook {event} stored")
+
+
+def after(booking_id: int) -> None:
+    logger.debug("Pessimistic booking for event %s", 12)
+    logger.info("Payment intent %s created for booking %s", INTENT["id"], booking_id)
+    logger.debug("Webhook %s (%s) stored", uuid.uuid4().hex, "payment_intent.created")
+
+
+def build_app(log: Callable[[int], None], work: float) -> Starlette:
+    async def book(request: Request) -> JSONResponse:
+        booking_id = request.path_params["booking_id"]
+        await asyncio.sleep(work)
+        log(booking_id)
+        return JSONResponse({"booking_id": booking_id})
+
+    return Starlette(
+        routes=[Route("/bookings/{booking_id:int}", book, methods=["POST"])]
+    )
+
+
+async def call(app: Starlette, booking_id: int) -> None:
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "POST",
+        "scheme": "http",
+        "path": f"/bookings/{booking_id}",
+        "raw_path": f"/bookings/{booking_id}".encode(),
+        "root_path": "",
+        "query_string": b"",
+        "headers": [],
+        "server": ("test", 80),
+        "client": ("test", 1234),
+    }
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        pass
+
+    await app(scope, receive, send)
+
+
+async def run(app: Starlette, args) -> tuple[list[float], float]:
+    latencies: list[float] = []
+    tasks = set()
+    total = int(args.rate * args.seconds)
+
+    async def request(booking_id: int, due: float) -> None:
+        await call(app, booking_id)
+        latencies.append(time.perf_counter() - due)
+
+    started = time.perf_counter()
+    sent = 0
+    while sent < total:
+        now = time.perf_counter()
+        while sent < total and started + sent / args.rate <= now:
+            task = asyncio.create_task(request(sent, started + sent / args.rate))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+            sent += 1
+        # Sleep rather than spin, so the loop idles like a server's would
+        await asyncio.sleep(max(started + sent / args.rate - now, 0))
+    await asyncio.gather(*tasks)
+    return latencies, time.perf_counter() - started
+
+
+def percentile(values: list[float], q: float) -> float:
+    return statistics.quantiles(values, n=1000)[int(q * 10) - 1] * 1e3
+
+
+def configure(mode: str, sink: TextIO):
+    """The logging setup of `mode`, and the queue listener to drain if any."""
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+    if mode == "queue":
+        return configure_logging(stream=sink)
+    if mode == "unlimited":
+        return configure_logging(stream=sink, rate=math.inf)
+    if mode == "sync":
+        logging.basicConfig(
+            level=logging.DEBUG, format=TEXT_FORMAT, stream=sink, force=True
+        )
+    else:
+        root.setLevel(logging.CRITICAL)
+    return None
+
+
+async def main(args) -> None:
+    modes = {"off": after, "sync": before, "queue": after, "unlimited": after}
+    modes = {mode: modes[mode] for mode in args.modes}
+    print(
+        f"{args.rate:.0f} req/s for {args.seconds}s, {args.work_ms}ms of work, "
+        f"{args.write_latency_ms}ms per write"
+    )
+    print(
+        f"{'mode':<9} {'p50 ms':>7} {'p99 ms':>7} {'p99.9 ms':>8} "
+        f"{'max ms':>7} {'req/s':>7} {'records':>8}"
+    )
+    for mode, log in modes.items():
+        with tempfile.NamedTemporaryFile("w+") as output:
+            sink = SlowStream(output, args.write_latency_ms / 1e3)
+            listener = configure(mode, sink)
+            app = build_app(log, args.work_ms / 1e3)
+            await run(app, argparse.Namespace(**{**vars(args), "seconds": 0.5}))
+            latencies, elapsed = await run(app, args)
+            if listener is not None:
+                listener.stop()
+            output.flush()
+            output.seek(0)
+            records = sum(1 for _ in output)
+        print(
+            f"{mode:<9} {percentile(latencies, 50):>7.2f} "
+            f"{percentile(latencies, 99):>7.2f} {percentile(latencies, 99.9):>8.2f} "
+            f"{max(latencies) * 1e3:>7.2f} {len(latencies) / elapsed:>7.0f} "
+            f"{records:>8}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rate", type=float, default=5000)
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--work-ms", type=float, default=1.0)
+    parser.add_argument("--write-latency-ms", type=float, default=0.0)
+    parser.add_argument(
+        "--modes", nargs="+", default=["off", "sync", "queue", "unlimited"]
+    )
+    asyncio.run(main(parser.parse_args()))
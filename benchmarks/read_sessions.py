@@ -0,0 +1,150 @@
+"""
+Compare the sessions GET handlers used to get from `with_session` with the
+ReadOnlySession `with_read_session` now hands out.
+
+Each simulated request loads one event by id and serializes it with the
+response model, the way `read_event` does. `concurrency` clients share a
+pool of `pool_size` connections. Per request it reports the database round
+trips (statements plus BEGIN/COMMIT), how long a pooled connection was
+held, and the latency percentiles and throughput.
+
+    python -m benchmarks.read_sessions --dsn postgresql+asyncpg://... \\
+        --requests 20000 --concurrency 100 --pool-size 10
+
+Run it against a scratch database: tables are created if missing and
+`--events` events are inserted when there are fewer.
+"""
+
+import argparse
+import asyncio
+import random
+import statistics
+import time
+from collections import Counter
+from typing import Awaitable, Callable
+
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+
+from benchmarks.serialization import setup
+from event_manager.core.config import settings
+from event_manager.core.database import create_sessionmaker
+from event_manager.core.read_only import create_read_only_sessionmaker
+from event_manager.models import Base, Event
+from event_manager.schemas.event import Event as EventSchema
+
+
+class Probe:
+    """Counts round trips and connection hold times on an engine."""
+
+    def __init__(self, engine: AsyncEngine):
+        self.counts: Counter[str] = Counter()
+        self.held: list[float] = []
+        sync_engine = engine.sync_engine
+        event.listen(sync_engine, "connect", self._connect)
+        event.listen(sync_engine, "before_cursor_execute", self._statement)
+        event.listen(sync_engine.pool, "checkout", self._checkout)
+        event.listen(sync_engine.pool, "checkin", self._checkin)
+
+    def _connect(self, dbapi_connection, connection_record) -> None:
+        # asyncpg logs the BEGIN and COMMIT it sends outside of cursors
+        connection_record.driver_connection.add_query_logger(
+            lambda record: self.counts.update([record.query.split()[0].upper()])
+        )
+
+    def _statement(self, *args) -> None:
+        self.counts.update(["statements"])
+
+    def _checkout(self, dbapi_connection, connection_record, proxy) -> None:
+        connection_record.info["checked_out"] = time.perf_counter()
+
+    def _checkin(self, dbapi_connection, connection_record) -> None:
+        started = connection_record.info.pop("checked_out", None)
+        if started is not None:
+            self.held.append(time.perf_counter() - started)
+
+    def reset(self) -> None:
+        self.counts.clear()
+        self.held.clear()
+
+
+async def read_event(session_maker, event_id: int, commit: bool) -> bytes:
+    async with session_maker() as session:
+        event_obj = await session.get(Event, event_id)
+        # What FastAPI does with the returned object, before the dependency
+        # closes the session
+        body = EventSchema.model_validate(event_obj).model_dump_json().encode()
+        if commit:
+            await session.commit()
+        return body
+
+
+async def run(
+    request: Callable[[int], Awaitable[bytes]], ids: list[int], args
+) -> tuple[list[float], float]:
+    latencies: list[float] = []
+    queue = iter(range(args.requests))
+
+    async def client() -> None:
+        for _ in queue:
+            started = time.perf_counter()
+            await request(random.choice(ids))
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(args.concurrency)))
+    return latencies, time.perf_counter() - started
+
+
+def percentile(values: list[float], q: int) -> float:
+    return statistics.quantiles(values, n=100)[q - 1] * 1e3
+
+
+async def main(args) -> None:
+    engine = create_async_engine(
+        args.dsn, pool_size=args.pool_size, max_overflow=0, pool_timeout=60
+    )
+    probe = Probe(engine)
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.create_all)
+    session_maker = create_sessionmaker(engine)
+    await setup(session_maker, args.events)
+    async with session_maker() as session:
+        ids = list(await session.scalars(select(Event.id).limit(args.events)))
+
+    read_only_maker = create_read_only_sessionmaker(engine)
+    modes = {
+        "session": lambda event_id: read_event(session_maker, event_id, True),
+        "read_only": lambda event_id: read_event(read_only_maker, event_id, False),
+    }
+    print(
+        f"{args.requests} requests, {args.concurrency} clients, "
+        f"{args.pool_size} connections"
+    )
+    print(
+        f"{'mode':<10} {'trips/req':>9} {'held ms':>8} "
+        f"{'p50 ms':>7} {'p99 ms':>7} {'req/s':>8}"
+    )
+    for name, request in modes.items():
+        # Warm up connections and statement caches
+        await run(request, ids, argparse.Namespace(**{**vars(args), "requests": 500}))
+        probe.reset()
+        latencies, elapsed = await run(request, ids, args)
+        await asyncio.sleep(0)  # Let the query loggers run
+        trips = sum(probe.counts.values()) / args.requests
+        held = statistics.fmean(probe.held) * 1e3
+        print(
+            f"{name:<10} {trips:>9.2f} {held:>8.3f} {percentile(latencies, 50):>7.2f} "
+            f"{percentile(latencies, 99):>7.2f} {args.requests / elapsed:>8.0f}"
+        )
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--dsn", default=settings.TEST_DATABASE_URL)
+    parser.add_argument("--events", type=int, default=1000)
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--pool-size", type=int, default=10)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,129 @@
+"""
+Measure the CPU cost per item of fetching and encoding a page of events.
+
+"orm" is the path the list endpoints used to take: model instances, then
+FastAPI's response_model validation, jsonable_encoder and the stdlib json.
+"rows" is the current one: column-only rows encoded by a RowSerializer.
+Times are process CPU time, so the database's own work is not counted;
+`--gzip` adds compressing the body as CompressionMiddleware would.
+
+    python -m benchmarks.serialization --dsn postgresql+asyncpg://... \\
+        --items 1000 --rounds 50
+
+Run it against a scratch database: tables are created if missing and
+`--items` events are inserted when there are fewer.
+"""
+
+import argparse
+import asyncio
+import json
+import time
+import zlib
+from datetime import date
+from datetime import time as dt_time
+from typing import Awaitable, Callable
+
+import pytz
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+from sqlalchemy import func, insert, select
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from event_manager.api.responses import RowSerializer
+from event_manager.core.config import settings
+from event_manager.core.database import create_sessionmaker
+from event_manager.dal.event import event_manager
+from event_manager.models import Base, Event
+from event_manager.schemas.event import Event as EventSchema
+
+EVENT_ROWS = RowSerializer(EventSchema)
+EVENT_LIST = create_response_field(name="events", type_=list[EventSchema])
+
+
+async def setup(session_maker, items: int) -> None:
+    async with session_maker() as session:
+        missing = items - await session.scalar(select(func.count(Event.id)))
+        if missing > 0:
+            await session.execute(
+                insert(Event),
+                [
+                    dict(
+                        name=f"bench-{i}",
+                        event_date=date(2030, 1, 1),
+                        event_time=dt_time(20, 0, tzinfo=pytz.UTC),
+                        venue="Benchmark Hall, 1 Long Street Name, Some City",
+                        location_lat=0.0,
+                        location_long=0.0,
+                        available_tickets=1000,
+                        base_price=100,
+                        surge_price=10,
+                        surge_threshold=50,
+                        version=0,
+                    )
+                    for i in range(missing)
+                ],
+            )
+            await session.commit()
+
+
+async def orm_page(session, items: int) -> bytes:
+    page = await event_manager.get_page(session, limit=items)
+    content = await serialize_response(field=EVENT_LIST, response_content=page.items)
+    # What starlette's JSONResponse.render does
+    return json.dumps(
+        content, ensure_ascii=False, allow_nan=False, separators=(",", ":")
+    ).encode()
+
+
+async def rows_page(session, items: int) -> bytes:
+    page = await event_manager.get_page(
+        session, limit=items, columns=[*EVENT_ROWS.columns, "version"]
+    )
+    return EVENT_ROWS.dump_json(page.items)
+
+
+async def measure(
+    session_maker,
+    render: Callable[..., Awaitable[bytes]],
+    args,
+) -> tuple[float, int]:
+    """Returns the CPU microseconds per item, and the body size."""
+    cpu = 0.0
+    for _ in range(args.rounds):
+        async with session_maker() as session:
+            started = time.process_time()
+            body = await render(session, args.items)
+            if args.gzip:
+                body = zlib.compress(body, 6, zlib.MAX_WBITS | 16)
+            cpu += time.process_time() - started
+    return cpu / args.rounds / args.items * 1e6, len(body)
+
+
+async def main(args) -> None:
+    engine = create_async_engine(args.dsn)
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.create_all)
+    session_maker = create_sessionmaker(engine)
+    await setup(session_maker, args.items)
+
+    print(
+        f"{args.items} events per page, {args.rounds} rounds"
+        f"{', gzipped' if args.gzip else ''}"
+    )
+    print(f"{'path':<6} {'us/item':>9} {'bytes':>9}")
+    for name, render in [("orm", orm_page), ("rows", rows_page)]:
+        # Warm up the statement caches first
+        async with session_maker() as session:
+            await render(session, args.items)
+        per_item, size = await measure(session_maker, render, args)
+        print(f"{name:<6} {per_item:>9.2f} {size:>9}")
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--dsn", default=settings.TEST_DATABASE_URL)
+    parser.add_argument("--items", type=int, default=1000)
+    parser.add_argument("--rounds", type=int, default=50)
+    parser.add_argument("--gzip", action="store_true")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,149 @@
+import zlib
+from functools import partial
+from typing import Callable, Protocol
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:  # optional, responses are only gzipped without it
+    brotli = None
+
+COMPRESSIBLE_TYPES = ("application/json", "application/x-ndjson", "text/")
+
+
+class Compressor(Protocol):
+    """The part of zlib's compressobj the middleware uses."""
+
+    def compress(self, data: bytes) -> bytes:
+        """Returns the compressed output available so far."""
+
+    def flush(self) -> bytes:
+        """Returns the rest of the output, ending the stream."""
+
+
+class BrotliCompressor:
+    def __init__(self, quality: int):
+        self._compressor = brotli.Compressor(quality=quality)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.process(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.finish()
+
+
+class _CompressingSender:
+    def __init__(
+        self,
+        send: Send,
+        compressor: Callable[[], Compressor],
+        encoding: str,
+        minimum_size: int,
+    ):
+        self.send = send
+        self.new_compressor = compressor
+        self.encoding = encoding
+        self.minimum_size = minimum_size
+        self.start: Message | None = None
+        self.compressor: Compressor | None = None
+
+    async def __call__(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            # Held back until the first body chunk tells whether to compress
+            self.start = message
+        elif message["type"] != "http.response.body":
+            await self.send(message)
+        elif self.start is not None:
+            await self._send_start(message)
+        elif self.compressor is not None:
+            await self._send_chunk(message)
+        else:
+            await self.send(message)
+
+    def _should_compress(self, headers: MutableHeaders, message: Message) -> bool:
+        if "content-encoding" in headers:
+            return False
+        if not headers.get("content-type", "").startswith(COMPRESSIBLE_TYPES):
+            return False
+        # Streams are compressed whatever their size
+        return message.get("more_body", False) or (
+            len(message.get("body", b"")) >= self.minimum_size
+        )
+
+    async def _send_start(self, message: Message) -> None:
+        start, self.start = self.start, None
+        headers = MutableHeaders(raw=start["headers"])
+        if not self._should_compress(headers, message):
+            await self.send(start)
+            await self.send(message)
+            return
+
+        self.compressor = self.new_compressor()
+        headers["Content-Encoding"] = self.encoding
+        headers.add_vary_header("Accept-Encoding")
+        del headers["Content-Length"]
+        if message.get("more_body", False):
+            await self.send(start)
+            await self._send_chunk(message)
+            return
+        body = self.compressor.compress(message.get("body", b""))
+        body += self.compressor.flush()
+        headers["Content-Length"] = str(len(body))
+        await self.send(start)
+        await self.send({**message, "body": body})
+
+    async def _send_chunk(self, message: Message) -> None:
+        chunk = self.compressor.compress(message.get("body", b""))
+        if not message.get("more_body", False):
+            chunk += self.compressor.flush()
+        await self.send({**message, "body": chunk})
+
+
+class CompressionMiddleware:
+    """
+    Compresses JSON, NDJSON and text responses of at least `minimum_size`
+    bytes with br when the client accepts it and brotli is installed, gzip
+    otherwise. Streamed responses are compressed chunk by chunk.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = 1024,
+        gzip_level: int = 6,
+        brotli_quality: int = 4,
+    ):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    def _encoding(self, accept_encoding: str) -> str | None:
+        accepted = {
+            coding.split(";")[0].strip() for coding in accept_encoding.split(",")
+        }
+        if brotli is not None and "br" in accepted:
+            return "br"
+        if "gzip" in accepted:
+            return "gzip"
+        return None
+
+    def _compressor(self, encoding: str) -> Compressor:
+        if encoding == "br":
+            return BrotliCompressor(self.brotli_quality)
+        return zlib.compressobj(self.gzip_level, zlib.DEFLATED, zlib.MAX_WBITS | 16)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        encoding = None
+        if scope["type"] == "http":
+            encoding = self._encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        sender = _CompressingSender(
+            send, partial(self._compressor, encoding), encoding, self.minimum_size
+        )
+        await self.app(scope, receive, sender)
@@ -0,0 +1,54 @@
+import hashlib
+from typing import Any, Iterable
+
+from fastapi import Request, Response
+
+from event_manager.dal.pagination import Page
+
+ETAG_HEADER = "ETag"
+
+
+def entity_tag(*versions: Any) -> str:
+    """
+    Weak ETag over whatever identifies a representation, e.g.
+    `(event.id, event.version)` for an event or those pairs of every item
+    for a page of events. Weak because it is not derived from the bytes.
+    """
+    digest = hashlib.blake2b(repr(versions).encode(), digest_size=12)
+    return f'W/"{digest.hexdigest()}"'
+
+
+def page_tag(page: Page, version: str) -> str:
+    """Tag of a page, from the `(id, <version>)` of its items and its cursor."""
+    return entity_tag(
+        [(item.id, getattr(item, version)) for item in page.items], page.next_cursor
+    )
+
+
+def _opaque(etag: str) -> str:
+    return etag.strip().removeprefix("W/")
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # If-None-Match uses the weak comparison
+    candidates: Iterable[str] = if_none_match.split(",")
+    return any(_opaque(candidate) == _opaque(etag) for candidate in candidates)
+
+
+def not_modified(
+    request: Request, response: Response, etag: str, private: bool = False
+) -> Response | None:
+    """
+    Tags `response` with `etag` and returns the bodiless 304 to send instead
+    when the client already holds that version. Clients and caches must
+    revalidate every time, and per-user data stays out of shared caches.
+    """
+    response.headers[ETAG_HEADER] = etag
+    response.headers["Cache-Control"] = "private, no-cache" if private else "no-cache"
+    if etag_matches(request.headers.get("If-None-Match"), etag):
+        return Response(status_code=304, headers=dict(response.headers))
+    return None
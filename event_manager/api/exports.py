@@ -0,0 +1,53 @@
+import enum
+from typing import Any, AsyncIterator, Callable, Sequence
+
+from fastapi.responses import StreamingResponse
+from sqlalchemy import Row
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
+
+from event_manager.api.responses import RowSerializer
+
+
+class ExportFormat(str, enum.Enum):
+    CSV = "csv"
+    # One JSON object per line
+    NDJSON = "ndjson"
+
+
+MEDIA_TYPES = {
+    ExportFormat.CSV: "text/csv; charset=utf-8",
+    ExportFormat.NDJSON: "application/x-ndjson",
+}
+
+
+def export_response(
+    session_factory: sessionmaker,
+    batches: Callable[[AsyncSession], AsyncIterator[Sequence[Row[Any]]]],
+    serializer: RowSerializer,
+    format: ExportFormat,
+    filename: str,
+) -> StreamingResponse:
+    """
+    Streams the rows `batches` reads from a session of its own, one chunk per
+    batch. The session lives as long as the body, and only one batch is in
+    memory at a time.
+    """
+
+    async def body() -> AsyncIterator[bytes]:
+        if format is ExportFormat.CSV:
+            yield serializer.csv_header()
+        async with session_factory() as session:
+            async for batch in batches(session):
+                if format is ExportFormat.CSV:
+                    yield serializer.dump_csv(batch)
+                else:
+                    yield serializer.dump_ndjson(batch)
+
+    return StreamingResponse(
+        body(),
+        media_type=MEDIA_TYPES[format],
+        headers={
+            "Content-Disposition": f'attachment; filename="{filename}.{format.value}"'
+        },
+    )
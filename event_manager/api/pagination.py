@@ -0,0 +1,10 @@
+from fastapi import Response
+
+from event_manager.dal.pagination import NEXT_CURSOR_HEADER, Page
+
+
+def set_next_cursor(response: Response, page: Page) -> None:
+    """List endpoints keep returning a plain JSON array; the cursor for the
+    next page travels in a response header."""
+    if page.next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = page.next_cursor
@@ -1,23 +1,47 @@
+from datetime import datetime
 from logging import getLogger
+from typing import Optional
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import load_only, sessionmaker
 
-from event_manager.core.database import with_session
+from event_manager.api.etag import entity_tag, not_modified, page_tag
+from event_manager.api.exports import ExportFormat, export_response
+from event_manager.api.pagination import set_next_cursor
+from event_manager.api.responses import RowSerializer
+from event_manager.core.config import settings
+from event_manager.core.database import (
+    get_read_session_factory,
+    with_read_session,
+)
 from event_manager.dal.booking import booking_manager
 from event_manager.dal.event import event_manager
+from event_manager.errors.all_errors import InvalidCursor
+from event_manager.models.event import Event
 from event_manager.schemas.booking import Booking
 
+# Columns calculate_total_cost reads
+PRICING_COLUMNS = load_only(
+    Event.available_tickets,
+    Event.base_price,
+    Event.surge_price,
+    Event.surge_threshold,
+    raiseload=True,
+)
+
+BOOKING_ROWS = RowSerializer(Booking)
+
 logger = getLogger(__name__)
 router = APIRouter()
 
 
 @router.get("/booking-total-cost")
 async def get_booking_total_cost(
-    event_id: int, quantity: int, db: AsyncSession = Depends(with_session)
+    event_id: int, quantity: int, db: AsyncSession = Depends(with_read_session)
 ) -> int:
     try:
-        event = await event_manager.get(db, event_id)
+        event = await event_manager.get(db, event_id, load=[PRICING_COLUMNS])
         if not event:
             raise RuntimeError(f"Event with id: {event_id} not found")
         return booking_manager.calculate_total_cost(event=event, quantity=quantity)
@@ -25,22 +49,63 @@ async def get_booking_total_cost(
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.get("/export")
+async def export_bookings(
+    format: ExportFormat = ExportFormat.CSV,
+    event_id: Optional[int] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    session_factory: sessionmaker = Depends(get_read_session_factory),
+):
+    where = booking_manager.export_filter(event_id, since, until)
+    return export_response(
+        session_factory,
+        lambda db: booking_manager.stream(
+            db, BOOKING_ROWS.columns, where, settings.EXPORT_BATCH_SIZE
+        ),
+        BOOKING_ROWS,
+        format,
+        filename="bookings",
+    )
+
+
 @router.get("/{booking_id}", response_model=Booking)
-async def read_booking(booking_id: int, db: AsyncSession = Depends(with_session)):
+async def read_booking(
+    booking_id: int,
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(with_read_session),
+):
     try:
         booking = await booking_manager.get(db, booking_id)
         if not booking:
             raise HTTPException(status_code=404, detail="Booking not found")
-        return booking
+        # The status is the only column that changes after the insert
+        etag = entity_tag(booking.id, booking.status)
+        return not_modified(request, response, etag, private=True) or booking
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @router.get("/", response_model=list[Booking])
 async def get_all_bookings(
-    skip: int = 0, limit: int = 10, db: AsyncSession = Depends(with_session)
+    request: Request,
+    response: Response,
+    cursor: Optional[str] = None,
+    skip: int = Query(0, deprecated=True),
+    limit: int = 10,
+    db: AsyncSession = Depends(with_read_session),
 ):
     try:
-        return await booking_manager.get_all(db, skip=skip, limit=limit)
+        page = await booking_manager.get_page(
+            db, cursor=cursor, limit=limit, skip=skip, columns=BOOKING_ROWS.columns
+        )
+    except InvalidCursor as e:
+        raise HTTPException(status_code=e.code, detail=e.message)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+    set_next_cursor(response, page)
+    etag = page_tag(page, "status")
+    if cached := not_modified(request, response, etag, private=True):
+        return cached
+    return BOOKING_ROWS.response(page.items, response)
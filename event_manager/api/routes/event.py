@@ -1,78 +1,189 @@
 from typing import Optional
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from event_manager.core.database import with_session
+from event_manager.api.etag import entity_tag, not_modified, page_tag
+from event_manager.api.pagination import set_next_cursor
+from event_manager.api.responses import RowSerializer
+from event_manager.bulk_import import get_event_importer
+from event_manager.bulk_import.importer import EventImporter, read_events
+from event_manager.core.database import (
+    pin_reads_to_primary,
+    with_read_session,
+    with_session,
+)
 from event_manager.dal.event import event_manager
-from event_manager.schemas.event import Event, EventCreate, EventUpdate
-
+from event_manager.errors.all_errors import (
+    InvalidCursor,
+    InvalidImportFile,
+    InvalidLocation,
+)
+from event_manager.geocoding import get_geocoder
+from event_manager.geocoding.abstract_geocoder import Geocoder
+from event_manager.schemas.event import (
+    Event,
+    EventCreate,
+    EventImportReport,
+    EventUpdate,
+    ImportFormat,
+)
+from event_manager.search import get_search_backend
+from event_manager.search.base import EventSearchBackend
+from event_manager.search.geo import parse_bbox, parse_near
+
+EVENT_ROWS = RowSerializer(Event)
+IMPORT_CONTENT_TYPES = {
+    "text/csv": ImportFormat.CSV,
+    "application/x-ndjson": ImportFormat.NDJSON,
+    "application/jsonl": ImportFormat.NDJSON,
+}
 router = APIRouter()
 
 
-@router.post("/", response_model=Event)
-async def create_event(event_in: EventCreate, db: AsyncSession = Depends(with_session)):
+def import_format(request: Request, format: ImportFormat | None) -> ImportFormat:
+    if format is not None:
+        return format
+    content_type = request.headers.get("content-type", "").split(";")[0].strip()
+    if content_type not in IMPORT_CONTENT_TYPES:
+        raise InvalidImportFile(
+            "Pass ?format=csv|ndjson or a text/csv or application/x-ndjson body"
+        )
+    return IMPORT_CONTENT_TYPES[content_type]
+
+
+@router.post("/", response_model=Event, dependencies=[Depends(pin_reads_to_primary)])
+async def create_event(
+    event_in: EventCreate,
+    db: AsyncSession = Depends(with_session),
+    search_backend: EventSearchBackend = Depends(get_search_backend),
+):
     try:
-        return await event_manager.create(db, event_in)
+        event = await event_manager.create(db, event_in)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    search_backend.index_event(event)
+    return event
+
+
+@router.post(
+    "/import",
+    response_model=EventImportReport,
+    dependencies=[Depends(pin_reads_to_primary)],
+)
+async def import_events(
+    request: Request,
+    format: Optional[ImportFormat] = None,
+    db: AsyncSession = Depends(with_session),
+    importer: EventImporter = Depends(get_event_importer),
+    search_backend: EventSearchBackend = Depends(get_search_backend),
+):
+    try:
+        rows = read_events(request.stream(), import_format(request, format))
+        return await importer.run(db, rows, search_backend)
+    except InvalidImportFile as e:
+        raise HTTPException(status_code=e.code, detail=e.message)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @router.get("/{event_id}", response_model=Event)
-async def read_event(event_id: int, db: AsyncSession = Depends(with_session)):
+async def read_event(
+    event_id: int,
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(with_read_session),
+):
     event = await event_manager.get(db, event_id)
     if not event:
         raise HTTPException(status_code=404, detail="Event not found")
-    return event
+    etag = entity_tag(event.id, event.version)
+    return not_modified(request, response, etag) or event
 
 
-@router.put("/{event_id}", response_model=Event)
+@router.put(
+    "/{event_id}", response_model=Event, dependencies=[Depends(pin_reads_to_primary)]
+)
 async def update_event(
     event_id: int,
     event_in: EventUpdate,
     db: AsyncSession = Depends(with_session),
+    search_backend: EventSearchBackend = Depends(get_search_backend),
 ):
     db_event = await event_manager.get(db, event_id)
     if not db_event:
         raise HTTPException(status_code=404, detail="Event not found")
     try:
-        return await event_manager.update(db, db_event, event_in)
+        event = await event_manager.update(db, db_event, event_in)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+    search_backend.index_event(event)
+    return event
 
 
-@router.delete("/{event_id}", response_model=None)
-async def delete_event(event_id: int, db: AsyncSession = Depends(with_session)):
+@router.delete(
+    "/{event_id}", response_model=None, dependencies=[Depends(pin_reads_to_primary)]
+)
+async def delete_event(
+    event_id: int,
+    db: AsyncSession = Depends(with_session),
+    search_backend: EventSearchBackend = Depends(get_search_backend),
+):
     try:
         await event_manager.remove(db, event_id)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+    search_backend.remove_event(event_id)
 
 
 @router.get("/", response_model=list[Event])
 async def get_all_events(
-    skip: int = 0, limit: int = 10, db: AsyncSession = Depends(with_session)
+    request: Request,
+    response: Response,
+    cursor: Optional[str] = None,
+    skip: int = Query(0, deprecated=True),
+    limit: int = 10,
+    db: AsyncSession = Depends(with_read_session),
 ):
     try:
-        return await event_manager.get_all(db, skip=skip, limit=limit)
+        page = await event_manager.get_page(
+            db,
+            cursor=cursor,
+            limit=limit,
+            skip=skip,
+            columns=[*EVENT_ROWS.columns, "version"],
+        )
+    except InvalidCursor as e:
+        raise HTTPException(status_code=e.code, detail=e.message)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+    set_next_cursor(response, page)
+    if cached := not_modified(request, response, page_tag(page, "version")):
+        return cached
+    return EVENT_ROWS.response(page.items, response)
 
 
 @router.get("/search/", response_model=list[Event])
 async def search_events(
+    request: Request,
+    response: Response,
+    q: Optional[str] = None,
     name: Optional[str] = None,
     date: Optional[str] = None,
     time: Optional[str] = None,
     venue: Optional[str] = None,
     location_lat: Optional[float] = None,
     location_long: Optional[float] = None,
-    skip: int = 0,
+    near: Optional[str] = Query(None, description="lat,long,radius_km"),
+    bbox: Optional[str] = Query(None, description="south,west,north,east"),
+    cursor: Optional[str] = None,
+    skip: int = Query(0, deprecated=True),
     limit: int = 10,
-    db: AsyncSession = Depends(with_session),
+    db: AsyncSession = Depends(with_read_session),
+    search_backend: EventSearchBackend = Depends(get_search_backend),
 ):
     try:
-        return await event_manager.search(
+        page = await event_manager.search(
             db,
             name=name,
             date=date,
@@ -82,15 +193,30 @@ async def search_events(
             location_long=location_long,
             skip=skip,
             limit=limit,
+            cursor=cursor,
+            q=q,
+            search_backend=search_backend,
+            near=parse_near(near) if near else None,
+            bbox=parse_bbox(bbox) if bbox else None,
         )
+    except (InvalidCursor, InvalidLocation) as e:
+        raise HTTPException(status_code=e.code, detail=e.message)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+    set_next_cursor(response, page)
+    if cached := not_modified(request, response, page_tag(page, "version")):
+        return cached
+    return EVENT_ROWS.response(page.items, response)
 
 
 @router.get("/events/{event_id}/map", response_model=str)
-async def get_event_map(event_id: int, db: AsyncSession = Depends(with_session)):
+async def get_event_map(
+    event_id: int,
+    db: AsyncSession = Depends(with_session),
+    geocoder: Geocoder = Depends(get_geocoder),
+):
     try:
-        return await event_manager.get_event_location_map(event_id, db)
+        return await event_manager.get_event_location_map(event_id, db, geocoder)
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
     except Exception as e:
@@ -0,0 +1,12 @@
+from fastapi import APIRouter, Depends
+from fastapi.responses import PlainTextResponse
+
+from event_manager.metrics import get_registry
+from event_manager.metrics.registry import Registry
+
+router = APIRouter()
+
+
+@router.get("/metrics", include_in_schema=False)
+async def metrics(registry: Registry = Depends(get_registry)):
+    return PlainTextResponse(registry.render(), media_type=registry.content_type)
@@ -1,109 +1,338 @@
+import uuid
+from datetime import datetime, timedelta
 from logging import getLogger
+from typing import Optional
 
-import stripe
-from fastapi import APIRouter, Depends, HTTPException, Request
+import pytz
+from fastapi import (
+    APIRouter,
+    BackgroundTasks,
+    Depends,
+    HTTPException,
+    Query,
+    Request,
+    Response,
+)
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import load_only, sessionmaker
 
+from event_manager.api.etag import entity_tag, not_modified, page_tag
+from event_manager.api.exports import ExportFormat, export_response
+from event_manager.api.pagination import set_next_cursor
+from event_manager.api.responses import RowSerializer
 from event_manager.core.config import settings
-from event_manager.core.database import with_session
+from event_manager.core.database import (
+    get_read_session_factory,
+    pin_reads_to_primary,
+    with_read_session,
+    with_session,
+)
 from event_manager.dal.booking import booking_manager
 from event_manager.dal.event import event_manager
 from event_manager.dal.payment import payment_manager
+from event_manager.dal.payment_outbox import payment_outbox_manager
 from event_manager.dal.user import user_manager
-from event_manager.errors.all_errors import ResourceNotFound
+from event_manager.dal.webhook_inbox import webhook_inbox_manager
+from event_manager.errors.all_errors import (
+    IdempotencyKeyReused,
+    IdempotentRequestInProgress,
+    InvalidCursor,
+    InvalidWebhook,
+    ReservationExpired,
+    ResourceNotFound,
+)
+from event_manager.idempotency import get_idempotency_store
+from event_manager.idempotency.store import (
+    IdempotencyStore,
+    StoredResponse,
+    request_fingerprint,
+)
+from event_manager.inventory import get_inventory_engine
+from event_manager.inventory.sharded_inventory import InventoryEngine
+from event_manager.models.booking import Booking, BookingStatus
 from event_manager.models.payment import PaymentStatus
-from event_manager.payment_gateway import get_idempotency_key, get_payment_gateway
+from event_manager.models.payment_outbox import OutboxStatus
+from event_manager.models.user import User
+from event_manager.payment_gateway import (
+    get_idempotency_key,
+    get_outbox_dispatcher,
+    get_payment_gateway,
+    get_webhook_inbox_worker,
+)
 from event_manager.payment_gateway.abstract_payment_gateway import PaymentGateway
-from event_manager.schemas.booking import BookingCreate
-from event_manager.schemas.payment import Payment, PaymentCreate
+from event_manager.payment_gateway.outbox import PaymentOutboxDispatcher
+from event_manager.payment_gateway.webhooks import WebhookInboxWorker
+from event_manager.schemas.booking import BookingCreate, BookingHold, BookingStrategy
+from event_manager.schemas.payment import (
+    Payment,
+    PaymentIntentStatus,
+    PaymentOutboxCreate,
+)
+
+PAYMENT_ROWS = RowSerializer(Payment)
 
 logger = getLogger(__name__)
 router = APIRouter()
 
 
+@router.get("/export")
+async def export_payments(
+    format: ExportFormat = ExportFormat.CSV,
+    event_id: Optional[int] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    session_factory: sessionmaker = Depends(get_read_session_factory),
+):
+    where = payment_manager.export_filter(event_id, since, until)
+    return export_response(
+        session_factory,
+        lambda db: payment_manager.stream(
+            db, PAYMENT_ROWS.columns, where, settings.EXPORT_BATCH_SIZE
+        ),
+        PAYMENT_ROWS,
+        format,
+        filename="payments",
+    )
+
+
 @router.get("/{payment_id}", response_model=Payment)
-async def read_payment(payment_id: int, db: AsyncSession = Depends(with_session)):
+async def read_payment(
+    payment_id: int,
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(with_read_session),
+):
     try:
         payment = await payment_manager.get(db, payment_id)
         if not payment:
             raise HTTPException(status_code=404, detail="Payment not found")
-        return payment
+        # Only the status changes once the payment is recorded
+        etag = entity_tag(payment.id, payment.status)
+        return not_modified(request, response, etag, private=True) or payment
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @router.get("/", response_model=list[Payment])
 async def get_all_payments(
-    skip: int = 0, limit: int = 10, db: AsyncSession = Depends(with_session)
+    request: Request,
+    response: Response,
+    cursor: Optional[str] = None,
+    skip: int = Query(0, deprecated=True),
+    limit: int = 10,
+    db: AsyncSession = Depends(with_read_session),
 ):
     try:
-        return await payment_manager.get_all(db, skip=skip, limit=limit)
+        page = await payment_manager.get_page(
+            db, cursor=cursor, limit=limit, skip=skip, columns=PAYMENT_ROWS.columns
+        )
+    except InvalidCursor as e:
+        raise HTTPException(status_code=e.code, detail=e.message)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+    set_next_cursor(response, page)
+    etag = page_tag(page, "status")
+    if cached := not_modified(request, response, etag, private=True):
+        return cached
+    return PAYMENT_ROWS.response(page.items, response)
 
 
-@router.post("/book_and_pay", response_model=dict)
-async def book_and_pay(
-    booking_in: BookingCreate,
-    optimistic: bool,
-    db: AsyncSession = Depends(with_session),
-    payment_gateway: PaymentGateway = Depends(get_payment_gateway),
-    idempotency_key: str = Depends(get_idempotency_key),
-):
+async def _create_booking(
+    db: AsyncSession, booking_in: BookingCreate, strategy: BookingStrategy
+) -> Booking:
+    if strategy == BookingStrategy.ATOMIC:
+        logger.debug("Atomic booking for event %s", booking_in.event_id)
+        return await booking_manager.create_booking_atomic(db, booking_in)
+
+    if strategy == BookingStrategy.OPTIMISTIC:
+        logger.debug("Optimistic booking for event %s", booking_in.event_id)
+        event = await event_manager.get(db, booking_in.event_id)
+        if not event:
+            raise RuntimeError(f"Event with id: {booking_in.event_id} not found")
+        return await booking_manager.create_booking_optimistic(db, booking_in, event)
+
+    logger.debug("Pessimistic booking for event %s", booking_in.event_id)
+    event = await event_manager.get_pessimistic_event(booking_in.event_id, db)
+    if not event:
+        raise RuntimeError(f"Event with id: {booking_in.event_id} not found")
+    return await booking_manager.create_booking_pessimistic(db, booking_in, event)
+
+
+def _legacy_strategy(optimistic: bool) -> BookingStrategy:
+    # Callers predating `strategy` pick with the `optimistic` flag
+    return BookingStrategy.OPTIMISTIC if optimistic else BookingStrategy.PESSIMISTIC
+
 
+async def _book_and_enqueue(
+    db: AsyncSession,
+    hold: BookingHold,
+    strategy: BookingStrategy,
+    inventory_engine: InventoryEngine,
+    idempotency_key: str,
+) -> Booking:
+    allotment_id = None
     try:
-        user = await user_manager.get(db, booking_in.user_id)
+        user = await user_manager.get(
+            db, hold.user_id, load=[load_only(User.id, raiseload=True)]
+        )
         if not user:
-            raise RuntimeError(f"User with id: {booking_in.user_id} not found")
-        if optimistic:
-            logger.info("OPtimistic Booking!!")
-            event = await event_manager.get(db, booking_in.event_id)
-            if not event:
-                raise RuntimeError(f"Event with id: {booking_in.event_id} not found")
-            db_booking = await booking_manager.create_booking_optimistic(
-                db, booking_in, event
+            raise RuntimeError(f"User with id: {hold.user_id} not found")
+        allotment_id = await inventory_engine.reserve(hold.event_id, hold.quantity)
+        if allotment_id is not None:
+            logger.debug("Sharded booking for event %s", hold.event_id)
+            db_booking = await booking_manager.create_booking_reserved(
+                db, hold, allotment_id
             )
         else:
-            logger.info("Pessimistic Booking!!")
-            event = await event_manager.get_pessimistic_event(booking_in.event_id, db)
-            if not event:
-                raise RuntimeError(f"Event with id: {booking_in.event_id} not found")
-            db_booking = await booking_manager.create_booking_pessimistic(
-                db, booking_in, event
-            )
+            db_booking = await _create_booking(db, hold, strategy)
 
-        logger.info(
-            f"COST {int(db_booking.total_cost)}",
-        )
-        payment_intent = payment_gateway.create_payment_intent(
-            amount=int(db_booking.total_cost),
-            metadata={"booking_id": db_booking.id},
-            idempotency_key=idempotency_key,
+        await payment_outbox_manager.enqueue(
+            db,
+            PaymentOutboxCreate(
+                booking_id=db_booking.id,
+                amount=db_booking.total_cost,
+                idempotency_key=idempotency_key,
+            ),
         )
+        return db_booking
+    except BaseException:
+        if allotment_id is not None:
+            await inventory_engine.release(hold.event_id, hold.quantity, allotment_id)
+        raise
+
+
+async def _replay(
+    request: Request, idempotency: IdempotencyStore, idempotency_key: str
+) -> tuple[str, Response | None]:
+    fingerprint = request_fingerprint(
+        request.method,
+        f"{request.url.path}?{request.url.query}",
+        await request.body(),
+    )
+    try:
+        stored = await idempotency.begin(idempotency_key, fingerprint)
+    except (IdempotencyKeyReused, IdempotentRequestInProgress) as e:
+        raise HTTPException(status_code=e.code, detail=e.message)
+    if stored is None:
+        return fingerprint, None
+    return fingerprint, JSONResponse(stored.body, status_code=stored.status_code)
 
-        payment_data = PaymentCreate(
-            booking_id=db_booking.id,
-            transaction_id=payment_intent["id"],
-            amount=db_booking.total_cost,
-            status=PaymentStatus.PENDING,
-            payment_time=booking_in.booking_time,
-            idempotency_key=idempotency_key,
+
+@router.post(
+    "/book_and_pay",
+    response_model=PaymentIntentStatus,
+    dependencies=[Depends(pin_reads_to_primary)],
+)
+async def book_and_pay(
+    request: Request,
+    booking_in: BookingCreate,
+    optimistic: bool = False,
+    strategy: BookingStrategy | None = None,
+    db: AsyncSession = Depends(with_session),
+    idempotency_key: str | None = Depends(get_idempotency_key),
+    idempotency: IdempotencyStore = Depends(get_idempotency_store),
+    inventory_engine: InventoryEngine = Depends(get_inventory_engine),
+    dispatcher: PaymentOutboxDispatcher = Depends(get_outbox_dispatcher),
+):
+    """
+    Books the tickets and queues the payment intent in the same transaction.
+    The intent is created by the outbox dispatcher once this commits, so no
+    provider call happens while the event row is locked; poll
+    `/payments/intents/{booking_id}` for the client secret. The tickets are
+    only held for `BOOKING_HOLD_TTL` seconds unless the payment succeeds.
+
+    Retries that send the same `Idempotency-Key` header get the first
+    response back without booking again; retries racing the first request
+    wait for it.
+    """
+    strategy = strategy or _legacy_strategy(optimistic)
+    hold = BookingHold(
+        **booking_in.model_dump(),
+        expires_at=datetime.now(pytz.UTC)
+        + timedelta(seconds=settings.BOOKING_HOLD_TTL),
+    )
+    fingerprint = None
+    if idempotency_key is not None:
+        fingerprint, replay = await _replay(request, idempotency, idempotency_key)
+        if replay is not None:
+            return replay
+    committed = False
+    try:
+        db_booking = await _book_and_enqueue(
+            db,
+            hold,
+            strategy,
+            inventory_engine,
+            # Without the header there is no replay protection, but the
+            # provider still gets a key
+            idempotency_key or str(uuid.uuid4()),
         )
-        await payment_manager.create(db, payment_data)
-        logger.info(f"Payment Intent --> {payment_intent}")
-        return {
-            "payment_intent_id": payment_intent["id"],
-            "client_secret": payment_intent["client_secret"],
-        }
-    except Exception as e:
-        logger.exception(f"Error creating PaymentIntent: {e}")
+        result = PaymentIntentStatus(
+            booking_id=db_booking.id, status=OutboxStatus.PENDING
+        )
+        stored = StoredResponse(status_code=200, body=jsonable_encoder(result))
+        if fingerprint:
+            await idempotency.save(db, idempotency_key, stored)
+        # Committed here rather than by with_session, so that a failing
+        # commit still gives the idempotency key up
+        await db.commit()
+        committed = True
+    except Exception:
+        logger.exception("Error booking tickets")
         raise HTTPException(status_code=500, detail="Failed to create payment intent")
+    finally:
+        # Also when cancelled, e.g. by a client disconnect, or retries get
+        # 409 until the claim times out. Rolled back first: the saved
+        # response holds the key's row lock the release needs
+        if fingerprint and not committed:
+            await db.rollback()
+            await idempotency.release(idempotency_key)
+    dispatcher.notify()
+    if fingerprint:
+        idempotency.finish(idempotency_key, fingerprint, stored)
+    return result
 
 
-@router.post("/success")
+@router.get("/intents/{booking_id}", response_model=PaymentIntentStatus)
+async def read_payment_intent(
+    booking_id: int,
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(with_session),
+):
+    outbox = await payment_outbox_manager.get_by_booking(db, booking_id)
+    if not outbox:
+        raise HTTPException(status_code=404, detail="Payment intent not found")
+    # Clients poll this until the dispatcher has created the intent
+    etag = entity_tag(outbox.booking_id, outbox.status, outbox.transaction_id)
+    if cached := not_modified(request, response, etag, private=True):
+        return cached
+    return PaymentIntentStatus(
+        booking_id=outbox.booking_id,
+        status=outbox.status,
+        payment_intent_id=outbox.transaction_id,
+        client_secret=outbox.client_secret,
+    )
+
+
+async def _confirm_hold(db: AsyncSession, booking_id: int) -> None:
+    if await booking_manager.end_hold(db, booking_id, BookingStatus.CONFIRMED):
+        return
+    booking = await booking_manager.get(
+        db, booking_id, load=[load_only(Booking.status, raiseload=True)]
+    )
+    if booking.status == BookingStatus.RELEASED:
+        # The sweeper already gave the tickets to someone else
+        raise ReservationExpired
+
+
+@router.post("/success", dependencies=[Depends(pin_reads_to_primary)])
 async def payment_success(
     payment_intent_id: str,
     db: AsyncSession = Depends(with_session),
+    payment_gateway: PaymentGateway = Depends(get_payment_gateway),
 ):
     try:
         payment = await payment_manager.get_payment_by_transaction_id(
@@ -116,20 +345,26 @@ async def payment_success(
         if payment.status == PaymentStatus.COMPLETED:
             return {"status": "success"}
 
-        stripe.PaymentIntent.confirm(
+        # The booking row stays locked until the confirmation commits, so the
+        # sweeper skips it instead of expiring it mid-payment
+        await _confirm_hold(db, payment.booking_id)
+        await payment_gateway.confirm_payment_intent(
             payment_intent_id,
             payment_method="pm_card_visa",
         )
         return {"status": "success"}
-    except Exception as e:
-        logger.exception(f"Error confirming PaymentIntent: {e}")
+    except ReservationExpired as e:
+        raise HTTPException(status_code=e.code, detail=e.message)
+    except Exception:
+        logger.exception("Error confirming PaymentIntent %s", payment_intent_id)
         raise HTTPException(status_code=500, detail="Failed to confirm payment intent")
 
 
-@router.post("/failure")
+@router.post("/failure", dependencies=[Depends(pin_reads_to_primary)])
 async def payment_failure(
     payment_intent_id: str,
     db: AsyncSession = Depends(with_session),
+    payment_gateway: PaymentGateway = Depends(get_payment_gateway),
 ):
     try:
         payment = await payment_manager.get_payment_by_transaction_id(
@@ -142,42 +377,40 @@ async def payment_failure(
         if payment.status == PaymentStatus.FAILED:
             return {"status": "failure"}
 
-        stripe.PaymentIntent.cancel(payment_intent_id)
-        await event_manager.update_event_after_payment_failure(
-            event_id=payment.booking.event_id,
-            db=db,
-            booking_quantity=payment.booking.quantity,
+        await payment_gateway.cancel_payment_intent(payment_intent_id)
+        held = await booking_manager.end_hold(
+            db, payment.booking_id, BookingStatus.RELEASED
         )
+        if held:
+            await event_manager.release_tickets(db, held.event_id, held.quantity)
         return {"status": "failure"}
-    except Exception as e:
-        logger.exception(f"Error failing PaymentIntent: {e}")
+    except Exception:
+        logger.exception("Error failing PaymentIntent %s", payment_intent_id)
         raise HTTPException(status_code=500, detail="Failed to fail payment intent")
 
 
 @router.post("/webhook")
 async def stripe_webhook(
     request: Request,
+    background_tasks: BackgroundTasks,
     db: AsyncSession = Depends(with_session),
     payment_gateway: PaymentGateway = Depends(get_payment_gateway),
+    inbox_worker: WebhookInboxWorker = Depends(get_webhook_inbox_worker),
 ):
+    """
+    Acknowledges as soon as the event is stored; the inbox worker applies it.
+    Redelivered events hit the unique event id and are dropped.
+    """
     payload = await request.body()
-    # logger.info(f"webhook payload --> {payload}")
-    sig_header = request.headers.get("stripe-signature")
-    logger.info(f"webhook sig_header --> {sig_header}")
-
     try:
-        event = stripe.Webhook.construct_event(
-            payload, sig_header, settings.STRIPE_WEBHOOK_SECRET
+        event = payment_gateway.parse_webhook_event(
+            payload, request.headers.get("stripe-signature")
         )
-        logger.info(f"webhook event --> {event}")
-    except ValueError as e:
-        logger.exception(f"Invalid payload: {e}")
-        raise HTTPException(status_code=400, detail="Invalid payload")
-    except stripe.exception.SignatureVerificationError as e:
-        logger.exception(f"Invalid signature: {e}")
-        raise HTTPException(status_code=400, detail="Invalid signature")
-
-    logger.info("Handling webhook event...")
-    await payment_gateway.handle_webhook_event(event, db)
-    logger.info("RETURNING!!!")
+    except InvalidWebhook as e:
+        logger.warning("Rejected webhook: %s", e.message)
+        raise HTTPException(status_code=e.code, detail=e.message)
+
+    if await webhook_inbox_manager.record(db, event):
+        background_tasks.add_task(inbox_worker.notify)
+    logger.debug("Webhook %s (%s) stored", event.event_id, event.event_type)
     return {"status": "success"}
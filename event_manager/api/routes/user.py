@@ -1,12 +1,14 @@
 from logging import getLogger
 from typing import Optional
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from event_manager.api.pagination import set_next_cursor
 from event_manager.core.database import with_session
 from event_manager.dal.company import company_manager
 from event_manager.dal.user import user_manager
+from event_manager.errors.all_errors import InvalidCursor
 from event_manager.keycloak.permission_definitions import Roles
 from event_manager.models.company import Company
 from event_manager.schemas.company import CompanyCreate
@@ -40,19 +42,19 @@ async def create_user(
         # )
         # logger.info(f"KEYCLOAK ID --> {keycloak_user_id}")
         company = await company_manager.create(db, company_in)
-        logger.info(f"COMPANY CREATED --> {company.id}")
+        logger.info("Company %s created", company.id)
         # Store Keycloak user_id in the local database
         # user_in.keycloak_id = keycloak_user_id
         user_in.company_id = company.id
         new_user = await user_manager.create(db, user_in)
         return new_user
     except Exception as e:
-        logger.info("Error while creating the user!!!")
+        logger.exception("Error while creating the user")
         if keycloak_user_id:
-            logger.info("DELETING KEYCLOAK USER!!")
+            logger.info("Deleting Keycloak user %s", keycloak_user_id)
             # await delete_keycloak_user(keycloak_user_id)
         if company:
-            logger.info(f"DELETING THE COMPANY!! --> {company.name}")
+            logger.info("Deleting company %s", company.id)
             await company_manager.remove(db, company.id)
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -103,9 +105,17 @@ async def delete_user(user_id: int, db: AsyncSession = Depends(with_session)):
 
 @router.get("/", response_model=list[User])
 async def get_all_users(
-    skip: int = 0, limit: int = 10, db: AsyncSession = Depends(with_session)
+    response: Response,
+    cursor: Optional[str] = None,
+    skip: int = Query(0, deprecated=True),
+    limit: int = 10,
+    db: AsyncSession = Depends(with_session),
 ):
     try:
-        return await user_manager.get_all(db, skip=skip, limit=limit)
+        page = await user_manager.get_page(db, cursor=cursor, limit=limit, skip=skip)
+    except InvalidCursor as e:
+        raise HTTPException(status_code=e.code, detail=e.message)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+    set_next_cursor(response, page)
+    return page.items
@@ -0,0 +1,11 @@
+from event_manager.bulk_import.importer import EventImporter
+from event_manager.core.config import settings
+
+event_importer = EventImporter(
+    chunk_size=settings.EVENT_IMPORT_CHUNK_SIZE,
+    max_errors=settings.EVENT_IMPORT_MAX_ERRORS,
+)
+
+
+def get_event_importer() -> EventImporter:
+    return event_importer
@@ -0,0 +1,50 @@
+"""
+Create or update events from a CSV or NDJSON file, in one transaction.
+
+    python -m event_manager.bulk_import events.csv
+    python -m event_manager.bulk_import events.jsonl --format ndjson
+
+The format defaults to the file extension. The report is printed as JSON;
+the exit status is 1 when any row failed, which does not stop the valid
+rows from being imported.
+"""
+
+import argparse
+import asyncio
+import sys
+from pathlib import Path
+from typing import AsyncIterator
+
+from event_manager.bulk_import import event_importer
+from event_manager.bulk_import.importer import read_events
+from event_manager.core.database import sessionmaker_instance
+from event_manager.schemas.event import ImportFormat
+
+BLOCK_SIZE = 1 << 16
+
+
+async def read_blocks(path: Path) -> AsyncIterator[bytes]:
+    with path.open("rb") as file:
+        while block := await asyncio.to_thread(file.read, BLOCK_SIZE):
+            yield block
+
+
+async def main(args) -> int:
+    format = args.format
+    if format is None:
+        is_csv = args.file.suffix.lower() == ".csv"
+        format = ImportFormat.CSV if is_csv else ImportFormat.NDJSON
+    async with sessionmaker_instance() as session:
+        report = await event_importer.run(
+            session, read_events(read_blocks(args.file), format)
+        )
+        await session.commit()
+    print(report.model_dump_json(indent=2))
+    return 1 if report.failed else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("file", type=Path)
+    parser.add_argument("--format", type=ImportFormat, help="csv or ndjson")
+    sys.exit(asyncio.run(main(parser.parse_args())))
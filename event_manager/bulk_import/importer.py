@@ -0,0 +1,85 @@
+from typing import AsyncIterable, AsyncIterator
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from event_manager.bulk_import.readers import ImportRow, read_csv, read_ndjson
+from event_manager.dal.event import IMPORT_COLUMNS, event_manager
+from event_manager.schemas.event import (
+    EventImportError,
+    EventImportReport,
+    ImportFormat,
+)
+from event_manager.search.base import EventSearchBackend
+
+readers = {
+    ImportFormat.CSV: read_csv,
+    ImportFormat.NDJSON: read_ndjson,
+}
+
+
+def read_events(
+    chunks: AsyncIterable[bytes], format: ImportFormat
+) -> AsyncIterator[ImportRow]:
+    return readers[format](chunks)
+
+
+class EventImporter:
+    """
+    Creates or updates events from a stream of parsed rows.
+
+    Valid rows are COPYed into a staging table and merged into events
+    `chunk_size` at a time, so memory stays flat however large the file.
+    Everything runs in the caller's transaction: nothing is visible until
+    it commits, and a failure rolls the whole import back.
+    """
+
+    def __init__(self, chunk_size: int, max_errors: int):
+        self.chunk_size = chunk_size
+        self.max_errors = max_errors
+
+    async def _merge(
+        self,
+        db: AsyncSession,
+        chunk: list[tuple],
+        report: EventImportReport,
+        search_backend: EventSearchBackend | None,
+    ) -> None:
+        await event_manager.stage_import(db, chunk)
+        for row in await event_manager.merge_import(db):
+            if row.inserted:
+                report.inserted += 1
+            else:
+                report.updated += 1
+            if search_backend is not None:
+                search_backend.index_event(row)
+        chunk.clear()
+
+    def _fail(self, report: EventImportReport, line: int, errors: list[str]) -> None:
+        report.failed += 1
+        if len(report.errors) < self.max_errors:
+            report.errors.append(EventImportError(line=line, errors=errors))
+        else:
+            report.errors_truncated = True
+
+    async def run(
+        self,
+        db: AsyncSession,
+        rows: AsyncIterable[ImportRow],
+        search_backend: EventSearchBackend | None = None,
+    ) -> EventImportReport:
+        report = EventImportReport()
+        chunk: list[tuple] = []
+        async for line, event in rows:
+            report.rows += 1
+            if isinstance(event, list):
+                self._fail(report, line, event)
+                continue
+            chunk.append((line, *(getattr(event, c) for c in IMPORT_COLUMNS)))
+            if len(chunk) >= self.chunk_size:
+                await self._merge(db, chunk, report, search_backend)
+        if chunk:
+            await self._merge(db, chunk, report, search_backend)
+        report.unchanged = (
+            report.rows - report.failed - report.inserted - report.updated
+        )
+        return report
@@ -0,0 +1,81 @@
+import codecs
+import csv
+from typing import AsyncIterable, AsyncIterator, Callable
+
+from pydantic import ValidationError
+
+from event_manager.schemas.event import EventCreate
+
+# Each reader yields `(line, event)`, or `(line, errors)` for rows that do
+# not parse or validate, `line` being where the row starts in the file
+ImportRow = tuple[int, EventCreate | list[str]]
+
+
+def describe(e: ValidationError) -> list[str]:
+    return [
+        (
+            f"{'.'.join(map(str, error['loc']))}: {error['msg']}"
+            if error["loc"]
+            else error["msg"]
+        )
+        for error in e.errors(include_url=False)
+    ]
+
+
+def validate(parse: Callable[[], EventCreate]) -> EventCreate | list[str]:
+    try:
+        return parse()
+    except ValidationError as e:
+        return describe(e)
+
+
+async def read_lines(chunks: AsyncIterable[bytes]) -> AsyncIterator[tuple[int, str]]:
+    """Numbered lines of a UTF-8 byte stream, whatever the chunk boundaries."""
+    decoder = codecs.getincrementaldecoder("utf-8-sig")(errors="replace")
+    number, pending = 0, ""
+    async for chunk in chunks:
+        *lines, pending = (pending + decoder.decode(chunk)).split("\n")
+        for line in lines:
+            number += 1
+            yield number, line.removesuffix("\r")
+    pending += decoder.decode(b"", final=True)
+    if pending:
+        yield number + 1, pending.removesuffix("\r")
+
+
+async def read_csv(chunks: AsyncIterable[bytes]) -> AsyncIterator[ImportRow]:
+    """
+    Rows of a CSV file whose header names EventCreate fields. Empty cells
+    fall back to the field defaults. Quoted cells may span lines: a record
+    ends on the first line that leaves an even number of quotes.
+    """
+    header: list[str] | None = None
+    record: list[str] = []
+    quotes = start = 0
+    async for number, line in read_lines(chunks):
+        if not record:
+            start = number
+        record.append(line)
+        quotes += line.count('"')
+        if quotes % 2:
+            continue
+        values = next(csv.reader(["\n".join(record)]), [])
+        record, quotes = [], 0
+        if not any(values):
+            continue
+        if header is None:
+            header = [name.strip() for name in values]
+        elif len(values) != len(header):
+            yield start, [f"expected {len(header)} fields, got {len(values)}"]
+        else:
+            fields = {name: value for name, value in zip(header, values) if value}
+            yield start, validate(lambda: EventCreate.model_validate_strings(fields))
+    if record:
+        yield start, ["unterminated quoted field"]
+
+
+async def read_ndjson(chunks: AsyncIterable[bytes]) -> AsyncIterator[ImportRow]:
+    """Rows of a file with one JSON object per line; blank lines are skipped."""
+    async for number, line in read_lines(chunks):
+        if line.strip():
+            yield number, validate(lambda: EventCreate.model_validate_json(line))
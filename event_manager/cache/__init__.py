@@ -0,0 +1,33 @@
+from event_manager.cache.base import CacheBackend
+from event_manager.cache.entity_cache import EntityCache
+from event_manager.cache.listener import CacheInvalidationListener
+from event_manager.cache.memory import InMemoryCacheBackend
+from event_manager.core.config import settings
+from event_manager.core.database import sessionmaker_instance
+
+cache_backend: CacheBackend = InMemoryCacheBackend(max_size=settings.ENTITY_CACHE_SIZE)
+# Table name -> cache, for the models listed in ENTITY_CACHE_TTL
+entity_caches: dict[str, EntityCache] = {}
+
+invalidation_listener = CacheInvalidationListener(
+    engine=sessionmaker_instance.kw["bind"],
+    backend=cache_backend,
+    channel=settings.ENTITY_CACHE_CHANNEL,
+    caches=entity_caches,
+)
+
+
+def entity_cache_for(model: type) -> EntityCache | None:
+    """The cache of `model`, or None when caching is not enabled for it."""
+    ttl = settings.ENTITY_CACHE_TTL.get(model.__tablename__)
+    if ttl is None:
+        return None
+    cache = EntityCache(
+        model,
+        backend=cache_backend,
+        ttl=ttl,
+        negative_ttl=settings.ENTITY_CACHE_NEGATIVE_TTL,
+        channel=settings.ENTITY_CACHE_CHANNEL,
+    )
+    entity_caches[cache.namespace] = cache
+    return cache
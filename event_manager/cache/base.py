@@ -0,0 +1,26 @@
+from abc import ABC, abstractmethod
+from typing import Any, Iterable
+
+
+class CacheBackend(ABC):
+    """
+    Key/value store behind EntityCache. Values are plain dicts of column
+    values, or None for rows known not to exist, so a shared out-of-process
+    store can be swapped in for the in-memory one.
+    """
+
+    @abstractmethod
+    async def get(self, key: str) -> tuple[bool, Any]:
+        """Returns `(found, value)`; a cached None is found."""
+
+    @abstractmethod
+    async def set(self, key: str, value: Any, ttl: float) -> None:
+        """Stores `value` under `key` for `ttl` seconds."""
+
+    @abstractmethod
+    async def delete(self, keys: Iterable[str]) -> None:
+        """Drops `keys`, ignoring those not cached."""
+
+    @abstractmethod
+    async def clear(self) -> None:
+        """Drops every key."""
@@ -0,0 +1,106 @@
+from typing import Any, Iterable, Iterator
+
+from sqlalchemy import event, func, inspect, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, make_transient_to_detached
+
+from event_manager.cache.base import CacheBackend
+
+# session.info key of the {EntityCache: ids} written by the transaction
+PENDING_INVALIDATIONS = "entity_cache_invalidations"
+# NOTIFY payloads are capped at 8000 bytes
+IDS_PER_NOTIFICATION = 500
+
+
+class EntityCache:
+    """
+    Read-through cache of the rows of one model, keyed by primary key.
+
+    Rows are kept as dicts of their column values for `ttl` seconds and
+    rows found missing for `negative_ttl`. Hits are merged into the caller's
+    session without a query, so they can be updated like any loaded row.
+
+    Writers call `invalidate()` in their transaction: the ids are dropped
+    here at once, skip the cache for the rest of that transaction, and are
+    published on `channel` with pg_notify when it commits. Postgres only
+    delivers notifications of committed transactions, so the
+    CacheInvalidationListener of every worker drops them then. A miss read
+    just before another worker's commit can still cache the old row, `ttl`
+    bounds for how long.
+    """
+
+    def __init__(
+        self,
+        model: type,
+        backend: CacheBackend,
+        ttl: float,
+        negative_ttl: float,
+        channel: str,
+    ):
+        self.model = model
+        self.backend = backend
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.channel = channel
+        self.namespace = model.__tablename__
+        self._columns = [attr.key for attr in inspect(model).column_attrs]
+
+    def _key(self, id: int) -> str:
+        return f"{self.namespace}:{id}"
+
+    def is_pending(self, db: AsyncSession, id: int) -> bool:
+        return id in db.info.get(PENDING_INVALIDATIONS, {}).get(self, ())
+
+    async def get(self, db: AsyncSession, id: int) -> tuple[bool, Any | None]:
+        """Returns `(found, row)`, the row being attached to `db`."""
+        found, values = await self.backend.get(self._key(id))
+        if not found or values is None:
+            return found, None
+        db_obj = self.model(**values)
+        make_transient_to_detached(db_obj)
+        return True, await db.merge(db_obj, load=False)
+
+    async def put(self, id: int, db_obj: Any | None) -> None:
+        if db_obj is None:
+            await self.backend.set(self._key(id), None, self.negative_ttl)
+            return
+        loaded = inspect(db_obj).dict
+        # Partially loaded rows, e.g. already in the session through
+        # load_only, would be cached with holes
+        if all(column in loaded for column in self._columns):
+            values = {column: loaded[column] for column in self._columns}
+            await self.backend.set(self._key(id), values, self.ttl)
+
+    async def discard(self, ids: Iterable[int]) -> None:
+        await self.backend.delete(self._key(id) for id in ids)
+
+    async def invalidate(self, db: AsyncSession, ids: Iterable[int]) -> None:
+        ids = set(ids)
+        await self.discard(ids)
+        db.info.setdefault(PENDING_INVALIDATIONS, {}).setdefault(self, set()).update(
+            ids
+        )
+
+    def payloads(self, ids: Iterable[int]) -> Iterator[str]:
+        ids = sorted(ids)
+        for start in range(0, len(ids), IDS_PER_NOTIFICATION):
+            chunk = ids[start : start + IDS_PER_NOTIFICATION]
+            yield f"{self.namespace}:{','.join(map(str, chunk))}"
+
+
+@event.listens_for(Session, "before_commit")
+def _publish_invalidations(session: Session) -> None:
+    # One statement per commit, whatever the number of writes
+    pending: dict[EntityCache, set[int]] = session.info.pop(PENDING_INVALIDATIONS, {})
+    notifications = [
+        func.pg_notify(cache.channel, payload)
+        for cache, ids in pending.items()
+        for payload in cache.payloads(ids)
+    ]
+    if notifications:
+        session.execute(select(*notifications))
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_invalidations(session: Session) -> None:
+    session.info.pop(PENDING_INVALIDATIONS, None)
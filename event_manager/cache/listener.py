@@ -0,0 +1,71 @@
+import asyncio
+from logging import getLogger
+from typing import Any
+
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from event_manager.cache.base import CacheBackend
+from event_manager.cache.entity_cache import EntityCache
+
+logger = getLogger(__name__)
+
+
+class CacheInvalidationListener:
+    """
+    LISTENs on `channel` and drops the ids published by the EntityCaches of
+    any worker, this one included, from the local caches. Holds one pooled
+    connection for as long as it runs.
+
+    Notifications sent while the connection is down are lost, so the
+    backend is cleared whenever (re)connecting.
+    """
+
+    def __init__(
+        self,
+        engine: AsyncEngine,
+        backend: CacheBackend,
+        channel: str,
+        caches: dict[str, EntityCache],
+    ):
+        self.engine = engine
+        self.backend = backend
+        self.channel = channel
+        self.caches = caches
+        self.listening = asyncio.Event()
+
+    async def _on_notification(
+        self, connection: Any, pid: int, channel: str, payload: str
+    ) -> None:
+        namespace, _, ids = payload.partition(":")
+        cache = self.caches.get(namespace)
+        if cache is not None:
+            await cache.discard(int(id) for id in ids.split(","))
+
+    async def listen(self) -> None:
+        """Listens until the connection is lost."""
+        closed = asyncio.Event()
+        async with self.engine.connect() as connection:
+            raw_connection = await connection.get_raw_connection()
+            driver_connection = raw_connection.driver_connection
+            driver_connection.add_termination_listener(lambda _: closed.set())
+            await driver_connection.add_listener(self.channel, self._on_notification)
+            try:
+                await self.backend.clear()
+                self.listening.set()
+                await closed.wait()
+            finally:
+                self.listening.clear()
+                if not driver_connection.is_closed():
+                    await driver_connection.remove_listener(
+                        self.channel, self._on_notification
+                    )
+
+    async def run(self, retry_interval: float) -> None:
+        if not self.caches:
+            return
+        while True:
+            try:
+                await self.listen()
+            except Exception:
+                logger.exception("Listening for cache invalidations failed")
+            await asyncio.sleep(retry_interval)
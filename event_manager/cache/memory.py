@@ -0,0 +1,37 @@
+import time
+from collections import OrderedDict
+from typing import Any, Iterable
+
+from event_manager.cache.base import CacheBackend
+
+
+class InMemoryCacheBackend(CacheBackend):
+    """Per process LRU bounded to `max_size` keys, each with its own expiry."""
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._entries: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+
+    async def get(self, key: str) -> tuple[bool, Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return False, None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            return False, None
+        self._entries.move_to_end(key)
+        return True, value
+
+    async def set(self, key: str, value: Any, ttl: float) -> None:
+        self._entries[key] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    async def delete(self, keys: Iterable[str]) -> None:
+        for key in keys:
+            self._entries.pop(key, None)
+
+    async def clear(self) -> None:
+        self._entries.clear()
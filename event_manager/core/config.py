@@ -8,12 +8,83 @@ class Settings(BaseSettings):
     POSTGRES_APPLICATION_NAME: str = "Event Manager"
     POSTGRES_POOL_SIZE: int = 10
     POSTGRES_POOL_MAX_OVERFLOW: int = 20
+    # Streaming replicas serving read-only endpoints, same format as DATABASE_URL
+    DATABASE_REPLICA_URLS: list[str] = []
+    # "round_robin" or "least_connections"
+    DATABASE_REPLICA_STRATEGY: str = "round_robin"
+    # Seconds a replica may trail the primary before reads fall back to it
+    DATABASE_REPLICA_MAX_LAG: float = 5.0
+    DATABASE_REPLICA_LAG_CHECK_INTERVAL: float = 1.0
+    # Seconds a client's reads stay on the primary after it wrote; keep it
+    # above MAX_LAG + LAG_CHECK_INTERVAL for read-your-writes
+    DATABASE_REPLICA_PIN_SECONDS: int = 10
     POSTGRES_USER: str
     POSTGRES_PASSWORD: str
     DB_HOST_PORT: int = 5433
     DB_PORT: int = 5432
 
     GOOGLE_MAPS_API_KEY: str
+    GEOCODE_CACHE_SIZE: int = 1024
+    GEOCODE_CACHE_TTL: float = 24 * 60 * 60
+
+    # Tickets each worker claims per shard for events with inventory_shards > 0
+    INVENTORY_SHARD_CAPACITY: int = 50
+    INVENTORY_RECONCILE_INTERVAL: float = 1.0
+    # Seconds before an event found unsharded is looked up again on booking
+    INVENTORY_UNSHARDED_TTL: float = 5.0
+    # Seconds before the allotment of a worker that stopped renewing it is
+    # handed back to the event; must be well above the reconcile interval
+    INVENTORY_ALLOTMENT_LEASE: float = 30.0
+    # Seconds an allotment may go without a sale before it is handed back
+    INVENTORY_IDLE_TTL: float = 300.0
+    # Seconds book_and_pay holds tickets for before an unpaid booking lapses
+    BOOKING_HOLD_TTL: float = 15 * 60
+    BOOKING_HOLD_SWEEP_INTERVAL: float = 5.0
+    BOOKING_HOLD_SWEEP_BATCH_SIZE: int = 1000
+
+    # Read-through cache of CRUD.get, as table name -> TTL in seconds, e.g.
+    # {"users": 300, "events": 2}; models not listed are not cached
+    ENTITY_CACHE_TTL: dict[str, float] = {}
+    ENTITY_CACHE_SIZE: int = 10_000
+    # Seconds a lookup of a missing row is remembered
+    ENTITY_CACHE_NEGATIVE_TTL: float = 5.0
+    # Writers pg_notify the invalidated ids here on commit
+    ENTITY_CACHE_CHANNEL: str = "entity_cache"
+    ENTITY_CACHE_LISTEN_RETRY_INTERVAL: float = 1.0
+
+    # gzip (br with the brotli package installed) for clients that accept it
+    RESPONSE_COMPRESSION: bool = True
+    RESPONSE_COMPRESSION_MIN_SIZE: int = 1024
+
+    # Rows validated, COPYed and merged at a time by bulk event imports
+    EVENT_IMPORT_CHUNK_SIZE: int = 1000
+    EVENT_IMPORT_MAX_ERRORS: int = 1000
+
+    # Rows fetched per server-side cursor round trip by streamed exports
+    EXPORT_BATCH_SIZE: int = 5000
+
+    # Distinct normalized statements given their own latency histogram on
+    # /metrics; the rest are counted together as "other"
+    METRICS_MAX_STATEMENTS: int = 500
+    # Fraction of requests broken down into database, payment gateway and
+    # serialization time on /metrics; 0 turns tracing off
+    METRICS_TRACE_SAMPLE_RATE: float = 0.0
+
+    LOG_LEVEL: str = "INFO"
+    # "json" (one object per line) or "text"
+    LOG_FORMAT: str = "json"
+    # Records waiting for the writer thread; more are dropped, not waited on
+    LOG_BUFFER_SIZE: int = 10_000
+    # Records a second per logger after a burst, e.g. during an error storm;
+    # LOG_RATE_LIMITS overrides it by logger name
+    LOG_RATE_LIMIT: float = 100.0
+    LOG_RATE_BURST: int = 500
+    LOG_RATE_LIMITS: dict[str, float] = {}
+    # Fraction of DEBUG and INFO records kept, by logger name
+    LOG_SAMPLE_RATES: dict[str, float] = {}
+
+    # "postgres" (tsvector + pg_trgm) or "memory" (in-process index)
+    EVENT_SEARCH_BACKEND: str = "postgres"
 
     TEST_DATABASE_URL: str
     TEST_SYNC_DATABASE_URL: str
@@ -26,6 +97,11 @@ class Settings(BaseSettings):
     KEYCLOAK_CLIENT_ID: str
     KEYCLOAK_CLIENT_SECRET: str
     KEYCLOAK_USERNAME: str
+    KEYCLOAK_JWKS_REFRESH_INTERVAL: float = 5 * 60
+    # Floor between refreshes triggered by tokens with an unknown kid
+    KEYCLOAK_JWKS_MIN_REFRESH_INTERVAL: float = 10.0
+    KEYCLOAK_TOKEN_CACHE_SIZE: int = 4096
+    KEYCLOAK_TOKEN_CACHE_TTL: float = 60.0
     # Keycloak DB
     KC_DB: str
     KC_DB_URL_HOST: str
@@ -36,6 +112,37 @@ class Settings(BaseSettings):
     STRIPE_PUBLISHABLE_KEY: str
     STRIPE_API_KEY: str
     STRIPE_WEBHOOK_SECRET: str
+    # Per call, and calls in flight per worker
+    PAYMENT_GATEWAY_TIMEOUT: float = 10.0
+    PAYMENT_GATEWAY_MAX_CONCURRENCY: int = 50
+    # Payment intents are created off the request path from payment_outbox
+    PAYMENT_OUTBOX_BATCH_SIZE: int = 50
+    PAYMENT_OUTBOX_INTERVAL: float = 0.5
+    PAYMENT_OUTBOX_MAX_ATTEMPTS: int = 5
+    # Seconds before retry n are RETRY_BACKOFF ** n
+    PAYMENT_OUTBOX_RETRY_BACKOFF: float = 2.0
+    # Seconds a claimed row stays hidden from other dispatchers
+    PAYMENT_OUTBOX_LEASE: float = 60.0
+    # Webhooks are stored on receipt and applied in batches by these workers
+    WEBHOOK_INBOX_BATCH_SIZE: int = 500
+    WEBHOOK_INBOX_WORKERS: int = 2
+    WEBHOOK_INBOX_INTERVAL: float = 1.0
+    # Failing events are retried RETRY_BACKOFF ** n seconds after failure n,
+    # then parked after MAX_ATTEMPTS
+    WEBHOOK_INBOX_MAX_ATTEMPTS: int = 5
+    WEBHOOK_INBOX_RETRY_BACKOFF: float = 2.0
+    # Seconds an event waits for its intent's payment to be recorded
+    WEBHOOK_INBOX_MAX_AGE: float = 3600.0
+    # Finished Idempotency-Key responses kept in memory per worker
+    IDEMPOTENCY_CACHE_SIZE: int = 10_000
+    # Seconds before a claim without a response is considered abandoned
+    IDEMPOTENCY_LOCK_TIMEOUT: float = 60.0
+    # Seconds a duplicate waits for the first request before getting a 409
+    IDEMPOTENCY_WAIT_TIMEOUT: float = 10.0
+    # Seconds after its first use that a finished key is pruned
+    IDEMPOTENCY_RETENTION: float = 24 * 60 * 60
+    IDEMPOTENCY_PRUNE_INTERVAL: float = 60.0
+    IDEMPOTENCY_PRUNE_BATCH_SIZE: int = 1000
 
     SSL_KEY_FILE: str
     SSL_CERT_FILE: str
@@ -1,13 +1,17 @@
-import json
 from logging import getLogger
 from typing import Any, AsyncGenerator, Type
 
+import orjson
+from fastapi import Depends, Request, Response
 from fastapi.encoders import jsonable_encoder
 from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import Pool
 
 from event_manager.core.config import settings
+from event_manager.core.replicas import ReplicaRouter
+from event_manager.metrics import database_metrics
+from event_manager.metrics.database import InstrumentedQueuePool
 
 logger = getLogger(__name__)
 
@@ -20,13 +24,19 @@ def get_server_settings() -> dict[str, str] | None:
 
 
 def dumps(d: Any) -> str:
-    return json.dumps(d, default=jsonable_encoder)
+    return orjson.dumps(
+        d, default=jsonable_encoder, option=orjson.OPT_NON_STR_KEYS
+    ).decode()
 
 
-def create_engine(dsn: str, poolclass: Type[Pool] | None = None) -> AsyncEngine:
+def create_engine(
+    dsn: str, poolclass: Type[Pool] | None = None, name: str = "primary"
+) -> AsyncEngine:
+    """An engine whose pool and statements are reported on /metrics as `name`."""
     kwargs: dict[str, Any] = {
         "pool_size": settings.POSTGRES_POOL_SIZE,
         "max_overflow": settings.POSTGRES_POOL_MAX_OVERFLOW,
+        "poolclass": poolclass or InstrumentedQueuePool,
     }
 
     if "asyncpg" in dsn.lower():
@@ -34,7 +44,9 @@ def create_engine(dsn: str, poolclass: Type[Pool] | None = None) -> AsyncEngine:
         if server_settings:
             kwargs["connect_args"] = {"server_settings": server_settings}
 
-    return create_async_engine(dsn, **kwargs, json_serializer=dumps)
+    engine = create_async_engine(dsn, **kwargs, json_serializer=dumps)
+    database_metrics.instrument(engine, name)
+    return engine
 
 
 def get_engine() -> AsyncEngine:
@@ -46,9 +58,22 @@ def create_sessionmaker(engine: AsyncEngine) -> sessionmaker:
 
 
 sessionmaker_instance: sessionmaker = create_sessionmaker(get_engine())
+replica_router = ReplicaRouter(
+    primary=sessionmaker_instance,
+    replicas=[
+        create_engine(url, name=f"replica{i}")
+        for i, url in enumerate(settings.DATABASE_REPLICA_URLS)
+    ],
+    strategy=settings.DATABASE_REPLICA_STRATEGY,
+    max_lag=settings.DATABASE_REPLICA_MAX_LAG,
+)
+
+# Set on responses to writes, so the client's next reads see them
+PRIMARY_PIN_COOKIE = "read_primary"
 
 
 async def with_session() -> AsyncGenerator[AsyncSession, None]:
+    # Leaving the context manager closes the session
     async with sessionmaker_instance() as session:
         try:
             yield session
@@ -57,5 +82,42 @@ async def with_session() -> AsyncGenerator[AsyncSession, None]:
             logger.info("ROLLING BACK")
             await session.rollback()  # Rollback in case of exceptions
             raise
-        finally:
-            await session.close()
+
+
+def pin_reads_to_primary(response: Response) -> None:
+    """Dependency of routes whose writes the client will want to read back."""
+    if replica_router.replicas:
+        response.set_cookie(
+            PRIMARY_PIN_COOKIE,
+            "1",
+            max_age=settings.DATABASE_REPLICA_PIN_SECONDS,
+            httponly=True,
+            samesite="lax",
+        )
+
+
+def get_read_session_factory(request: Request) -> sessionmaker:
+    """
+    A replica's session factory, or the primary's when no replica is fresh
+    enough or the client recently wrote through `pin_reads_to_primary`.
+    For reads that need a transaction, like streamed exports, which also
+    outlive `with_read_session`: it is closed before the body is sent.
+    """
+    pinned = PRIMARY_PIN_COOKIE in request.cookies
+    return replica_router.session_factory(pinned=pinned)
+
+
+def get_read_only_session_factory(request: Request) -> sessionmaker:
+    pinned = PRIMARY_PIN_COOKIE in request.cookies
+    return replica_router.session_factory(pinned=pinned, read_only=True)
+
+
+async def with_read_session(
+    session_factory: sessionmaker = Depends(get_read_only_session_factory),
+) -> AsyncGenerator[AsyncSession, None]:
+    """
+    A ReadOnlySession, possibly on a replica, for routes that only read:
+    nothing is committed, and connections are only held during queries.
+    """
+    async with session_factory() as session:
+        yield session
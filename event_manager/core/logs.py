@@ -0,0 +1,218 @@
+import atexit
+import logging
+import random
+import sys
+import threading
+from collections import deque
+from datetime import datetime, timezone
+from typing import TextIO
+
+import orjson
+
+TEXT_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+
+# Attributes every LogRecord has; any other came in through `extra=`
+_RECORD_ATTRIBUTES = frozenset(vars(logging.makeLogRecord({}))) | {
+    "message",
+    "asctime",
+}
+
+
+class JSONFormatter(logging.Formatter):
+    """
+    One JSON object per line: time, level, logger and message, then the
+    `extra` fields of the record and its traceback, if any.
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(
+                timespec="milliseconds"
+            ),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for name, value in vars(record).items():
+            if name not in _RECORD_ATTRIBUTES:
+                entry[name] = value
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        if record.stack_info:
+            entry["stack"] = record.stack_info
+        return orjson.dumps(entry, default=repr).decode()
+
+
+class LogBuffer(logging.Handler):
+    """
+    Keeps records unformatted for the LogWriter thread: the message is only
+    built from its arguments, and the traceback rendered, over there. So
+    arguments should be values, not objects the request goes on to change.
+    Appending to the deque takes no lock the writer holds, and wakes
+    nothing. Past `capacity` waiting records, new ones are dropped rather
+    than held, and the count is attached to the next one as `dropped`.
+    """
+
+    def __init__(self, capacity: int):
+        super().__init__()
+        self.capacity = capacity
+        self.records: deque[logging.LogRecord] = deque()
+        self._dropped = 0
+
+    def emit(self, record: logging.LogRecord) -> None:
+        if len(self.records) >= self.capacity:
+            self._dropped += 1
+            return
+        if self._dropped:
+            record.dropped = self._dropped
+            self._dropped = 0
+        self.records.append(record)
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Keeps the `rates[logger name]` fraction of the DEBUG and INFO records
+    of the loggers listed; warnings and errors always pass.
+    """
+
+    def __init__(self, rates: dict[str, float]):
+        super().__init__()
+        self.rates = rates
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        rate = self.rates.get(record.name)
+        if rate is None or record.levelno >= logging.WARNING:
+            return True
+        return random.random() < rate
+
+
+class _Bucket:
+    __slots__ = ("tokens", "updated", "suppressed")
+
+    def __init__(self, tokens: float, now: float):
+        self.tokens = tokens
+        self.updated = now
+        self.suppressed = 0
+
+
+class RateLimitFilter(logging.Filter):
+    """
+    A token bucket per logger, letting `burst` records through at once and
+    `rate` a second after that, or `rates[logger name]` for the loggers
+    listed. What is held back is counted, and the count attached to the
+    logger's next record as `suppressed`.
+    """
+
+    def __init__(self, rate: float, burst: int, rates: dict[str, float] = {}):
+        super().__init__()
+        self.rate = rate
+        self.burst = burst
+        self.rates = rates
+        self._buckets: dict[str, _Bucket] = {}
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        now = record.created
+        bucket = self._buckets.get(record.name)
+        if bucket is None:
+            bucket = self._buckets[record.name] = _Bucket(self.burst, now)
+        rate = self.rates.get(record.name, self.rate)
+        bucket.tokens = min(
+            bucket.tokens + (now - bucket.updated) * rate, float(self.burst)
+        )
+        bucket.updated = now
+        if bucket.tokens < 1:
+            bucket.suppressed += 1
+            return False
+        bucket.tokens -= 1
+        if bucket.suppressed:
+            record.suppressed = bucket.suppressed
+            bucket.suppressed = 0
+        return True
+
+
+class LogWriter(threading.Thread):
+    """
+    Every `interval` seconds, formats what is waiting in `buffer` and writes
+    it to `stream` at once. Batching keeps the thread from contending with
+    the event loop for the GIL on every record.
+    """
+
+    def __init__(
+        self,
+        buffer: LogBuffer,
+        formatter: logging.Formatter,
+        stream: TextIO,
+        interval: float = 0.05,
+    ):
+        super().__init__(name="log-writer", daemon=True)
+        self.buffer = buffer
+        self.formatter = formatter
+        self.stream = stream
+        self.interval = interval
+        self._stopped = threading.Event()
+
+    def run(self) -> None:
+        while not self._stopped.wait(self.interval):
+            self.flush()
+        self.flush()
+
+    def flush(self) -> None:
+        records = self.buffer.records
+        lines = []
+        while records:
+            record = records.popleft()
+            try:
+                lines.append(self.formatter.format(record))
+            except Exception:
+                self.buffer.handleError(record)
+        if not lines:
+            return
+        try:
+            self.stream.write("\n".join(lines) + "\n")
+            self.stream.flush()
+        except Exception:
+            # A closed stream or broken pipe loses this batch, but not the
+            # thread, which would leave the buffer to fill up and drop all
+            self.buffer.handleError(record)
+
+    def stop(self) -> None:
+        """Writes what is left and waits for the thread; safe to repeat."""
+        self._stopped.set()
+        if self.is_alive():
+            self.join()
+
+
+def configure_logging(
+    level: str = "INFO",
+    json: bool = True,
+    capacity: int = 10_000,
+    interval: float = 0.05,
+    rate: float = 100.0,
+    burst: int = 500,
+    rate_limits: dict[str, float] = {},
+    sample_rates: dict[str, float] = {},
+    stream: TextIO | None = None,
+) -> LogWriter:
+    """
+    Routes all logging through a LogBuffer of `capacity` records to a
+    LogWriter thread writing to `stream`, stdout by default, so a request
+    only pays for building the record. Returns the started writer for the
+    caller to stop, which flushes the buffer; it is stopped at exit too.
+    """
+    handler = LogBuffer(capacity)
+    handler.addFilter(SamplingFilter(sample_rates))
+    handler.addFilter(RateLimitFilter(rate, burst, rate_limits))
+
+    # Neither format shows them, and looking them up costs every record
+    logging.logThreads = logging.logProcesses = logging.logMultiprocessing = False
+    root = logging.getLogger()
+    for previous in root.handlers[:]:
+        root.removeHandler(previous)
+    root.addHandler(handler)
+    root.setLevel(level)
+
+    formatter = JSONFormatter() if json else logging.Formatter(TEXT_FORMAT)
+    writer = LogWriter(handler, formatter, stream or sys.stdout, interval)
+    writer.start()
+    atexit.register(writer.stop)
+    return writer
@@ -0,0 +1,64 @@
+from typing import Any
+
+from sqlalchemy.exc import InvalidRequestError
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+from sqlalchemy.orm import Session, sessionmaker
+
+
+class _ReadOnlySyncSession(Session):
+    def flush(self, objects: Any = None) -> None:
+        if self.new or self.dirty or self.deleted:
+            raise InvalidRequestError("Read-only sessions cannot write")
+
+
+class ReadOnlySession(AsyncSession):
+    """
+    A session for handlers that only read. Its engine runs in autocommit
+    mode, so no BEGIN or COMMIT is sent around the queries, and the pooled
+    connection goes back to the pool as soon as each statement returns
+    instead of when the response has been serialized. Returned instances
+    are detached and keep what was loaded. Nothing is ever flushed.
+
+    `stream()` needs a transaction for its server-side cursor and is not
+    available; use a regular session for it.
+    """
+
+    sync_session_class = _ReadOnlySyncSession
+
+    async def _release(self) -> None:
+        # Nothing to roll back on an autocommit connection, so the pool's
+        # reset on checkin costs no round trip either
+        await self.close()
+
+    async def execute(self, *args: Any, **kwargs: Any) -> Any:
+        try:
+            return await super().execute(*args, **kwargs)
+        finally:
+            await self._release()
+
+    async def scalar(self, *args: Any, **kwargs: Any) -> Any:
+        try:
+            return await super().scalar(*args, **kwargs)
+        finally:
+            await self._release()
+
+    async def get(self, *args: Any, **kwargs: Any) -> Any:
+        try:
+            return await super().get(*args, **kwargs)
+        finally:
+            await self._release()
+
+    async def stream(self, *args: Any, **kwargs: Any) -> Any:
+        raise InvalidRequestError("Read-only sessions cannot stream")
+
+
+def create_read_only_sessionmaker(
+    engine: AsyncEngine, info: dict[str, Any] | None = None
+) -> sessionmaker:
+    return sessionmaker(
+        engine.execution_options(isolation_level="AUTOCOMMIT"),
+        class_=ReadOnlySession,
+        expire_on_commit=False,
+        autoflush=False,
+        info=info or {},
+    )
@@ -0,0 +1,117 @@
+import asyncio
+import itertools
+import math
+from dataclasses import dataclass
+from logging import getLogger
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+from sqlalchemy.orm import sessionmaker
+
+from event_manager.core.read_only import create_read_only_sessionmaker
+
+logger = getLogger(__name__)
+
+# Set in the info of sessions on a replica, whose reads may be stale
+REPLICA_SESSION = "replica"
+
+# Seconds the replica is behind the primary; 0 when it has replayed
+# everything it received, and on a server that is not a standby at all
+REPLICATION_LAG = text("""
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp())
+    END
+    """)
+
+
+@dataclass
+class Replica:
+    engine: AsyncEngine
+    session_factory: sessionmaker
+    read_only_factory: sessionmaker
+    # Unknown until the first check, which keeps the replica out of rotation
+    lag: float = math.inf
+
+
+class ReplicaRouter:
+    """
+    Hands out session factories for read-only work: one of the replicas
+    within `max_lag` seconds of the primary, picked round-robin or by fewest
+    checked out connections, or the primary when none is.
+
+    Lags are only known once `check_lag()` has run, usually from `run()`.
+    Callers that just wrote pass `pinned=True` to read their own writes.
+    With `read_only=True` the factory makes ReadOnlySessions.
+    """
+
+    strategies = ("round_robin", "least_connections")
+
+    def __init__(
+        self,
+        primary: sessionmaker,
+        replicas: list[AsyncEngine],
+        strategy: str = "round_robin",
+        max_lag: float = 5.0,
+    ):
+        if strategy not in self.strategies:
+            raise ValueError(f"Unknown replica strategy: {strategy}")
+        self.primary = primary
+        self.primary_read_only = create_read_only_sessionmaker(primary.kw["bind"])
+        self.replicas = [
+            Replica(
+                engine=engine,
+                session_factory=sessionmaker(
+                    engine,
+                    expire_on_commit=False,
+                    class_=AsyncSession,
+                    info={REPLICA_SESSION: True},
+                ),
+                read_only_factory=create_read_only_sessionmaker(
+                    engine, info={REPLICA_SESSION: True}
+                ),
+            )
+            for engine in replicas
+        ]
+        self.strategy = strategy
+        self.max_lag = max_lag
+        self._turns = itertools.count()
+
+    def pick(self) -> Replica | None:
+        healthy = [replica for replica in self.replicas if replica.lag <= self.max_lag]
+        if not healthy:
+            return None
+        if self.strategy == "least_connections":
+            return min(healthy, key=lambda replica: replica.engine.pool.checkedout())
+        return healthy[next(self._turns) % len(healthy)]
+
+    def session_factory(
+        self, pinned: bool = False, read_only: bool = False
+    ) -> sessionmaker:
+        replica = None if pinned else self.pick()
+        if replica is None:
+            return self.primary_read_only if read_only else self.primary
+        return replica.read_only_factory if read_only else replica.session_factory
+
+    async def _lag(self, replica: Replica) -> float:
+        try:
+            async with replica.engine.connect() as connection:
+                lag = await connection.scalar(REPLICATION_LAG)
+        except Exception:
+            logger.exception("Checking the lag of %r failed", replica.engine.url)
+            return math.inf
+        # NULL before the standby has replayed any transaction
+        return math.inf if lag is None else float(lag)
+
+    async def check_lag(self) -> None:
+        lags = await asyncio.gather(*map(self._lag, self.replicas))
+        for replica, lag in zip(self.replicas, lags):
+            if lag > self.max_lag >= replica.lag:
+                logger.warning("%r is %.1fs behind", replica.engine.url, lag)
+            replica.lag = lag
+
+    async def run(self, interval: float) -> None:
+        while True:
+            await self.check_lag()
+            await asyncio.sleep(interval)
@@ -1,46 +1,37 @@
-from typing import TYPE_CHECKING
+from datetime import datetime
+from typing import Any, Sequence
 
+from sqlalchemy import CTE, Row, Update, exists, func, insert, literal, select, update
 from sqlalchemy.exc import OperationalError
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm.exc import StaleDataError
 
 from event_manager.dal.crud_manager import CRUD
-from event_manager.errors.all_errors import InsufficientTickets
-from event_manager.models.booking import Booking
+from event_manager.dal.event import event_manager
+from event_manager.errors.all_errors import InsufficientTickets, ResourceNotFound
+from event_manager.models.booking import Booking, BookingStatus
+from event_manager.models.event import Event
+from event_manager.pricing.surge import event_total_costs, surge_total_cost
 from event_manager.schemas.booking import BookingCreate, BookingUpdate
 
-if TYPE_CHECKING:
-    from event_manager.models.event import Event
-
 
 class BookingManager(CRUD[Booking, BookingCreate, BookingUpdate]):
-    def calculate_total_cost(self, event: "Event", quantity: int) -> int:
-
-        if event.available_tickets > event.surge_threshold:
-            # No surge pricing if tickets are above the threshold
-            return quantity * event.base_price
-
-        total_cost = 0
-        remaining_tickets = event.available_tickets
-        remaining_quantity = quantity
-        surge_level = 1  # Start with one surge level
-
-        while remaining_quantity > 0:
-            if remaining_tickets % 5 == 0:
-                tickets_in_tier = 5
-            else:
-                tickets_in_tier = remaining_tickets % 5
-
-            tier_price = event.base_price + ((surge_level) * event.surge_price)
-            total_cost += tickets_in_tier * tier_price
-            remaining_quantity -= tickets_in_tier
-            remaining_tickets -= tickets_in_tier
-            surge_level += 1  # Increase surge level for the next tier
-
-        return total_cost
+    def calculate_total_cost(self, event: Event, quantity: int) -> int:
+        return surge_total_cost(
+            event.available_tickets,
+            event.surge_threshold,
+            event.base_price,
+            event.surge_price,
+            quantity,
+        )
+
+    def calculate_total_costs(
+        self, events: Sequence[Event], quantities: Sequence[int]
+    ) -> list[float]:
+        return event_total_costs(events, quantities).tolist()
 
     async def create_booking(
-        self, db: AsyncSession, booking_in: BookingCreate, event: "Event"
+        self, db: AsyncSession, booking_in: BookingCreate, event: Event
     ) -> Booking:
         try:
             if event.available_tickets < booking_in.quantity:
@@ -50,6 +41,7 @@ class BookingManager(CRUD[Booking, BookingCreate, BookingUpdate]):
 
             db.add(booking)
             event.available_tickets -= booking_in.quantity
+            await event_manager.invalidate(db, [event.id])
             await db.commit()
             await db.refresh(booking)
         except Exception as e:
@@ -59,7 +51,7 @@ class BookingManager(CRUD[Booking, BookingCreate, BookingUpdate]):
         return booking
 
     async def create_booking_optimistic(
-        self, db: AsyncSession, booking_in: BookingCreate, event: "Event"
+        self, db: AsyncSession, booking_in: BookingCreate, event: Event
     ) -> Booking:
         try:
             # Check ticket availability
@@ -76,6 +68,7 @@ class BookingManager(CRUD[Booking, BookingCreate, BookingUpdate]):
 
             db.add(booking)
             db.add(event)
+            await event_manager.invalidate(db, [event.id])
 
             # Flush changes to the database
             await db.flush()
@@ -91,7 +84,7 @@ class BookingManager(CRUD[Booking, BookingCreate, BookingUpdate]):
         return booking
 
     async def create_booking_pessimistic(
-        self, db: AsyncSession, booking_in: BookingCreate, event: "Event"
+        self, db: AsyncSession, booking_in: BookingCreate, event: Event
     ) -> Booking:
         try:
             # Check ticket availability
@@ -109,6 +102,7 @@ class BookingManager(CRUD[Booking, BookingCreate, BookingUpdate]):
 
             db.add(booking)
             db.add(event)
+            await event_manager.invalidate(db, [event.id])
 
             # Flush changes to the database
             await db.flush()
@@ -128,5 +122,182 @@ class BookingManager(CRUD[Booking, BookingCreate, BookingUpdate]):
 
         return booking
 
+    async def create_booking_atomic(
+        self, db: AsyncSession, booking_in: BookingCreate
+    ) -> Booking:
+        # Conditional decrement chained into the booking INSERT, so the
+        # reservation and the booking cost a single round trip and the event
+        # row is only locked for the duration of that one statement.
+        reserved = (
+            update(Event)
+            .where(
+                Event.id == booking_in.event_id,
+                Event.available_tickets >= booking_in.quantity,
+            )
+            .values(
+                available_tickets=Event.available_tickets - booking_in.quantity,
+                version=Event.version + 1,
+            )
+            .returning(Event.id)
+            .cte("reserved")
+        )
+        booking_data = booking_in.model_dump(exclude={"event_id"})
+        stmt = (
+            insert(Booking)
+            .from_select(
+                ["event_id", *booking_data],
+                select(
+                    reserved.c.id,
+                    *(
+                        literal(value, Booking.__table__.c[column].type)
+                        for column, value in booking_data.items()
+                    ),
+                ),
+                # Python-side defaults would be bound as NULL here, leave
+                # unset columns to their server defaults
+                include_defaults=False,
+            )
+            .add_cte(reserved)
+            .returning(Booking)
+        )
+        booking = (await db.scalars(stmt)).one_or_none()
+        if booking is None:
+            # Nothing was reserved; only now pay for telling the two cases apart
+            event_exists = await db.scalar(
+                select(exists().where(Event.id == booking_in.event_id))
+            )
+            if not event_exists:
+                raise ResourceNotFound(
+                    f"Event with id: {booking_in.event_id} not found"
+                )
+            raise InsufficientTickets
+        await event_manager.invalidate(db, [booking_in.event_id])
+        return booking
+
+    async def create_booking_reserved(
+        self, db: AsyncSession, booking_in: BookingCreate, allotment_id: int
+    ) -> Booking:
+        # Tickets were already taken from the in-memory allotment, so the
+        # event row is neither read nor locked here. The insert fails if the
+        # allotment was closed meanwhile, which handed them back.
+        booking = Booking(**booking_in.model_dump(), allotment_id=allotment_id)
+        db.add(booking)
+        await db.flush()
+        await db.refresh(booking)
+        return booking
+
+    async def end_hold(
+        self, db: AsyncSession, booking_id: int, status: BookingStatus
+    ) -> Row[Any] | None:
+        """
+        Moves a held booking to `status`, returning its `(event_id, quantity)`
+        or None when it was not held, e.g. the sweeper already released it.
+        Callers only give tickets back on a row, so they are never returned
+        twice.
+        """
+        result = await db.execute(
+            update(Booking)
+            .where(Booking.id == booking_id, Booking.status == BookingStatus.HELD)
+            .values(status=status)
+            .returning(Booking.event_id, Booking.quantity)
+            .execution_options(synchronize_session=False)
+        )
+        return result.one_or_none()
+
+    @staticmethod
+    def credit_released(released: CTE) -> Update:
+        """
+        Builds the statement that hands the tickets of `released`, a CTE of
+        `(event_id, quantity)` rows, back to their events in one go:
+
+            WITH released AS (...),
+                 credited AS (SELECT event_id, sum(quantity) ... GROUP BY),
+                 locked AS (SELECT id FROM events ... ORDER BY id FOR UPDATE)
+            UPDATE events ... FROM credited, locked RETURNING id, bookings
+
+        Event rows are locked in id order so concurrent callers cannot
+        deadlock. It returns each event credited with its number of bookings,
+        to be passed on to `credited_events()`.
+        """
+        credited = (
+            select(
+                released.c.event_id,
+                func.sum(released.c.quantity).label("quantity"),
+                func.count().label("bookings"),
+            )
+            .group_by(released.c.event_id)
+            .cte("credited")
+        )
+        locked = (
+            select(Event.id)
+            .where(Event.id.in_(select(credited.c.event_id)))
+            .order_by(Event.id)
+            .with_for_update()
+            .cte("locked")
+        )
+        return (
+            update(Event)
+            .where(Event.id == credited.c.event_id, Event.id == locked.c.id)
+            .values(
+                available_tickets=Event.available_tickets + credited.c.quantity,
+                version=Event.version + 1,
+            )
+            .returning(Event.id, credited.c.bookings)
+            .execution_options(synchronize_session=False)
+        )
+
+    @staticmethod
+    async def credited_events(db: AsyncSession, rows: Sequence[Row[Any]]) -> int:
+        """
+        Invalidates the events in the result of `credit_released()`, returning
+        the total number of bookings credited.
+        """
+        await event_manager.invalidate(db, [row.id for row in rows])
+        return sum(row.bookings for row in rows)
+
+    async def release_expired_holds(self, db: AsyncSession, limit: int) -> int:
+        """
+        Releases up to `limit` expired holds and credits their tickets back,
+        in one statement whatever the batch size. Holds locked by a live
+        payment are skipped, not waited on. Returns how many bookings were
+        released.
+        """
+        due = (
+            select(Booking.id)
+            .where(
+                Booking.status == BookingStatus.HELD,
+                Booking.expires_at <= func.now(),
+            )
+            .order_by(Booking.expires_at)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+            .subquery()
+        )
+        expired = (
+            update(Booking)
+            .where(Booking.id == due.c.id)
+            .values(status=BookingStatus.RELEASED)
+            .returning(Booking.event_id, Booking.quantity)
+            .cte("expired")
+        )
+        result = await db.execute(self.credit_released(expired))
+        return await self.credited_events(db, result.all())
+
+    @staticmethod
+    def export_filter(
+        event_id: int | None = None,
+        since: datetime | None = None,
+        until: datetime | None = None,
+    ) -> list[Any]:
+        """Bookings of `event_id`, if given, made in `[since, until)`."""
+        clause = []
+        if event_id is not None:
+            clause.append(Booking.event_id == event_id)
+        if since is not None:
+            clause.append(Booking.booking_time >= since)
+        if until is not None:
+            clause.append(Booking.booking_time < until)
+        return clause
+
 
 booking_manager = BookingManager(Booking)
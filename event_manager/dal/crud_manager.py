@@ -1,9 +1,24 @@
-from typing import Any, Generic, List, Optional, Type, TypeVar
+from typing import (
+    Any,
+    AsyncIterator,
+    Generic,
+    Iterable,
+    List,
+    Optional,
+    Sequence,
+    Type,
+    TypeVar,
+)
 
 from fastapi.encoders import jsonable_encoder
 from pydantic import BaseModel
-from sqlalchemy import and_, delete, select
+from sqlalchemy import Row, and_, delete, select, tuple_
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql.base import ExecutableOption
+
+from event_manager.cache.entity_cache import EntityCache
+from event_manager.core.replicas import REPLICA_SESSION
+from event_manager.dal.pagination import Page, decode_cursor, encode_cursor
 
 ModelType = TypeVar("ModelType")
 CreateSchemaType = TypeVar("CreateSchemaType", bound=BaseModel)
@@ -11,12 +26,46 @@ UpdateSchemaType = TypeVar("UpdateSchemaType", bound=BaseModel)
 
 
 class CRUD(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
-    def __init__(self, model: Type[ModelType]):
+    """
+    Relationships on the models are `lazy="raise"`, so nothing beyond the
+    requested row is fetched unless the caller asks for it through `load`,
+    e.g. `load=[joinedload(Payment.booking)]` or
+    `load=[load_only(Event.base_price, raiseload=True)]`.
+
+    With a `cache`, `get` is served from it and always reads and caches
+    whole rows, ignoring `load`; only cache models whose callers narrow
+    columns, never those that load relationships. Every write to a cached
+    model, including bulk UPDATEs outside of `update`/`remove`, has to be
+    followed by `invalidate()` in the same transaction.
+    """
+
+    def __init__(self, model: Type[ModelType], cache: EntityCache | None = None):
         self.model = model
+        self.cache = cache
 
-    async def get(self, db: AsyncSession, id: int) -> Optional[ModelType]:
-        result = await db.execute(select(self.model).where(self.model.id == id))
-        return result.scalars().first()
+    async def get(
+        self, db: AsyncSession, id: int, load: Sequence[ExecutableOption] = ()
+    ) -> Optional[ModelType]:
+        # Rows this transaction wrote are read back from the database, and
+        # never cached before it commits
+        cached = self.cache is not None and not self.cache.is_pending(db, id)
+        if cached:
+            found, db_obj = await self.cache.get(db, id)
+            if found:
+                return db_obj
+            load = ()
+        result = await db.execute(
+            select(self.model).where(self.model.id == id).options(*load)
+        )
+        db_obj = result.scalars().first()
+        # A lagging replica could re-cache a row invalidated since
+        if cached and not db.info.get(REPLICA_SESSION):
+            await self.cache.put(id, db_obj)
+        return db_obj
+
+    async def invalidate(self, db: AsyncSession, ids: Iterable[int]) -> None:
+        if self.cache is not None:
+            await self.cache.invalidate(db, ids)
 
     async def create(self, db: AsyncSession, obj_in: CreateSchemaType) -> ModelType:
         try:
@@ -26,6 +75,8 @@ class CRUD(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
             db.add(db_obj)
             await db.flush()  # Use flush instead of commit to save changes but keep the transaction open
             await db.refresh(db_obj)
+            # Forget a cached "not found" for the new id
+            await self.invalidate(db, [db_obj.id])
             return db_obj
         except Exception as e:
             print(e)
@@ -42,11 +93,13 @@ class CRUD(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         db.add(db_obj)
         await db.flush()  # Use flush instead of commit to save changes but keep the transaction open
         await db.refresh(db_obj)
+        await self.invalidate(db, [db_obj.id])
         return db_obj
 
     async def remove(self, db: AsyncSession, id: int) -> None:
         await db.execute(delete(self.model).where(self.model.id == id))
         await db.flush()
+        await self.invalidate(db, [id])
 
     async def get_all(
         self,
@@ -54,8 +107,9 @@ class CRUD(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         skip: int = 0,
         limit: int = 10,
         additional_where_clause: list[Any] | None = None,
+        load: Sequence[ExecutableOption] = (),
     ) -> List[ModelType]:
-        query = select(self.model)
+        query = select(self.model).options(*load)
 
         if additional_where_clause:
             query = query.where(and_(*additional_where_clause))
@@ -66,3 +120,78 @@ class CRUD(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
 
         result = await db.execute(query)
         return result.scalars().all()
+
+    async def get_page(
+        self,
+        db: AsyncSession,
+        cursor: str | None = None,
+        limit: int = 10,
+        sort_key: str = "id",
+        additional_where_clause: list[Any] | None = None,
+        load: Sequence[ExecutableOption] = (),
+        skip: int = 0,
+        columns: Sequence[str] = (),
+    ) -> Page[ModelType]:
+        """
+        Keyset pagination ordered by `(sort_key, id)`. The next page starts
+        right after the last row of this one, so page N costs the same as
+        page 1 instead of scanning and discarding `skip` rows. `skip` is only
+        honoured when no cursor is given, for clients still paging by offset.
+
+        With `columns`, which must include `id` and `sort_key`, the page holds
+        plain rows of those columns instead of model instances, skipping the
+        ORM for read-only listings.
+        """
+        sort_column = getattr(self.model, sort_key)
+        if columns:
+            query = select(*(getattr(self.model, column) for column in columns))
+        else:
+            query = select(self.model).options(*load)
+        if additional_where_clause:
+            query = query.where(and_(*additional_where_clause))
+
+        if cursor:
+            sort_value, last_id = decode_cursor(
+                cursor, sort_key, sort_column.type.python_type
+            )
+            if sort_key == "id":
+                query = query.where(self.model.id > last_id)
+            else:
+                query = query.where(
+                    tuple_(sort_column, self.model.id) > tuple_(sort_value, last_id)
+                )
+        elif skip:
+            query = query.offset(skip)
+
+        order_by = [sort_column] if sort_key == "id" else [sort_column, self.model.id]
+        # One extra row tells whether there is a next page without a COUNT
+        query = query.order_by(*order_by).limit(limit + 1)
+        result = await db.execute(query)
+        rows = result.all() if columns else result.scalars().all()
+
+        page = Page(items=list(rows[:limit]))
+        if len(rows) > limit and page.items:
+            last = page.items[-1]
+            page.next_cursor = encode_cursor(sort_key, getattr(last, sort_key), last.id)
+        return page
+
+    async def stream(
+        self,
+        db: AsyncSession,
+        columns: Sequence[str],
+        additional_where_clause: list[Any] | None = None,
+        batch_size: int = 1000,
+    ) -> AsyncIterator[Sequence[Row[Any]]]:
+        """
+        Every matching row of `columns`, in id order, in batches of
+        `batch_size` read through a server-side cursor. Unlike `get_all`,
+        only one batch is ever held in memory and the first one arrives as
+        soon as the database produces it, however many rows match.
+        """
+        query = select(*(getattr(self.model, column) for column in columns))
+        if additional_where_clause:
+            query = query.where(and_(*additional_where_clause))
+        query = query.order_by(self.model.id).execution_options(yield_per=batch_size)
+        result = await db.stream(query)
+        async for batch in result.partitions():
+            yield batch
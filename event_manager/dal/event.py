@@ -1,14 +1,58 @@
-from typing import List, Optional
+import bisect
+from typing import Any, Optional, Sequence
 
-import googlemaps
+from sqlalchemy import (
+    Column,
+    Integer,
+    MetaData,
+    Row,
+    Table,
+    case,
+    delete,
+    func,
+    literal_column,
+    tuple_,
+    update,
+)
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
+from sqlalchemy.orm import load_only
 from sqlalchemy.sql import and_, or_
 
-from event_manager.core.config import settings
+from event_manager.cache import entity_cache_for
 from event_manager.dal.crud_manager import CRUD
+from event_manager.dal.pagination import Page, decode_cursor, encode_cursor
+from event_manager.geocoding.abstract_geocoder import Geocoder
+from event_manager.metrics import database_metrics
 from event_manager.models.event import Event
 from event_manager.schemas.event import EventCreate, EventUpdate
+from event_manager.search.base import EventSearchBackend
+from event_manager.search.geo import rank_by_distance
+
+DISTANCE_SORT_KEY = "distance"
+
+IMPORT_COLUMNS = list(EventCreate.model_fields)
+# Columns an import overwrites on existing events; tickets and shards are
+# live inventory and only set when the event is created
+IMPORT_UPDATED_COLUMNS = [
+    "event_date",
+    "event_time",
+    "venue",
+    "base_price",
+    "surge_price",
+    "surge_threshold",
+]
+
+# Per transaction staging table of bulk imports, outside Base.metadata
+event_import_staging = Table(
+    "event_import",
+    MetaData(),
+    Column("line", Integer, nullable=False),
+    *(Column(column, Event.__table__.c[column].type) for column in IMPORT_COLUMNS),
+    prefixes=["TEMPORARY"],
+    postgresql_on_commit="DROP",
+)
 
 
 class EventManager(CRUD[Event, EventCreate, EventUpdate]):
@@ -23,8 +67,52 @@ class EventManager(CRUD[Event, EventCreate, EventUpdate]):
         location_long: Optional[float] = None,
         skip: int = 0,
         limit: int = 10,
-    ) -> List[Event]:
-        query = select(Event)
+        cursor: Optional[str] = None,
+        q: Optional[str] = None,
+        search_backend: Optional[EventSearchBackend] = None,
+        near: Optional[tuple[float, float, float]] = None,
+        bbox: Optional[tuple[float, float, float, float]] = None,
+    ) -> Page[Event]:
+        """
+        Without `q` or `near` this returns events matching any of the given
+        filters, ordered by name. With `q` the results are the ranked free-text
+        matches of `search_backend`; with `near=(lat, long, radius_km)` they are
+        the events within the radius, nearest first. The filters, and the
+        `bbox=(south, west, north, east)` box, narrow either mode.
+        """
+        filters = self._filters(name, date, time, venue, location_lat, location_long)
+        where = [or_(*filters)] if filters else []
+        if bbox:
+            where.append(self._within_bbox(*bbox))
+
+        if near:
+            return await self.nearby(
+                db, *near, limit=limit, cursor=cursor, additional_where_clause=where
+            )
+        if q:
+            return await search_backend.search(
+                db, q, limit=limit, cursor=cursor, additional_where_clause=where
+            )
+
+        # Ordered by (name, id): name alone is not unique and made pages unstable
+        return await self.get_page(
+            db,
+            cursor=cursor,
+            limit=limit,
+            sort_key="name",
+            additional_where_clause=where,
+            skip=skip,
+        )
+
+    @staticmethod
+    def _filters(
+        name: Optional[str],
+        date: Optional[str],
+        time: Optional[str],
+        venue: Optional[str],
+        location_lat: Optional[float],
+        location_long: Optional[float],
+    ) -> list[Any]:
         filters = []
         if name:
             filters.append(Event.name.ilike(f"%{name}%"))
@@ -41,28 +129,106 @@ class EventManager(CRUD[Event, EventCreate, EventUpdate]):
                     Event.location_long == location_long,
                 )
             )
+        return filters
+
+    @staticmethod
+    def _within_bbox(south: float, west: float, north: float, east: float):
+        within_long = Event.location_long.between(west, east)
+        if west > east:
+            # The box crosses the antimeridian
+            within_long = or_(Event.location_long >= west, Event.location_long <= east)
+        return and_(Event.location_lat.between(south, north), within_long)
+
+    async def nearby(
+        self,
+        db: AsyncSession,
+        lat: float,
+        long: float,
+        radius_km: float,
+        limit: int = 10,
+        cursor: Optional[str] = None,
+        additional_where_clause: list[Any] | None = None,
+    ) -> Page[Event]:
+        """
+        Events within `radius_km` of `(lat, long)`, nearest first. The
+        `event_location_earth_idx` GiST index narrows the table down to the
+        enclosing box, and only the `(id, lat, long)` of those candidates are
+        fetched and re-ranked by exact distance before the page is loaded.
+        """
+        location = func.ll_to_earth(Event.location_lat, Event.location_long)
+        box = func.earth_box(func.ll_to_earth(lat, long), radius_km * 1000)
+        query = select(Event.id, Event.location_lat, Event.location_long).where(
+            box.op("@>")(location)
+        )
+        if additional_where_clause:
+            query = query.where(and_(*additional_where_clause))
+        ranked = rank_by_distance(lat, long, radius_km, (await db.execute(query)).all())
+
+        if cursor:
+            last = decode_cursor(cursor, DISTANCE_SORT_KEY, float)
+            ranked = ranked[bisect.bisect_right(ranked, last) :]
+        page_entries = ranked[:limit]
+        events = {
+            event.id: event
+            for event in await db.scalars(
+                select(Event).where(
+                    Event.id.in_([event_id for _, event_id in page_entries])
+                )
+            )
+        }
 
-        if filters:
-            query = query.where(or_(*filters))
+        page = Page(
+            items=[
+                events[event_id] for _, event_id in page_entries if event_id in events
+            ]
+        )
+        if len(ranked) > limit and page_entries:
+            last_distance, last_id = page_entries[-1]
+            page.next_cursor = encode_cursor(DISTANCE_SORT_KEY, last_distance, last_id)
+        return page
 
-        query = query.offset(skip).limit(limit).order_by(Event.name)
-        result = await db.execute(query)
-        return result.scalars().all()
+    async def update(
+        self, db: AsyncSession, db_obj: Event, obj_in: EventUpdate
+    ) -> Event:
+        if obj_in.venue is not None and obj_in.venue != db_obj.venue:
+            db_obj.venue_lat = db_obj.venue_long = None
+        # Edits are new versions too, for optimistic bookings and ETags alike
+        db_obj.version += 1
+        return await super().update(db, db_obj, obj_in)
 
-    async def get_event_location_map(self, event_id: int, db: AsyncSession):
-        event = await event_manager.get(db, event_id)
+    async def get_event_location_map(
+        self, event_id: int, db: AsyncSession, geocoder: Geocoder
+    ) -> str:
+        event = await self.get(
+            db,
+            event_id,
+            load=[
+                load_only(
+                    Event.venue,
+                    Event.venue_lat,
+                    Event.venue_long,
+                    Event.location_lat,
+                    Event.location_long,
+                    raiseload=True,
+                )
+            ],
+        )
         if not event:
             raise ValueError("Event not found")
 
-        gmaps = googlemaps.Client(key=settings.GOOGLE_MAPS_API_KEY)
-        geocode_result = gmaps.geocode(event.venue)
-        if geocode_result:
-            location = geocode_result[0]["geometry"]["location"]
-            lat = location["lat"]
-            lng = location["lng"]
+        if event.venue_lat is not None:
+            lat, lng = event.venue_lat, event.venue_long
+        elif coordinates := await geocoder.geocode(event.venue):
+            lat, lng = coordinates
+            # A bulk UPDATE: caching coordinates is not a new event version
+            await db.execute(
+                update(Event)
+                .where(Event.id == event_id)
+                .values(venue_lat=lat, venue_long=lng)
+            )
+            await self.invalidate(db, [event_id])
         else:
-            lat = event.location_lat
-            lng = event.location_long
+            lat, lng = event.location_lat, event.location_long
 
         # Construct the Google Maps URL
         map_url = f"https://www.google.com/maps/search/?api=1&query={lat},{lng}"
@@ -70,10 +236,12 @@ class EventManager(CRUD[Event, EventCreate, EventUpdate]):
         return map_url
 
     async def get_pessimistic_event(self, event_id: int, db: AsyncSession):
-        # Acquire a lock on the event row using with_for_update()
-        result = await db.execute(
-            select(Event).where(Event.id == event_id).with_for_update()
-        )
+        # Acquire a lock on the event row using with_for_update(), timing how
+        # long other bookings of the event keep us waiting for it
+        with database_metrics.event_lock_wait_seconds.time():
+            result = await db.execute(
+                select(Event).where(Event.id == event_id).with_for_update()
+            )
         event = result.scalar_one_or_none()
         return event
 
@@ -83,7 +251,118 @@ class EventManager(CRUD[Event, EventCreate, EventUpdate]):
         event = await self.get(db, event_id)
         event.available_tickets += booking_quantity
         db.add(event)
+        await self.invalidate(db, [event_id])
         await db.commit()
 
+    async def get_inventory_shards(
+        self, db: AsyncSession, event_ids: list[int]
+    ) -> dict[int, int]:
+        result = await db.execute(
+            select(Event.id, Event.inventory_shards).where(Event.id.in_(event_ids))
+        )
+        return {event_id: shards for event_id, shards in result.all()}
+
+    async def claim_tickets(
+        self, db: AsyncSession, event_id: int, quantity: int
+    ) -> int:
+        """Move up to `quantity` tickets out of the event row, returning how many
+        were actually claimed."""
+        current = (
+            select(Event.id, Event.available_tickets)
+            .where(Event.id == event_id, Event.available_tickets > 0)
+            .with_for_update()
+            .subquery()
+        )
+        claimed = func.least(current.c.available_tickets, quantity)
+        result = await db.execute(
+            update(Event)
+            .where(Event.id == current.c.id)
+            .values(
+                available_tickets=Event.available_tickets - claimed,
+                version=Event.version + 1,
+            )
+            .returning(claimed)
+            .execution_options(synchronize_session=False)
+        )
+        await self.invalidate(db, [event_id])
+        return result.scalar_one_or_none() or 0
+
+    async def release_tickets(
+        self, db: AsyncSession, event_id: int, quantity: int
+    ) -> None:
+        await db.execute(
+            update(Event)
+            .where(Event.id == event_id)
+            .values(
+                available_tickets=Event.available_tickets + quantity,
+                version=Event.version + 1,
+            )
+            .execution_options(synchronize_session=False)
+        )
+        await self.invalidate(db, [event_id])
+
+    async def stage_import(self, db: AsyncSession, rows: Sequence[tuple]) -> None:
+        """
+        COPYs `(line, *IMPORT_COLUMNS)` tuples into the staging table, which
+        is created on first use and dropped when the transaction ends.
+        """
+        connection = await db.connection()
+        await connection.run_sync(event_import_staging.create, checkfirst=True)
+        raw_connection = await connection.get_raw_connection()
+        await raw_connection.driver_connection.copy_records_to_table(
+            event_import_staging.name,
+            records=rows,
+            columns=[column.name for column in event_import_staging.columns],
+        )
+
+    async def merge_import(self, db: AsyncSession) -> list[Row[Any]]:
+        """
+        Upserts the staged rows on `name_lat_long_uix` and empties the staging
+        table. When a name and location appears more than once the last line
+        wins, and existing events only change, and get a new version, when
+        one of IMPORT_UPDATED_COLUMNS differs. Returns `(id, name, venue,
+        inserted)` for each event created or changed.
+        """
+        staged = event_import_staging.c
+        key = [staged.name, staged.location_lat, staged.location_long]
+        latest = (
+            select(
+                *(
+                    (
+                        func.coalesce(staged[column], 0).label(column)
+                        if column in ("surge_price", "surge_threshold")
+                        else staged[column]
+                    )
+                    for column in IMPORT_COLUMNS
+                )
+            )
+            .distinct(*key)
+            .order_by(*key, staged.line.desc())
+        )
+        stmt = insert(Event).from_select(IMPORT_COLUMNS, latest)
+        current = [Event.__table__.c[column] for column in IMPORT_UPDATED_COLUMNS]
+        imported = [stmt.excluded[column] for column in IMPORT_UPDATED_COLUMNS]
+        venue_moved = Event.venue.is_distinct_from(stmt.excluded.venue)
+        stmt = stmt.on_conflict_do_update(
+            constraint="name_lat_long_uix",
+            set_={
+                **dict(zip(IMPORT_UPDATED_COLUMNS, imported)),
+                "venue_lat": case((venue_moved, None), else_=Event.venue_lat),
+                "venue_long": case((venue_moved, None), else_=Event.venue_long),
+                "version": Event.version + 1,
+            },
+            where=tuple_(*current).is_distinct_from(tuple_(*imported)),
+        ).returning(
+            Event.id,
+            Event.name,
+            Event.venue,
+            # Only rows updated by the upsert carry a locking xmax
+            literal_column("xmax = 0").label("inserted"),
+        )
+        rows = (await db.execute(stmt)).all()
+        await db.execute(delete(event_import_staging))
+        await self.invalidate(db, [row.id for row in rows])
+        return rows
+
 
-event_manager = EventManager(Event)
+event_manager = EventManager(Event, cache=entity_cache_for(Event))
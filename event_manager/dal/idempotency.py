@@ -0,0 +1,93 @@
+from datetime import timedelta
+from typing import Any
+
+from pydantic import BaseModel
+from sqlalchemy import Row, delete, select, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import func
+
+from event_manager.dal.crud_manager import CRUD
+from event_manager.models.idempotency_key import IdempotencyKey
+
+
+class IdempotencyKeyManager(CRUD[IdempotencyKey, BaseModel, BaseModel]):
+    async def claim(
+        self, db: AsyncSession, key: str, fingerprint: str, lock_timeout: float
+    ) -> Row[Any] | None:
+        """
+        Returns None when the caller now owns `key`, otherwise the existing
+        `(fingerprint, response_status, response_body)`. A claim left without
+        a response for `lock_timeout` seconds, e.g. by a crashed worker, is
+        taken over.
+        """
+        claimed = await db.execute(
+            insert(IdempotencyKey)
+            .values(key=key, fingerprint=fingerprint)
+            .on_conflict_do_update(
+                index_elements=[IdempotencyKey.key],
+                set_={"fingerprint": fingerprint, "locked_at": func.now()},
+                where=(
+                    IdempotencyKey.response_status.is_(None)
+                    & (
+                        IdempotencyKey.locked_at
+                        < func.now() - timedelta(seconds=lock_timeout)
+                    )
+                ),
+            )
+            .returning(IdempotencyKey.id)
+        )
+        if claimed.scalar_one_or_none() is not None:
+            return None
+        result = await db.execute(
+            select(
+                IdempotencyKey.fingerprint,
+                IdempotencyKey.response_status,
+                IdempotencyKey.response_body,
+            ).where(IdempotencyKey.key == key)
+        )
+        return result.one()
+
+    async def store_response(
+        self, db: AsyncSession, key: str, status_code: int, body: Any
+    ) -> None:
+        await db.execute(
+            update(IdempotencyKey)
+            .where(IdempotencyKey.key == key)
+            .values(response_status=status_code, response_body=body)
+            .execution_options(synchronize_session=False)
+        )
+
+    async def release(self, db: AsyncSession, key: str) -> None:
+        await db.execute(
+            delete(IdempotencyKey).where(
+                IdempotencyKey.key == key, IdempotencyKey.response_status.is_(None)
+            )
+        )
+
+    async def delete_finished(
+        self, db: AsyncSession, retention: float, limit: int
+    ) -> int:
+        """
+        Deletes up to `limit` keys with a response that were created over
+        `retention` seconds ago, skipping rows locked by a replay. Returns
+        how many.
+        """
+        expired = (
+            select(IdempotencyKey.id)
+            .where(
+                IdempotencyKey.response_status.is_not(None),
+                IdempotencyKey.created_at < func.now() - timedelta(seconds=retention),
+            )
+            .order_by(IdempotencyKey.created_at)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+            .scalar_subquery()
+        )
+        result = await db.execute(
+            delete(IdempotencyKey).where(IdempotencyKey.id.in_(expired))
+        )
+        return result.rowcount
+
+
+idempotency_key_manager = IdempotencyKeyManager(IdempotencyKey)
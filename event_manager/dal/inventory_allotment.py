@@ -0,0 +1,127 @@
+from collections import defaultdict
+from datetime import timedelta
+from typing import Any, Sequence
+
+from pydantic import BaseModel
+from sqlalchemy import Row, delete, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import func
+
+from event_manager.dal.crud_manager import CRUD
+from event_manager.dal.event import event_manager
+from event_manager.models.booking import Booking
+from event_manager.models.inventory_allotment import InventoryAllotment
+
+
+class InventoryAllotmentManager(CRUD[InventoryAllotment, BaseModel, BaseModel]):
+    async def claim(
+        self,
+        db: AsyncSession,
+        worker_id: str,
+        event_id: int,
+        allotment_id: int | None,
+        quantity: int,
+    ) -> tuple[int, int | None]:
+        """
+        Moves up to `quantity` tickets from the event row into allotment
+        `allotment_id`, or a new one when it is None or was reclaimed.
+        Returns how many were claimed and the allotment they went to.
+        """
+        claimed = await event_manager.claim_tickets(db, event_id, quantity)
+        if not claimed:
+            return 0, allotment_id
+        if allotment_id is not None:
+            result = await db.execute(
+                update(InventoryAllotment)
+                .where(InventoryAllotment.id == allotment_id)
+                .values(tickets=InventoryAllotment.tickets + claimed)
+                .returning(InventoryAllotment.id)
+                .execution_options(synchronize_session=False)
+            )
+            if result.scalar_one_or_none() is not None:
+                return claimed, allotment_id
+        result = await db.execute(
+            insert(InventoryAllotment)
+            .values(worker_id=worker_id, event_id=event_id, tickets=claimed)
+            .returning(InventoryAllotment.id)
+        )
+        return claimed, result.scalar_one()
+
+    async def heartbeat(self, db: AsyncSession, worker_id: str) -> set[int]:
+        """Renews the worker's allotments, returning those it still has."""
+        result = await db.execute(
+            update(InventoryAllotment)
+            .where(InventoryAllotment.worker_id == worker_id)
+            .values(heartbeat_at=func.now())
+            .returning(InventoryAllotment.id)
+            .execution_options(synchronize_session=False)
+        )
+        return set(result.scalars())
+
+    async def close(self, db: AsyncSession, allotment_id: int) -> None:
+        """
+        Credits what is unsold of the allotment back to its event and
+        deletes it, waiting for bookings still being made from it. A no-op
+        if it was reclaimed already.
+        """
+        result = await db.execute(
+            select(
+                InventoryAllotment.id,
+                InventoryAllotment.event_id,
+                InventoryAllotment.tickets,
+            )
+            .where(InventoryAllotment.id == allotment_id)
+            .with_for_update()
+        )
+        await self._credit_unsold(db, result.all())
+
+    async def reclaim_expired(self, db: AsyncSession, lease: float, limit: int) -> int:
+        """
+        Closes up to `limit` allotments whose worker has not renewed them for
+        `lease` seconds. Allotments locked by a booking being made from them
+        are skipped. Returns how many were closed.
+        """
+        result = await db.execute(
+            select(
+                InventoryAllotment.id,
+                InventoryAllotment.event_id,
+                InventoryAllotment.tickets,
+            )
+            .where(
+                InventoryAllotment.heartbeat_at < func.now() - timedelta(seconds=lease)
+            )
+            .order_by(InventoryAllotment.heartbeat_at)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        expired = result.all()
+        await self._credit_unsold(db, expired)
+        return len(expired)
+
+    async def _credit_unsold(
+        self, db: AsyncSession, allotments: Sequence[Row[Any]]
+    ) -> None:
+        # Locked rows, so a booking made from them either committed and is
+        # counted here, or fails its foreign key once they are deleted
+        if not allotments:
+            return
+        ids = [allotment.id for allotment in allotments]
+        result = await db.execute(
+            select(Booking.allotment_id, func.sum(Booking.quantity))
+            .where(Booking.allotment_id.in_(ids))
+            .group_by(Booking.allotment_id)
+        )
+        sold = dict(result.all())
+        unsold: dict[int, int] = defaultdict(int)
+        for allotment in allotments:
+            unsold[allotment.event_id] += allotment.tickets - sold.get(allotment.id, 0)
+        await db.execute(
+            delete(InventoryAllotment).where(InventoryAllotment.id.in_(ids))
+        )
+        # Event rows in id order, so concurrent callers cannot deadlock
+        for event_id in sorted(unsold):
+            if unsold[event_id]:
+                await event_manager.release_tickets(db, event_id, unsold[event_id])
+
+
+inventory_allotment_manager = InventoryAllotmentManager(InventoryAllotment)
@@ -0,0 +1,45 @@
+import base64
+import binascii
+import json
+from dataclasses import dataclass, field
+from datetime import date, datetime, time
+from typing import Any, Generic, TypeVar
+
+from event_manager.errors.all_errors import InvalidCursor
+
+ModelType = TypeVar("ModelType")
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+@dataclass
+class Page(Generic[ModelType]):
+    items: list[ModelType] = field(default_factory=list)
+    next_cursor: str | None = None
+
+
+def encode_cursor(sort_key: str, sort_value: Any, id: int) -> str:
+    if isinstance(sort_value, (date, datetime, time)):
+        sort_value = sort_value.isoformat()
+    payload = json.dumps({"k": sort_key, "v": sort_value, "id": id})
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, sort_key: str, python_type: type) -> tuple[Any, int]:
+    """
+    Returns the `(sort_value, id)` of the last row of the previous page.
+    Cursors are only valid for the sort key they were issued for.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded))
+        if payload["k"] != sort_key:
+            raise InvalidCursor
+        sort_value = payload["v"]
+        if python_type in (date, datetime, time):
+            sort_value = python_type.fromisoformat(sort_value)
+        else:
+            sort_value = python_type(sort_value)
+        return sort_value, int(payload["id"])
+    except (binascii.Error, ValueError, TypeError, KeyError) as e:
+        raise InvalidCursor from e
@@ -1,21 +1,125 @@
+from datetime import datetime
+from typing import Any, Sequence
+
+from sqlalchemy import CTE, Update, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql.base import ExecutableOption
 
+from event_manager.dal.booking import booking_manager
 from event_manager.dal.crud_manager import CRUD
-from event_manager.models.payment import Payment
+from event_manager.models.booking import Booking, BookingStatus
+from event_manager.models.payment import Payment, PaymentStatus
 from event_manager.schemas.payment import PaymentCreate, PaymentUpdate
 
 
 class PaymentManager(CRUD[Payment, PaymentCreate, PaymentUpdate]):
     async def get_payment_by_transaction_id(
-        self, db: AsyncSession, transaction_id: str
+        self,
+        db: AsyncSession,
+        transaction_id: str,
+        load: Sequence[ExecutableOption] = (),
     ) -> Payment | None:
         payments = await self.get_all(
-            db=db, additional_where_clause=[Payment.transaction_id == transaction_id]
+            db=db,
+            additional_where_clause=[Payment.transaction_id == transaction_id],
+            load=load,
         )
         if payments:
             return payments[0]
         else:
             return None
 
+    async def existing_transaction_ids(
+        self, db: AsyncSession, transaction_ids: list[str]
+    ) -> set[str]:
+        """Those of `transaction_ids` a payment was recorded for."""
+        result = await db.execute(
+            select(Payment.transaction_id).where(
+                Payment.transaction_id.in_(transaction_ids)
+            )
+        )
+        return set(result.scalars())
+
+    async def settle(
+        self, db: AsyncSession, transaction_ids: list[str], status: PaymentStatus
+    ) -> list[int]:
+        """
+        Moves the pending payments among `transaction_ids` to `status` in a
+        single statement: completed payments confirm their held booking,
+        failed ones release it and credit the tickets back to the event.
+        Payments no longer pending are left alone, so replays are no-ops.
+
+        A payment completed for a booking that was released meanwhile (the
+        hold lapsed and its tickets went back on sale) is marked
+        REFUND_REQUIRED instead; the ids of those bookings are returned.
+        """
+        settled = (
+            update(Payment)
+            .where(
+                Payment.transaction_id.in_(transaction_ids),
+                Payment.status == PaymentStatus.PENDING,
+            )
+            .values(status=status)
+            .returning(Payment.id, Payment.booking_id)
+            .cte("settled")
+        )
+        holds = update(Booking).where(
+            Booking.id == settled.c.booking_id,
+            Booking.status == BookingStatus.HELD,
+        )
+        if status == PaymentStatus.COMPLETED:
+            return await self._confirm(db, settled, holds)
+        released = (
+            holds.values(status=BookingStatus.RELEASED)
+            .returning(Booking.event_id, Booking.quantity)
+            .cte("released")
+        )
+        result = await db.execute(booking_manager.credit_released(released))
+        await booking_manager.credited_events(db, result.all())
+        return []
+
+    async def _confirm(
+        self, db: AsyncSession, settled: CTE, holds: Update
+    ) -> list[int]:
+        confirmed = (
+            holds.values(status=BookingStatus.CONFIRMED)
+            .returning(Booking.id)
+            .cte("confirmed")
+        )
+        # Bookings the success route already confirmed are left alone; only
+        # released ones, whose tickets went back on sale, need a refund
+        result = await db.execute(
+            select(settled.c.id, settled.c.booking_id)
+            .join(Booking, Booking.id == settled.c.booking_id)
+            .where(Booking.status == BookingStatus.RELEASED)
+            .add_cte(confirmed)
+        )
+        lapsed = result.all()
+        if lapsed:
+            await db.execute(
+                update(Payment)
+                .where(Payment.id.in_([row.id for row in lapsed]))
+                .values(status=PaymentStatus.REFUND_REQUIRED)
+                .execution_options(synchronize_session=False)
+            )
+        return [row.booking_id for row in lapsed]
+
+    @staticmethod
+    def export_filter(
+        event_id: int | None = None,
+        since: datetime | None = None,
+        until: datetime | None = None,
+    ) -> list[Any]:
+        """Payments for bookings of `event_id`, if given, made in `[since, until)`."""
+        clause = []
+        if event_id is not None:
+            bookings = select(Booking.id).where(Booking.event_id == event_id)
+            clause.append(Payment.booking_id.in_(bookings))
+        if since is not None:
+            clause.append(Payment.payment_time >= since)
+        if until is not None:
+            clause.append(Payment.payment_time < until)
+        return clause
+
 
 payment_manager = PaymentManager(Payment)
@@ -0,0 +1,139 @@
+from datetime import timedelta
+from typing import Any, Sequence
+
+from sqlalchemy import Row, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import func
+
+from event_manager.dal.booking import booking_manager
+from event_manager.dal.crud_manager import CRUD
+from event_manager.dal.event import event_manager
+from event_manager.models.booking import Booking, BookingStatus
+from event_manager.models.payment import Payment, PaymentStatus
+from event_manager.models.payment_outbox import OutboxStatus, PaymentOutbox
+from event_manager.schemas.payment import PaymentOutboxCreate, PaymentOutboxUpdate
+
+
+class PaymentOutboxManager(
+    CRUD[PaymentOutbox, PaymentOutboxCreate, PaymentOutboxUpdate]
+):
+    async def enqueue(self, db: AsyncSession, outbox_in: PaymentOutboxCreate) -> None:
+        # Part of the booking transaction, so a single statement and no refresh
+        await db.execute(insert(PaymentOutbox).values(**outbox_in.model_dump()))
+
+    async def get_by_booking(
+        self, db: AsyncSession, booking_id: int
+    ) -> PaymentOutbox | None:
+        result = await db.execute(
+            select(PaymentOutbox).where(PaymentOutbox.booking_id == booking_id)
+        )
+        return result.scalars().first()
+
+    async def claim_due(
+        self, db: AsyncSession, limit: int, lease: float
+    ) -> Sequence[Row[Any]]:
+        """
+        Leases up to `limit` due rows for `lease` seconds. Rows locked by
+        another dispatcher are skipped rather than waited on, and a lease that
+        runs out (the dispatcher died mid-batch) makes the row due again.
+        """
+        due = (
+            select(PaymentOutbox.id)
+            .where(
+                PaymentOutbox.status == OutboxStatus.PENDING,
+                PaymentOutbox.next_attempt_at <= func.now(),
+            )
+            .order_by(PaymentOutbox.next_attempt_at)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+            .subquery()
+        )
+        result = await db.execute(
+            update(PaymentOutbox)
+            .where(PaymentOutbox.id == due.c.id, Booking.id == PaymentOutbox.booking_id)
+            .values(
+                attempts=PaymentOutbox.attempts + 1,
+                next_attempt_at=func.now() + timedelta(seconds=lease),
+            )
+            .returning(
+                PaymentOutbox.id,
+                PaymentOutbox.booking_id,
+                PaymentOutbox.amount,
+                PaymentOutbox.idempotency_key,
+                PaymentOutbox.attempts,
+                Booking.event_id,
+                Booking.quantity,
+            )
+            .execution_options(synchronize_session=False)
+        )
+        return result.all()
+
+    async def mark_dispatched(
+        self, db: AsyncSession, claimed: Row[Any], payment_intent: dict[str, Any]
+    ) -> None:
+        result = await db.execute(
+            update(PaymentOutbox)
+            .where(
+                PaymentOutbox.id == claimed.id,
+                PaymentOutbox.status == OutboxStatus.PENDING,
+            )
+            .values(
+                status=OutboxStatus.DISPATCHED,
+                transaction_id=payment_intent["id"],
+                client_secret=payment_intent["client_secret"],
+                last_error=None,
+            )
+            .returning(PaymentOutbox.id)
+            .execution_options(synchronize_session=False)
+        )
+        if result.scalar_one_or_none() is None:
+            # Lease ran out and another dispatcher already recorded the intent
+            return
+        await db.execute(
+            insert(Payment).values(
+                booking_id=claimed.booking_id,
+                amount=claimed.amount,
+                status=PaymentStatus.PENDING,
+                transaction_id=payment_intent["id"],
+                idempotency_key=claimed.idempotency_key,
+            )
+        )
+
+    async def mark_retry(
+        self,
+        db: AsyncSession,
+        claimed: Row[Any],
+        error: str,
+        max_attempts: int,
+        backoff: float,
+    ) -> None:
+        """
+        Schedules the next attempt `backoff ** attempts` seconds out, or gives
+        up after `max_attempts` and hands the held tickets back.
+        """
+        if claimed.attempts < max_attempts:
+            values: dict[str, Any] = {
+                "next_attempt_at": func.now()
+                + timedelta(seconds=backoff**claimed.attempts)
+            }
+        else:
+            values = {"status": OutboxStatus.FAILED}
+        result = await db.execute(
+            update(PaymentOutbox)
+            .where(
+                PaymentOutbox.id == claimed.id,
+                PaymentOutbox.status == OutboxStatus.PENDING,
+            )
+            .values(last_error=error, **values)
+            .returning(PaymentOutbox.status)
+            .execution_options(synchronize_session=False)
+        )
+        if result.scalar_one_or_none() != OutboxStatus.FAILED:
+            return
+        if await booking_manager.end_hold(
+            db, claimed.booking_id, BookingStatus.RELEASED
+        ):
+            await event_manager.release_tickets(db, claimed.event_id, claimed.quantity)
+
+
+payment_outbox_manager = PaymentOutboxManager(PaymentOutbox)
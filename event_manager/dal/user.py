@@ -3,6 +3,7 @@ from typing import Optional
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from event_manager.cache import entity_cache_for
 from event_manager.dal.crud_manager import CRUD
 from event_manager.models.user import User
 from event_manager.schemas.user import UserCreate, UserUpdate
@@ -14,4 +15,4 @@ class UserManager(CRUD[User, UserCreate, UserUpdate]):
         return result.scalars().first()
 
 
-user_manager = UserManager(User)
+user_manager = UserManager(User, cache=entity_cache_for(User))
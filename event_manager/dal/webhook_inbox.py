@@ -0,0 +1,94 @@
+from datetime import timedelta
+from typing import Any, Sequence
+
+from sqlalchemy import Row, case, false, or_, select, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import func
+
+from event_manager.dal.crud_manager import CRUD
+from event_manager.models.webhook_inbox import WebhookInbox
+from event_manager.schemas.payment import WebhookEvent, WebhookEventUpdate
+
+
+class WebhookInboxManager(CRUD[WebhookInbox, WebhookEvent, WebhookEventUpdate]):
+    async def record(self, db: AsyncSession, event: WebhookEvent) -> bool:
+        """Stores the event, returning False when it was already delivered."""
+        result = await db.execute(
+            insert(WebhookInbox)
+            .values(**event.model_dump())
+            .on_conflict_do_nothing(index_elements=[WebhookInbox.event_id])
+            .returning(WebhookInbox.id)
+        )
+        return result.scalar_one_or_none() is not None
+
+    async def claim_batch(self, db: AsyncSession, limit: int) -> Sequence[Row[Any]]:
+        """
+        Locks up to `limit` unprocessed events that are due, oldest first,
+        until the transaction ends; events locked by another worker are
+        skipped.
+        """
+        result = await db.execute(
+            select(
+                WebhookInbox.id,
+                WebhookInbox.event_type,
+                WebhookInbox.payment_intent_id,
+            )
+            .where(
+                WebhookInbox.processed_at.is_(None),
+                WebhookInbox.parked_at.is_(None),
+                WebhookInbox.next_attempt_at <= func.now(),
+            )
+            .order_by(WebhookInbox.received_at, WebhookInbox.id)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        return result.all()
+
+    async def mark_processed(self, db: AsyncSession, ids: list[int]) -> None:
+        await db.execute(
+            update(WebhookInbox)
+            .where(WebhookInbox.id.in_(ids))
+            .values(processed_at=func.now())
+            .execution_options(synchronize_session=False)
+        )
+
+    async def mark_retry(
+        self,
+        db: AsyncSession,
+        ids: list[int],
+        error: str,
+        backoff: float,
+        max_attempts: int | None = None,
+        max_age: float | None = None,
+    ) -> int:
+        """
+        Schedules the events' next attempt `backoff ** attempts` seconds out,
+        or parks them once they have been tried `max_attempts` times or were
+        received over `max_age` seconds ago. Returns how many were parked.
+        """
+        attempts = WebhookInbox.attempts + 1
+        give_up = []
+        if max_attempts is not None:
+            give_up.append(attempts >= max_attempts)
+        if max_age is not None:
+            give_up.append(
+                WebhookInbox.received_at <= func.now() - timedelta(seconds=max_age)
+            )
+        result = await db.execute(
+            update(WebhookInbox)
+            .where(WebhookInbox.id.in_(ids))
+            .values(
+                attempts=attempts,
+                last_error=error,
+                next_attempt_at=func.now()
+                + func.make_interval(0, 0, 0, 0, 0, 0, func.power(backoff, attempts)),
+                parked_at=case((or_(false(), *give_up), func.now())),
+            )
+            .returning(WebhookInbox.parked_at)
+            .execution_options(synchronize_session=False)
+        )
+        return sum(parked_at is not None for parked_at in result.scalars())
+
+
+webhook_inbox_manager = WebhookInboxManager(WebhookInbox)
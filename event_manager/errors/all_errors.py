@@ -12,3 +12,42 @@ class InsufficientTickets(BaseEventError):
 class ResourceNotFound(BaseEventError):
     def __init__(self, message: str):
         super().__init__(code=400, message=message)
+
+
+class InvalidCursor(BaseEventError):
+    def __init__(self):
+        super().__init__(code=400, message="Invalid pagination cursor")
+
+
+class InvalidLocation(BaseEventError):
+    def __init__(self, message: str):
+        super().__init__(code=400, message=message)
+
+
+class ReservationExpired(BaseEventError):
+    def __init__(self):
+        super().__init__(code=409, message="Reservation expired")
+
+
+class InvalidWebhook(BaseEventError):
+    def __init__(self, message: str):
+        super().__init__(code=400, message=message)
+
+
+class IdempotencyKeyReused(BaseEventError):
+    def __init__(self):
+        super().__init__(
+            code=422, message="Idempotency-Key was used for a different request"
+        )
+
+
+class IdempotentRequestInProgress(BaseEventError):
+    def __init__(self):
+        super().__init__(
+            code=409, message="A request with this Idempotency-Key is in progress"
+        )
+
+
+class InvalidImportFile(BaseEventError):
+    def __init__(self, message: str):
+        super().__init__(code=400, message=message)
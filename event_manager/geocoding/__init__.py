@@ -0,0 +1,14 @@
+from event_manager.core.config import settings
+from event_manager.geocoding.abstract_geocoder import Geocoder
+from event_manager.geocoding.cached_geocoder import CachedGeocoder
+from event_manager.geocoding.google_maps import GoogleMapsGeocoder
+
+geocoder = CachedGeocoder(
+    GoogleMapsGeocoder(settings.GOOGLE_MAPS_API_KEY),
+    max_size=settings.GEOCODE_CACHE_SIZE,
+    ttl=settings.GEOCODE_CACHE_TTL,
+)
+
+
+def get_geocoder() -> Geocoder:
+    return geocoder
@@ -0,0 +1,15 @@
+import re
+from abc import ABC, abstractmethod
+
+Coordinates = tuple[float, float]
+
+
+def normalize_address(address: str) -> str:
+    """Case, punctuation and whitespace do not change where a venue is."""
+    return " ".join(re.findall(r"\w+", address.lower()))
+
+
+class Geocoder(ABC):
+    @abstractmethod
+    async def geocode(self, address: str) -> Coordinates | None:
+        """Returns the `(lat, long)` of the address, or None if it is unknown."""
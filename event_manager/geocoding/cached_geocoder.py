@@ -0,0 +1,79 @@
+import asyncio
+import time
+from collections import OrderedDict
+
+from event_manager.geocoding.abstract_geocoder import (
+    Coordinates,
+    Geocoder,
+    normalize_address,
+)
+
+
+class CachedGeocoder(Geocoder):
+    """
+    Bounded LRU cache with a TTL in front of another geocoder, keyed by the
+    normalized address. Misses are cached too, and concurrent lookups of the
+    same address share one call to the wrapped geocoder.
+    """
+
+    def __init__(self, geocoder: Geocoder, max_size: int, ttl: float):
+        self.geocoder = geocoder
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: OrderedDict[str, tuple[float, Coordinates | None]] = (
+            OrderedDict()
+        )
+        self._pending: dict[str, asyncio.Future] = {}
+
+    def _get(self, key: str) -> tuple[bool, Coordinates | None]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return False, None
+        expires_at, coordinates = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            return False, None
+        self._entries.move_to_end(key)
+        return True, coordinates
+
+    def _put(self, key: str, coordinates: Coordinates | None) -> None:
+        self._entries[key] = (time.monotonic() + self.ttl, coordinates)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    async def geocode(self, address: str) -> Coordinates | None:
+        key = normalize_address(address)
+        found, coordinates = self._get(key)
+        if found:
+            return coordinates
+        if key in self._pending:
+            pending = self._pending[key]
+            try:
+                return await asyncio.shield(pending)
+            except asyncio.CancelledError:
+                if not pending.cancelled() or asyncio.current_task().cancelling():
+                    raise
+            # The lookup was cancelled with the task that made it; not this one
+            return await self.geocode(address)
+
+        future = asyncio.get_running_loop().create_future()
+        self._pending[key] = future
+        try:
+            coordinates = await self.geocoder.geocode(address)
+        except Exception as e:
+            future.set_exception(e)
+            # Only waiters see the failure; avoid "exception never retrieved"
+            future.exception()
+            raise
+        else:
+            self._put(key, coordinates)
+            future.set_result(coordinates)
+            return coordinates
+        finally:
+            del self._pending[key]
+            if not future.done():
+                future.cancel()
+
+    def clear(self) -> None:
+        self._entries.clear()
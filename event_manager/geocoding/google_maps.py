@@ -0,0 +1,30 @@
+import asyncio
+
+import googlemaps
+
+from event_manager.geocoding.abstract_geocoder import Coordinates, Geocoder
+
+
+class GoogleMapsGeocoder(Geocoder):
+    """
+    googlemaps is a blocking client, so lookups run on the default thread
+    pool instead of the event loop. One client, and with it one HTTP
+    connection pool, is shared by all requests.
+    """
+
+    def __init__(self, api_key: str):
+        self.api_key = api_key
+        self._client: googlemaps.Client | None = None
+
+    @property
+    def client(self) -> googlemaps.Client:
+        if self._client is None:
+            self._client = googlemaps.Client(key=self.api_key)
+        return self._client
+
+    async def geocode(self, address: str) -> Coordinates | None:
+        result = await asyncio.to_thread(self.client.geocode, address)
+        if not result:
+            return None
+        location = result[0]["geometry"]["location"]
+        return location["lat"], location["lng"]
@@ -0,0 +1,20 @@
+from event_manager.geocoding.abstract_geocoder import (
+    Coordinates,
+    Geocoder,
+    normalize_address,
+)
+
+
+class StaticGeocoder(Geocoder):
+    """Resolves addresses from a fixed table, for tests and local runs."""
+
+    def __init__(self, locations: dict[str, Coordinates] | None = None):
+        self.locations = {
+            normalize_address(address): coordinates
+            for address, coordinates in (locations or {}).items()
+        }
+        self.lookups: list[str] = []
+
+    async def geocode(self, address: str) -> Coordinates | None:
+        self.lookups.append(address)
+        return self.locations.get(normalize_address(address))
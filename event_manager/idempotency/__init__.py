@@ -0,0 +1,16 @@
+from event_manager.core.config import settings
+from event_manager.core.database import sessionmaker_instance
+from event_manager.idempotency.store import IdempotencyStore
+
+idempotency_store = IdempotencyStore(
+    session_factory=sessionmaker_instance,
+    max_size=settings.IDEMPOTENCY_CACHE_SIZE,
+    lock_timeout=settings.IDEMPOTENCY_LOCK_TIMEOUT,
+    wait_timeout=settings.IDEMPOTENCY_WAIT_TIMEOUT,
+    retention=settings.IDEMPOTENCY_RETENTION,
+    prune_batch_size=settings.IDEMPOTENCY_PRUNE_BATCH_SIZE,
+)
+
+
+def get_idempotency_store() -> IdempotencyStore:
+    return idempotency_store
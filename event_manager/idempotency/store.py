@@ -0,0 +1,172 @@
+import asyncio
+import hashlib
+from collections import OrderedDict
+from dataclasses import dataclass
+from logging import getLogger
+from typing import Any, Callable
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from event_manager.dal.idempotency import idempotency_key_manager
+from event_manager.errors.all_errors import (
+    IdempotencyKeyReused,
+    IdempotentRequestInProgress,
+)
+
+logger = getLogger(__name__)
+
+
+def request_fingerprint(method: str, url: str, body: bytes) -> str:
+    digest = hashlib.sha256(f"{method} {url}\n".encode())
+    digest.update(body)
+    return digest.hexdigest()
+
+
+@dataclass
+class StoredResponse:
+    status_code: int
+    body: Any
+
+
+class IdempotencyStore:
+    """
+    Maps `Idempotency-Key`s to the response of the request that first used
+    them: an `idempotency_keys` row per key, with a bounded LRU of finished
+    responses in front so hot replays skip the database.
+
+    `begin()` either claims the key for the caller or returns the stored
+    response. Duplicates that arrive while the first request is running wait
+    for it, woken at once when it ran in this process and polling the table
+    otherwise, and give up with IdempotentRequestInProgress after
+    `wait_timeout` seconds. Finished keys are kept for `retention` seconds,
+    then deleted by `run_pruner()` `prune_batch_size` at a time.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], AsyncSession],
+        max_size: int,
+        lock_timeout: float,
+        wait_timeout: float,
+        retention: float,
+        prune_batch_size: int,
+        poll_interval: float = 0.05,
+    ):
+        self.session_factory = session_factory
+        self.max_size = max_size
+        self.lock_timeout = lock_timeout
+        self.wait_timeout = wait_timeout
+        self.retention = retention
+        self.prune_batch_size = prune_batch_size
+        self.poll_interval = poll_interval
+        self._responses: OrderedDict[str, tuple[str, StoredResponse]] = OrderedDict()
+        self._in_flight: dict[str, asyncio.Event] = {}
+
+    def _get(self, key: str, fingerprint: str) -> StoredResponse | None:
+        entry = self._responses.get(key)
+        if entry is None:
+            return None
+        stored_fingerprint, response = entry
+        if stored_fingerprint != fingerprint:
+            raise IdempotencyKeyReused
+        self._responses.move_to_end(key)
+        return response
+
+    def _put(self, key: str, fingerprint: str, response: StoredResponse) -> None:
+        self._responses[key] = (fingerprint, response)
+        self._responses.move_to_end(key)
+        while len(self._responses) > self.max_size:
+            self._responses.popitem(last=False)
+
+    async def _claim(self, key: str, fingerprint: str) -> StoredResponse | None:
+        async with self.session_factory() as session:
+            existing = await idempotency_key_manager.claim(
+                session, key, fingerprint, self.lock_timeout
+            )
+            await session.commit()
+        if existing is None:
+            self._in_flight[key] = asyncio.Event()
+            return None
+        if existing.fingerprint != fingerprint:
+            raise IdempotencyKeyReused
+        if existing.response_status is None:
+            raise IdempotentRequestInProgress
+        response = StoredResponse(existing.response_status, existing.response_body)
+        self._put(key, fingerprint, response)
+        return response
+
+    async def _wait(self, key: str) -> None:
+        in_flight = self._in_flight.get(key)
+        if in_flight is None:
+            await asyncio.sleep(self.poll_interval)
+            return
+        try:
+            await asyncio.wait_for(in_flight.wait(), self.poll_interval)
+        except asyncio.TimeoutError:
+            pass
+
+    async def begin(self, key: str, fingerprint: str) -> StoredResponse | None:
+        """Returns the stored response, or None once the caller owns `key`."""
+        deadline = asyncio.get_running_loop().time() + self.wait_timeout
+        while True:
+            response = self._get(key, fingerprint)
+            if response is not None:
+                return response
+            try:
+                return await self._claim(key, fingerprint)
+            except IdempotentRequestInProgress:
+                if asyncio.get_running_loop().time() >= deadline:
+                    raise
+            await self._wait(key)
+
+    async def save(self, db: AsyncSession, key: str, response: StoredResponse) -> None:
+        """Records the response in the caller's transaction."""
+        await idempotency_key_manager.store_response(
+            db, key, response.status_code, response.body
+        )
+
+    def finish(self, key: str, fingerprint: str, response: StoredResponse) -> None:
+        """To be called once the transaction that saved `response` committed."""
+        self._put(key, fingerprint, response)
+        self._wake(key)
+
+    async def release(self, key: str) -> None:
+        """Gives the key up after a failed request, so a retry runs again."""
+        try:
+            async with self.session_factory() as session:
+                await idempotency_key_manager.release(session, key)
+                await session.commit()
+        finally:
+            self._wake(key)
+
+    def _wake(self, key: str) -> None:
+        in_flight = self._in_flight.pop(key, None)
+        if in_flight is not None:
+            in_flight.set()
+
+    def clear(self) -> None:
+        self._responses.clear()
+
+    async def prune(self) -> int:
+        """Deletes every key past its retention, returning how many."""
+        pruned = 0
+        while True:
+            async with self.session_factory() as session:
+                batch = await idempotency_key_manager.delete_finished(
+                    session, self.retention, self.prune_batch_size
+                )
+                await session.commit()
+            pruned += batch
+            if batch < self.prune_batch_size:
+                return pruned
+
+    async def run_pruner(self, interval: float) -> None:
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                pruned = await self.prune()
+            except Exception:
+                logger.exception("Pruning idempotency keys failed")
+                continue
+            if pruned:
+                logger.info("Pruned %s idempotency keys", pruned)
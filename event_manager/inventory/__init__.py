@@ -0,0 +1,20 @@
+from event_manager.core.config import settings
+from event_manager.core.database import sessionmaker_instance
+from event_manager.inventory.hold_sweeper import HoldSweeper
+from event_manager.inventory.sharded_inventory import InventoryEngine
+
+inventory_engine = InventoryEngine(
+    session_factory=sessionmaker_instance,
+    shard_capacity=settings.INVENTORY_SHARD_CAPACITY,
+    unsharded_ttl=settings.INVENTORY_UNSHARDED_TTL,
+    lease=settings.INVENTORY_ALLOTMENT_LEASE,
+    idle_ttl=settings.INVENTORY_IDLE_TTL,
+)
+hold_sweeper = HoldSweeper(
+    session_factory=sessionmaker_instance,
+    batch_size=settings.BOOKING_HOLD_SWEEP_BATCH_SIZE,
+)
+
+
+def get_inventory_engine() -> InventoryEngine:
+    return inventory_engine
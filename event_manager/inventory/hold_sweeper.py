@@ -0,0 +1,47 @@
+import asyncio
+from logging import getLogger
+from typing import Callable
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from event_manager.dal.booking import booking_manager
+
+logger = getLogger(__name__)
+
+
+class HoldSweeper:
+    """
+    Gives the tickets of abandoned `book_and_pay` holds back to their events.
+
+    Each batch is a single statement in its own short transaction, so a
+    backlog of millions of expired holds is worked off `batch_size` at a time
+    without ever blocking live bookings or payments for long.
+    """
+
+    def __init__(self, session_factory: Callable[[], AsyncSession], batch_size: int):
+        self.session_factory = session_factory
+        self.batch_size = batch_size
+
+    async def sweep(self) -> int:
+        """Releases every hold expired so far, returning how many."""
+        released = 0
+        while True:
+            async with self.session_factory() as session:
+                batch = await booking_manager.release_expired_holds(
+                    session, self.batch_size
+                )
+                await session.commit()
+            released += batch
+            if batch < self.batch_size:
+                return released
+
+    async def run(self, interval: float) -> None:
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                released = await self.sweep()
+            except Exception:
+                logger.exception("Releasing expired holds failed")
+                continue
+            if released:
+                logger.info("Released %s expired holds", released)
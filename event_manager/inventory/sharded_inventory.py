@@ -0,0 +1,286 @@
+import asyncio
+import itertools
+import uuid
+import time
+from collections import OrderedDict
+from logging import getLogger
+from typing import Callable
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from event_manager.dal.event import event_manager
+from event_manager.dal.inventory_allotment import inventory_allotment_manager
+from event_manager.errors.all_errors import InsufficientTickets
+
+logger = getLogger(__name__)
+
+
+class TicketShard:
+    """A single sub-counter of an event's inventory."""
+
+    __slots__ = ("available",)
+
+    def __init__(self, available: int = 0):
+        self.available = available
+
+    def take(self, quantity: int) -> bool:
+        if self.available < quantity:
+            return False
+        self.available -= quantity
+        return True
+
+    def put(self, quantity: int) -> None:
+        self.available += quantity
+
+    def drain(self) -> int:
+        drained, self.available = self.available, 0
+        return drained
+
+
+class ShardedInventory:
+    """
+    Tickets of one event claimed by this worker, split over N shards.
+    Reservations start on a rotating shard and only touch the other shards
+    when that one cannot serve the request. Nothing here awaits, so each
+    call runs to completion on the event loop and needs no lock; the shard
+    count sizes the allotment the engine keeps for the event.
+    """
+
+    def __init__(self, event_id: int, shard_count: int):
+        if shard_count < 1:
+            raise ValueError("shard_count must be at least 1")
+        self.event_id = event_id
+        self.shards = [TicketShard() for _ in range(shard_count)]
+        self.refill_lock = asyncio.Lock()
+        # The inventory_allotments row the tickets were claimed under
+        self.allotment_id: int | None = None
+        self.sold_at = time.monotonic()
+        self._cursor = itertools.count()
+
+    @property
+    def shard_count(self) -> int:
+        return len(self.shards)
+
+    @property
+    def available(self) -> int:
+        return sum(shard.available for shard in self.shards)
+
+    def reserve(self, quantity: int) -> bool:
+        start = next(self._cursor)
+        for offset in range(self.shard_count):
+            if self.shards[(start + offset) % self.shard_count].take(quantity):
+                return True
+        return self._reserve_across_shards(quantity)
+
+    def _reserve_across_shards(self, quantity: int) -> bool:
+        if self.available < quantity:
+            return False
+        remaining = quantity
+        for shard in self.shards:
+            taken = min(shard.available, remaining)
+            shard.available -= taken
+            remaining -= taken
+            if not remaining:
+                break
+        return True
+
+    def release(self, quantity: int) -> None:
+        self.shards[next(self._cursor) % self.shard_count].put(quantity)
+
+    def distribute(self, quantity: int) -> None:
+        per_shard, extra = divmod(quantity, self.shard_count)
+        for index, shard in enumerate(self.shards):
+            shard.put(per_shard + (1 if index < extra else 0))
+
+    def drain(self) -> int:
+        return sum(shard.drain() for shard in self.shards)
+
+
+class InventoryEngine:
+    """
+    Serves bookings for events with `inventory_shards > 0` from memory.
+
+    Every worker claims an allotment of `shard_count * shard_capacity` tickets
+    from `events.available_tickets` in its own short transaction and sells
+    from it without touching the event row again. The reconciler tops the
+    allotment up when it runs low, and hands what is unsold back to the row
+    when an event opts out, sells nothing for `idle_ttl` seconds, or the
+    worker shuts down.
+
+    Allotments are recorded in `inventory_allotments` and bookings sold from
+    them point at theirs, so what is unsold is known without the worker. The
+    reconciler renews this worker's allotments and closes those of workers
+    that did not renew theirs for `lease` seconds, e.g. after a crash; a
+    worker finding its own allotment closed drops it.
+
+    Only events with an inventory are refreshed by the reconciler. Events
+    found unsharded are remembered, up to `unsharded_cache_size` of them, and
+    looked up again on the next booking `unsharded_ttl` seconds later.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], AsyncSession],
+        shard_capacity: int,
+        unsharded_ttl: float = 5.0,
+        unsharded_cache_size: int = 10_000,
+        lease: float = 30.0,
+        idle_ttl: float = 300.0,
+        reclaim_batch_size: int = 100,
+    ):
+        self.session_factory = session_factory
+        self.shard_capacity = shard_capacity
+        self.unsharded_ttl = unsharded_ttl
+        self.unsharded_cache_size = unsharded_cache_size
+        self.lease = lease
+        self.idle_ttl = idle_ttl
+        self.reclaim_batch_size = reclaim_batch_size
+        self.worker_id = uuid.uuid4().hex
+        self._inventories: dict[int, ShardedInventory] = {}
+        # Event id to when it was last found unsharded
+        self._unsharded: OrderedDict[int, float] = OrderedDict()
+
+    def get_inventory(self, event_id: int) -> ShardedInventory | None:
+        return self._inventories.get(event_id)
+
+    async def reserve(self, event_id: int, quantity: int) -> int | None:
+        """
+        Returns the allotment the tickets came from, for the booking to
+        record, or None when the event is not managed by the engine, so the
+        caller can fall back to a row-locking booking strategy.
+        """
+        if event_id not in self._inventories and not self._known_unsharded(event_id):
+            await self.refresh_configuration([event_id])
+        inventory = self._inventories.get(event_id)
+        if inventory is None:
+            return None
+        if not inventory.reserve(quantity):
+            await self._top_up(inventory, minimum=quantity)
+            if self._inventories.get(event_id) is not inventory:
+                # Reconfigured meanwhile; try again with what the event is now
+                return await self.reserve(event_id, quantity)
+            if not inventory.reserve(quantity):
+                raise InsufficientTickets
+        inventory.sold_at = time.monotonic()
+        return inventory.allotment_id
+
+    async def release(self, event_id: int, quantity: int, allotment_id: int) -> None:
+        """Puts back tickets `reserve()` took for a booking that failed."""
+        inventory = self._inventories.get(event_id)
+        if inventory is not None and inventory.allotment_id == allotment_id:
+            inventory.release(quantity)
+        # Otherwise the allotment was closed, which credited them to the event
+
+    def _known_unsharded(self, event_id: int) -> bool:
+        checked_at = self._unsharded.get(event_id)
+        return (
+            checked_at is not None
+            and time.monotonic() - checked_at < self.unsharded_ttl
+        )
+
+    def _remember_unsharded(self, event_id: int) -> None:
+        self._unsharded[event_id] = time.monotonic()
+        self._unsharded.move_to_end(event_id)
+        while len(self._unsharded) > self.unsharded_cache_size:
+            self._unsharded.popitem(last=False)
+
+    async def refresh_configuration(self, event_ids: list[int]) -> None:
+        async with self.session_factory() as session:
+            shard_counts = await event_manager.get_inventory_shards(session, event_ids)
+
+        for event_id in event_ids:
+            shard_count = shard_counts.get(event_id, 0)
+            if shard_count:
+                self._unsharded.pop(event_id, None)
+            else:
+                self._remember_unsharded(event_id)
+            inventory = self._inventories.get(event_id)
+            if inventory and inventory.shard_count == shard_count:
+                continue
+            if inventory:
+                # Shard count changed or event opted out: rebuild from scratch
+                await self._drop(inventory)
+            if shard_count and event_id not in self._inventories:
+                self._inventories[event_id] = ShardedInventory(event_id, shard_count)
+
+    async def _renew_allotments(self) -> None:
+        async with self.session_factory() as session:
+            live = await inventory_allotment_manager.heartbeat(session, self.worker_id)
+            reclaimed = await inventory_allotment_manager.reclaim_expired(
+                session, self.lease, self.reclaim_batch_size
+            )
+            await session.commit()
+        if reclaimed:
+            logger.warning("Reclaimed %s lapsed inventory allotments", reclaimed)
+        for inventory in list(self._inventories.values()):
+            if (
+                inventory.allotment_id is not None
+                and inventory.allotment_id not in live
+            ):
+                # This worker stalled past its lease and the tickets were
+                # handed back; selling on would oversell
+                logger.warning("Allotment for event %s lapsed", inventory.event_id)
+                await self._drop(inventory)
+
+    async def reconcile(self) -> None:
+        await self._renew_allotments()
+        if self._inventories:
+            await self.refresh_configuration(list(self._inventories))
+        now = time.monotonic()
+        for inventory in list(self._inventories.values()):
+            if now - inventory.sold_at > self.idle_ttl:
+                await self._drop(inventory)
+            elif inventory.available < self._allotment(inventory) // 2:
+                await self._top_up(inventory)
+
+    async def run_reconciler(self, interval: float) -> None:
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.reconcile()
+            except Exception:
+                logger.exception("Inventory reconciliation failed")
+
+    async def release_all(self) -> None:
+        for inventory in list(self._inventories.values()):
+            await self._drop(inventory)
+
+    def _allotment(self, inventory: ShardedInventory) -> int:
+        return inventory.shard_count * self.shard_capacity
+
+    async def _top_up(self, inventory: ShardedInventory, minimum: int = 0) -> None:
+        async with inventory.refill_lock:
+            if self._inventories.get(inventory.event_id) is not inventory:
+                # Dropped while waiting for the lock
+                return
+            wanted = max(self._allotment(inventory), minimum) - inventory.available
+            if wanted <= 0:
+                return
+            async with self.session_factory() as session:
+                claimed, allotment_id = await inventory_allotment_manager.claim(
+                    session,
+                    self.worker_id,
+                    inventory.event_id,
+                    inventory.allotment_id,
+                    wanted,
+                )
+                await session.commit()
+            if inventory.allotment_id not in (None, allotment_id):
+                # Closed by another worker, which handed what was left back
+                inventory.drain()
+            inventory.allotment_id = allotment_id
+            inventory.distribute(claimed)
+
+    async def _drop(self, inventory: ShardedInventory) -> None:
+        """Forgets the inventory and closes its allotment."""
+        # Under the refill lock, so no top-up can add to the allotment after
+        # it was closed
+        async with inventory.refill_lock:
+            if self._inventories.get(inventory.event_id) is inventory:
+                del self._inventories[inventory.event_id]
+            inventory.drain()
+            if inventory.allotment_id is None:
+                return
+            async with self.session_factory() as session:
+                await inventory_allotment_manager.close(session, inventory.allotment_id)
+                await session.commit()
@@ -31,13 +31,13 @@ async def create_keycloak_user(
         "enabled": True,
         "credentials": [{"value": password, "type": "password", "temporary": False}],
     }
-    logger.info(f"USER --> {user}")
+    logger.info("Creating Keycloak user %s", username)
     try:
         user_id = await keycloak_admin.a_create_user(user)
         count_users = await keycloak_admin.a_users_count()
-        logger.info(f"User count after creating {count_users}")
+        logger.debug("User count after creating %s", count_users)
         roles = await keycloak_admin.a_get_realm_roles()
-        logger.info(f"Keycloak roles --> {roles}")
+        logger.debug("Keycloak roles: %s", [krole["name"] for krole in roles])
         if is_admin:
             final_role = next(role for role in roles if role["name"] == "admin")
         else:
@@ -74,14 +74,14 @@ async def update_keycloak_user(
         await keycloak_admin.a_update_user(user_id=user_id, payload=user)
         if role:
             roles = await keycloak_admin.a_get_realm_roles()
-            logger.info(f"Keycloak roles --> {roles}")
+            logger.debug("Keycloak roles: %s", [krole["name"] for krole in roles])
             update_role = next(
                 krole for krole in roles if krole["name"] == role.value.lower()
             )
             delete_role = next(
                 krole for krole in roles if krole["name"] == old_role.value.lower()
             )
-            logger.debug(f"OLD ROLE --> {delete_role}")
+            logger.debug("Removing role %s", delete_role["name"])
             await keycloak_admin.a_delete_realm_roles_of_user(
                 user_id=user_id, roles=[delete_role]
             )
@@ -98,9 +98,9 @@ async def update_keycloak_user(
 async def delete_keycloak_user(user_id: str) -> None:
     try:
         resp = await keycloak_admin.a_delete_user(user_id=user_id)
-        logger.info(f"keycloak delete response {resp}")
+        logger.debug("Keycloak delete response %s", resp)
         count_users = await keycloak_admin.a_users_count()
-        logger.info(f"User count after deleting {count_users}")
+        logger.debug("User count after deleting %s", count_users)
     except Exception as e:
-        logger.exception(f"Error while deleting keycloak user with id {user_id}")
+        logger.exception("Error while deleting keycloak user with id %s", user_id)
         raise e
@@ -0,0 +1,129 @@
+import asyncio
+import hashlib
+import time
+from collections import OrderedDict
+from logging import getLogger
+from typing import Any, Awaitable, Callable
+
+import httpx
+import jwt
+from jwt import PyJWK
+
+logger = getLogger(__name__)
+
+JWKSFetcher = Callable[[], Awaitable[dict[str, Any]]]
+
+
+def http_jwks_fetcher(uri: str, timeout: float = 5.0) -> JWKSFetcher:
+    async def fetch() -> dict[str, Any]:
+        async with httpx.AsyncClient(timeout=timeout) as client:
+            response = await client.get(uri)
+            response.raise_for_status()
+            return response.json()
+
+    return fetch
+
+
+class JWKSCache:
+    """
+    Process-wide signing keys of the realm, by `kid`.
+
+    Keys are refreshed in the background every `refresh_interval`. A token
+    signed with an unknown `kid` triggers an immediate refresh so rotated-in
+    keys are picked up, but at most once per `min_refresh_interval` so bogus
+    key ids cannot turn every request into a round trip to Keycloak. Keys
+    that disappear from the realm are dropped on the next refresh.
+    """
+
+    def __init__(self, fetch: JWKSFetcher, min_refresh_interval: float = 10.0):
+        self.fetch = fetch
+        self.min_refresh_interval = min_refresh_interval
+        self._keys: dict[str, PyJWK] = {}
+        self._refreshed_at: float | None = None
+        self._lock = asyncio.Lock()
+
+    async def get_signing_key(self, kid: str | None) -> PyJWK:
+        key = self._keys.get(kid)
+        if key is not None:
+            return key
+        async with self._lock:
+            # Another request may have refreshed while this one waited
+            if kid not in self._keys and self._may_refresh():
+                await self._refresh()
+        key = self._keys.get(kid)
+        if key is None:
+            raise jwt.exceptions.InvalidKeyError(f"Unknown signing key {kid}")
+        return key
+
+    def _may_refresh(self) -> bool:
+        return (
+            self._refreshed_at is None
+            or time.monotonic() - self._refreshed_at >= self.min_refresh_interval
+        )
+
+    async def _refresh(self) -> None:
+        self._refreshed_at = time.monotonic()
+        jwks = await self.fetch()
+        keys = {}
+        for jwk in jwks.get("keys", []):
+            if jwk.get("use", "sig") != "sig" or "kid" not in jwk:
+                continue
+            try:
+                keys[jwk["kid"]] = PyJWK(jwk)
+            except jwt.exceptions.PyJWTError:
+                logger.warning("Skipping unusable JWK %s", jwk["kid"])
+        self._keys = keys
+
+    async def refresh(self) -> None:
+        async with self._lock:
+            await self._refresh()
+
+    async def run_refresher(self, interval: float) -> None:
+        while True:
+            try:
+                await self.refresh()
+            except Exception:
+                logger.exception("JWKS refresh failed")
+            await asyncio.sleep(interval)
+
+
+class VerifiedTokenCache:
+    """
+    Short-lived LRU of tokens whose signature and claims were already
+    verified, keyed by a digest of the token so raw tokens are not kept
+    around. Entries never outlive the token's own `exp`.
+    """
+
+    def __init__(self, max_size: int, ttl: float):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: OrderedDict[bytes, tuple[float, dict[str, Any]]] = OrderedDict()
+
+    @staticmethod
+    def _key(token: str) -> bytes:
+        return hashlib.sha256(token.encode()).digest()
+
+    def get(self, token: str) -> dict[str, Any] | None:
+        key = self._key(token)
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, claims = entry
+        if expires_at <= time.time():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return claims
+
+    def put(self, token: str, claims: dict[str, Any]) -> None:
+        expires_at = time.time() + self.ttl
+        if "exp" in claims:
+            expires_at = min(expires_at, claims["exp"])
+        key = self._key(token)
+        self._entries[key] = (expires_at, claims)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
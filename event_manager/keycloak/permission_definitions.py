@@ -1,5 +1,5 @@
 import enum
-from typing import Optional
+from typing import Iterable, Optional
 
 
 @enum.unique
@@ -41,16 +41,47 @@ role_to_permissions_map = {
 }
 
 
-def permissions_for_role(r: Optional[str]) -> list[Permission]:
+# Compiled once: every permission is one bit, every role the OR of its bits,
+# so checking any number of permissions is a dict lookup and an AND.
+permission_bits = {
+    permission: 1 << index for index, permission in enumerate(Permission)
+}
+
+
+def permission_mask(permissions: Iterable[Permission]) -> int:
+    mask = 0
+    for permission in permissions:
+        mask |= permission_bits[permission]
+    return mask
+
+
+role_permission_masks = {
+    role: permission_mask(permissions)
+    for role, permissions in role_to_permissions_map.items()
+}
+role_permission_sets = {
+    role: frozenset(permissions)
+    for role, permissions in role_to_permissions_map.items()
+}
+
+
+def has_all(role: str, mask: int) -> bool:
+    """Whether the role holds every permission of `mask`; unknown roles hold none."""
+    return role_permission_masks.get(role, 0) & mask == mask
+
+
+def has_any(role: str, mask: int) -> bool:
+    """Whether the role holds at least one permission of `mask`."""
+    return role_permission_masks.get(role, 0) & mask != 0
+
+
+def permissions_for_role(r: Optional[str]) -> frozenset[Permission]:
     if not r:
-        return []
-    elif r in role_to_permissions_map:
-        return role_to_permissions_map[r]
+        return frozenset()
+    elif r in role_permission_sets:
+        return role_permission_sets[r]
     raise Exception(f"Role could not be recognized {r}")
 
 
 def role_has_permission(role: str, permission: Permission) -> bool:
-    try:
-        return permission in permissions_for_role(role)
-    except Exception:
-        return False
+    return has_all(role, permission_bits[permission])
@@ -2,22 +2,46 @@ from typing import Any
 
 from event_manager.keycloak.permission_definitions import (
     Permission,
-    role_has_permission,
+    has_all,
+    has_any,
+    permission_mask,
 )
 
 
 class SimplePermissionClass:
     """
-    Extend this class to define new permission classes that depend on only one permission
+    Extend this class to define new permission classes. Set `allowed_permission`
+    for a single permission, or `required_permissions` (all of them) and/or
+    `any_of_permissions` (at least one) for several; they are compiled into
+    bitmasks when the subclass is defined.
     """
 
     message = "User is not authorized to access this resource"
     allowed_permission: Permission | None = None
+    required_permissions: tuple[Permission, ...] = ()
+    any_of_permissions: tuple[Permission, ...] = ()
 
-    async def has_permission(self, source: Any, role: str, **kwargs: Any) -> bool:
-        if self.allowed_permission is None:
+    required_mask: int = 0
+    any_of_mask: int = 0
+
+    def __init_subclass__(cls, **kwargs: Any) -> None:
+        super().__init_subclass__(**kwargs)
+        required = list(cls.required_permissions)
+        if cls.allowed_permission is not None:
+            required.append(cls.allowed_permission)
+        cls.required_mask = permission_mask(required)
+        cls.any_of_mask = permission_mask(cls.any_of_permissions)
+
+    @classmethod
+    def is_allowed(cls, role: str) -> bool:
+        if not (cls.required_mask or cls.any_of_mask):
             return False
-        return role_has_permission(role, self.allowed_permission)
+        if cls.required_mask and not has_all(role, cls.required_mask):
+            return False
+        return not cls.any_of_mask or has_any(role, cls.any_of_mask)
+
+    async def has_permission(self, source: Any, role: str, **kwargs: Any) -> bool:
+        return self.is_allowed(role)
 
 
 class CanCreateEvent(SimplePermissionClass):
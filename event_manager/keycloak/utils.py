@@ -4,7 +4,6 @@ from typing import Annotated
 import jwt
 from fastapi import Depends
 from fastapi.security import OAuth2AuthorizationCodeBearer
-from jwt import PyJWKClient
 
 from event_manager.core.config import settings
 from event_manager.keycloak.exceptions import (
@@ -12,6 +11,11 @@ from event_manager.keycloak.exceptions import (
     TokenExpiredException,
     TokenReadException,
 )
+from event_manager.keycloak.jwks import (
+    JWKSCache,
+    VerifiedTokenCache,
+    http_jwks_fetcher,
+)
 from event_manager.keycloak.permission_definitions import role_to_permissions_map
 
 logger = getLogger(__name__)
@@ -24,15 +28,34 @@ oauth_2_scheme = OAuth2AuthorizationCodeBearer(
     refreshUrl=f"{settings.KEYCLOAK_URL}/realms/{settings.KEYCLOAK_REALM}/protocol/openid-connect/token",
 )
 
+jwks_cache = JWKSCache(
+    http_jwks_fetcher(JWKS_URI),
+    min_refresh_interval=settings.KEYCLOAK_JWKS_MIN_REFRESH_INTERVAL,
+)
+verified_tokens = VerifiedTokenCache(
+    max_size=settings.KEYCLOAK_TOKEN_CACHE_SIZE, ttl=settings.KEYCLOAK_TOKEN_CACHE_TTL
+)
+
+
+def get_jwks_cache() -> JWKSCache:
+    return jwks_cache
+
+
+def get_verified_tokens() -> VerifiedTokenCache:
+    return verified_tokens
+
 
 async def validate_and_parse_token(
-    access_token: Annotated[str, Depends(oauth_2_scheme)]
+    access_token: Annotated[str, Depends(oauth_2_scheme)],
+    jwks: JWKSCache = Depends(get_jwks_cache),
+    verified: VerifiedTokenCache = Depends(get_verified_tokens),
 ):
-    logger.info(f"ACCESS TOKEN!!! {access_token}")
-    jwks_client = PyJWKClient(JWKS_URI)
+    decoded_token = verified.get(access_token)
+    if decoded_token is not None:
+        return decoded_token
     try:
-        signing_key = jwks_client.get_signing_key_from_jwt(access_token)
-        logger.info(f"SIGN KEY {signing_key.key}")
+        kid = jwt.get_unverified_header(access_token).get("kid")
+        signing_key = await jwks.get_signing_key(kid)
         decoded_token = jwt.decode(
             access_token,
             signing_key.key,
@@ -40,13 +63,11 @@ async def validate_and_parse_token(
             audience=settings.KEYCLOAK_CLIENT_ID,
             options={"verify_exp": True},
         )
-        logger.info(f"DATA {decoded_token}")
-        return decoded_token
     except jwt.exceptions.ExpiredSignatureError as e:
         logger.exception("Expired signature")
         raise TokenExpiredException from e
     except jwt.exceptions.InvalidKeyError as e:
-        logger.exception("Expired token")
+        logger.exception("Unknown signing key")
         raise TokenDecodingException from e
     except jwt.exceptions.InvalidSignatureError as e:
         logger.exception("Invalid signature")
@@ -55,28 +76,36 @@ async def validate_and_parse_token(
         logger.exception("Exception decoding token")
         raise TokenDecodingException from e
     except Exception as e:
-        logger.exception("Exception parsing token", str(e))
+        logger.exception("Exception parsing token")
         raise TokenDecodingException from e
+    verified.put(access_token, decoded_token)
+    return decoded_token
 
 
-def reorder_roles(roles: list[str]):
-    # Define the priority order
-    priority = {"super_admin": 1, "admin": 2, "user": 3}
+# Highest priority first
+ROLE_PRIORITY = {"super_admin": 1, "admin": 2, "user": 3}
 
-    # Sort roles based on the priority; roles not in priority will retain their order
-    sorted_roles = sorted(roles, key=lambda role: priority.get(role, float("inf")))
 
-    return sorted_roles
+def _role_priority(role: str) -> float:
+    return ROLE_PRIORITY.get(role, float("inf"))
+
+
+def reorder_roles(roles: list[str]):
+    # Sort roles based on the priority; roles not in priority will retain their order
+    return sorted(roles, key=_role_priority)
 
 
 def read_role_from_token(parsed_token: dict) -> str:
     all_roles = parsed_token.get("realm_access", {}).get("roles", [])
-    logger.info(f"ROLES: {all_roles}")
     if len(all_roles) == 0:
-        logger.critical("Keycloak user had no role supplied", parsed_token=parsed_token)
+        logger.critical("Keycloak user had no role supplied")
         raise TokenReadException("No role supplied on the user")
 
-    return reorder_roles(all_roles)[0]
+    # Same result as reorder_roles(all_roles)[0] without sorting per request
+    for role in ROLE_PRIORITY:
+        if role in all_roles:
+            return role
+    return all_roles[0]
 
 
 async def get_permissions_for_role(role: str) -> list[str]:
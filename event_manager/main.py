@@ -1,23 +1,91 @@
+import asyncio
 import logging
-import sys
+from contextlib import asynccontextmanager
 
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import RedirectResponse
 from pydantic import ValidationError
 
+from event_manager.api.compression import CompressionMiddleware
+from event_manager.api.etag import ETAG_HEADER
+from event_manager.api.responses import JSONResponse
 from event_manager.api.routes import api_router
+from event_manager.cache import invalidation_listener
 from event_manager.core.config import settings
-
-# Configure the logger
-logging.basicConfig(
-    level=logging.DEBUG,  # Set the logging level to DEBUG to capture all types of log messages
-    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",  # Set the log message format
-    handlers=[logging.StreamHandler(sys.stdout)],  # Log to standard output
+from event_manager.core.database import replica_router, sessionmaker_instance
+from event_manager.core.logs import configure_logging
+from event_manager.dal.pagination import NEXT_CURSOR_HEADER
+from event_manager.idempotency import idempotency_store
+from event_manager.inventory import hold_sweeper, inventory_engine
+from event_manager.keycloak.utils import jwks_cache
+from event_manager.metrics import request_metrics
+from event_manager.metrics.http import RequestMetricsMiddleware
+from event_manager.payment_gateway import (
+    get_payment_gateway,
+    outbox_dispatcher,
+    webhook_inbox_worker,
 )
+from event_manager.search import event_search_backend
 
 logger = logging.getLogger(__name__)
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    log_writer = configure_logging(
+        level=settings.LOG_LEVEL,
+        json=settings.LOG_FORMAT == "json",
+        capacity=settings.LOG_BUFFER_SIZE,
+        rate=settings.LOG_RATE_LIMIT,
+        burst=settings.LOG_RATE_BURST,
+        rate_limits=settings.LOG_RATE_LIMITS,
+        sample_rates=settings.LOG_SAMPLE_RATES,
+    )
+    async with sessionmaker_instance() as session:
+        await event_search_backend.warm_up(session)
+    reconciler = asyncio.create_task(
+        inventory_engine.run_reconciler(settings.INVENTORY_RECONCILE_INTERVAL)
+    )
+    expired_holds = asyncio.create_task(
+        hold_sweeper.run(settings.BOOKING_HOLD_SWEEP_INTERVAL)
+    )
+    jwks_refresher = asyncio.create_task(
+        jwks_cache.run_refresher(settings.KEYCLOAK_JWKS_REFRESH_INTERVAL)
+    )
+    payment_dispatcher = asyncio.create_task(
+        outbox_dispatcher.run(settings.PAYMENT_OUTBOX_INTERVAL)
+    )
+    webhook_workers = asyncio.create_task(
+        webhook_inbox_worker.run(settings.WEBHOOK_INBOX_INTERVAL)
+    )
+    cache_invalidations = asyncio.create_task(
+        invalidation_listener.run(settings.ENTITY_CACHE_LISTEN_RETRY_INTERVAL)
+    )
+    replica_lag_checks = asyncio.create_task(
+        replica_router.run(settings.DATABASE_REPLICA_LAG_CHECK_INTERVAL)
+    )
+    idempotency_pruner = asyncio.create_task(
+        idempotency_store.run_pruner(settings.IDEMPOTENCY_PRUNE_INTERVAL)
+    )
+    try:
+        yield
+    finally:
+        idempotency_pruner.cancel()
+        replica_lag_checks.cancel()
+        cache_invalidations.cancel()
+        webhook_workers.cancel()
+        payment_dispatcher.cancel()
+        jwks_refresher.cancel()
+        expired_holds.cancel()
+        reconciler.cancel()
+        # Hand unsold in-memory allotments back to the events table
+        await inventory_engine.release_all()
+        await get_payment_gateway().aclose()
+        # Last, so the shutdown above is logged
+        log_writer.stop()
+
+
 app = FastAPI(
     title=settings.POSTGRES_APPLICATION_NAME,
     description="Manager for managing events, bookings, and payments",
@@ -27,6 +95,8 @@ app = FastAPI(
     redoc_url="/redoc",
     ssl_keyfile=settings.SSL_KEY_FILE,
     ssl_certfile=settings.SSL_CERT_FILE,
+    lifespan=lifespan,
+    default_response_class=JSONResponse,
 )
 
 app.add_middleware(
@@ -35,6 +105,19 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, ETAG_HEADER],
+)
+
+if settings.RESPONSE_COMPRESSION:
+    app.add_middleware(
+        CompressionMiddleware, minimum_size=settings.RESPONSE_COMPRESSION_MIN_SIZE
+    )
+
+# Outermost, so compression counts towards the latency
+app.add_middleware(
+    RequestMetricsMiddleware,
+    metrics=request_metrics,
+    trace_sample_rate=settings.METRICS_TRACE_SAMPLE_RATE,
 )
 
 
@@ -0,0 +1,14 @@
+from event_manager.core.config import settings
+from event_manager.metrics.database import DatabaseMetrics
+from event_manager.metrics.http import RequestMetrics
+from event_manager.metrics.registry import Registry
+
+registry = Registry()
+database_metrics = DatabaseMetrics(
+    registry, max_statements=settings.METRICS_MAX_STATEMENTS
+)
+request_metrics = RequestMetrics(registry)
+
+
+def get_registry() -> Registry:
+    return registry
@@ -0,0 +1,156 @@
+import re
+import time
+from functools import lru_cache
+from typing import Any
+
+from sqlalchemy import event
+from sqlalchemy.exc import TimeoutError
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from event_manager.metrics import tracing
+from event_manager.metrics.registry import Registry
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_PARAMETER = re.compile(r"\$\d+|%\(\w+\)s")
+_NUMBER = re.compile(r"(?<![\w$.])\d+(?:\.\d+)?")
+# Expanded IN lists and multi-row VALUES, whose length varies per call
+_LIST = re.compile(r"\((\?(?:::[\w ]+)?)(?:, \?(?:::[\w ]+)?)+\)")
+_ROWS = re.compile(r"(\([^()]*\))(?:, \1)+")
+_SPACE = re.compile(r"\s+")
+
+
+@lru_cache(maxsize=4096)
+def normalize_statement(statement: str) -> str:
+    """The statement with literals, parameters and list lengths elided."""
+    statement = _SPACE.sub(" ", statement).strip()
+    statement = _STRING.sub("?", statement)
+    statement = _PARAMETER.sub("?", statement)
+    statement = _NUMBER.sub("?", statement)
+    statement = _LIST.sub(r"(\1, ...)", statement)
+    return _ROWS.sub(r"\1, ...", statement)
+
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """Times checkouts, once `DatabaseMetrics.instrument()` ran on its engine."""
+
+    checkout_timer: Any = None
+    checkout_timeouts: Any = None
+
+    def _do_get(self):
+        if self.checkout_timer is None:
+            return super()._do_get()
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except TimeoutError:
+            self.checkout_timeouts.inc()
+            raise
+        finally:
+            self.checkout_timer.observe(time.perf_counter() - started)
+
+    def recreate(self) -> "InstrumentedQueuePool":
+        # engine.dispose() swaps the pool for a fresh one
+        pool = super().recreate()
+        pool.checkout_timer = self.checkout_timer
+        pool.checkout_timeouts = self.checkout_timeouts
+        return pool
+
+
+class DatabaseMetrics:
+    """
+    Pool usage, per statement latency and row lock waits of the engines
+    passed to `instrument()`, labelled with the name they were given.
+    Statements are grouped by their normalized SQL; past `max_statements`
+    distinct ones, new statements are counted as "other".
+    """
+
+    def __init__(self, registry: Registry, max_statements: int = 500):
+        self.max_statements = max_statements
+        self.statements: set[str] = set()
+        self.engines: dict[str, AsyncEngine] = {}
+        self.checkout_seconds = registry.histogram(
+            "db_pool_checkout_seconds",
+            "Time to get a pooled connection, waiting and connecting included",
+            ["pool"],
+        )
+        self.checkout_timeouts = registry.counter(
+            "db_pool_checkout_timeouts",
+            "Checkouts that gave up after the pool timeout",
+            ["pool"],
+        )
+        registry.callback_gauge(
+            "db_pool_size", "Connections kept open", ["pool"], self._pool_sizes
+        )
+        registry.callback_gauge(
+            "db_pool_checked_out",
+            "Connections in use",
+            ["pool"],
+            self._checked_out,
+        )
+        registry.callback_gauge(
+            "db_pool_overflow",
+            "Connections open beyond the pool size",
+            ["pool"],
+            self._overflow,
+        )
+        self.statement_seconds = registry.histogram(
+            "db_statement_seconds",
+            "Statement latency as seen by the driver",
+            ["pool", "statement"],
+        )
+        self.event_lock_wait_seconds = registry.histogram(
+            "db_event_lock_wait_seconds",
+            "Time to lock an event row in get_pessimistic_event",
+        )
+
+    def _pool_sizes(self) -> dict[tuple[str, ...], float]:
+        return {
+            (name,): engine.pool.size()
+            for name, engine in self.engines.items()
+            if isinstance(engine.pool, AsyncAdaptedQueuePool)
+        }
+
+    def _checked_out(self) -> dict[tuple[str, ...], float]:
+        return {
+            (name,): engine.pool.checkedout()
+            for name, engine in self.engines.items()
+            if isinstance(engine.pool, AsyncAdaptedQueuePool)
+        }
+
+    def _overflow(self) -> dict[tuple[str, ...], float]:
+        # QueuePool counts up from -pool_size as connections are opened
+        return {
+            (name,): max(engine.pool.overflow(), 0)
+            for name, engine in self.engines.items()
+            if isinstance(engine.pool, AsyncAdaptedQueuePool)
+        }
+
+    def _statement_key(self, statement: str) -> str:
+        key = normalize_statement(statement)
+        if key not in self.statements:
+            if len(self.statements) >= self.max_statements:
+                return "other"
+            self.statements.add(key)
+        return key
+
+    def instrument(self, engine: AsyncEngine, name: str) -> None:
+        self.engines[name] = engine
+        sync_engine = engine.sync_engine
+        if isinstance(sync_engine.pool, InstrumentedQueuePool):
+            sync_engine.pool.checkout_timer = self.checkout_seconds.labels(name)
+            sync_engine.pool.checkout_timeouts = self.checkout_timeouts.labels(name)
+
+        @event.listens_for(sync_engine, "before_cursor_execute")
+        def started(conn, cursor, statement, parameters, context, executemany):
+            # No context for the few statements run outside of an execute()
+            if context is not None:
+                context.metrics_started = time.perf_counter()
+
+        @event.listens_for(sync_engine, "after_cursor_execute")
+        def finished(conn, cursor, statement, parameters, context, executemany):
+            if context is not None:
+                elapsed = time.perf_counter() - context.metrics_started
+                key = self._statement_key(statement)
+                self.statement_seconds.labels(name, key).observe(elapsed)
+                tracing.add("db", elapsed)
@@ -0,0 +1,118 @@
+import random
+import time
+from collections import Counter
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from event_manager.metrics import tracing
+from event_manager.metrics.latency import LatencyMetric
+from event_manager.metrics.registry import Registry
+
+UNMATCHED_ROUTE = "unmatched"
+QUANTILES = (0.5, 0.9, 0.99, 0.999)
+
+
+def route_template(scope: Scope) -> str:
+    """The path of the APIRoute that handled the request, if any did."""
+    route = scope.get("route")
+    return route.path if route is not None else UNMATCHED_ROUTE
+
+
+class RequestMetrics:
+    """
+    Latency, throughput, errors and concurrency per route template, plus a
+    breakdown of sampled requests into tracing.PHASES.
+    """
+
+    def __init__(self, registry: Registry):
+        self.duration_seconds = registry.register(
+            LatencyMetric(
+                "http_request_duration_seconds",
+                "Time from receiving a request to sending the end of its body",
+                ["route", "method"],
+            )
+        )
+        registry.callback_gauge(
+            "http_request_duration_quantile_seconds",
+            "Latency quantiles of this worker, to within 3%",
+            ["route", "method", "quantile"],
+            lambda: self.duration_seconds.quantiles(QUANTILES),
+        )
+        self.requests = registry.counter(
+            "http_requests",
+            "Requests answered, by status code; 500 when the app raised",
+            ["route", "method", "status"],
+        )
+        # The scopes of requests being handled, by id; the router adds the
+        # route to them once matched
+        self.active: dict[int, Scope] = {}
+        registry.callback_gauge(
+            "http_requests_in_flight",
+            "Requests being handled",
+            ["route"],
+            self._in_flight,
+        )
+        self.phase_seconds = registry.histogram(
+            "http_request_phase_seconds",
+            "Time sampled requests spent per phase; other is the remainder",
+            ["route", "phase"],
+        )
+
+    def _in_flight(self) -> dict[tuple[str, ...], float]:
+        return Counter((route_template(scope),) for scope in list(self.active.values()))
+
+    def record_trace(
+        self, route: str, trace: tracing.RequestTrace, elapsed: float
+    ) -> None:
+        for phase, seconds in trace.phases.items():
+            self.phase_seconds.labels(route, phase).observe(seconds)
+        other = max(elapsed - sum(trace.phases.values()), 0.0)
+        self.phase_seconds.labels(route, "other").observe(other)
+
+
+class RequestMetricsMiddleware:
+    """
+    Records every HTTP request into `metrics` under its route template,
+    which FastAPI puts in the scope while routing. A `trace_sample_rate`
+    fraction of requests is traced.
+    """
+
+    def __init__(
+        self, app: ASGIApp, metrics: RequestMetrics, trace_sample_rate: float = 0.0
+    ):
+        self.app = app
+        self.metrics = metrics
+        self.trace_sample_rate = trace_sample_rate
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        trace = token = None
+        if self.trace_sample_rate and random.random() < self.trace_sample_rate:
+            trace = tracing.RequestTrace()
+            token = tracing.current_trace.set(trace)
+
+        active = self.metrics.active
+        active[id(scope)] = scope
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - started
+            del active[id(scope)]
+            route, method = route_template(scope), scope["method"]
+            self.metrics.duration_seconds.labels(route, method).record(elapsed)
+            self.metrics.requests.labels(route, method, str(status)).inc()
+            if trace is not None:
+                tracing.current_trace.reset(token)
+                self.metrics.record_trace(route, trace, elapsed)
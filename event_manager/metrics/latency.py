@@ -0,0 +1,135 @@
+import bisect
+import math
+from itertools import accumulate
+from typing import Iterator, Sequence
+
+from event_manager.metrics.registry import (
+    DEFAULT_BUCKETS,
+    Sample,
+    _LabelledMetric,
+    format_value,
+)
+
+# Latencies are recorded in whole microseconds, in log-linear buckets: exact
+# below 2 ** SUB_BUCKET_BITS, then 2 ** (SUB_BUCKET_BITS - 1) buckets per
+# power of two, so any recorded value is within 1 / 32 of the truth.
+SUB_BUCKET_BITS = 6
+_SUB_BUCKETS = 1 << SUB_BUCKET_BITS
+_HALF = _SUB_BUCKETS >> 1
+# Slower requests are recorded as this
+MAX_MICROSECONDS = 60_000_000
+
+
+def bucket_index(microseconds: int) -> int:
+    if microseconds < _SUB_BUCKETS:
+        return microseconds
+    shift = microseconds.bit_length() - SUB_BUCKET_BITS
+    return _SUB_BUCKETS + (shift - 1) * _HALF + (microseconds >> shift) - _HALF
+
+
+def bucket_upper_bound(index: int) -> int:
+    """The largest value, in microseconds, recorded in bucket `index`."""
+    if index < _SUB_BUCKETS:
+        return index
+    shift, sub_bucket = divmod(index - _SUB_BUCKETS, _HALF)
+    return ((sub_bucket + _HALF + 1) << (shift + 1)) - 1
+
+
+_BUCKET_COUNT = bucket_index(MAX_MICROSECONDS) + 1
+_UPPER_BOUNDS = [bucket_upper_bound(index) for index in range(_BUCKET_COUNT)]
+
+
+class LatencySnapshot:
+    """The counts of a LatencyHistogram at one point in time."""
+
+    __slots__ = ("cumulative", "sum")
+
+    def __init__(self, counts: list[int], total: float):
+        self.cumulative = list(accumulate(counts))
+        self.sum = total
+
+    @property
+    def count(self) -> int:
+        return self.cumulative[-1]
+
+    def quantile(self, q: float) -> float:
+        """The latency in seconds that a `q` fraction of requests stayed under."""
+        if not self.count:
+            return math.nan
+        rank = max(math.ceil(q * self.count), 1)
+        index = bisect.bisect_left(self.cumulative, rank)
+        return (_UPPER_BOUNDS[index] + 1) / 1e6
+
+    def count_under(self, seconds: float) -> int:
+        """Requests recorded at or under `seconds`, to the bucket resolution."""
+        index = bisect.bisect_right(_UPPER_BOUNDS, int(seconds * 1e6)) - 1
+        return self.cumulative[index] if index >= 0 else 0
+
+
+class LatencyHistogram:
+    """
+    An HDR-style histogram: a flat list of counters indexed by a couple of
+    bit operations on the latency, so recording never searches bucket
+    bounds. Each worker records on its own event loop, which needs no lock,
+    and a snapshot is one list copy.
+    """
+
+    __slots__ = ("counts", "sum")
+
+    def __init__(self):
+        self.counts = [0] * _BUCKET_COUNT
+        self.sum = 0.0
+
+    def record(self, seconds: float) -> None:
+        microseconds = min(int(seconds * 1e6), MAX_MICROSECONDS)
+        self.counts[bucket_index(microseconds)] += 1
+        self.sum += seconds
+
+    def snapshot(self) -> LatencySnapshot:
+        return LatencySnapshot(self.counts[:], self.sum)
+
+
+class LatencyMetric(_LabelledMetric):
+    """
+    LatencyHistograms rendered as a Prometheus histogram with the coarse
+    `buckets`, which scrapers aggregate across workers, alongside
+    `quantiles()` read from the fine buckets.
+    """
+
+    type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str],
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def _new_child(self) -> LatencyHistogram:
+        return LatencyHistogram()
+
+    def _snapshots(self) -> Iterator[tuple[tuple[str, ...], LatencySnapshot]]:
+        for values, child in list(self._children.items()):
+            yield values, child.snapshot()
+
+    def quantiles(self, quantiles: Sequence[float]) -> dict[tuple[str, ...], float]:
+        """{(*label values, quantile): seconds}, for a CallbackGauge."""
+        return {
+            (*values, format_value(q)): snapshot.quantile(q)
+            for values, snapshot in self._snapshots()
+            for q in quantiles
+        }
+
+    def samples(self) -> Iterator[Sample]:
+        for values, snapshot in self._snapshots():
+            labels = dict(zip(self.labelnames, values))
+            for upper_bound in self.buckets:
+                le = format_value(upper_bound)
+                count = snapshot.count_under(upper_bound)
+                yield f"{self.name}_bucket", {**labels, "le": le}, count
+            yield f"{self.name}_bucket", {**labels, "le": "+Inf"}, snapshot.count
+            yield f"{self.name}_sum", labels, snapshot.sum
+            yield f"{self.name}_count", labels, snapshot.count
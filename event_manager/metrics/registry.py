@@ -0,0 +1,249 @@
+import bisect
+import math
+import time
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from typing import Callable, Iterator, Sequence
+
+# Prometheus' defaults, plus sub-millisecond ones for database statements
+DEFAULT_BUCKETS = (
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+Sample = tuple[str, dict[str, str], float]
+
+
+def format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def format_labels(labels: dict[str, str]) -> str:
+    if not labels:
+        return ""
+    pairs = ",".join(
+        '{}="{}"'.format(
+            name,
+            value.replace("\\", r"\\").replace("\n", r"\n").replace('"', r"\""),
+        )
+        for name, value in labels.items()
+    )
+    return "{" + pairs + "}"
+
+
+class Metric(ABC):
+    type: str
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str]):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+
+    @abstractmethod
+    def samples(self) -> Iterator[Sample]:
+        pass
+
+    def render(self) -> str:
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.type}",
+        ]
+        for name, labels, value in self.samples():
+            lines.append(f"{name}{format_labels(labels)} {format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+class _LabelledMetric(Metric):
+    """A metric with one child per combination of label values."""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str]):
+        super().__init__(name, documentation, labelnames)
+        self._children: dict[tuple[str, ...], object] = {}
+
+    @abstractmethod
+    def _new_child(self):
+        pass
+
+    def labels(self, *values: str):
+        child = self._children.get(values)
+        if child is None:
+            if len(values) != len(self.labelnames):
+                raise ValueError(f"{self.name} takes labels {self.labelnames}")
+            child = self._children[values] = self._new_child()
+        return child
+
+    def _labelled(self) -> Iterator[tuple[dict[str, str], object]]:
+        for values, child in self._children.items():
+            yield dict(zip(self.labelnames, values)), child
+
+
+class _Value:
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.value += amount
+
+    def set(self, value: float) -> None:
+        self.value = value
+
+
+class Counter(_LabelledMetric):
+    type = "counter"
+
+    def _new_child(self) -> _Value:
+        return _Value()
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.labels().inc(amount)
+
+    def samples(self) -> Iterator[Sample]:
+        for labels, child in self._labelled():
+            yield f"{self.name}_total", labels, child.value
+
+
+class Gauge(_LabelledMetric):
+    type = "gauge"
+
+    def _new_child(self) -> _Value:
+        return _Value()
+
+    def set(self, value: float) -> None:
+        self.labels().set(value)
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.labels().inc(amount)
+
+    def samples(self) -> Iterator[Sample]:
+        for labels, child in self._labelled():
+            yield self.name, labels, child.value
+
+
+class CallbackGauge(Metric):
+    """A gauge read when rendered, from `callback() -> {label values: value}`."""
+
+    type = "gauge"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str],
+        callback: Callable[[], dict[tuple[str, ...], float]],
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.callback = callback
+
+    def samples(self) -> Iterator[Sample]:
+        for values, value in self.callback().items():
+            yield self.name, dict(zip(self.labelnames, values)), value
+
+
+class _Buckets:
+    __slots__ = ("upper_bounds", "counts", "sum")
+
+    def __init__(self, upper_bounds: Sequence[float]):
+        self.upper_bounds = upper_bounds
+        # The last count is for +Inf
+        self.counts = [0] * (len(upper_bounds) + 1)
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.upper_bounds, value)] += 1
+        self.sum += value
+
+    @contextmanager
+    def time(self) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started)
+
+
+class Histogram(_LabelledMetric):
+    type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str],
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def _new_child(self) -> _Buckets:
+        return _Buckets(self.buckets)
+
+    def observe(self, value: float) -> None:
+        self.labels().observe(value)
+
+    def time(self):
+        return self.labels().time()
+
+    def samples(self) -> Iterator[Sample]:
+        for labels, child in self._labelled():
+            cumulative = 0
+            for upper_bound, count in zip((*self.buckets, math.inf), child.counts):
+                cumulative += count
+                le = format_value(upper_bound)
+                yield f"{self.name}_bucket", {**labels, "le": le}, cumulative
+            yield f"{self.name}_sum", labels, child.sum
+            yield f"{self.name}_count", labels, cumulative
+
+
+class Registry:
+    """
+    The metrics of this process, rendered in the Prometheus text format.
+    Every worker process has its own.
+    """
+
+    content_type = "text/plain; version=0.0.4; charset=utf-8"
+
+    def __init__(self):
+        self._metrics: dict[str, Metric] = {}
+
+    def register(self, metric: Metric) -> Metric:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} is already registered")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames=()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames=()) -> Gauge:
+        return self.register(Gauge(name, documentation, labelnames))
+
+    def histogram(
+        self, name: str, documentation: str, labelnames=(), buckets=DEFAULT_BUCKETS
+    ) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def callback_gauge(
+        self, name: str, documentation: str, labelnames, callback
+    ) -> CallbackGauge:
+        return self.register(CallbackGauge(name, documentation, labelnames, callback))
+
+    def render(self) -> str:
+        return "".join(metric.render() for metric in self._metrics.values())
@@ -0,0 +1,43 @@
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator
+
+PHASES = ("db", "payment_gateway", "serialization")
+
+
+class RequestTrace:
+    """Seconds a sampled request spent in each of PHASES."""
+
+    __slots__ = ("phases",)
+
+    def __init__(self):
+        self.phases = dict.fromkeys(PHASES, 0.0)
+
+
+# Set by RequestMetricsMiddleware for sampled requests only. The SQLAlchemy
+# greenlets and the tasks a request spawns get a copy of the context, so they
+# add to the same trace.
+current_trace: ContextVar[RequestTrace | None] = ContextVar(
+    "current_trace", default=None
+)
+
+
+def add(phase: str, seconds: float) -> None:
+    trace = current_trace.get()
+    if trace is not None:
+        trace.phases[phase] += seconds
+
+
+@contextmanager
+def span(phase: str) -> Iterator[None]:
+    """Adds the time spent in the block to `phase` of the current trace."""
+    trace = current_trace.get()
+    if trace is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        trace.phases[phase] += time.perf_counter() - started
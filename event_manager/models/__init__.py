@@ -1,14 +1,24 @@
 from event_manager.models.base import Base
-from event_manager.models.booking import Booking
+from event_manager.models.booking import Booking, BookingStatus
 from event_manager.models.event import Event
+from event_manager.models.idempotency_key import IdempotencyKey
+from event_manager.models.inventory_allotment import InventoryAllotment
 from event_manager.models.payment import Payment, PaymentStatus
+from event_manager.models.payment_outbox import OutboxStatus, PaymentOutbox
 from event_manager.models.user import User
+from event_manager.models.webhook_inbox import WebhookInbox
 
 __all__ = [
     "Base",
     "Event",
     "Booking",
+    "BookingStatus",
     "Payment",
     "User",
     "PaymentStatus",
+    "PaymentOutbox",
+    "OutboxStatus",
+    "WebhookInbox",
+    "IdempotencyKey",
+    "InventoryAllotment",
 ]
@@ -1,6 +1,9 @@
+import enum
+from datetime import datetime
 from typing import TYPE_CHECKING
 
-from sqlalchemy import Column, DateTime, Float, ForeignKey, Integer
+from sqlalchemy import Column, DateTime, Float, ForeignKey, Index, Integer
+from sqlalchemy.dialects.postgresql import ENUM
 from sqlalchemy.orm import Mapped, relationship
 from sqlalchemy.sql import func
 
@@ -12,8 +15,24 @@ if TYPE_CHECKING:
     from event_manager.models.user import User
 
 
+class BookingStatus(enum.Enum):
+    # Tickets are set aside until `expires_at` while the payment is pending
+    HELD = "HELD"
+    CONFIRMED = "CONFIRMED"
+    # Expired or failed hold, tickets went back to the event
+    RELEASED = "RELEASED"
+
+
 class Booking(Base):
     __tablename__ = "bookings"
+    __table_args__ = (
+        # The hold sweeper only ever scans held bookings by expiry
+        Index(
+            "booking_hold_expiry_idx",
+            "expires_at",
+            postgresql_where="status = 'HELD'",
+        ),
+    )
 
     event_id = Column(Integer, ForeignKey("events.id"), nullable=False, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
@@ -22,13 +41,25 @@ class Booking(Base):
     )
     quantity = Column(Integer, nullable=False)
     total_cost = Column(Float, nullable=False)
+    status: BookingStatus = Column(
+        ENUM(BookingStatus),
+        nullable=False,
+        default=BookingStatus.CONFIRMED,
+        server_default=BookingStatus.CONFIRMED.value,
+    )
+    expires_at: datetime | None = Column(DateTime(timezone=True), nullable=True)
+    # The in-memory allotment the tickets were sold from, if any
+    allotment_id: int | None = Column(
+        Integer,
+        ForeignKey("inventory_allotments.id", ondelete="SET NULL"),
+        nullable=True,
+        index=True,
+    )
 
     event: Mapped["Event"] = relationship(
-        "Event", back_populates="bookings", lazy="selectin"
-    )
-    user: Mapped["User"] = relationship(
-        "User", back_populates="bookings", lazy="selectin"
+        "Event", back_populates="bookings", lazy="raise"
     )
+    user: Mapped["User"] = relationship("User", back_populates="bookings", lazy="raise")
     payments: Mapped[list[Payment]] = relationship(
-        "Payment", back_populates="booking", lazy="selectin"
+        "Payment", back_populates="booking", lazy="raise"
     )
@@ -24,5 +24,5 @@ class Company(Base):
     registration_number = Column(String, nullable=False, unique=True)
 
     users: Mapped[list["User"]] = relationship(
-        "User", back_populates="company", lazy="selectin"
+        "User", back_populates="company", lazy="raise"
     )
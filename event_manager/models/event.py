@@ -2,6 +2,7 @@ from datetime import date, time
 
 from sqlalchemy import (
     Column,
+    Computed,
     Date,
     Float,
     Index,
@@ -9,7 +10,9 @@ from sqlalchemy import (
     String,
     Time,
     UniqueConstraint,
+    func,
 )
+from sqlalchemy.dialects.postgresql import TSVECTOR
 from sqlalchemy.orm import Mapped, relationship
 
 from event_manager.models.base import Base
@@ -19,7 +22,24 @@ from event_manager.models.booking import Booking
 class Event(Base):
     __tablename__ = "events"
     __table_args__ = (
-        Index("location_lat", "location_long"),
+        # Bounding box filters and exact coordinate lookups
+        Index("event_location_idx", "location_lat", "location_long"),
+        # Keyset pagination of search results walks (name, id)
+        Index("event_name_id_idx", "name", "id"),
+        Index("event_search_vector_idx", "search_vector", postgresql_using="gin"),
+        # pg_trgm indexes serve both ILIKE '%...%' filters and typo matching
+        Index(
+            "event_name_trgm_idx",
+            "name",
+            postgresql_using="gin",
+            postgresql_ops={"name": "gin_trgm_ops"},
+        ),
+        Index(
+            "event_venue_trgm_idx",
+            "venue",
+            postgresql_using="gin",
+            postgresql_ops={"venue": "gin_trgm_ops"},
+        ),
         UniqueConstraint(
             "name", "location_lat", "location_long", name="name_lat_long_uix"
         ),
@@ -31,11 +51,26 @@ class Event(Base):
     venue: str = Column(String, nullable=False)
     location_lat: float = Column(Float, nullable=False)
     location_long: float = Column(Float, nullable=False)
+    # Geocoded position of `venue`, cleared whenever the venue changes
+    venue_lat: float | None = Column(Float, nullable=True)
+    venue_long: float | None = Column(Float, nullable=True)
     available_tickets: int = Column(Integer, nullable=False)
     base_price: float = Column(Float, nullable=False)
     surge_price: float = Column(Float, nullable=False, default=0)
     surge_threshold: float = Column(Float, nullable=False, default=0)
     version: int = Column(Integer, nullable=False, default=0)
+    # Number of in-memory inventory shards; 0 keeps the event on row-level locking
+    inventory_shards: int = Column(
+        Integer, nullable=False, default=0, server_default="0"
+    )
+    search_vector: str = Column(
+        TSVECTOR,
+        Computed(
+            "setweight(to_tsvector('simple', coalesce(name, '')), 'A') || "
+            "setweight(to_tsvector('simple', coalesce(venue, '')), 'B')",
+            persisted=True,
+        ),
+    )
 
     __mapper_args__ = {
         "version_id_col": version,  # SQLAlchemy uses this column for versioning
@@ -43,5 +78,13 @@ class Event(Base):
     }
 
     bookings: Mapped[list[Booking]] = relationship(
-        "Booking", back_populates="event", lazy="selectin"
+        "Booking", back_populates="event", lazy="raise"
     )
+
+
+# Radius lookups go through earthdistance; queries must use the same expression
+Index(
+    "event_location_earth_idx",
+    func.ll_to_earth(Event.location_lat, Event.location_long),
+    postgresql_using="gist",
+)
@@ -0,0 +1,39 @@
+from datetime import datetime
+from typing import Any
+
+from sqlalchemy import Column, DateTime, Index, Integer, String
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.sql import func
+
+from event_manager.models.base import Base
+
+
+class IdempotencyKey(Base):
+    """
+    A client supplied `Idempotency-Key` and the response it produced. The
+    row is claimed before the request runs and the response is written in
+    the request's own transaction, so a key never has a response for work
+    that was rolled back.
+    """
+
+    __tablename__ = "idempotency_keys"
+    __table_args__ = (
+        # The retention sweep only ever scans finished keys
+        Index(
+            "idempotency_keys_finished_idx",
+            "created_at",
+            postgresql_where="response_status IS NOT NULL",
+        ),
+    )
+
+    key: str = Column(String, nullable=False, unique=True)
+    # sha256 of method, path, query and body; a reused key must match it
+    fingerprint: str = Column(String, nullable=False)
+    response_status: int | None = Column(Integer, nullable=True)
+    response_body: Any = Column(JSONB, nullable=True)
+    locked_at: datetime = Column(
+        DateTime(timezone=True), nullable=False, server_default=func.now()
+    )
+    created_at: datetime = Column(
+        DateTime(timezone=True), nullable=False, server_default=func.now()
+    )
@@ -0,0 +1,24 @@
+from datetime import datetime
+
+from sqlalchemy import Column, DateTime, ForeignKey, Integer, String
+from sqlalchemy.sql import func
+
+from event_manager.models.base import Base
+
+
+class InventoryAllotment(Base):
+    """
+    Tickets a worker took out of an event's `available_tickets` to sell from
+    memory. `tickets` counts every claim, so the unsold rest is `tickets`
+    less the bookings made from the allotment. The worker renews
+    `heartbeat_at` while it runs; once that lapses, any worker credits the
+    unsold rest back to the event and deletes the row.
+    """
+
+    __tablename__ = "inventory_allotments"
+    worker_id: str = Column(String, nullable=False, index=True)
+    event_id: int = Column(Integer, ForeignKey("events.id"), nullable=False)
+    tickets: int = Column(Integer, nullable=False, default=0)
+    heartbeat_at: datetime = Column(
+        DateTime(timezone=True), nullable=False, server_default=func.now(), index=True
+    )
@@ -17,6 +17,8 @@ class PaymentStatus(enum.Enum):
     PENDING = "PENDING"
     COMPLETED = "COMPLETED"
     FAILED = "FAILED"
+    # Charged after the booking's hold had lapsed; to be refunded
+    REFUND_REQUIRED = "REFUND_REQUIRED"
 
 
 class Payment(Base):
@@ -33,5 +35,5 @@ class Payment(Base):
     idempotency_key: str = Column(String, nullable=False, unique=True)
 
     booking: Mapped["Booking"] = relationship(
-        "Booking", back_populates="payments", lazy="selectin"
+        "Booking", back_populates="payments", lazy="raise"
     )
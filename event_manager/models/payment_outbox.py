@@ -0,0 +1,50 @@
+import enum
+from datetime import datetime
+
+from sqlalchemy import Column, DateTime, Float, ForeignKey, Index, Integer, String
+from sqlalchemy.dialects.postgresql import ENUM
+from sqlalchemy.sql import func
+
+from event_manager.models.base import Base
+
+
+class OutboxStatus(enum.Enum):
+    PENDING = "PENDING"
+    DISPATCHED = "DISPATCHED"
+    FAILED = "FAILED"
+
+
+class PaymentOutbox(Base):
+    """
+    A payment intent still to be created with the provider, written in the
+    same transaction as its booking and picked up by the outbox dispatcher.
+    """
+
+    __tablename__ = "payment_outbox"
+    __table_args__ = (
+        # The dispatcher only ever scans due, pending rows
+        Index(
+            "payment_outbox_due_idx",
+            "next_attempt_at",
+            postgresql_where="status = 'PENDING'",
+        ),
+    )
+
+    booking_id: int = Column(
+        Integer, ForeignKey("bookings.id"), nullable=False, unique=True
+    )
+    amount: float = Column(Float, nullable=False)
+    idempotency_key: str = Column(String, nullable=False, unique=True)
+    status: OutboxStatus = Column(
+        ENUM(OutboxStatus), nullable=False, default=OutboxStatus.PENDING
+    )
+    attempts: int = Column(Integer, nullable=False, default=0)
+    next_attempt_at: datetime = Column(
+        DateTime(timezone=True), nullable=False, server_default=func.now()
+    )
+    last_error: str | None = Column(String, nullable=True)
+    transaction_id: str | None = Column(String, nullable=True)
+    client_secret: str | None = Column(String, nullable=True)
+    created_at: datetime = Column(
+        DateTime(timezone=True), nullable=False, server_default=func.now()
+    )
@@ -37,8 +37,8 @@ class User(Base):
     username: str = Column(String, nullable=False, index=True)
 
     company: Mapped["Company"] = relationship(
-        "Company", back_populates="users", lazy="selectin"
+        "Company", back_populates="users", lazy="raise"
     )
     bookings: Mapped["Booking"] = relationship(
-        "Booking", back_populates="user", lazy="selectin"
+        "Booking", back_populates="user", lazy="raise"
     )
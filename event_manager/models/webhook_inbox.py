@@ -0,0 +1,41 @@
+from datetime import datetime
+from typing import Any
+
+from sqlalchemy import Column, DateTime, Index, Integer, String
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.sql import func
+
+from event_manager.models.base import Base
+
+
+class WebhookInbox(Base):
+    """
+    Provider webhooks as received. The unique provider event id makes
+    redelivered events a no-op insert; the inbox worker applies the rest
+    in batches and stamps `processed_at`. An event that keeps failing is
+    retried with backoff, then stamped `parked_at` and left for review.
+    """
+
+    __tablename__ = "webhook_inbox"
+    __table_args__ = (
+        Index(
+            "webhook_inbox_unprocessed_idx",
+            "received_at",
+            postgresql_where="processed_at IS NULL AND parked_at IS NULL",
+        ),
+    )
+
+    event_id: str = Column(String, nullable=False, unique=True)
+    event_type: str = Column(String, nullable=False)
+    payment_intent_id: str | None = Column(String, nullable=True)
+    payload: dict[str, Any] = Column(JSONB, nullable=False)
+    received_at: datetime = Column(
+        DateTime(timezone=True), nullable=False, server_default=func.now()
+    )
+    processed_at: datetime | None = Column(DateTime(timezone=True), nullable=True)
+    attempts: int = Column(Integer, nullable=False, default=0)
+    next_attempt_at: datetime = Column(
+        DateTime(timezone=True), nullable=False, server_default=func.now()
+    )
+    last_error: str | None = Column(String, nullable=True)
+    parked_at: datetime | None = Column(DateTime(timezone=True), nullable=True)
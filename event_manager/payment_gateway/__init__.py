@@ -1,12 +1,44 @@
-import uuid
+from fastapi import Header
 
+from event_manager.core.config import settings
+from event_manager.core.database import sessionmaker_instance
 from event_manager.payment_gateway.abstract_payment_gateway import PaymentGateway
+from event_manager.payment_gateway.outbox import PaymentOutboxDispatcher
 from event_manager.payment_gateway.stripe_payment import stripe_payment_gateway
+from event_manager.payment_gateway.webhooks import WebhookInboxWorker
+
+outbox_dispatcher = PaymentOutboxDispatcher(
+    session_factory=sessionmaker_instance,
+    gateway=stripe_payment_gateway,
+    batch_size=settings.PAYMENT_OUTBOX_BATCH_SIZE,
+    max_attempts=settings.PAYMENT_OUTBOX_MAX_ATTEMPTS,
+    retry_backoff=settings.PAYMENT_OUTBOX_RETRY_BACKOFF,
+    lease=settings.PAYMENT_OUTBOX_LEASE,
+)
+webhook_inbox_worker = WebhookInboxWorker(
+    session_factory=sessionmaker_instance,
+    gateway=stripe_payment_gateway,
+    batch_size=settings.WEBHOOK_INBOX_BATCH_SIZE,
+    workers=settings.WEBHOOK_INBOX_WORKERS,
+    max_attempts=settings.WEBHOOK_INBOX_MAX_ATTEMPTS,
+    retry_backoff=settings.WEBHOOK_INBOX_RETRY_BACKOFF,
+    max_age=settings.WEBHOOK_INBOX_MAX_AGE,
+)
 
 
 def get_payment_gateway() -> PaymentGateway:
     return stripe_payment_gateway
 
 
-def get_idempotency_key() -> str:
-    return str(uuid.uuid4())
+def get_outbox_dispatcher() -> PaymentOutboxDispatcher:
+    return outbox_dispatcher
+
+
+def get_webhook_inbox_worker() -> WebhookInboxWorker:
+    return webhook_inbox_worker
+
+
+def get_idempotency_key(
+    idempotency_key: str | None = Header(None, alias="Idempotency-Key")
+) -> str | None:
+    return idempotency_key
@@ -1,14 +1,44 @@
 from abc import ABC, abstractmethod
 from typing import Any, Dict
 
+from event_manager.models.payment import PaymentStatus
+from event_manager.schemas.payment import WebhookEvent
+
 
 class PaymentGateway(ABC):
+    """
+    Calls to the payment provider are coroutines so a slow provider only
+    delays the request waiting on it, never the whole worker.
+    """
+
+    @abstractmethod
+    async def create_payment_intent(
+        self,
+        amount: int,
+        idempotency_key: str,
+        currency: str | None = "USD",
+        metadata: Dict[str, Any] = {},
+    ) -> Dict[str, Any]:
+        pass
+
     @abstractmethod
-    def create_payment_intent(
-        self, amount: int, currency: str | None = "USD", metadata: Dict[str, Any] = {}
+    async def confirm_payment_intent(
+        self, intent_id: str, payment_method: str
     ) -> Dict[str, Any]:
         pass
 
     @abstractmethod
-    async def handle_webhook_event(self, event: Dict[str, Any], db: Any) -> None:
+    async def cancel_payment_intent(self, intent_id: str) -> Dict[str, Any]:
         pass
+
+    # Provider event types that move a payment out of PENDING
+    webhook_transitions: Dict[str, PaymentStatus] = {}
+
+    @abstractmethod
+    def parse_webhook_event(
+        self, payload: bytes, signature: str | None
+    ) -> WebhookEvent:
+        """Verifies and decodes a webhook, raising InvalidWebhook."""
+
+    async def aclose(self) -> None:
+        """Releases pooled connections on shutdown."""
@@ -0,0 +1,85 @@
+import asyncio
+import json
+import uuid
+from typing import Any, Dict
+
+from event_manager.errors.all_errors import InvalidWebhook
+from event_manager.metrics import tracing
+from event_manager.models.payment import PaymentStatus
+from event_manager.payment_gateway.abstract_payment_gateway import PaymentGateway
+from event_manager.schemas.payment import WebhookEvent
+
+
+class FakePaymentGateway(PaymentGateway):
+    """
+    In-process stand-in for the payment provider, for tests and for
+    benchmarking book-and-pay without network access. `latency` seconds are
+    awaited per call to mimic the provider round trip.
+    """
+
+    webhook_transitions = {
+        "payment_intent.succeeded": PaymentStatus.COMPLETED,
+        "payment_intent.payment_failed": PaymentStatus.FAILED,
+    }
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.intents: Dict[str, Dict[str, Any]] = {}
+        self._by_idempotency_key: Dict[str, str] = {}
+
+    async def _round_trip(self) -> None:
+        if self.latency:
+            with tracing.span("payment_gateway"):
+                await asyncio.sleep(self.latency)
+
+    async def create_payment_intent(
+        self,
+        amount: int,
+        idempotency_key: str,
+        currency: str | None = "USD",
+        metadata: Dict[str, Any] = {},
+    ) -> Dict[str, Any]:
+        await self._round_trip()
+        intent_id = self._by_idempotency_key.get(idempotency_key)
+        if intent_id is None:
+            intent_id = f"pi_fake_{uuid.uuid4().hex}"
+            self._by_idempotency_key[idempotency_key] = intent_id
+            self.intents[intent_id] = {
+                "id": intent_id,
+                "amount": amount,
+                "currency": currency,
+                "metadata": dict(metadata),
+                "status": "requires_confirmation",
+            }
+        return {
+            "id": intent_id,
+            "client_secret": f"{intent_id}_secret",
+            "idempotency_key": idempotency_key,
+        }
+
+    async def confirm_payment_intent(
+        self, intent_id: str, payment_method: str
+    ) -> Dict[str, Any]:
+        await self._round_trip()
+        self.intents[intent_id]["status"] = "succeeded"
+        return {"id": intent_id, "status": "succeeded"}
+
+    async def cancel_payment_intent(self, intent_id: str) -> Dict[str, Any]:
+        await self._round_trip()
+        self.intents[intent_id]["status"] = "canceled"
+        return {"id": intent_id, "status": "canceled"}
+
+    def parse_webhook_event(
+        self, payload: bytes, signature: str | None
+    ) -> WebhookEvent:
+        """Takes Stripe shaped events, unsigned."""
+        try:
+            event = json.loads(payload)
+            return WebhookEvent(
+                event_id=event["id"],
+                event_type=event["type"],
+                payment_intent_id=event["data"]["object"].get("id"),
+                payload=event,
+            )
+        except (ValueError, KeyError, TypeError, AttributeError):
+            raise InvalidWebhook("Invalid payload")
@@ -0,0 +1,96 @@
+import asyncio
+from logging import getLogger
+from typing import Any, Callable
+
+from sqlalchemy import Row
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from event_manager.dal.payment_outbox import payment_outbox_manager
+from event_manager.payment_gateway.abstract_payment_gateway import PaymentGateway
+
+logger = getLogger(__name__)
+
+
+class PaymentOutboxDispatcher:
+    """
+    Creates the payment intents queued by `book_and_pay`.
+
+    Rows are claimed in one short transaction, the provider is called with no
+    transaction or row lock held, and the results are written back in a
+    second transaction. `notify()` wakes the loop right after a booking
+    commits; the interval only matters for retries and missed wake-ups.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], AsyncSession],
+        gateway: PaymentGateway,
+        batch_size: int,
+        max_attempts: int,
+        retry_backoff: float,
+        lease: float,
+    ):
+        self.session_factory = session_factory
+        self.gateway = gateway
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.retry_backoff = retry_backoff
+        self.lease = lease
+        self._wake_up = asyncio.Event()
+
+    def notify(self) -> None:
+        self._wake_up.set()
+
+    async def _create_intent(self, claimed: Row[Any]) -> dict[str, Any]:
+        return await self.gateway.create_payment_intent(
+            amount=int(claimed.amount),
+            metadata={"booking_id": claimed.booking_id},
+            idempotency_key=claimed.idempotency_key,
+        )
+
+    async def dispatch_batch(self) -> int:
+        """Returns how many rows were claimed."""
+        async with self.session_factory() as session:
+            claimed = await payment_outbox_manager.claim_due(
+                session, self.batch_size, self.lease
+            )
+            await session.commit()
+        if not claimed:
+            return 0
+
+        results = await asyncio.gather(
+            *(self._create_intent(row) for row in claimed), return_exceptions=True
+        )
+        async with self.session_factory() as session:
+            for row, result in zip(claimed, results):
+                if isinstance(result, BaseException):
+                    logger.warning(
+                        "Payment intent for booking %s failed: %r",
+                        row.booking_id,
+                        result,
+                    )
+                    await payment_outbox_manager.mark_retry(
+                        session,
+                        row,
+                        repr(result),
+                        self.max_attempts,
+                        self.retry_backoff,
+                    )
+                else:
+                    await payment_outbox_manager.mark_dispatched(session, row, result)
+            await session.commit()
+        return len(claimed)
+
+    async def run(self, interval: float) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._wake_up.wait(), interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake_up.clear()
+            try:
+                # A full batch means more rows are probably due
+                while await self.dispatch_batch() == self.batch_size:
+                    pass
+            except Exception:
+                logger.exception("Payment outbox dispatch failed")
@@ -1,32 +1,66 @@
+import asyncio
 from logging import getLogger
-from typing import Any, Dict
+from typing import Any, Awaitable, Callable, Dict
 
 import stripe
-from sqlalchemy.ext.asyncio import AsyncSession
 
 from event_manager.core.config import settings
-from event_manager.dal.payment import payment_manager
+from event_manager.errors.all_errors import InvalidWebhook
+from event_manager.metrics import tracing
 from event_manager.models.payment import PaymentStatus
 from event_manager.payment_gateway.abstract_payment_gateway import PaymentGateway
+from event_manager.schemas.payment import WebhookEvent
 
 logger = getLogger(__name__)
 stripe.api_key = settings.STRIPE_API_KEY
 
 
 class StripePaymentGateway(PaymentGateway):
-    def create_payment_intent(
+    """
+    Talks to Stripe through the SDK's async methods on one shared httpx
+    client, so connections are kept alive across requests. At most
+    `max_concurrency` calls are in flight per worker and each one is
+    abandoned after `timeout` seconds; intent creation carries an
+    idempotency key, so retrying a timed out call is safe.
+    """
+
+    webhook_transitions = {
+        "payment_intent.succeeded": PaymentStatus.COMPLETED,
+        "payment_intent.payment_failed": PaymentStatus.FAILED,
+    }
+
+    def __init__(self, api_key: str, timeout: float, max_concurrency: int):
+        self.timeout = timeout
+        self._http_client = stripe.HTTPXClient(timeout=timeout)
+        self._client = stripe.StripeClient(api_key, http_client=self._http_client)
+        self._slots = asyncio.Semaphore(max_concurrency)
+
+    async def _call(
+        self, method: Callable[..., Awaitable[Any]], *args: Any, **kwargs: Any
+    ) -> Any:
+        with tracing.span("payment_gateway"):
+            async with self._slots:
+                return await asyncio.wait_for(method(*args, **kwargs), self.timeout)
+
+    async def create_payment_intent(
         self,
         amount: float,
         idempotency_key: str,
         currency: str | None = "USD",
         metadata: Dict[str, Any] = {},
     ) -> Dict[str, Any]:
-        intent = stripe.PaymentIntent.create(
-            amount=amount,
-            currency=currency,
-            metadata=metadata,
-            automatic_payment_methods={"enabled": True, "allow_redirects": "never"},
-            idempotency_key=idempotency_key,
+        intent = await self._call(
+            self._client.payment_intents.create_async,
+            params={
+                "amount": amount,
+                "currency": currency,
+                "metadata": metadata,
+                "automatic_payment_methods": {
+                    "enabled": True,
+                    "allow_redirects": "never",
+                },
+            },
+            options={"idempotency_key": idempotency_key},
         )
         return {
             "id": intent["id"],
@@ -34,44 +68,45 @@ class StripePaymentGateway(PaymentGateway):
             "idempotency_key": idempotency_key,
         }
 
-    async def handle_webhook_event(
-        self, event: Dict[str, Any], db: AsyncSession
-    ) -> None:
-        if event["type"] == "payment_intent.succeeded":
-            intent = event["data"]["object"]
-            logger.info("Payment SUCCESS!!!")
-            await self._handle_payment_intent_succeeded(intent, db)
-        elif event["type"] == "payment_intent.payment_failed":
-            intent = event["data"]["object"]
-            logger.info("Payment FAILURE!!!")
-            await self._handle_payment_intent_failed(intent, db)
-        else:
-            logger.info(f"UNKNOWN Intent Type!!! --> {event['type']}")
-
-    async def _handle_payment_intent_succeeded(
-        self, intent: Dict[str, Any], db: AsyncSession
-    ) -> None:
-        db_payment = await payment_manager.get_payment_by_transaction_id(
-            db, intent["id"]
+    async def confirm_payment_intent(
+        self, intent_id: str, payment_method: str
+    ) -> Dict[str, Any]:
+        intent = await self._call(
+            self._client.payment_intents.confirm_async,
+            intent_id,
+            params={"payment_method": payment_method},
         )
-        if db_payment:
-            db_payment.status = PaymentStatus.COMPLETED
-            await db.commit()
-            await db.refresh(db_payment)
+        return {"id": intent["id"], "status": intent["status"]}
+
+    async def cancel_payment_intent(self, intent_id: str) -> Dict[str, Any]:
+        intent = await self._call(self._client.payment_intents.cancel_async, intent_id)
+        return {"id": intent["id"], "status": intent["status"]}
+
+    async def aclose(self) -> None:
+        await self._http_client.close_async()
 
-    async def _handle_payment_intent_failed(
-        self, intent: Dict[str, Any], db: AsyncSession
-    ) -> None:
-        db_payment = await payment_manager.get_payment_by_transaction_id(
-            db, intent["id"]
+    def parse_webhook_event(
+        self, payload: bytes, signature: str | None
+    ) -> WebhookEvent:
+        try:
+            event = stripe.Webhook.construct_event(
+                payload, signature, settings.STRIPE_WEBHOOK_SECRET
+            )
+        except ValueError:
+            raise InvalidWebhook("Invalid payload")
+        except stripe.SignatureVerificationError:
+            raise InvalidWebhook("Invalid signature")
+        intent = event["data"]["object"]
+        return WebhookEvent(
+            event_id=event["id"],
+            event_type=event["type"],
+            payment_intent_id=intent.get("id"),
+            payload=event.to_dict(),
         )
-        if db_payment:
-            db_payment.status = PaymentStatus.FAILED
-            db_payment.booking.event.available_tickets += db_payment.booking.quantity
-            db.add(db_payment)
-            db.add(db_payment.booking.event)
-            db.commit()
-            db.refresh(db_payment)
 
 
-stripe_payment_gateway = StripePaymentGateway()
+stripe_payment_gateway = StripePaymentGateway(
+    settings.STRIPE_API_KEY,
+    timeout=settings.PAYMENT_GATEWAY_TIMEOUT,
+    max_concurrency=settings.PAYMENT_GATEWAY_MAX_CONCURRENCY,
+)
@@ -0,0 +1,196 @@
+import asyncio
+from collections import defaultdict
+from logging import getLogger
+from typing import Callable
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from event_manager.dal.payment import payment_manager
+from event_manager.dal.webhook_inbox import webhook_inbox_manager
+from event_manager.models.payment import PaymentStatus
+from event_manager.payment_gateway.abstract_payment_gateway import PaymentGateway
+
+logger = getLogger(__name__)
+
+
+class WebhookInboxWorker:
+    """
+    Applies the webhooks stored by `/payments/webhook`.
+
+    `workers` loops drain the inbox concurrently, each claiming batches with
+    SKIP LOCKED. A batch costs one statement per target payment status plus
+    one to mark it processed, however many events it holds, so a burst of
+    webhooks after a big on-sale is absorbed here instead of in the API.
+    Should the batch fail, its intents are settled again one savepoint at a
+    time, and only the events of those that still fail are retried. Events
+    for an intent with no payment yet are retried too, for up to `max_age`
+    seconds after they were received.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], AsyncSession],
+        gateway: PaymentGateway,
+        batch_size: int,
+        workers: int,
+        max_attempts: int,
+        retry_backoff: float,
+        max_age: float,
+    ):
+        self.session_factory = session_factory
+        self.gateway = gateway
+        self.batch_size = batch_size
+        self.workers = workers
+        self.max_attempts = max_attempts
+        self.retry_backoff = retry_backoff
+        self.max_age = max_age
+        self._wake_up = asyncio.Event()
+
+    def notify(self) -> None:
+        self._wake_up.set()
+
+    def _transitions(self, claimed) -> dict[str, PaymentStatus]:
+        # Events arrive oldest first, so the latest one per intent wins
+        latest: dict[str, PaymentStatus] = {}
+        for row in claimed:
+            status = self.gateway.webhook_transitions.get(row.event_type)
+            if status is not None and row.payment_intent_id:
+                latest[row.payment_intent_id] = status
+        return latest
+
+    async def _settle(
+        self, session: AsyncSession, transitions: dict[str, PaymentStatus]
+    ) -> None:
+        by_status: dict[PaymentStatus, list[str]] = defaultdict(list)
+        for intent_id, status in transitions.items():
+            by_status[status].append(intent_id)
+        for status, intent_ids in by_status.items():
+            lapsed = await payment_manager.settle(session, intent_ids, status)
+            if lapsed:
+                logger.warning(
+                    "Payments for bookings %s completed after their hold "
+                    "lapsed; marked for refund",
+                    lapsed,
+                )
+
+    async def _settle_each(
+        self, session: AsyncSession, transitions: dict[str, PaymentStatus]
+    ) -> dict[str, str]:
+        """
+        Settles the intents one savepoint at a time, so a failing one only
+        rolls back itself. Returns the errors of those that failed.
+        """
+        errors = {}
+        for intent_id, status in transitions.items():
+            try:
+                async with session.begin_nested():
+                    await self._settle(session, {intent_id: status})
+            except Exception as e:
+                logger.warning("Settling payment intent %s failed: %r", intent_id, e)
+                errors[intent_id] = repr(e)
+        return errors
+
+    async def _park_failed(
+        self,
+        session: AsyncSession,
+        failed: dict[str, list[int]],
+        errors: dict[str, str],
+    ) -> None:
+        for intent_id, ids in failed.items():
+            parked = await webhook_inbox_manager.mark_retry(
+                session,
+                ids,
+                errors[intent_id],
+                self.retry_backoff,
+                max_attempts=self.max_attempts,
+            )
+            if parked:
+                logger.error(
+                    "Parked %s webhook events for payment intent %s: %s",
+                    parked,
+                    intent_id,
+                    errors[intent_id],
+                )
+
+    async def _wait_for_payments(self, session: AsyncSession, ids: list[int]) -> None:
+        # The intent can be reported before the outbox records its payment
+        parked = await webhook_inbox_manager.mark_retry(
+            session,
+            ids,
+            "No payment recorded for the intent",
+            self.retry_backoff,
+            max_age=self.max_age,
+        )
+        if parked:
+            logger.error("Parked %s webhook events for unknown payment intents", parked)
+
+    async def _retry(
+        self,
+        session: AsyncSession,
+        claimed,
+        errors: dict[str, str],
+        unmatched: set[str],
+    ) -> list[int]:
+        """Records the events to retry; returns the ids of the others."""
+        processed, waiting, failed = [], [], defaultdict(list)
+        for row in claimed:
+            if row.payment_intent_id in errors:
+                failed[row.payment_intent_id].append(row.id)
+            elif row.payment_intent_id in unmatched:
+                waiting.append(row.id)
+            else:
+                processed.append(row.id)
+        await self._park_failed(session, failed, errors)
+        if waiting:
+            await self._wait_for_payments(session, waiting)
+        return processed
+
+    async def process_batch(self) -> int:
+        """Returns how many events were claimed."""
+        async with self.session_factory() as session:
+            claimed = await webhook_inbox_manager.claim_batch(session, self.batch_size)
+            if not claimed:
+                return 0
+            transitions = self._transitions(claimed)
+            unmatched = set(transitions)
+            if transitions:
+                unmatched -= await payment_manager.existing_transaction_ids(
+                    session, list(transitions)
+                )
+            for intent_id in unmatched:
+                del transitions[intent_id]
+            errors: dict[str, str] = {}
+            try:
+                async with session.begin_nested():
+                    await self._settle(session, transitions)
+            except Exception:
+                # Find the events at fault instead of failing the whole batch
+                errors = await self._settle_each(session, transitions)
+            processed = await self._retry(session, claimed, errors, unmatched)
+            if processed:
+                await webhook_inbox_manager.mark_processed(session, processed)
+            await session.commit()
+        return len(claimed)
+
+    async def drain(self) -> int:
+        processed = 0
+        while True:
+            batch = await self.process_batch()
+            processed += batch
+            if batch < self.batch_size:
+                return processed
+
+    async def _work(self, interval: float) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._wake_up.wait(), interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake_up.clear()
+            try:
+                await self.drain()
+            except Exception:
+                logger.exception("Processing payment webhooks failed")
+
+    async def run(self, interval: float) -> None:
+        await asyncio.gather(*(self._work(interval) for _ in range(self.workers)))
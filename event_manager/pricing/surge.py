@@ -0,0 +1,76 @@
+from typing import Sequence
+
+import numpy as np
+from numpy.typing import ArrayLike
+
+from event_manager.models.event import Event
+
+SURGE_TIER_SIZE = 5
+
+
+def surge_total_cost(
+    available_tickets: int,
+    surge_threshold: float,
+    base_price: float,
+    surge_price: float,
+    quantity: int,
+) -> float:
+    """
+    Price of `quantity` tickets in constant time.
+
+    Once `available_tickets` drops to `surge_threshold`, tickets are sold in
+    tiers of SURGE_TIER_SIZE, tier k costing `base_price + k * surge_price`.
+    The first tier holds what is left of the current block of five
+    (`available_tickets % 5`, or a full five), and the tier the quantity
+    ends in is charged in full. For n tiers that is
+    `first * (base + surge) + 5 * sum(base + k * surge for k in 2..n)`.
+    """
+    if available_tickets > surge_threshold:
+        return quantity * base_price
+    if quantity <= 0:
+        return 0
+
+    first_tier = available_tickets % SURGE_TIER_SIZE or SURGE_TIER_SIZE
+    later_tiers = -(-max(quantity - first_tier, 0) // SURGE_TIER_SIZE)
+    tiers = later_tiers + 1
+    return first_tier * (base_price + surge_price) + SURGE_TIER_SIZE * (
+        later_tiers * base_price + surge_price * (tiers * (tiers + 1) // 2 - 1)
+    )
+
+
+def surge_total_costs(
+    available_tickets: ArrayLike,
+    surge_threshold: ArrayLike,
+    base_price: ArrayLike,
+    surge_price: ArrayLike,
+    quantity: ArrayLike,
+) -> np.ndarray:
+    """`surge_total_cost` over broadcastable arrays, for pricing many quotes at once."""
+    available_tickets = np.asarray(available_tickets, dtype=np.int64)
+    quantity = np.asarray(quantity, dtype=np.int64)
+    base_price = np.asarray(base_price, dtype=np.float64)
+    surge_price = np.asarray(surge_price, dtype=np.float64)
+
+    first_tier = available_tickets % SURGE_TIER_SIZE
+    first_tier = np.where(first_tier == 0, SURGE_TIER_SIZE, first_tier)
+    later_tiers = -(-np.maximum(quantity - first_tier, 0) // SURGE_TIER_SIZE)
+    tiers = later_tiers + 1
+    surged = first_tier * (base_price + surge_price) + SURGE_TIER_SIZE * (
+        later_tiers * base_price + surge_price * (tiers * (tiers + 1) // 2 - 1)
+    )
+    return np.where(
+        available_tickets > np.asarray(surge_threshold),
+        quantity * base_price,
+        np.where(quantity > 0, surged, 0.0),
+    )
+
+
+def event_total_costs(events: Sequence[Event], quantities: ArrayLike) -> np.ndarray:
+    """Prices `quantities[i]` tickets of `events[i]`."""
+    return surge_total_costs(
+        [event.available_tickets for event in events],
+        [event.surge_threshold for event in events],
+        [event.base_price for event in events],
+        [event.surge_price for event in events],
+        quantities,
+    )
@@ -1,7 +1,17 @@
+import enum
 from datetime import datetime
 
 from pydantic import BaseModel, ConfigDict
 
+from event_manager.models.booking import BookingStatus
+
+
+class BookingStrategy(str, enum.Enum):
+    OPTIMISTIC = "OPTIMISTIC"
+    PESSIMISTIC = "PESSIMISTIC"
+    # Single conditional UPDATE ... RETURNING chained into the booking INSERT
+    ATOMIC = "ATOMIC"
+
 
 class BookingBase(BaseModel):
     event_id: int
@@ -15,11 +25,20 @@ class BookingCreate(BookingBase):
     pass
 
 
+class BookingHold(BookingCreate):
+    """A booking that gives its tickets back unless paid by `expires_at`."""
+
+    status: BookingStatus = BookingStatus.HELD
+    expires_at: datetime
+
+
 class BookingUpdate(BaseModel):
     pass
 
 
 class Booking(BookingBase):
     id: int
+    status: BookingStatus
+    expires_at: datetime | None = None
 
     model_config = ConfigDict(from_attributes=True)
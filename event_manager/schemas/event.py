@@ -1,3 +1,4 @@
+import enum
 from datetime import date, time
 from typing import Optional
 
@@ -16,6 +17,7 @@ class EventBase(BaseModel):
     base_price: Annotated[float, Field(strict=True, gt=0)]
     surge_price: float | None = 0
     surge_threshold: float | None = 0
+    inventory_shards: Annotated[int, Field(ge=0)] = 0
 
 
 class EventCreate(EventBase):
@@ -33,9 +35,33 @@ class EventUpdate(EventBase):
     base_price: Optional[float] = None
     surge_price: Optional[float] = None
     surge_threshold: Optional[float] = None
+    inventory_shards: Optional[int] = None
 
 
 class Event(EventBase):
     id: int
 
     model_config = ConfigDict(from_attributes=True)
+
+
+class ImportFormat(str, enum.Enum):
+    CSV = "csv"
+    # One JSON object per line
+    NDJSON = "ndjson"
+
+
+class EventImportError(BaseModel):
+    line: int
+    errors: list[str]
+
+
+class EventImportReport(BaseModel):
+    rows: int = 0
+    inserted: int = 0
+    updated: int = 0
+    # Identical to the stored event, or superseded by a later line
+    unchanged: int = 0
+    failed: int = 0
+    errors: list[EventImportError] = []
+    # Only the first EVENT_IMPORT_MAX_ERRORS failures are listed
+    errors_truncated: bool = False
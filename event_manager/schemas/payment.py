@@ -1,8 +1,10 @@
 from datetime import datetime
+from typing import Any
 
 from pydantic import BaseModel, ConfigDict
 
 from event_manager.models.payment import PaymentStatus
+from event_manager.models.payment_outbox import OutboxStatus
 
 
 class PaymentBase(BaseModel):
@@ -25,3 +27,38 @@ class Payment(PaymentBase):
     id: int
 
     model_config = ConfigDict(from_attributes=True)
+
+
+class PaymentOutboxCreate(BaseModel):
+    booking_id: int
+    amount: float
+    idempotency_key: str
+
+
+class PaymentOutboxUpdate(BaseModel):
+    pass
+
+
+class PaymentIntentStatus(BaseModel):
+    """
+    What `book_and_pay` answers with; clients poll
+    `/payments/intents/{booking_id}` until `client_secret` is set.
+    """
+
+    booking_id: int
+    status: OutboxStatus
+    payment_intent_id: str | None = None
+    client_secret: str | None = None
+
+
+class WebhookEvent(BaseModel):
+    """A verified provider webhook, as stored in the webhook inbox."""
+
+    event_id: str
+    event_type: str
+    payment_intent_id: str | None = None
+    payload: dict[str, Any]
+
+
+class WebhookEventUpdate(BaseModel):
+    pass
@@ -0,0 +1,15 @@
+from event_manager.core.config import settings
+from event_manager.search.base import EventSearchBackend
+from event_manager.search.in_memory import InMemoryEventSearch
+from event_manager.search.postgres import PostgresEventSearch
+
+search_backends: dict[str, type[EventSearchBackend]] = {
+    "postgres": PostgresEventSearch,
+    "memory": InMemoryEventSearch,
+}
+
+event_search_backend = search_backends[settings.EVENT_SEARCH_BACKEND]()
+
+
+def get_search_backend() -> EventSearchBackend:
+    return event_search_backend
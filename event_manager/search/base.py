@@ -0,0 +1,42 @@
+import re
+from abc import ABC, abstractmethod
+from typing import Any
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from event_manager.dal.pagination import Page
+from event_manager.models.event import Event
+
+RANK_SORT_KEY = "rank"
+
+
+def tokenize(text: str) -> list[str]:
+    return re.findall(r"\w+", text.lower())
+
+
+class EventSearchBackend(ABC):
+    """
+    Ranked, prefix and typo tolerant free-text search over event names and
+    venues. Results are ordered by descending relevance and paginated with
+    `(rank, id)` cursors.
+    """
+
+    @abstractmethod
+    async def search(
+        self,
+        db: AsyncSession,
+        text: str,
+        limit: int = 10,
+        cursor: str | None = None,
+        additional_where_clause: list[Any] | None = None,
+    ) -> Page[Event]:
+        pass
+
+    def index_event(self, event: Event) -> None:
+        """Called after an event is created or updated."""
+
+    def remove_event(self, event_id: int) -> None:
+        """Called after an event is deleted."""
+
+    async def warm_up(self, db: AsyncSession) -> None:
+        """Called once on startup."""
@@ -0,0 +1,78 @@
+from typing import Sequence
+
+import numpy as np
+
+from event_manager.errors.all_errors import InvalidLocation
+
+# Radius of earthdistance's earth(), so the GiST box prefilter and the exact
+# distances agree on what is inside the radius
+EARTH_RADIUS_KM = 6378.168
+
+
+def _parse_floats(value: str, fields: str) -> list[float]:
+    try:
+        numbers = [float(part) for part in value.split(",")]
+    except ValueError as e:
+        raise InvalidLocation(f"Expected {fields}") from e
+    if len(numbers) != len(fields.split(",")):
+        raise InvalidLocation(f"Expected {fields}")
+    return numbers
+
+
+def _check_point(lat: float, long: float) -> None:
+    if not (-90 <= lat <= 90 and -180 <= long <= 180):
+        raise InvalidLocation(f"Invalid coordinates {lat},{long}")
+
+
+def parse_near(value: str) -> tuple[float, float, float]:
+    """Parses a `lat,long,radius_km` query parameter."""
+    lat, long, radius_km = _parse_floats(value, "lat,long,radius_km")
+    _check_point(lat, long)
+    if radius_km <= 0:
+        raise InvalidLocation("radius_km must be positive")
+    return lat, long, radius_km
+
+
+def parse_bbox(value: str) -> tuple[float, float, float, float]:
+    """Parses a `south,west,north,east` query parameter."""
+    south, west, north, east = _parse_floats(value, "south,west,north,east")
+    _check_point(south, west)
+    _check_point(north, east)
+    if south > north:
+        raise InvalidLocation("south must not be above north")
+    return south, west, north, east
+
+
+def haversine_km(
+    lat: float, long: float, lats: np.ndarray, longs: np.ndarray
+) -> np.ndarray:
+    """Great-circle distances from `(lat, long)` to every point, in one pass."""
+    lat1, long1 = np.radians(lat), np.radians(long)
+    lats, longs = np.radians(lats), np.radians(longs)
+    a = (
+        np.sin((lats - lat1) / 2) ** 2
+        + np.cos(lat1) * np.cos(lats) * np.sin((longs - long1) / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+def rank_by_distance(
+    lat: float,
+    long: float,
+    radius_km: float,
+    candidates: Sequence[tuple[int, float, float]],
+) -> list[tuple[float, int]]:
+    """
+    Re-ranks `(id, lat, long)` candidates of a bounding box lookup, returning
+    `(distance_km, id)` pairs inside the radius, nearest first.
+    """
+    if not candidates:
+        return []
+    points = np.asarray(candidates, dtype=np.float64)
+    ids = points[:, 0].astype(np.int64)
+    distances = haversine_km(lat, long, points[:, 1], points[:, 2])
+
+    inside = distances <= radius_km
+    ids, distances = ids[inside], distances[inside]
+    order = np.lexsort((ids, distances))
+    return list(zip(distances[order].tolist(), ids[order].tolist()))
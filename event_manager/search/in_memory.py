@@ -0,0 +1,178 @@
+import bisect
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Any
+
+from sqlalchemy import and_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from event_manager.dal.pagination import Page, decode_cursor, encode_cursor
+from event_manager.models.event import Event
+from event_manager.search.base import RANK_SORT_KEY, EventSearchBackend, tokenize
+
+# Same weights and threshold defaults as setweight() A/B and pg_trgm
+NAME_WEIGHT = 1.0
+VENUE_WEIGHT = 0.4
+WORD_SIMILARITY_THRESHOLD = 0.6
+
+
+def trigrams(words: list[str]) -> set[str]:
+    grams: set[str] = set()
+    for word in words:
+        padded = f"  {word} "
+        grams.update(padded[i : i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+@dataclass
+class _Document:
+    name_tokens: list[str]
+    venue_tokens: list[str]
+    name_trigrams: set[str]
+    venue_trigrams: set[str]
+
+
+class InMemoryEventSearch(EventSearchBackend):
+    """
+    Pure Python stand-in for PostgresEventSearch, used by tests and where
+    pg_trgm is not available. Keeps a sorted token list for prefix lookups
+    and a trigram inverted index for typo tolerant candidates; the events
+    themselves are still loaded from the database.
+    """
+
+    def __init__(self):
+        self._documents: dict[int, _Document] = {}
+        self._sorted_tokens: list[str] = []
+        self._token_postings: dict[str, set[int]] = defaultdict(set)
+        self._trigram_postings: dict[str, set[int]] = defaultdict(set)
+
+    def index_event(self, event: Event) -> None:
+        self.remove_event(event.id)
+        name_tokens, venue_tokens = tokenize(event.name), tokenize(event.venue)
+        document = _Document(
+            name_tokens=name_tokens,
+            venue_tokens=venue_tokens,
+            name_trigrams=trigrams(name_tokens),
+            venue_trigrams=trigrams(venue_tokens),
+        )
+        self._documents[event.id] = document
+        for token in name_tokens + venue_tokens:
+            if not self._token_postings[token]:
+                bisect.insort(self._sorted_tokens, token)
+            self._token_postings[token].add(event.id)
+        for gram in document.name_trigrams | document.venue_trigrams:
+            self._trigram_postings[gram].add(event.id)
+
+    def remove_event(self, event_id: int) -> None:
+        document = self._documents.pop(event_id, None)
+        if document is None:
+            return
+        for token in set(document.name_tokens + document.venue_tokens):
+            self._token_postings[token].discard(event_id)
+            if not self._token_postings[token]:
+                del self._token_postings[token]
+                self._sorted_tokens.pop(bisect.bisect_left(self._sorted_tokens, token))
+        for gram in document.name_trigrams | document.venue_trigrams:
+            self._trigram_postings[gram].discard(event_id)
+            if not self._trigram_postings[gram]:
+                del self._trigram_postings[gram]
+
+    async def warm_up(self, db: AsyncSession) -> None:
+        result = await db.execute(select(Event.id, Event.name, Event.venue))
+        for row in result.all():
+            self.index_event(row)
+
+    def _prefix_matches(self, word: str) -> set[int]:
+        matches: set[int] = set()
+        start = bisect.bisect_left(self._sorted_tokens, word)
+        for token in self._sorted_tokens[start:]:
+            if not token.startswith(word):
+                break
+            matches |= self._token_postings[token]
+        return matches
+
+    @staticmethod
+    def _text_rank(document: _Document, words: list[str]) -> float:
+        def all_prefixed(tokens: list[str]) -> bool:
+            return all(
+                any(token.startswith(word) for token in tokens) for word in words
+            )
+
+        text_rank = 0.0
+        if all_prefixed(document.name_tokens):
+            text_rank += NAME_WEIGHT
+        if all_prefixed(document.venue_tokens):
+            text_rank += VENUE_WEIGHT
+        # Words spread over name and venue still match as a whole
+        return text_rank or VENUE_WEIGHT
+
+    def rank(self, text: str) -> list[tuple[float, int]]:
+        """Returns `(rank, event_id)` pairs, best match first."""
+        words = tokenize(text)
+        if not words:
+            return []
+
+        full_text = set.intersection(*(self._prefix_matches(word) for word in words))
+        query_trigrams = trigrams(words)
+        candidates = set(full_text)
+        for gram in query_trigrams:
+            candidates |= self._trigram_postings.get(gram, set())
+
+        ranked = []
+        for event_id in candidates:
+            document = self._documents[event_id]
+            similarity = max(
+                len(query_trigrams & document.name_trigrams),
+                len(query_trigrams & document.venue_trigrams),
+            ) / len(query_trigrams)
+            if event_id in full_text:
+                text_rank = self._text_rank(document, words)
+            elif similarity > WORD_SIMILARITY_THRESHOLD:
+                text_rank = 0.0
+            else:
+                continue
+            ranked.append((text_rank + similarity, event_id))
+        ranked.sort(reverse=True)
+        return ranked
+
+    async def search(
+        self,
+        db: AsyncSession,
+        text: str,
+        limit: int = 10,
+        cursor: str | None = None,
+        additional_where_clause: list[Any] | None = None,
+    ) -> Page[Event]:
+        ranked = self.rank(text)
+        if ranked and additional_where_clause:
+            allowed = set(
+                await db.scalars(
+                    select(Event.id).where(
+                        Event.id.in_([event_id for _, event_id in ranked]),
+                        and_(*additional_where_clause),
+                    )
+                )
+            )
+            ranked = [entry for entry in ranked if entry[1] in allowed]
+        if cursor:
+            last = decode_cursor(cursor, RANK_SORT_KEY, float)
+            ranked = [entry for entry in ranked if entry < last]
+
+        page_entries = ranked[:limit]
+        events = {
+            event.id: event
+            for event in await db.scalars(
+                select(Event).where(
+                    Event.id.in_([event_id for _, event_id in page_entries])
+                )
+            )
+        }
+        page = Page(
+            items=[
+                events[event_id] for _, event_id in page_entries if event_id in events
+            ]
+        )
+        if len(ranked) > limit and page_entries:
+            last_rank, last_id = page_entries[-1]
+            page.next_cursor = encode_cursor(RANK_SORT_KEY, last_rank, last_id)
+        return page
@@ -0,0 +1,58 @@
+from typing import Any
+
+from sqlalchemy import and_, func, or_, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from event_manager.dal.pagination import Page, decode_cursor, encode_cursor
+from event_manager.models.event import Event
+from event_manager.search.base import RANK_SORT_KEY, EventSearchBackend, tokenize
+
+
+class PostgresEventSearch(EventSearchBackend):
+    """
+    Matches the weighted `events.search_vector` column against a prefix
+    tsquery (GIN indexed) and, for misspellings, name/venue word similarity
+    through the pg_trgm GIN indexes. Relevance is the full-text rank plus the
+    best trigram word similarity.
+    """
+
+    async def search(
+        self,
+        db: AsyncSession,
+        text: str,
+        limit: int = 10,
+        cursor: str | None = None,
+        additional_where_clause: list[Any] | None = None,
+    ) -> Page[Event]:
+        words = tokenize(text)
+        if not words:
+            return Page()
+
+        tsquery = func.to_tsquery("simple", " & ".join(f"{word}:*" for word in words))
+        text = " ".join(words)
+        rank = func.ts_rank(Event.search_vector, tsquery) + func.greatest(
+            func.word_similarity(text, Event.name),
+            func.word_similarity(text, Event.venue),
+        )
+        query = select(Event, rank).where(
+            or_(
+                Event.search_vector.op("@@")(tsquery),
+                # `%>` is word_similarity above pg_trgm.word_similarity_threshold
+                Event.name.op("%>")(text),
+                Event.venue.op("%>")(text),
+            )
+        )
+        if additional_where_clause:
+            query = query.where(and_(*additional_where_clause))
+        if cursor:
+            last_rank, last_id = decode_cursor(cursor, RANK_SORT_KEY, float)
+            query = query.where(tuple_(rank, Event.id) < tuple_(last_rank, last_id))
+
+        query = query.order_by(rank.desc(), Event.id.desc()).limit(limit + 1)
+        rows = (await db.execute(query)).all()
+
+        page = Page(items=[event for event, _ in rows[:limit]])
+        if len(rows) > limit and page.items:
+            last_event, last_rank = rows[limit - 1]
+            page.next_cursor = encode_cursor(RANK_SORT_KEY, last_rank, last_event.id)
+        return page
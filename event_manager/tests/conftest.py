@@ -6,13 +6,17 @@ from unittest.mock import AsyncMock, patch
 import pytest
 import pytest_asyncio
 from httpx import AsyncClient
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event, text
 from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy_utils import create_database, database_exists, drop_database
 
 from event_manager.core.config import settings
-from event_manager.core.database import create_sessionmaker, with_session
+from event_manager.core.database import (
+    create_sessionmaker,
+    with_read_session,
+    with_session,
+)
 from event_manager.keycloak.utils import validate_and_parse_token
 from event_manager.main import app
 from event_manager.models import Base
@@ -42,6 +46,11 @@ def create_test_database():
         logger.info("Test database created successfully.")
 
         # Create tables using the synchronous engine
+        with sync_engine.begin() as connection:
+            connection.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+            connection.execute(
+                text("CREATE EXTENSION IF NOT EXISTS earthdistance CASCADE")
+            )
         Base.metadata.create_all(sync_engine)
 
 
@@ -94,6 +103,7 @@ async def client(session: AsyncSession):
 
     async with AsyncClient(app=app, base_url="http://127.0.0.1:8080") as client:
         app.dependency_overrides[with_session] = session_override
+        app.dependency_overrides[with_read_session] = session_override
         app.dependency_overrides[validate_and_parse_token] = lambda: {
             "realm_access": {
                 "roles": [
@@ -107,6 +117,19 @@ async def client(session: AsyncSession):
         yield client
 
 
+@pytest.fixture
+def statements(engine: AsyncEngine):
+    """The SQL statements the test runs, in order."""
+    executed: list[str] = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        executed.append(statement)
+
+    event.listen(engine.sync_engine, "before_cursor_execute", record)
+    yield executed
+    event.remove(engine.sync_engine, "before_cursor_execute", record)
+
+
 @pytest.fixture(scope="session", autouse=True)
 def mock_keycloak_user_creation():
     with patch(
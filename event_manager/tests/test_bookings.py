@@ -1,9 +1,16 @@
-from datetime import datetime
+from datetime import date, datetime, time
 
 import pytest
 import pytz
 from faker import Faker
 from httpx import AsyncClient
+from sqlalchemy.orm import sessionmaker
+
+from event_manager.dal.booking import booking_manager
+from event_manager.errors.all_errors import InsufficientTickets, ResourceNotFound
+from event_manager.keycloak.permission_definitions import Roles
+from event_manager.models import Event, User
+from event_manager.schemas.booking import BookingCreate
 
 base_route = "http://127.0.0.1:8080/bookings/"
 
@@ -197,3 +204,79 @@ async def test_delete_booking(client: AsyncClient):
     booking_id = data["id"]
     response = await client.delete(f"{base_route}{booking_id}")
     assert response.status_code == 200
+
+
+async def create_user_and_event(
+    session_maker: sessionmaker, available_tickets: int
+) -> tuple[int, int]:
+    async with session_maker() as session:
+        user = User(
+            name=faker.name(),
+            email=faker.email(),
+            country_code=faker.country_code(),
+            phone_number=faker.numerify("##########"),
+            role=Roles.USER,
+            username=faker.user_name(),
+        )
+        event = Event(
+            name=faker.name(),
+            event_date=date(2024, 6, 30),
+            event_time=time(11, 15, tzinfo=pytz.UTC),
+            venue=faker.address(),
+            location_lat=-89,
+            location_long=-179,
+            available_tickets=available_tickets,
+            base_price=100,
+            surge_price=0,
+            surge_threshold=0,
+            version=0,
+        )
+        session.add_all([user, event])
+        await session.commit()
+        return user.id, event.id
+
+
+@pytest.mark.asyncio
+async def test_create_booking_atomic(session_maker: sessionmaker):
+    user_id, event_id = await create_user_and_event(session_maker, 10)
+    booking_in = BookingCreate(
+        event_id=event_id,
+        user_id=user_id,
+        booking_time=datetime(2024, 8, 15, 14, 0, 0, tzinfo=pytz.UTC),
+        quantity=4,
+        total_cost=400,
+    )
+
+    async with session_maker() as session:
+        booking = await booking_manager.create_booking_atomic(session, booking_in)
+        await session.commit()
+        assert booking.id
+        assert booking.event_id == event_id
+        assert booking.quantity == 4
+
+    async with session_maker() as session:
+        event = await session.get(Event, event_id)
+        assert event.available_tickets == 6
+        assert event.version == 1
+
+
+@pytest.mark.asyncio
+async def test_create_booking_atomic_with_insufficient_tickets(
+    session_maker: sessionmaker,
+):
+    user_id, event_id = await create_user_and_event(session_maker, 3)
+    booking_in = BookingCreate(
+        event_id=event_id,
+        user_id=user_id,
+        booking_time=datetime(2024, 8, 15, 14, 0, 0, tzinfo=pytz.UTC),
+        quantity=4,
+        total_cost=400,
+    )
+
+    async with session_maker() as session:
+        with pytest.raises(InsufficientTickets):
+            await booking_manager.create_booking_atomic(session, booking_in)
+
+        booking_in.event_id = event_id + 1000
+        with pytest.raises(ResourceNotFound):
+            await booking_manager.create_booking_atomic(session, booking_in)
@@ -0,0 +1,143 @@
+import asyncio
+from datetime import datetime
+
+import pytest
+import pytz
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.orm import sessionmaker
+
+from event_manager.cache.entity_cache import EntityCache
+from event_manager.cache.listener import CacheInvalidationListener
+from event_manager.cache.memory import InMemoryCacheBackend
+from event_manager.dal.booking import booking_manager
+from event_manager.dal.event import event_manager
+from event_manager.dal.user import user_manager
+from event_manager.models import Event, User
+from event_manager.schemas.booking import BookingCreate
+from event_manager.schemas.user import UserUpdate
+from event_manager.tests.test_bookings import create_user_and_event
+
+CHANNEL = "entity_cache_test"
+
+
+def make_cache(model: type, ttl: float = 60.0) -> EntityCache:
+    return EntityCache(
+        model,
+        backend=InMemoryCacheBackend(max_size=100),
+        ttl=ttl,
+        negative_ttl=ttl,
+        channel=CHANNEL,
+    )
+
+
+@pytest.mark.asyncio
+async def test_memory_backend_evicts_least_recently_used_and_expires():
+    backend = InMemoryCacheBackend(max_size=2)
+    await backend.set("a", 1, ttl=60)
+    await backend.set("b", None, ttl=60)
+    assert await backend.get("a") == (True, 1)
+    await backend.set("c", 3, ttl=60)
+
+    assert await backend.get("b") == (False, None)
+    assert await backend.get("a") == (True, 1)
+    await backend.set("a", 1, ttl=-1)
+    assert await backend.get("a") == (False, None)
+
+
+@pytest.mark.asyncio
+async def test_get_is_read_through_and_update_invalidates(
+    session_maker: sessionmaker, statements: list[str], monkeypatch
+):
+    monkeypatch.setattr(user_manager, "cache", make_cache(User))
+    user_id, _ = await create_user_and_event(session_maker, 10)
+
+    async with session_maker() as session:
+        await user_manager.get(session, user_id)
+    statements.clear()
+    async with session_maker() as session:
+        user = await user_manager.get(session, user_id)
+        assert statements == []
+        # Hits are attached to the session like any loaded row
+        await user_manager.update(session, user, UserUpdate(name="Cached Name"))
+        await session.commit()
+
+    async with session_maker() as session:
+        user = await user_manager.get(session, user_id)
+    assert user.name == "Cached Name"
+
+
+@pytest.mark.asyncio
+async def test_missing_rows_are_cached(
+    session_maker: sessionmaker, statements: list[str], monkeypatch
+):
+    monkeypatch.setattr(user_manager, "cache", make_cache(User))
+
+    async with session_maker() as session:
+        assert await user_manager.get(session, -1) is None
+        assert await user_manager.get(session, -1) is None
+    assert len(statements) == 1
+
+
+@pytest.mark.asyncio
+async def test_bookings_invalidate_the_event(session_maker: sessionmaker, monkeypatch):
+    monkeypatch.setattr(event_manager, "cache", make_cache(Event))
+    user_id, event_id = await create_user_and_event(session_maker, 10)
+    async with session_maker() as session:
+        await event_manager.get(session, event_id)
+
+    async with session_maker() as session:
+        await booking_manager.create_booking_atomic(
+            session,
+            BookingCreate(
+                event_id=event_id,
+                user_id=user_id,
+                booking_time=datetime.now(pytz.UTC),
+                quantity=3,
+                total_cost=300,
+            ),
+        )
+        # The transaction reads its own write, and does not cache it
+        assert (await event_manager.get(session, event_id)).available_tickets == 7
+        assert event_manager.cache.is_pending(session, event_id)
+        await session.commit()
+
+    async with session_maker() as session:
+        event = await event_manager.get(session, event_id)
+    assert event.available_tickets == 7
+
+
+@pytest.mark.asyncio
+async def test_invalidations_reach_other_workers_on_commit(
+    engine: AsyncEngine, session_maker: sessionmaker, monkeypatch
+):
+    _, event_id = await create_user_and_event(session_maker, 10)
+    other_worker = make_cache(Event)
+    listener = CacheInvalidationListener(
+        engine=engine,
+        backend=other_worker.backend,
+        channel=CHANNEL,
+        caches={other_worker.namespace: other_worker},
+    )
+    task = asyncio.create_task(listener.run(retry_interval=0.1))
+    await asyncio.wait_for(listener.listening.wait(), 5)
+    monkeypatch.setattr(event_manager, "cache", make_cache(Event))
+    try:
+        async with session_maker() as session:
+            await other_worker.put(event_id, await session.get(Event, event_id))
+
+        async with session_maker() as session:
+            await event_manager.release_tickets(session, event_id, 2)
+            await asyncio.sleep(0.1)
+            # Not before the commit
+            assert (await other_worker.backend.get(f"events:{event_id}"))[0]
+            await session.commit()
+
+        for _ in range(50):
+            if not (await other_worker.backend.get(f"events:{event_id}"))[0]:
+                break
+            await asyncio.sleep(0.1)
+        else:
+            pytest.fail("the invalidation was not received")
+    finally:
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
@@ -0,0 +1,74 @@
+import pytest
+from httpx import AsyncClient
+from sqlalchemy.orm import sessionmaker
+
+from event_manager.api.etag import etag_matches
+from event_manager.dal.event import event_manager
+from event_manager.tests.test_bookings import create_user_and_event
+from event_manager.tests.test_payments import book_with_pending_intent
+
+
+def test_etag_matches_uses_weak_comparison():
+    assert etag_matches('W/"abc"', '"abc"')
+    assert etag_matches('"x", W/"abc"', 'W/"abc"')
+    assert etag_matches("*", 'W/"abc"')
+    assert not etag_matches('W/"abd"', 'W/"abc"')
+    assert not etag_matches(None, 'W/"abc"')
+
+
+@pytest.mark.asyncio
+async def test_unchanged_event_is_not_modified(
+    client: AsyncClient, session_maker: sessionmaker
+):
+    _, event_id = await create_user_and_event(session_maker, 10)
+
+    response = await client.get(f"/events/{event_id}")
+    assert response.status_code == 200
+    etag = response.headers["ETag"]
+    assert response.headers["Cache-Control"] == "no-cache"
+
+    response = await client.get(f"/events/{event_id}", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["ETag"] == etag
+
+    async with session_maker() as session:
+        await event_manager.release_tickets(session, event_id, 1)
+        await session.commit()
+    response = await client.get(f"/events/{event_id}", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.json()["available_tickets"] == 11
+    assert response.headers["ETag"] != etag
+
+
+@pytest.mark.asyncio
+async def test_unchanged_event_page_is_not_modified(
+    client: AsyncClient, session_maker: sessionmaker
+):
+    await create_user_and_event(session_maker, 10)
+
+    response = await client.get("/events/?limit=5")
+    etag = response.headers["ETag"]
+    response = await client.get("/events/?limit=5", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+
+    # Another page is another representation
+    response = await client.get("/events/?limit=4", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_bookings_and_intents_are_tagged_by_status(
+    client: AsyncClient, session_maker: sessionmaker
+):
+    user_id, event_id = await create_user_and_event(session_maker, 10)
+    booking_id = await book_with_pending_intent(session_maker, event_id, user_id)
+
+    for path in [f"/bookings/{booking_id}", f"/payments/intents/{booking_id}"]:
+        response = await client.get(path)
+        assert response.status_code == 200
+        assert response.headers["Cache-Control"] == "private, no-cache"
+        response = await client.get(
+            path, headers={"If-None-Match": response.headers["ETag"]}
+        )
+        assert response.status_code == 304
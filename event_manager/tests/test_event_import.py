@@ -0,0 +1,141 @@
+import json
+
+import pytest
+from faker import Faker
+from httpx import AsyncClient
+from sqlalchemy import select
+from sqlalchemy.orm import sessionmaker
+
+from event_manager.bulk_import.importer import EventImporter, read_events
+from event_manager.models import Event
+from event_manager.schemas.event import ImportFormat
+
+base_route = "http://127.0.0.1:8080/events/import"
+
+faker = Faker()
+
+CSV_HEADER = "name,event_date,event_time,venue,location_lat,location_long,"
+CSV_HEADER += "available_tickets,base_price,surge_price\n"
+
+
+def csv_row(name: str, venue: str, price: str, tickets: int = 100) -> str:
+    return f'{name},2030-01-01,20:00:00Z,"{venue}",10.5,20.5,{tickets},{price},\n'
+
+
+async def chunked(text: str, size: int = 7):
+    data = text.encode()
+    for start in range(0, len(data), size):
+        yield data[start : start + size]
+
+
+async def import_text(
+    session_maker: sessionmaker, text: str, format: ImportFormat, chunk_size=2
+):
+    importer = EventImporter(chunk_size=chunk_size, max_errors=1)
+    async with session_maker() as session:
+        report = await importer.run(session, read_events(chunked(text), format))
+        await session.commit()
+    return report
+
+
+async def stored(session_maker: sessionmaker, name: str) -> Event:
+    async with session_maker() as session:
+        return await session.scalar(select(Event).where(Event.name == name))
+
+
+@pytest.mark.asyncio
+async def test_csv_import_inserts_and_reports_bad_rows(session_maker: sessionmaker):
+    first, second = faker.uuid4(), faker.uuid4()
+    text = (
+        CSV_HEADER
+        + csv_row(first, "Main Hall,\nFirst Floor", "25.5")
+        + csv_row(second, "Arena", "-1")
+        + "too,few,fields\n"
+        + csv_row(second, "Arena", "30")
+    )
+
+    report = await import_text(session_maker, text, ImportFormat.CSV)
+
+    assert report.rows == 4
+    assert (report.inserted, report.updated, report.failed) == (2, 0, 2)
+    assert report.errors[0].line == 4
+    assert report.errors[0].errors == ["base_price: Input should be greater than 0"]
+    assert report.errors_truncated
+    event = await stored(session_maker, first)
+    assert event.venue == "Main Hall,\nFirst Floor"
+    assert (event.base_price, event.surge_price, event.available_tickets) == (
+        25.5,
+        0,
+        100,
+    )
+
+
+@pytest.mark.asyncio
+async def test_import_updates_existing_events(session_maker: sessionmaker):
+    name = faker.uuid4()
+    await import_text(
+        session_maker, CSV_HEADER + csv_row(name, "Arena", "30"), ImportFormat.CSV
+    )
+    created = await stored(session_maker, name)
+
+    # The last line for a name and location wins, tickets are left alone
+    text = (
+        CSV_HEADER
+        + csv_row(name, "Arena", "40", tickets=5)
+        + csv_row(name, "Arena", "50", tickets=5)
+    )
+    report = await import_text(session_maker, text, ImportFormat.CSV)
+
+    assert (report.inserted, report.updated, report.unchanged) == (0, 1, 1)
+    event = await stored(session_maker, name)
+    assert event.id == created.id
+    assert (event.base_price, event.available_tickets) == (50, 100)
+    assert event.version == created.version + 1
+
+    report = await import_text(
+        session_maker, CSV_HEADER + csv_row(name, "Arena", "50"), ImportFormat.CSV
+    )
+    assert (report.updated, report.unchanged) == (0, 1)
+
+
+@pytest.mark.asyncio
+async def test_ndjson_import(session_maker: sessionmaker):
+    name = faker.uuid4()
+    event = {
+        "name": name,
+        "event_date": "2030-01-01",
+        "event_time": "20:00:00Z",
+        "venue": "Arena",
+        "location_lat": 10.5,
+        "location_long": 20.5,
+        "available_tickets": 100,
+        "base_price": 30,
+    }
+    text = json.dumps(event) + "\n\n" + '{"name": "broken"\n'
+
+    report = await import_text(session_maker, text, ImportFormat.NDJSON)
+
+    assert (report.rows, report.inserted, report.failed) == (2, 1, 1)
+    assert report.errors[0].line == 3
+    assert (await stored(session_maker, name)).base_price == 30
+
+
+@pytest.mark.asyncio
+async def test_import_endpoint(client: AsyncClient):
+    name = faker.uuid4()
+    response = await client.post(
+        base_route,
+        content=CSV_HEADER + csv_row(name, "Arena", "30"),
+        headers={"Content-Type": "text/csv"},
+    )
+    assert response.status_code == 200
+    assert response.json()["inserted"] == 1
+
+    response = await client.post(
+        base_route, content=b"{}", headers={"Content-Type": "application/json"}
+    )
+    assert response.status_code == 400
+
+    response = await client.post(f"{base_route}?format=ndjson", content=b"{}\n")
+    assert response.status_code == 200
+    assert response.json()["failed"] == 1
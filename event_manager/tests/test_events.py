@@ -1,7 +1,14 @@
+from datetime import date, time
+
 import pytest
+import pytz
 from faker import Faker
 from httpx import AsyncClient
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
+
+from event_manager.dal.pagination import NEXT_CURSOR_HEADER
+from event_manager.models import Event
 
 base_route = "http://127.0.0.1:8080/events/"
 
@@ -112,3 +119,57 @@ async def test_delete_event(client: AsyncClient):
     event_id = data["id"]
     response = await client.delete(f"{base_route}{event_id}")
     assert response.status_code == 200
+
+
+async def create_named_events(
+    session_maker: sessionmaker, name: str, count: int
+) -> list[int]:
+    async with session_maker() as session:
+        events = [
+            Event(
+                name=name,
+                event_date=date(2024, 6, 30),
+                event_time=time(11, 15, tzinfo=pytz.UTC),
+                venue=faker.address(),
+                location_lat=-89,
+                location_long=-179 + index,
+                available_tickets=10,
+                base_price=100,
+                surge_price=0,
+                surge_threshold=0,
+                version=0,
+            )
+            for index in range(count)
+        ]
+        session.add_all(events)
+        await session.commit()
+        return [event.id for event in events]
+
+
+@pytest.mark.asyncio
+async def test_search_events_cursor_pagination(
+    client: AsyncClient, session_maker: sessionmaker
+):
+    # Same name on every event: the id tie-breaker keeps the pages stable
+    name = faker.uuid4()
+    event_ids = await create_named_events(session_maker, name, 5)
+
+    seen, cursor = [], None
+    for _ in range(3):
+        params = {"name": name, "limit": 2}
+        if cursor:
+            params["cursor"] = cursor
+        response = await client.get(f"{base_route}search/", params=params)
+        assert response.status_code == 200
+        seen.extend(event["id"] for event in response.json())
+        cursor = response.headers.get(NEXT_CURSOR_HEADER)
+
+    assert seen == sorted(event_ids)
+    assert cursor is None
+
+
+@pytest.mark.asyncio
+async def test_get_all_events_with_invalid_cursor(client: AsyncClient):
+    response = await client.get(base_route, params={"cursor": "not-a-cursor"})
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Invalid pagination cursor"
@@ -0,0 +1,116 @@
+import csv
+import io
+import json
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+import pytz
+from httpx import AsyncClient
+from sqlalchemy.orm import sessionmaker
+
+from event_manager.core.database import get_read_session_factory
+from event_manager.dal.booking import booking_manager
+from event_manager.main import app
+from event_manager.models import Payment
+from event_manager.models.payment import PaymentStatus
+from event_manager.tests.test_bookings import create_user_and_event
+from event_manager.tests.test_payments import book_with_pending_intent
+
+
+@pytest.fixture
+def export_client(client: AsyncClient, session_maker: sessionmaker):
+    app.dependency_overrides[get_read_session_factory] = lambda: session_maker
+    yield client
+    del app.dependency_overrides[get_read_session_factory]
+
+
+async def pay(session_maker: sessionmaker, booking_id: int) -> None:
+    async with session_maker() as session:
+        session.add(
+            Payment(
+                booking_id=booking_id,
+                amount=200,
+                status=PaymentStatus.COMPLETED,
+                transaction_id=str(uuid.uuid4()),
+                idempotency_key=str(uuid.uuid4()),
+            )
+        )
+        await session.commit()
+
+
+@pytest.mark.asyncio
+async def test_stream_reads_every_row_in_batches(session_maker: sessionmaker):
+    user_id, event_id = await create_user_and_event(session_maker, 10)
+    booking_ids = [
+        await book_with_pending_intent(session_maker, event_id, user_id)
+        for _ in range(5)
+    ]
+
+    async with session_maker() as session:
+        batches = [
+            batch
+            async for batch in booking_manager.stream(
+                session,
+                ["id", "event_id"],
+                booking_manager.export_filter(event_id),
+                batch_size=2,
+            )
+        ]
+
+    assert [len(batch) for batch in batches] == [2, 2, 1]
+    assert [row.id for batch in batches for row in batch] == booking_ids
+
+
+@pytest.mark.asyncio
+async def test_export_bookings(export_client: AsyncClient, session_maker: sessionmaker):
+    user_id, event_id = await create_user_and_event(session_maker, 10)
+    booking_ids = [
+        await book_with_pending_intent(session_maker, event_id, user_id)
+        for _ in range(3)
+    ]
+
+    response = await export_client.get(f"/bookings/export?event_id={event_id}")
+    assert response.status_code == 200
+    assert response.headers["Content-Type"].startswith("text/csv")
+    assert 'filename="bookings.csv"' in response.headers["Content-Disposition"]
+    records = list(csv.DictReader(io.StringIO(response.text)))
+    assert [int(record["id"]) for record in records] == booking_ids
+    assert records[0]["status"] == "HELD"
+    assert records[0]["quantity"] == "2"
+
+    response = await export_client.get(
+        "/bookings/export",
+        params={"event_id": event_id, "format": "ndjson"},
+    )
+    assert response.headers["Content-Type"] == "application/x-ndjson"
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert [line["id"] for line in lines] == booking_ids
+
+    until = (datetime.now(pytz.UTC) - timedelta(days=1)).isoformat()
+    response = await export_client.get(
+        "/bookings/export", params={"event_id": event_id, "until": until}
+    )
+    assert response.text.splitlines()[1:] == []
+
+
+@pytest.mark.asyncio
+async def test_export_payments_of_an_event(
+    export_client: AsyncClient, session_maker: sessionmaker
+):
+    user_id, event_id = await create_user_and_event(session_maker, 10)
+    _, other_event_id = await create_user_and_event(session_maker, 10)
+    booking_id = await book_with_pending_intent(session_maker, event_id, user_id)
+    other_booking_id = await book_with_pending_intent(
+        session_maker, other_event_id, user_id
+    )
+    await pay(session_maker, booking_id)
+    await pay(session_maker, other_booking_id)
+
+    response = await export_client.get(
+        "/payments/export", params={"event_id": event_id, "format": "ndjson"}
+    )
+    assert response.status_code == 200
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert [line["booking_id"] for line in lines] == [booking_id]
+    assert lines[0]["status"] == "COMPLETED"
@@ -0,0 +1,120 @@
+import math
+from datetime import date, time
+
+import pytest
+import pytz
+from faker import Faker
+from httpx import AsyncClient
+from sqlalchemy.orm import sessionmaker
+
+from event_manager.dal.pagination import NEXT_CURSOR_HEADER
+from event_manager.models.event import Event
+from event_manager.search.geo import EARTH_RADIUS_KM, rank_by_distance
+
+faker = Faker()
+
+# Roughly 1.11 km per 0.01 degree of latitude
+ORIGIN = (48.8566, 2.3522)
+
+
+async def create_events(
+    session_maker: sessionmaker, name: str, points: list[tuple[float, float]]
+) -> list[int]:
+    async with session_maker() as session:
+        events = [
+            Event(
+                name=name,
+                event_date=date(2024, 6, 30),
+                event_time=time(11, 15, tzinfo=pytz.UTC),
+                venue=faker.address(),
+                location_lat=lat,
+                location_long=long,
+                available_tickets=100,
+                base_price=100,
+                surge_price=0,
+                surge_threshold=0,
+                version=0,
+            )
+            for lat, long in points
+        ]
+        session.add_all(events)
+        await session.commit()
+        return [event.id for event in events]
+
+
+def haversine(lat1: float, long1: float, lat2: float, long2: float) -> float:
+    d_lat, d_long = math.radians(lat2 - lat1), math.radians(long2 - long1)
+    a = (
+        math.sin(d_lat / 2) ** 2
+        + math.cos(math.radians(lat1))
+        * math.cos(math.radians(lat2))
+        * math.sin(d_long / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(a))
+
+
+def test_rank_by_distance_matches_scalar_haversine():
+    candidates = [
+        (index, float(faker.latitude()), float(faker.longitude()))
+        for index in range(200)
+    ]
+    ranked = rank_by_distance(*ORIGIN, 5000, candidates)
+
+    expected = sorted(
+        (haversine(*ORIGIN, lat, long), index)
+        for index, lat, long in candidates
+        if haversine(*ORIGIN, lat, long) <= 5000
+    )
+    assert [event_id for _, event_id in ranked] == [
+        event_id for _, event_id in expected
+    ]
+    for (distance, _), (expected_distance, _) in zip(ranked, expected):
+        assert distance == pytest.approx(expected_distance)
+
+
+@pytest.mark.asyncio
+async def test_search_near_orders_by_distance_and_paginates(
+    client: AsyncClient, session_maker: sessionmaker
+):
+    name = faker.uuid4()
+    lat, long = ORIGIN
+    far, nearest, middle = await create_events(
+        session_maker, name, [(lat + 0.2, long), (lat + 0.01, long), (lat, long + 0.05)]
+    )
+
+    response = await client.get(
+        f"/events/search/?name={name}&near={lat},{long},10&limit=1"
+    )
+    assert response.status_code == 200
+    assert [event["id"] for event in response.json()] == [nearest]
+
+    cursor = response.headers[NEXT_CURSOR_HEADER]
+    response = await client.get(
+        f"/events/search/?name={name}&near={lat},{long},10&limit=1&cursor={cursor}"
+    )
+    assert response.status_code == 200
+    assert [event["id"] for event in response.json()] == [middle]
+    # The event 22 km away is outside the radius
+    assert NEXT_CURSOR_HEADER not in response.headers
+
+
+@pytest.mark.asyncio
+async def test_search_within_bounding_box(
+    client: AsyncClient, session_maker: sessionmaker
+):
+    name = faker.uuid4()
+    inside, _ = await create_events(session_maker, name, [(10.5, 179.5), (10.5, 170)])
+
+    # Crosses the antimeridian
+    response = await client.get(f"/events/search/?name={name}&bbox=10,179,11,-179")
+    assert response.status_code == 200
+    assert [event["id"] for event in response.json()] == [inside]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "query", ["near=1,2", "near=1,2,0", "near=91,0,5", "bbox=a,b,c,d", "bbox=5,0,1,1"]
+)
+async def test_search_rejects_invalid_locations(client: AsyncClient, query: str):
+    response = await client.get(f"/events/search/?{query}")
+    assert response.status_code == 400
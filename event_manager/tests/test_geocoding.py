@@ -0,0 +1,159 @@
+import asyncio
+from datetime import date, time
+
+import pytest
+import pytz
+from faker import Faker
+from httpx import AsyncClient
+from sqlalchemy.orm import sessionmaker
+
+from event_manager.dal.event import event_manager
+from event_manager.geocoding import get_geocoder
+from event_manager.geocoding.abstract_geocoder import Coordinates, Geocoder
+from event_manager.geocoding.cached_geocoder import CachedGeocoder
+from event_manager.geocoding.static_geocoder import StaticGeocoder
+from event_manager.main import app
+from event_manager.models.event import Event
+from event_manager.schemas.event import EventUpdate
+
+faker = Faker()
+
+
+class SlowGeocoder(Geocoder):
+    def __init__(self):
+        self.calls = 0
+
+    async def geocode(self, address: str) -> Coordinates | None:
+        self.calls += 1
+        await asyncio.sleep(0.01)
+        return 1.0, 2.0
+
+
+async def create_event(session_maker: sessionmaker, venue: str) -> int:
+    async with session_maker() as session:
+        event = Event(
+            name=faker.name(),
+            event_date=date(2024, 6, 30),
+            event_time=time(11, 15, tzinfo=pytz.UTC),
+            venue=venue,
+            location_lat=10.0,
+            location_long=20.0,
+            available_tickets=100,
+            base_price=100,
+            surge_price=0,
+            surge_threshold=0,
+            version=0,
+        )
+        session.add(event)
+        await session.commit()
+        return event.id
+
+
+async def get_map(client: AsyncClient, event_id: int, geocoder: Geocoder) -> str:
+    app.dependency_overrides[get_geocoder] = lambda: geocoder
+    try:
+        response = await client.get(f"/events/events/{event_id}/map")
+    finally:
+        del app.dependency_overrides[get_geocoder]
+    assert response.status_code == 200
+    return response.json()
+
+
+@pytest.mark.asyncio
+async def test_cached_geocoder_normalizes_addresses():
+    static = StaticGeocoder({"Town Hall, Springfield": (1.0, 2.0)})
+    geocoder = CachedGeocoder(static, max_size=10, ttl=60)
+
+    assert await geocoder.geocode("Town Hall, Springfield") == (1.0, 2.0)
+    assert await geocoder.geocode("  town hall springfield ") == (1.0, 2.0)
+    assert await geocoder.geocode("Nowhere") is None
+    assert await geocoder.geocode("nowhere") is None
+    assert len(static.lookups) == 2
+
+
+@pytest.mark.asyncio
+async def test_cached_geocoder_evicts_and_expires():
+    static = StaticGeocoder()
+    geocoder = CachedGeocoder(static, max_size=2, ttl=60)
+    for address in ["a", "b", "a", "c", "a", "b"]:
+        await geocoder.geocode(address)
+    # "b" was the least recently used entry when "c" came in
+    assert static.lookups == ["a", "b", "c", "b"]
+
+    geocoder.ttl = 0
+    await geocoder.geocode("d")
+    await geocoder.geocode("d")
+    assert static.lookups[-2:] == ["d", "d"]
+
+
+@pytest.mark.asyncio
+async def test_cached_geocoder_shares_concurrent_lookups():
+    slow = SlowGeocoder()
+    geocoder = CachedGeocoder(slow, max_size=10, ttl=60)
+
+    results = await asyncio.gather(*(geocoder.geocode("Arena") for _ in range(10)))
+    assert results == [(1.0, 2.0)] * 10
+    assert slow.calls == 1
+
+
+@pytest.mark.asyncio
+async def test_cached_geocoder_survives_a_cancelled_lookup():
+    slow = SlowGeocoder()
+    geocoder = CachedGeocoder(slow, max_size=10, ttl=60)
+
+    owner = asyncio.create_task(geocoder.geocode("Arena"))
+    await asyncio.sleep(0)
+    waiter = asyncio.create_task(geocoder.geocode("Arena"))
+    await asyncio.sleep(0)
+    owner.cancel()
+    # The waiter looks the address up itself rather than hang or be cancelled
+    assert await asyncio.wait_for(waiter, 1) == (1.0, 2.0)
+    assert owner.cancelled()
+    assert slow.calls == 2
+
+
+@pytest.mark.asyncio
+async def test_map_uses_geocoded_venue(
+    client: AsyncClient, session_maker: sessionmaker
+):
+    venue = faker.address()
+    event_id = await create_event(session_maker, venue)
+
+    assert await get_map(client, event_id, StaticGeocoder({venue: (51.5, -0.12)})) == (
+        "https://www.google.com/maps/search/?api=1&query=51.5,-0.12"
+    )
+    # Unknown venues fall back to the event's own coordinates
+    assert await get_map(client, event_id, StaticGeocoder()) == (
+        "https://www.google.com/maps/search/?api=1&query=10.0,20.0"
+    )
+
+
+@pytest.mark.asyncio
+async def test_geocoded_venue_is_persisted(session_maker: sessionmaker):
+    venue = faker.address()
+    event_id = await create_event(session_maker, venue)
+    expected = "https://www.google.com/maps/search/?api=1&query=51.5,-0.12"
+
+    async with session_maker() as session:
+        geocoder = StaticGeocoder({venue: (51.5, -0.12)})
+        assert (
+            await event_manager.get_event_location_map(event_id, session, geocoder)
+            == expected
+        )
+        await session.commit()
+
+    empty = StaticGeocoder()
+    async with session_maker() as session:
+        assert (
+            await event_manager.get_event_location_map(event_id, session, empty)
+            == expected
+        )
+        assert empty.lookups == []
+
+        event = await event_manager.get(session, event_id)
+        await event_manager.update(session, event, EventUpdate(venue="Elsewhere"))
+        await session.commit()
+
+    async with session_maker() as session:
+        await event_manager.get_event_location_map(event_id, session, empty)
+        assert empty.lookups == ["Elsewhere"]
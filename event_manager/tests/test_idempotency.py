@@ -0,0 +1,255 @@
+import asyncio
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+import pytz
+from httpx import AsyncClient
+from sqlalchemy import select, update
+from sqlalchemy.orm import sessionmaker
+
+from event_manager.core.database import with_session
+
+from event_manager.errors.all_errors import (
+    IdempotencyKeyReused,
+    IdempotentRequestInProgress,
+)
+from event_manager.idempotency import get_idempotency_store
+from event_manager.idempotency.store import IdempotencyStore, StoredResponse
+from event_manager.inventory import get_inventory_engine
+from event_manager.inventory.sharded_inventory import InventoryEngine
+from event_manager.main import app
+from event_manager.models.idempotency_key import IdempotencyKey
+from event_manager.tests.test_bookings import create_user_and_event
+
+
+def make_store(session_maker: sessionmaker, **kwargs) -> IdempotencyStore:
+    options = dict(
+        max_size=100,
+        lock_timeout=60.0,
+        wait_timeout=2.0,
+        retention=3600.0,
+        prune_batch_size=1,
+    )
+    options.update(kwargs)
+    return IdempotencyStore(session_factory=session_maker, **options)
+
+
+async def complete(
+    session_maker: sessionmaker,
+    store: IdempotencyStore,
+    key: str,
+    fingerprint: str,
+    response: StoredResponse,
+) -> None:
+    async with session_maker() as session:
+        await store.save(session, key, response)
+        await session.commit()
+    store.finish(key, fingerprint, response)
+
+
+@pytest.mark.asyncio
+async def test_replay_returns_the_stored_response(session_maker: sessionmaker):
+    store, key = make_store(session_maker), str(uuid.uuid4())
+    response = StoredResponse(status_code=200, body={"booking_id": 1})
+
+    assert await store.begin(key, "fingerprint") is None
+    await complete(session_maker, store, key, "fingerprint", response)
+
+    assert await store.begin(key, "fingerprint") == response
+    # Another worker without the response in memory reads it from the table
+    assert await make_store(session_maker).begin(key, "fingerprint") == response
+    with pytest.raises(IdempotencyKeyReused):
+        await store.begin(key, "other request")
+
+
+@pytest.mark.asyncio
+async def test_concurrent_duplicates_wait_for_the_first(
+    session_maker: sessionmaker,
+):
+    store, key = make_store(session_maker), str(uuid.uuid4())
+    other_worker = make_store(session_maker)
+    response = StoredResponse(status_code=200, body={"booking_id": 2})
+    assert await store.begin(key, "fingerprint") is None
+
+    waiting = [
+        asyncio.create_task(store.begin(key, "fingerprint")),
+        asyncio.create_task(other_worker.begin(key, "fingerprint")),
+    ]
+    await asyncio.sleep(0.1)
+    assert not any(task.done() for task in waiting)
+
+    await complete(session_maker, store, key, "fingerprint", response)
+    assert await asyncio.gather(*waiting) == [response, response]
+
+
+@pytest.mark.asyncio
+async def test_released_and_abandoned_keys_can_be_retried(
+    session_maker: sessionmaker,
+):
+    store, key = make_store(session_maker, wait_timeout=0.1), str(uuid.uuid4())
+    assert await store.begin(key, "fingerprint") is None
+    with pytest.raises(IdempotentRequestInProgress):
+        await store.begin(key, "fingerprint")
+
+    await store.release(key)
+    assert await store.begin(key, "fingerprint") is None
+
+    # The owner died without releasing: taken over after the lock timeout
+    assert (
+        await make_store(session_maker, lock_timeout=0).begin(key, "fingerprint")
+        is None
+    )
+
+
+@pytest.mark.asyncio
+async def test_finished_keys_are_pruned_after_retention(
+    session_maker: sessionmaker,
+):
+    store = make_store(session_maker)
+    old, recent, running = (str(uuid.uuid4()) for _ in range(3))
+    response = StoredResponse(status_code=200, body={"booking_id": 3})
+    for key in (old, recent, running):
+        assert await store.begin(key, "fingerprint") is None
+    for key in (old, recent):
+        await complete(session_maker, store, key, "fingerprint", response)
+    async with session_maker() as session:
+        await session.execute(
+            update(IdempotencyKey)
+            .where(IdempotencyKey.key.in_([old, running]))
+            .values(created_at=datetime.now(pytz.UTC) - timedelta(days=2))
+        )
+        await session.commit()
+
+    assert await store.prune() >= 1
+
+    async with session_maker() as session:
+        kept = await session.scalars(
+            select(IdempotencyKey.key).where(
+                IdempotencyKey.key.in_([old, recent, running])
+            )
+        )
+        assert set(kept) == {recent, running}
+
+
+def booking_request(user_id: int, event_id: int, quantity: int = 2) -> dict:
+    return {
+        "event_id": event_id,
+        "user_id": user_id,
+        "booking_time": datetime.now(pytz.UTC).isoformat(),
+        "quantity": quantity,
+        "total_cost": 100 * quantity,
+    }
+
+
+@pytest.mark.asyncio
+async def test_failed_commit_gives_the_key_up(
+    client: AsyncClient, session_maker: sessionmaker
+):
+    user_id, event_id = await create_user_and_event(session_maker, 10)
+    store = make_store(session_maker)
+    key = str(uuid.uuid4())
+
+    async def failing_commit_session():
+        async with session_maker() as session:
+
+            async def commit():
+                raise ConnectionError("connection lost")
+
+            session.commit = commit
+            yield session
+
+    inventory_engine = InventoryEngine(session_factory=session_maker, shard_capacity=5)
+    client_session = app.dependency_overrides[with_session]
+    app.dependency_overrides[get_idempotency_store] = lambda: store
+    app.dependency_overrides[get_inventory_engine] = lambda: inventory_engine
+    app.dependency_overrides[with_session] = failing_commit_session
+    try:
+        response = await client.post(
+            "/payments/book_and_pay?strategy=ATOMIC",
+            json=booking_request(user_id, event_id),
+            headers={"Idempotency-Key": key},
+        )
+    finally:
+        del app.dependency_overrides[get_idempotency_store]
+        del app.dependency_overrides[get_inventory_engine]
+        app.dependency_overrides[with_session] = client_session
+
+    assert response.status_code == 500
+    assert key not in store._in_flight
+    # A retry runs the request again
+    assert await make_store(session_maker).begin(key, "fingerprint") is None
+
+
+@pytest.mark.asyncio
+async def test_cancelled_request_gives_the_key_up(
+    client: AsyncClient, session_maker: sessionmaker
+):
+    user_id, event_id = await create_user_and_event(session_maker, 10)
+    store = make_store(session_maker)
+    key = str(uuid.uuid4())
+
+    async def cancelled_commit_session():
+        async with session_maker() as session:
+
+            async def commit():
+                raise asyncio.CancelledError
+
+            session.commit = commit
+            yield session
+
+    inventory_engine = InventoryEngine(session_factory=session_maker, shard_capacity=5)
+    client_session = app.dependency_overrides[with_session]
+    app.dependency_overrides[get_idempotency_store] = lambda: store
+    app.dependency_overrides[get_inventory_engine] = lambda: inventory_engine
+    app.dependency_overrides[with_session] = cancelled_commit_session
+    try:
+        with pytest.raises(asyncio.CancelledError):
+            await client.post(
+                "/payments/book_and_pay?strategy=ATOMIC",
+                json=booking_request(user_id, event_id),
+                headers={"Idempotency-Key": key},
+            )
+    finally:
+        del app.dependency_overrides[get_idempotency_store]
+        del app.dependency_overrides[get_inventory_engine]
+        app.dependency_overrides[with_session] = client_session
+
+    assert key not in store._in_flight
+    assert await make_store(session_maker).begin(key, "fingerprint") is None
+
+
+@pytest.mark.asyncio
+async def test_book_and_pay_replays_by_idempotency_key(
+    client: AsyncClient, session_maker: sessionmaker
+):
+    user_id, event_id = await create_user_and_event(session_maker, 10)
+    store = make_store(session_maker)
+    inventory_engine = InventoryEngine(session_factory=session_maker, shard_capacity=5)
+    app.dependency_overrides[get_idempotency_store] = lambda: store
+    app.dependency_overrides[get_inventory_engine] = lambda: inventory_engine
+    booking = booking_request(user_id, event_id)
+    headers = {"Idempotency-Key": str(uuid.uuid4())}
+    try:
+        first = await client.post(
+            "/payments/book_and_pay?strategy=ATOMIC", json=booking, headers=headers
+        )
+        retry = await client.post(
+            "/payments/book_and_pay?strategy=ATOMIC", json=booking, headers=headers
+        )
+        other = await client.post(
+            "/payments/book_and_pay?strategy=ATOMIC",
+            json={**booking, "quantity": 3},
+            headers=headers,
+        )
+        unkeyed = await client.post(
+            "/payments/book_and_pay?strategy=ATOMIC", json=booking
+        )
+    finally:
+        del app.dependency_overrides[get_idempotency_store]
+        del app.dependency_overrides[get_inventory_engine]
+
+    assert first.status_code == retry.status_code == 200
+    assert retry.json() == first.json()
+    assert other.status_code == 422
+    assert unkeyed.json()["booking_id"] != first.json()["booking_id"]
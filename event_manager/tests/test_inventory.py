@@ -0,0 +1,247 @@
+import asyncio
+from datetime import date, datetime, time, timedelta
+
+import pytest
+import pytz
+from faker import Faker
+from sqlalchemy import update
+from sqlalchemy.orm import sessionmaker
+
+from event_manager.dal.event import event_manager
+from event_manager.errors.all_errors import InsufficientTickets
+from event_manager.inventory.sharded_inventory import InventoryEngine, ShardedInventory
+from event_manager.keycloak.permission_definitions import Roles
+from event_manager.models.booking import Booking
+from event_manager.models.event import Event
+from event_manager.models.inventory_allotment import InventoryAllotment
+from event_manager.models.user import User
+
+faker = Faker()
+
+
+async def create_event(
+    session_maker: sessionmaker, available_tickets: int, inventory_shards: int
+) -> int:
+    async with session_maker() as session:
+        event = Event(
+            name=faker.name(),
+            event_date=date(2024, 6, 30),
+            event_time=time(11, 15, tzinfo=pytz.UTC),
+            venue=faker.address(),
+            location_lat=float(faker.latitude()),
+            location_long=float(faker.longitude()),
+            available_tickets=available_tickets,
+            base_price=100,
+            surge_price=0,
+            surge_threshold=0,
+            version=0,
+            inventory_shards=inventory_shards,
+        )
+        session.add(event)
+        await session.commit()
+        return event.id
+
+
+async def book_from_allotment(
+    session_maker: sessionmaker, event_id: int, allotment_id: int, quantity: int
+) -> None:
+    async with session_maker() as session:
+        user = User(
+            name=faker.name(),
+            email=faker.email(),
+            country_code=faker.country_code(),
+            phone_number=faker.numerify("##########"),
+            role=Roles.USER,
+            username=faker.user_name(),
+        )
+        session.add(user)
+        await session.flush()
+        session.add(
+            Booking(
+                event_id=event_id,
+                user_id=user.id,
+                booking_time=datetime.now(pytz.UTC),
+                quantity=quantity,
+                total_cost=100 * quantity,
+                allotment_id=allotment_id,
+            )
+        )
+        await session.commit()
+
+
+async def get_available_tickets(session_maker: sessionmaker, event_id: int) -> int:
+    async with session_maker() as session:
+        event = await session.get(Event, event_id)
+        return event.available_tickets
+
+
+def test_sharded_inventory_distributes_evenly():
+    inventory = ShardedInventory(event_id=1, shard_count=4)
+    inventory.distribute(10)
+    assert [shard.available for shard in inventory.shards] == [3, 3, 2, 2]
+    assert inventory.available == 10
+
+
+def test_sharded_inventory_reserves_across_shards():
+    inventory = ShardedInventory(event_id=1, shard_count=4)
+    inventory.distribute(10)
+
+    assert inventory.reserve(7)
+    assert inventory.available == 3
+    assert not inventory.reserve(4)
+    assert inventory.reserve(3)
+    assert inventory.available == 0
+
+
+def test_sharded_inventory_release_and_drain():
+    inventory = ShardedInventory(event_id=1, shard_count=2)
+    inventory.distribute(4)
+    assert inventory.reserve(3)
+    inventory.release(2)
+    assert inventory.drain() == 3
+    assert inventory.available == 0
+
+
+@pytest.mark.asyncio
+async def test_engine_ignores_unsharded_events(session_maker: sessionmaker):
+    event_id = await create_event(
+        session_maker, available_tickets=10, inventory_shards=0
+    )
+    engine = InventoryEngine(session_factory=session_maker, shard_capacity=5)
+
+    assert await engine.reserve(event_id, 2) is None
+    assert await get_available_tickets(session_maker, event_id) == 10
+    assert engine.get_inventory(event_id) is None
+
+
+@pytest.mark.asyncio
+async def test_engine_rechecks_unsharded_events(session_maker: sessionmaker):
+    event_id = await create_event(
+        session_maker, available_tickets=10, inventory_shards=0
+    )
+    engine = InventoryEngine(
+        session_factory=session_maker, shard_capacity=5, unsharded_ttl=3600
+    )
+    assert await engine.reserve(event_id, 1) is None
+
+    async with session_maker() as session:
+        (await session.get(Event, event_id)).inventory_shards = 2
+        await session.commit()
+    # Only events with an inventory are refreshed
+    await engine.reconcile()
+    assert await engine.reserve(event_id, 1) is None
+
+    engine.unsharded_ttl = 0
+    assert await engine.reserve(event_id, 1) is not None
+
+
+@pytest.mark.asyncio
+async def test_engine_claims_and_returns_allotment(session_maker: sessionmaker):
+    event_id = await create_event(
+        session_maker, available_tickets=30, inventory_shards=2
+    )
+    engine = InventoryEngine(session_factory=session_maker, shard_capacity=5)
+
+    allotment_id = await engine.reserve(event_id, 3)
+    assert allotment_id is not None
+    await book_from_allotment(session_maker, event_id, allotment_id, 2)
+    # One allotment of shard_count * shard_capacity left the event row
+    assert await get_available_tickets(session_maker, event_id) == 20
+    assert engine.get_inventory(event_id).available == 7
+
+    # The third ticket never became a booking
+    await engine.release(event_id, 1, allotment_id)
+    assert engine.get_inventory(event_id).available == 8
+    await engine.release_all()
+    assert await get_available_tickets(session_maker, event_id) == 28
+
+
+@pytest.mark.asyncio
+async def test_engine_never_oversells(session_maker: sessionmaker):
+    event_id = await create_event(
+        session_maker, available_tickets=12, inventory_shards=3
+    )
+    engine = InventoryEngine(session_factory=session_maker, shard_capacity=2)
+
+    for _ in range(6):
+        assert await engine.reserve(event_id, 2) is not None
+    with pytest.raises(InsufficientTickets):
+        await engine.reserve(event_id, 1)
+    assert await get_available_tickets(session_maker, event_id) == 0
+
+
+@pytest.mark.asyncio
+async def test_tickets_claimed_for_a_dropped_inventory_go_back(
+    session_maker: sessionmaker, monkeypatch: pytest.MonkeyPatch
+):
+    event_id = await create_event(
+        session_maker, available_tickets=30, inventory_shards=2
+    )
+    engine = InventoryEngine(session_factory=session_maker, shard_capacity=5)
+    assert await engine.reserve(event_id, 10) is not None
+    claim_tickets = event_manager.claim_tickets
+    refreshes = []
+
+    async def opt_out_then_claim(db, event_id, quantity):
+        # The event opts out while the top-up is on its way
+        async with session_maker() as session:
+            (await session.get(Event, event_id)).inventory_shards = 0
+            await session.commit()
+        refreshes.append(asyncio.create_task(engine.refresh_configuration([event_id])))
+        return await claim_tickets(db, event_id, quantity)
+
+    monkeypatch.setattr(event_manager, "claim_tickets", opt_out_then_claim)
+    # The refresh waits for the top-up, so the sale comes from a live allotment
+    assert await engine.reserve(event_id, 1) is not None
+    await asyncio.gather(*refreshes)
+    assert engine.get_inventory(event_id) is None
+    # Nothing was booked, so closing the allotment credited all of it
+    assert await get_available_tickets(session_maker, event_id) == 30
+
+
+@pytest.mark.asyncio
+async def test_allotment_of_a_dead_worker_is_reclaimed(session_maker: sessionmaker):
+    event_id = await create_event(
+        session_maker, available_tickets=30, inventory_shards=2
+    )
+    dead = InventoryEngine(session_factory=session_maker, shard_capacity=5)
+    allotment_id = await dead.reserve(event_id, 3)
+    await book_from_allotment(session_maker, event_id, allotment_id, 3)
+    async with session_maker() as session:
+        await session.execute(
+            update(InventoryAllotment)
+            .where(InventoryAllotment.id == allotment_id)
+            .values(heartbeat_at=datetime.now(pytz.UTC) - timedelta(minutes=5))
+        )
+        await session.commit()
+
+    engine = InventoryEngine(session_factory=session_maker, shard_capacity=5)
+    await engine.reconcile()
+    # Everything but the booked tickets went back to the event row
+    assert await get_available_tickets(session_maker, event_id) == 27
+    async with session_maker() as session:
+        assert await session.get(InventoryAllotment, allotment_id) is None
+
+    # A worker that was only stalled finds out on its next heartbeat
+    await dead.reconcile()
+    assert dead.get_inventory(event_id) is None
+    await dead.release(event_id, 1, allotment_id)
+    assert await get_available_tickets(session_maker, event_id) == 27
+
+
+@pytest.mark.asyncio
+async def test_idle_allotment_is_handed_back(session_maker: sessionmaker):
+    event_id = await create_event(
+        session_maker, available_tickets=30, inventory_shards=2
+    )
+    engine = InventoryEngine(
+        session_factory=session_maker, shard_capacity=5, idle_ttl=3600
+    )
+    assert await engine.reserve(event_id, 1) is not None
+    await engine.reconcile()
+    assert engine.get_inventory(event_id) is not None
+
+    engine.idle_ttl = 0
+    await engine.reconcile()
+    assert engine.get_inventory(event_id) is None
+    assert await get_available_tickets(session_maker, event_id) == 30
@@ -0,0 +1,139 @@
+import time
+from typing import Any
+
+import jwt
+import pytest
+from cryptography.hazmat.primitives.asymmetric import rsa
+from jwt.algorithms import RSAAlgorithm
+
+from event_manager.core.config import settings
+from event_manager.keycloak.exceptions import (
+    TokenDecodingException,
+    TokenExpiredException,
+)
+from event_manager.keycloak.jwks import JWKSCache, VerifiedTokenCache
+from event_manager.keycloak.utils import validate_and_parse_token
+
+
+class LocalJWKS:
+    """Stands in for the realm's certs endpoint."""
+
+    def __init__(self):
+        self.private_keys: dict[str, rsa.RSAPrivateKey] = {}
+        self.fetches = 0
+
+    def rotate(self, kid: str, keep: bool = True) -> None:
+        if not keep:
+            self.private_keys.clear()
+        self.private_keys[kid] = rsa.generate_private_key(
+            public_exponent=65537, key_size=2048
+        )
+
+    async def fetch(self) -> dict[str, Any]:
+        self.fetches += 1
+        keys = []
+        for kid, private_key in self.private_keys.items():
+            jwk = RSAAlgorithm.to_jwk(private_key.public_key(), as_dict=True)
+            keys.append({**jwk, "kid": kid, "use": "sig", "alg": "RS256"})
+        return {"keys": keys}
+
+    def sign(self, kid: str, **claims: Any) -> str:
+        payload = {
+            "aud": settings.KEYCLOAK_CLIENT_ID,
+            "exp": int(time.time()) + 300,
+            "realm_access": {"roles": ["user"]},
+            **claims,
+        }
+        return jwt.encode(
+            payload, self.private_keys[kid], algorithm="RS256", headers={"kid": kid}
+        )
+
+
+@pytest.fixture
+def realm() -> LocalJWKS:
+    realm = LocalJWKS()
+    realm.rotate("key-1")
+    return realm
+
+
+async def validate(token: str, jwks: JWKSCache, verified: VerifiedTokenCache):
+    return await validate_and_parse_token(token, jwks=jwks, verified=verified)
+
+
+@pytest.mark.asyncio
+async def test_keys_are_fetched_once(realm: LocalJWKS):
+    jwks = JWKSCache(realm.fetch)
+    verified = VerifiedTokenCache(max_size=10, ttl=60)
+
+    for subject in ["a", "b", "c"]:
+        token = realm.sign("key-1", sub=subject)
+        assert (await validate(token, jwks, verified))["sub"] == subject
+    assert realm.fetches == 1
+
+
+@pytest.mark.asyncio
+async def test_verified_tokens_skip_verification(realm: LocalJWKS):
+    jwks = JWKSCache(realm.fetch)
+    verified = VerifiedTokenCache(max_size=10, ttl=60)
+    token = realm.sign("key-1", sub="a")
+    claims = await validate(token, jwks, verified)
+
+    # Even a key rotation does not matter until the entry expires
+    realm.rotate("key-2", keep=False)
+    jwks.min_refresh_interval = 0
+    await jwks.refresh()
+    assert await validate(token, jwks, verified) is claims
+
+    verified.clear()
+    with pytest.raises(TokenDecodingException):
+        await validate(token, jwks, verified)
+
+
+@pytest.mark.asyncio
+async def test_rotated_keys_are_picked_up(realm: LocalJWKS):
+    jwks = JWKSCache(realm.fetch, min_refresh_interval=0)
+    verified = VerifiedTokenCache(max_size=10, ttl=60)
+    await validate(realm.sign("key-1"), jwks, verified)
+
+    realm.rotate("key-2", keep=False)
+    assert await validate(realm.sign("key-2", sub="b"), jwks, verified)
+    assert realm.fetches == 2
+    with pytest.raises(jwt.exceptions.InvalidKeyError):
+        await jwks.get_signing_key("key-1")
+
+
+@pytest.mark.asyncio
+async def test_unknown_kids_are_rate_limited(realm: LocalJWKS):
+    jwks = JWKSCache(realm.fetch, min_refresh_interval=60)
+    verified = VerifiedTokenCache(max_size=10, ttl=60)
+    await jwks.refresh()
+
+    realm.rotate("bogus")
+    for _ in range(5):
+        with pytest.raises(TokenDecodingException):
+            await validate(realm.sign("bogus"), jwks, verified)
+    assert realm.fetches == 1
+
+
+@pytest.mark.asyncio
+async def test_expired_tokens_are_rejected(realm: LocalJWKS):
+    jwks = JWKSCache(realm.fetch)
+    verified = VerifiedTokenCache(max_size=10, ttl=60)
+    token = realm.sign("key-1", exp=int(time.time()) - 1)
+
+    with pytest.raises(TokenExpiredException):
+        await validate(token, jwks, verified)
+
+
+def test_verified_token_cache_respects_exp_and_size():
+    verified = VerifiedTokenCache(max_size=2, ttl=60)
+    verified.put("expired", {"exp": time.time() - 1})
+    assert verified.get("expired") is None
+
+    verified.put("a", {"sub": "a"})
+    verified.put("b", {"sub": "b"})
+    verified.get("a")
+    verified.put("c", {"sub": "c"})
+    assert verified.get("b") is None
+    assert verified.get("a") == {"sub": "a"}
+    assert verified.get("c") == {"sub": "c"}
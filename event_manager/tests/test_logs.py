@@ -0,0 +1,109 @@
+import io
+import json
+import logging
+import time
+
+import pytest
+
+from event_manager.core.logs import (
+    JSONFormatter,
+    LogBuffer,
+    LogWriter,
+    RateLimitFilter,
+    SamplingFilter,
+)
+
+
+def make_record(name: str = "test", level: int = logging.INFO, created: float = 0):
+    record = logging.makeLogRecord(
+        {"name": name, "levelno": level, "levelname": logging.getLevelName(level)}
+    )
+    record.created = created
+    return record
+
+
+@pytest.fixture
+def pipeline():
+    """A logger buffering 2 records for a writer the test flushes."""
+    stream = io.StringIO()
+    handler = LogBuffer(capacity=2)
+    logger = logging.getLogger("test_logs")
+    logger.propagate = False
+    logger.setLevel(logging.INFO)
+    logger.addHandler(handler)
+    yield logger, LogWriter(handler, JSONFormatter(), stream), stream
+    logger.removeHandler(handler)
+    logger.setLevel(logging.NOTSET)
+    logger.propagate = True
+
+
+def test_records_are_formatted_by_the_writer(pipeline):
+    logger, writer, stream = pipeline
+    booking = {"id": 1}
+    logger.info("Booking %s", booking, extra={"event_id": 7})
+    # Formatting waits for the writer
+    booking["id"] = 2
+    try:
+        raise ValueError("declined")
+    except ValueError:
+        logger.exception("Payment failed")
+    logger.warning("Dropped: the buffer is full")
+    writer.flush()
+    logger.info("After the writer caught up")
+    writer.start()
+    writer.stop()
+    writer.stop()
+
+    entries = [json.loads(line) for line in stream.getvalue().splitlines()]
+    assert [entry["message"] for entry in entries] == [
+        "Booking {'id': 2}",
+        "Payment failed",
+        "After the writer caught up",
+    ]
+    assert entries[0]["event_id"] == 7
+    assert entries[0]["level"] == "INFO" and entries[0]["logger"] == "test_logs"
+    assert entries[1]["exception"].endswith("ValueError: declined")
+    assert entries[2]["dropped"] == 1
+
+
+def test_writer_survives_a_broken_stream(pipeline, monkeypatch):
+    monkeypatch.setattr(logging, "raiseExceptions", False)
+    logger, writer, _ = pipeline
+    writer.stream = io.StringIO()
+    writer.stream.close()
+    writer.interval = 0.01
+    writer.start()
+    logger.info("Lost with the stream")
+    time.sleep(0.05)
+    assert writer.is_alive()
+
+    writer.stream = stream = io.StringIO()
+    logger.info("Written once it is back")
+    writer.stop()
+    assert json.loads(stream.getvalue())["message"] == "Written once it is back"
+
+
+def test_rate_limit():
+    rate_limit = RateLimitFilter(rate=1, burst=2, rates={"chatty": 0})
+    assert [rate_limit.filter(make_record(created=0)) for _ in range(4)] == [
+        True,
+        True,
+        False,
+        False,
+    ]
+    record = make_record(created=1.5)
+    assert rate_limit.filter(record) and record.suppressed == 2
+    assert not rate_limit.filter(make_record(created=1.6))
+
+    # Loggers have their own buckets
+    assert rate_limit.filter(make_record("other", created=1.6))
+    assert rate_limit.filter(make_record("chatty", created=100))
+    assert rate_limit.filter(make_record("chatty", created=100))
+    assert not rate_limit.filter(make_record("chatty", created=200))
+
+
+def test_sampling():
+    sampling = SamplingFilter({"chatty": 0.0})
+    assert not sampling.filter(make_record("chatty", logging.DEBUG))
+    assert sampling.filter(make_record("chatty", logging.ERROR))
+    assert sampling.filter(make_record("other", logging.DEBUG))
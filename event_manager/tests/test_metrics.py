@@ -0,0 +1,92 @@
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import text
+from sqlalchemy.orm import sessionmaker
+
+from event_manager.core.config import settings
+from event_manager.core.database import create_engine, create_sessionmaker
+from event_manager.dal.event import event_manager
+from event_manager.metrics import registry
+from event_manager.metrics.database import normalize_statement
+from event_manager.metrics.registry import Registry
+from event_manager.tests.test_bookings import create_user_and_event
+
+
+def sample(name: str, **labels: str) -> float | None:
+    """The value of one sample in the rendered registry."""
+    rendered_labels = ",".join(f'{k}="{v}"' for k, v in labels.items())
+    prefix = f"{name}{{{rendered_labels}}} " if labels else f"{name} "
+    for line in registry.render().splitlines():
+        if line.startswith(prefix):
+            return float(line[len(prefix) :])
+    return None
+
+
+def test_text_format():
+    test_registry = Registry()
+    requests = test_registry.counter("requests", "Requests served", ["path"])
+    requests.labels('/a"b').inc()
+    requests.labels('/a"b').inc(2)
+    in_flight = test_registry.gauge("in_flight", "Requests in flight")
+    in_flight.set(3)
+    latency = test_registry.histogram("latency_seconds", "Latency", buckets=[0.1, 1])
+    latency.observe(0.05)
+    latency.observe(0.5)
+    latency.observe(5)
+
+    assert test_registry.render() == (
+        "# HELP requests Requests served\n"
+        "# TYPE requests counter\n"
+        'requests_total{path="/a\\"b"} 3\n'
+        "# HELP in_flight Requests in flight\n"
+        "# TYPE in_flight gauge\n"
+        "in_flight 3\n"
+        "# HELP latency_seconds Latency\n"
+        "# TYPE latency_seconds histogram\n"
+        'latency_seconds_bucket{le="0.1"} 1\n'
+        'latency_seconds_bucket{le="1"} 2\n'
+        'latency_seconds_bucket{le="+Inf"} 3\n'
+        "latency_seconds_sum 5.55\n"
+        "latency_seconds_count 3\n"
+    )
+
+
+def test_normalize_statement():
+    assert normalize_statement(
+        "SELECT events.id FROM events\n WHERE events.id IN "
+        "($1::INTEGER, $2::INTEGER) AND events.name = 'x' LIMIT 10"
+    ) == (
+        "SELECT events.id FROM events WHERE events.id IN (?::INTEGER, ...) "
+        "AND events.name = ? LIMIT ?"
+    )
+
+
+@pytest.mark.asyncio
+async def test_engine_metrics():
+    engine = create_engine(settings.TEST_DATABASE_URL, name="metrics-test")
+    async with create_sessionmaker(engine)() as session:
+        await session.execute(text("SELECT pg_sleep(0.01)"))
+        assert sample("db_pool_checked_out", pool="metrics-test") == 1
+        await session.commit()
+
+    assert sample("db_pool_checked_out", pool="metrics-test") == 0
+    assert sample("db_pool_overflow", pool="metrics-test") == 0
+    assert sample("db_pool_checkout_seconds_count", pool="metrics-test") == 1
+    statement = "SELECT pg_sleep(?)"
+    labels = dict(pool="metrics-test", statement=statement)
+    assert sample("db_statement_seconds_count", **labels) == 1
+    assert sample("db_statement_seconds_sum", **labels) >= 0.01
+    await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_lock_wait_and_endpoint(client: AsyncClient, session_maker: sessionmaker):
+    _, event_id = await create_user_and_event(session_maker, 10)
+    waits = sample("db_event_lock_wait_seconds_count") or 0
+    async with session_maker() as session:
+        assert (await event_manager.get_pessimistic_event(event_id, session)).id
+
+    response = await client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["Content-Type"] == registry.content_type
+    assert f"db_event_lock_wait_seconds_count {int(waits) + 1}" in response.text
@@ -0,0 +1,217 @@
+import asyncio
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+import pytz
+from httpx import AsyncClient
+from sqlalchemy.orm import sessionmaker
+
+from event_manager.dal.payment import payment_manager
+from event_manager.dal.payment_outbox import payment_outbox_manager
+from event_manager.inventory import get_inventory_engine
+from event_manager.inventory.sharded_inventory import InventoryEngine
+from event_manager.main import app
+from event_manager.models import (
+    Booking,
+    BookingStatus,
+    Event,
+    OutboxStatus,
+    PaymentStatus,
+)
+from event_manager.payment_gateway import get_outbox_dispatcher
+from event_manager.payment_gateway.abstract_payment_gateway import PaymentGateway
+from event_manager.payment_gateway.fake_payment import FakePaymentGateway
+from event_manager.payment_gateway.outbox import PaymentOutboxDispatcher
+from event_manager.payment_gateway.stripe_payment import StripePaymentGateway
+from event_manager.schemas.payment import PaymentOutboxCreate
+from event_manager.tests.test_bookings import create_user_and_event
+
+
+async def book_with_pending_intent(
+    session_maker: sessionmaker, event_id: int, user_id: int, quantity: int = 2
+) -> int:
+    async with session_maker() as session:
+        booking = Booking(
+            event_id=event_id,
+            user_id=user_id,
+            booking_time=datetime.now(pytz.UTC),
+            quantity=quantity,
+            total_cost=100 * quantity,
+            status=BookingStatus.HELD,
+            expires_at=datetime.now(pytz.UTC) + timedelta(minutes=15),
+        )
+        session.add(booking)
+        await session.flush()
+        await payment_outbox_manager.enqueue(
+            session,
+            PaymentOutboxCreate(
+                booking_id=booking.id,
+                amount=booking.total_cost,
+                idempotency_key=str(uuid.uuid4()),
+            ),
+        )
+        await session.commit()
+        return booking.id
+
+
+def make_dispatcher(
+    session_maker: sessionmaker, gateway: PaymentGateway, **kwargs
+) -> PaymentOutboxDispatcher:
+    options = dict(batch_size=50, max_attempts=3, retry_backoff=0.0, lease=60.0)
+    options.update(kwargs)
+    return PaymentOutboxDispatcher(
+        session_factory=session_maker, gateway=gateway, **options
+    )
+
+
+class FailingPaymentGateway(FakePaymentGateway):
+    async def create_payment_intent(self, *args, **kwargs):
+        raise RuntimeError("provider unavailable")
+
+
+@pytest.mark.asyncio
+async def test_book_and_pay_queues_the_intent(
+    client: AsyncClient, session_maker: sessionmaker
+):
+    user_id, event_id = await create_user_and_event(session_maker, 10)
+    gateway = FakePaymentGateway(latency=0.01)
+    dispatcher = make_dispatcher(session_maker, gateway)
+    inventory_engine = InventoryEngine(session_factory=session_maker, shard_capacity=5)
+    app.dependency_overrides[get_outbox_dispatcher] = lambda: dispatcher
+    app.dependency_overrides[get_inventory_engine] = lambda: inventory_engine
+    try:
+        response = await client.post(
+            "/payments/book_and_pay?strategy=ATOMIC",
+            json={
+                "event_id": event_id,
+                "user_id": user_id,
+                "booking_time": datetime.now(pytz.UTC).isoformat(),
+                "quantity": 2,
+                "total_cost": 200,
+            },
+        )
+    finally:
+        del app.dependency_overrides[get_outbox_dispatcher]
+        del app.dependency_overrides[get_inventory_engine]
+
+    assert response.status_code == 200
+    assert response.json()["status"] == OutboxStatus.PENDING.value
+    assert response.json()["client_secret"] is None
+    # The provider is only called by the dispatcher, after the commit
+    assert gateway.intents == {}
+    assert dispatcher._wake_up.is_set()
+
+
+@pytest.mark.asyncio
+async def test_dispatcher_creates_intent_and_payment(
+    client: AsyncClient, session_maker: sessionmaker
+):
+    user_id, event_id = await create_user_and_event(session_maker, 10)
+    booking_id = await book_with_pending_intent(session_maker, event_id, user_id)
+    gateway = FakePaymentGateway()
+
+    await make_dispatcher(session_maker, gateway).dispatch_batch()
+
+    response = await client.get(f"/payments/intents/{booking_id}")
+    assert response.status_code == 200
+    intent = response.json()
+    assert intent["status"] == OutboxStatus.DISPATCHED.value
+    assert intent["client_secret"] == f"{intent['payment_intent_id']}_secret"
+    assert gateway.intents[intent["payment_intent_id"]]["amount"] == 200
+    async with session_maker() as session:
+        payment = await payment_manager.get_payment_by_transaction_id(
+            session, intent["payment_intent_id"]
+        )
+    assert payment.booking_id == booking_id
+    assert payment.status == PaymentStatus.PENDING
+
+
+@pytest.mark.asyncio
+async def test_unknown_intent_is_not_found(client: AsyncClient):
+    response = await client.get("/payments/intents/0")
+    assert response.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_dispatcher_gives_up_and_returns_tickets(session_maker: sessionmaker):
+    user_id, event_id = await create_user_and_event(session_maker, 8)
+    booking_id = await book_with_pending_intent(session_maker, event_id, user_id)
+    dispatcher = make_dispatcher(session_maker, FailingPaymentGateway(), max_attempts=2)
+
+    await dispatcher.dispatch_batch()
+    async with session_maker() as session:
+        outbox = await payment_outbox_manager.get_by_booking(session, booking_id)
+    assert (outbox.status, outbox.attempts) == (OutboxStatus.PENDING, 1)
+    assert "provider unavailable" in outbox.last_error
+
+    await dispatcher.dispatch_batch()
+    async with session_maker() as session:
+        outbox = await payment_outbox_manager.get_by_booking(session, booking_id)
+        event = await session.get(Event, event_id)
+    assert (outbox.status, outbox.attempts) == (OutboxStatus.FAILED, 2)
+    assert event.available_tickets == 10
+
+
+@pytest.mark.asyncio
+async def test_concurrent_dispatchers_never_double_dispatch(
+    session_maker: sessionmaker,
+):
+    user_id, event_id = await create_user_and_event(session_maker, 100)
+    booking_ids = [
+        await book_with_pending_intent(session_maker, event_id, user_id, quantity=1)
+        for _ in range(10)
+    ]
+    gateways = [FakePaymentGateway(latency=0.01) for _ in range(3)]
+
+    await asyncio.gather(
+        *(
+            make_dispatcher(session_maker, gateway, batch_size=4).dispatch_batch()
+            for gateway in gateways
+        )
+    )
+    await make_dispatcher(session_maker, gateways[0]).dispatch_batch()
+
+    async with session_maker() as session:
+        rows = [
+            await payment_outbox_manager.get_by_booking(session, booking_id)
+            for booking_id in booking_ids
+        ]
+    assert {row.status for row in rows} == {OutboxStatus.DISPATCHED}
+    assert {row.attempts for row in rows} == {1}
+    assert sum(len(gateway.intents) for gateway in gateways) == 10
+
+
+@pytest.mark.asyncio
+async def test_fake_gateway_honours_idempotency_keys():
+    gateway = FakePaymentGateway()
+    first = await gateway.create_payment_intent(100, idempotency_key="key")
+    again = await gateway.create_payment_intent(100, idempotency_key="key")
+    other = await gateway.create_payment_intent(100, idempotency_key="other")
+
+    assert first["id"] == again["id"] != other["id"]
+    assert len(gateway.intents) == 2
+
+
+@pytest.mark.asyncio
+async def test_stripe_gateway_bounds_concurrency_and_time():
+    gateway = StripePaymentGateway("sk_test_unused", timeout=0.2, max_concurrency=2)
+    in_flight, peak = 0, 0
+
+    async def call(delay: float) -> float:
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(delay)
+        in_flight -= 1
+        return delay
+
+    assert (
+        await asyncio.gather(*(gateway._call(call, 0.01) for _ in range(6)))
+        == [0.01] * 6
+    )
+    assert peak == 2
+
+    with pytest.raises(asyncio.TimeoutError):
+        await gateway._call(call, 1)
+    await gateway.aclose()
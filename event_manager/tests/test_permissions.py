@@ -0,0 +1,80 @@
+import pytest
+
+from event_manager.keycloak.exceptions import AuthorizationException
+from event_manager.keycloak.permission_definitions import (
+    Permission,
+    has_all,
+    has_any,
+    permission_mask,
+    role_has_permission,
+    role_to_permissions_map,
+)
+from event_manager.keycloak.permissions import (
+    CanCreateEvent,
+    CanManageUser,
+    SimplePermissionClass,
+)
+from event_manager.keycloak.security import IsAuthorized
+from event_manager.keycloak.utils import read_role_from_token, reorder_roles
+
+
+class CanManageEvents(SimplePermissionClass):
+    required_permissions = (Permission.CREATE_EVENT, Permission.DELETE_EVENT)
+
+
+class CanBookOrPay(SimplePermissionClass):
+    any_of_permissions = (Permission.MAKE_BOOKING, Permission.DO_PAYMENT)
+
+
+def token(*roles: str) -> dict:
+    return {"realm_access": {"roles": list(roles)}}
+
+
+@pytest.mark.parametrize("role", [*role_to_permissions_map, "unknown", ""])
+@pytest.mark.parametrize("permission", list(Permission))
+def test_masks_agree_with_permission_lists(role: str, permission: Permission):
+    expected = permission in role_to_permissions_map.get(role, [])
+    assert role_has_permission(role, permission) is expected
+
+
+def test_has_all_and_has_any():
+    mask = permission_mask([Permission.VIEW_EVENT, Permission.MANAGE_USERS])
+    assert has_all("super_admin", mask)
+    assert not has_all("admin", mask)
+    assert has_any("admin", mask)
+    assert not has_any("unknown", mask)
+
+
+@pytest.mark.parametrize(
+    "permission_class, role, allowed",
+    [
+        (CanManageEvents, "admin", True),
+        (CanManageEvents, "user", False),
+        (CanBookOrPay, "user", True),
+        (CanBookOrPay, "offline_access", False),
+        (CanManageUser, "admin", False),
+    ],
+)
+def test_permission_classes(permission_class, role: str, allowed: bool):
+    assert permission_class.is_allowed(role) is allowed
+
+
+@pytest.mark.parametrize(
+    "roles",
+    [
+        ["offline_access", "user", "admin"],
+        ["user", "super_admin"],
+        ["uma_authorization", "offline_access"],
+        ["user"],
+    ],
+)
+def test_read_role_picks_highest_priority(roles: list[str]):
+    assert read_role_from_token(token(*roles)) == reorder_roles(roles)[0]
+
+
+def test_is_authorized():
+    IsAuthorized(CanCreateEvent)(token("offline_access", "admin"))
+    with pytest.raises(AuthorizationException):
+        IsAuthorized(CanCreateEvent)(token("offline_access", "user"))
+    with pytest.raises(AssertionError):
+        IsAuthorized(SimplePermissionClass)
@@ -0,0 +1,92 @@
+import itertools
+import random
+
+import numpy as np
+import pytest
+
+from event_manager.dal.booking import booking_manager
+from event_manager.models.event import Event
+from event_manager.pricing.surge import surge_total_cost, surge_total_costs
+
+
+def tier_loop_total_cost(
+    available_tickets: int,
+    surge_threshold: float,
+    base_price: float,
+    surge_price: float,
+    quantity: int,
+) -> float:
+    """The original tier-by-tier implementation, kept as the reference."""
+    if available_tickets > surge_threshold:
+        return quantity * base_price
+
+    total_cost = 0
+    remaining_tickets = available_tickets
+    remaining_quantity = quantity
+    surge_level = 1
+    while remaining_quantity > 0:
+        if remaining_tickets % 5 == 0:
+            tickets_in_tier = 5
+        else:
+            tickets_in_tier = remaining_tickets % 5
+        total_cost += tickets_in_tier * (base_price + surge_level * surge_price)
+        remaining_quantity -= tickets_in_tier
+        remaining_tickets -= tickets_in_tier
+        surge_level += 1
+    return total_cost
+
+
+def random_cases(count: int, seed: int = 20240630):
+    rng = random.Random(seed)
+    for _ in range(count):
+        available_tickets = rng.randint(0, 500)
+        yield (
+            available_tickets,
+            rng.choice([0, available_tickets, rng.uniform(0, 600), 10**9]),
+            rng.choice([rng.randint(1, 1000), round(rng.uniform(0.5, 500), 2)]),
+            rng.choice([0, rng.randint(1, 200), round(rng.uniform(0, 50), 2)]),
+            rng.randint(-2, available_tickets + 20),
+        )
+
+
+def test_closed_form_matches_tier_loop_exhaustively():
+    for available_tickets, quantity in itertools.product(range(0, 60), range(-1, 70)):
+        case = (available_tickets, 100, 200, 50, quantity)
+        assert surge_total_cost(*case) == tier_loop_total_cost(*case), case
+
+
+def test_closed_form_matches_tier_loop():
+    for case in random_cases(2000):
+        assert surge_total_cost(*case) == pytest.approx(
+            tier_loop_total_cost(*case)
+        ), case
+
+
+def test_closed_form_is_constant_time_for_huge_quantities():
+    cost = surge_total_cost(0, 0, 100, 1, 10**12)
+    assert cost == 5 * sum_of_tiers(10**12 // 5, base=100, surge=1)
+
+
+def sum_of_tiers(tiers: int, base: int, surge: int) -> int:
+    return tiers * base + surge * tiers * (tiers + 1) // 2
+
+
+def test_batched_costs_match_scalar_costs():
+    cases = list(random_cases(5000, seed=7))
+    columns = [np.array(column) for column in zip(*cases)]
+
+    expected = [surge_total_cost(*case) for case in cases]
+    np.testing.assert_allclose(surge_total_costs(*columns), expected)
+
+
+def test_booking_manager_prices_many_events():
+    events = [
+        Event(
+            available_tickets=98, surge_threshold=100, base_price=200, surge_price=50
+        ),
+        Event(
+            available_tickets=100, surge_threshold=10, base_price=200, surge_price=50
+        ),
+    ]
+    assert booking_manager.calculate_total_costs(events, [8, 3]) == [2250, 600]
+    assert booking_manager.calculate_total_cost(events[0], 8) == 2250
@@ -0,0 +1,130 @@
+from datetime import date, datetime, time
+
+import pytest
+import pytest_asyncio
+import pytz
+from faker import Faker
+from httpx import AsyncClient
+from sqlalchemy.orm import sessionmaker
+
+from event_manager.inventory import get_inventory_engine
+from event_manager.inventory.sharded_inventory import InventoryEngine
+from event_manager.keycloak.permission_definitions import Roles
+from event_manager.main import app
+from event_manager.models import Booking, Event, Payment, PaymentStatus, User
+from event_manager.payment_gateway import get_payment_gateway
+from event_manager.payment_gateway.fake_payment import FakePaymentGateway
+
+faker = Faker()
+
+
+@pytest_asyncio.fixture
+async def booked_event(session_maker: sessionmaker) -> dict[str, int]:
+    async with session_maker() as session:
+        user = User(
+            name=faker.name(),
+            email=faker.email(),
+            country_code=faker.country_code(),
+            phone_number=faker.numerify("##########"),
+            role=Roles.USER,
+            username=faker.user_name(),
+        )
+        event = Event(
+            name=faker.name(),
+            event_date=date(2024, 6, 30),
+            event_time=time(11, 15, tzinfo=pytz.UTC),
+            venue=faker.address(),
+            location_lat=-89,
+            location_long=-179,
+            available_tickets=100,
+            base_price=100,
+            surge_price=0,
+            surge_threshold=0,
+            version=0,
+        )
+        session.add_all([user, event])
+        await session.flush()
+        # A popular event: the old selectin loaders dragged all of these along
+        bookings = [
+            Booking(
+                event_id=event.id,
+                user_id=user.id,
+                booking_time=datetime.now(pytz.UTC),
+                quantity=1,
+                total_cost=100,
+            )
+            for _ in range(20)
+        ]
+        session.add_all(bookings)
+        await session.flush()
+        payment = Payment(
+            booking_id=bookings[0].id,
+            amount=100,
+            status=PaymentStatus.PENDING,
+            transaction_id=f"pi_{faker.uuid4()}",
+            idempotency_key=faker.uuid4(),
+        )
+        session.add(payment)
+        await session.commit()
+        return {
+            "user_id": user.id,
+            "event_id": event.id,
+            "booking_id": bookings[0].id,
+            "payment_id": payment.id,
+        }
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "path",
+    [
+        "/events/{event_id}",
+        "/events/",
+        "/bookings/booking-total-cost?event_id={event_id}&quantity=2",
+        "/bookings/{booking_id}",
+        "/bookings/",
+        "/payments/{payment_id}",
+        "/payments/",
+        "/users/{user_id}",
+        "/users/",
+    ],
+)
+async def test_read_endpoints_issue_a_single_statement(
+    client: AsyncClient, booked_event: dict[str, int], statements: list[str], path
+):
+    response = await client.get(path.format(**booked_event))
+    assert response.status_code == 200
+    assert len(statements) == 1, statements
+
+
+@pytest.mark.asyncio
+async def test_book_and_pay_statement_count(
+    client: AsyncClient,
+    session_maker: sessionmaker,
+    booked_event: dict[str, int],
+    statements: list[str],
+):
+    inventory_engine = InventoryEngine(session_factory=session_maker, shard_capacity=5)
+    await inventory_engine.refresh_configuration([booked_event["event_id"]])
+    app.dependency_overrides[get_inventory_engine] = lambda: inventory_engine
+    app.dependency_overrides[get_payment_gateway] = FakePaymentGateway
+    statements.clear()
+    try:
+        response = await client.post(
+            "/payments/book_and_pay?strategy=ATOMIC",
+            json={
+                "event_id": booked_event["event_id"],
+                "user_id": booked_event["user_id"],
+                "booking_time": datetime.now(pytz.UTC).isoformat(),
+                "quantity": 2,
+                "total_cost": 200,
+            },
+        )
+    finally:
+        del app.dependency_overrides[get_inventory_engine]
+        del app.dependency_overrides[get_payment_gateway]
+
+    assert response.status_code == 200
+    # user lookup, reservation + booking insert, outbox insert; the payment
+    # intent is created later by the outbox dispatcher
+    assert len(statements) == 3, statements
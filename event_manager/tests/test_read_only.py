@@ -0,0 +1,115 @@
+import asyncio
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import event, select, text
+from sqlalchemy.exc import InvalidRequestError
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+
+from event_manager.core.config import settings
+from event_manager.core.database import (
+    create_sessionmaker,
+    get_read_only_session_factory,
+    with_read_session,
+)
+from event_manager.core.read_only import create_read_only_sessionmaker
+from event_manager.main import app
+from event_manager.models import Event
+from event_manager.tests.test_bookings import create_user_and_event
+from event_manager.tests.test_payments import book_with_pending_intent
+
+
+@pytest.fixture
+def queries() -> list[str]:
+    return []
+
+
+@pytest.fixture
+async def read_engine(queries: list[str]):
+    engine = create_async_engine(settings.TEST_DATABASE_URL)
+
+    @event.listens_for(engine.sync_engine, "connect")
+    def log_queries(dbapi_connection, connection_record):
+        connection_record.driver_connection.add_query_logger(
+            lambda record: queries.append(record.query)
+        )
+
+    yield engine
+    await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_read_only_session_skips_transactions(
+    read_engine: AsyncEngine, queries: list[str], session_maker
+):
+    _, event_id = await create_user_and_event(session_maker, 10)
+    session_factory = create_read_only_sessionmaker(read_engine)
+
+    async with session_factory() as session:
+        event_obj = await session.get(Event, event_id)
+        assert read_engine.pool.checkedout() == 0
+        assert await session.scalar(text("SELECT 1")) == 1
+        assert read_engine.pool.checkedout() == 0
+        events = (await session.scalars(select(Event.id).limit(1))).all()
+        assert read_engine.pool.checkedout() == 0
+
+    assert event_obj.id == event_id and event_obj.available_tickets == 10
+    assert len(events) == 1
+
+    # Whereas a regular session wraps them in a transaction. asyncpg logs
+    # the transaction statements, soon rather than right away.
+    async with create_sessionmaker(read_engine)() as session:
+        await session.get(Event, event_id)
+        await session.commit()
+    await asyncio.sleep(0)
+    assert [query.split()[0].rstrip(";") for query in queries] == ["BEGIN", "COMMIT"]
+
+
+@pytest.mark.asyncio
+async def test_read_only_session_does_not_write(
+    read_engine: AsyncEngine, session_maker
+):
+    _, event_id = await create_user_and_event(session_maker, 10)
+
+    async with create_read_only_sessionmaker(read_engine)() as session:
+        event_obj = await session.get(Event, event_id)
+        session.add(event_obj)
+        event_obj.available_tickets = 0
+        with pytest.raises(InvalidRequestError):
+            await session.flush()
+        with pytest.raises(InvalidRequestError):
+            await session.stream(select(Event))
+
+    async with session_maker() as session:
+        assert (await session.get(Event, event_id)).available_tickets == 10
+
+
+@pytest.fixture
+def read_only_client(client: AsyncClient, read_engine: AsyncEngine):
+    shared_session = app.dependency_overrides.pop(with_read_session)
+    app.dependency_overrides[get_read_only_session_factory] = lambda: (
+        create_read_only_sessionmaker(read_engine)
+    )
+    yield client
+    del app.dependency_overrides[get_read_only_session_factory]
+    app.dependency_overrides[with_read_session] = shared_session
+
+
+@pytest.mark.asyncio
+async def test_read_routes_on_read_only_sessions(
+    read_only_client: AsyncClient, read_engine: AsyncEngine, session_maker
+):
+    user_id, event_id = await create_user_and_event(session_maker, 10)
+    booking_id = await book_with_pending_intent(session_maker, event_id, user_id)
+
+    for route in [
+        f"/events/{event_id}",
+        "/events/?limit=5",
+        f"/bookings/{booking_id}",
+        "/bookings/?limit=5",
+        f"/bookings/booking-total-cost?event_id={event_id}&quantity=2",
+        "/payments/?limit=5",
+    ]:
+        response = await read_only_client.get(route)
+        assert response.status_code == 200, route
+        assert read_engine.pool.checkedout() == 0
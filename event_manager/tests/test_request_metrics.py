@@ -0,0 +1,101 @@
+import asyncio
+import random
+
+import pytest
+from fastapi import FastAPI
+from httpx import AsyncClient
+from sqlalchemy import text
+from sqlalchemy.orm import sessionmaker
+
+from event_manager.api.responses import JSONResponse
+from event_manager.core.config import settings
+from event_manager.core.database import create_engine, create_sessionmaker
+from event_manager.metrics.http import RequestMetrics, RequestMetricsMiddleware
+from event_manager.metrics.latency import LatencyHistogram, bucket_index
+from event_manager.metrics.registry import Registry
+from event_manager.payment_gateway.fake_payment import FakePaymentGateway
+from event_manager.tests.test_bookings import create_user_and_event
+from event_manager.tests.test_metrics import sample
+
+
+def test_latency_histogram():
+    histogram = LatencyHistogram()
+    latencies = [random.uniform(0.001, 0.5) for _ in range(10000)]
+    for latency in latencies:
+        histogram.record(latency)
+    histogram.record(3600)
+    latencies.append(3600)
+    latencies.sort()
+
+    snapshot = histogram.snapshot()
+    histogram.record(0.1)
+    assert snapshot.count == 10001
+    for q in (0.5, 0.9, 0.99):
+        exact = latencies[int(q * len(latencies)) - 1]
+        assert abs(snapshot.quantile(q) - exact) / exact < 1 / 32
+    # Clamped to MAX_MICROSECONDS
+    assert 60 <= snapshot.quantile(1) < 60 * (1 + 1 / 32)
+    under = sum(latency <= 0.1 for latency in latencies)
+    assert abs(snapshot.count_under(0.1) - under) <= under / 32
+    assert bucket_index(63) == 63 and bucket_index(64) == bucket_index(65) == 64
+
+
+@pytest.mark.asyncio
+async def test_route_metrics(client: AsyncClient, session_maker: sessionmaker):
+    _, event_id = await create_user_and_event(session_maker, 10)
+    labels = dict(route="/events/{event_id}", method="GET")
+    served = sample("http_requests_total", **labels, status="200") or 0
+
+    assert (await client.get(f"/events/{event_id}")).status_code == 200
+    assert (await client.get("/events/0")).status_code == 404
+    assert (await client.get("/no-such-route")).status_code == 404
+
+    assert sample("http_requests_total", **labels, status="200") == served + 1
+    assert sample("http_requests_total", **labels, status="404") >= 1
+    assert sample("http_requests_total", route="unmatched", method="GET", status="404")
+    assert sample("http_request_duration_seconds_count", **labels) >= served + 2
+    assert sample("http_request_duration_seconds_bucket", **labels, le="+Inf") >= 2
+    assert sample("http_request_duration_quantile_seconds", **labels, quantile="0.99")
+    assert sample("http_requests_in_flight", route="/metrics") is None
+
+    response = await client.get("/metrics")
+    assert 'http_requests_in_flight{route="/metrics"} 1' in response.text
+
+
+@pytest.fixture
+async def traced_app():
+    engine = create_engine(settings.TEST_DATABASE_URL, name="trace-test")
+    gateway = FakePaymentGateway(latency=0.02)
+    app = FastAPI(default_response_class=JSONResponse)
+
+    @app.get("/checkout/{cart_id}")
+    async def checkout(cart_id: int):
+        async with create_sessionmaker(engine)() as session:
+            await session.execute(text("SELECT pg_sleep(0.02)"))
+        intent = await gateway.create_payment_intent(100, f"cart-{cart_id}")
+        await asyncio.sleep(0.02)
+        return {"intent": intent["id"], "items": list(range(10000))}
+
+    registry = Registry()
+    metrics = RequestMetrics(registry)
+    yield RequestMetricsMiddleware(app, metrics, trace_sample_rate=1.0), registry
+    await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_sampled_trace(traced_app):
+    app, registry = traced_app
+    async with AsyncClient(app=app, base_url="http://test") as client:
+        assert (await client.get("/checkout/1")).status_code == 200
+
+    prefix = 'http_request_phase_seconds_sum{route="/checkout/{cart_id}",phase="'
+    phases = {
+        line[len(prefix) :].split('"')[0]: float(line.split()[-1])
+        for line in registry.render().splitlines()
+        if line.startswith(prefix)
+    }
+    assert phases.keys() == {"db", "payment_gateway", "serialization", "other"}
+    assert phases["db"] >= 0.02
+    assert phases["payment_gateway"] >= 0.02
+    assert phases["serialization"] > 0
+    assert phases["other"] >= 0.02
@@ -0,0 +1,181 @@
+import asyncio
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+import pytz
+from httpx import AsyncClient
+from sqlalchemy.orm import sessionmaker
+
+from event_manager.dal.booking import booking_manager
+from event_manager.inventory.hold_sweeper import HoldSweeper
+from event_manager.main import app
+from event_manager.models import Booking, BookingStatus, Event, Payment, PaymentStatus
+from event_manager.payment_gateway import get_payment_gateway
+from event_manager.payment_gateway.fake_payment import FakePaymentGateway
+from event_manager.schemas.booking import BookingHold
+from event_manager.tests.test_bookings import create_user_and_event
+
+
+async def hold_tickets(
+    session_maker: sessionmaker,
+    event_id: int,
+    user_id: int,
+    quantity: int,
+    expires_in: timedelta,
+) -> int:
+    """Books like `book_and_pay` does: tickets leave the event up front."""
+    async with session_maker() as session:
+        booking = await booking_manager.create_booking_atomic(
+            session,
+            BookingHold(
+                event_id=event_id,
+                user_id=user_id,
+                booking_time=datetime.now(pytz.UTC),
+                quantity=quantity,
+                total_cost=100 * quantity,
+                expires_at=datetime.now(pytz.UTC) + expires_in,
+            ),
+        )
+        await session.commit()
+        return booking.id
+
+
+async def get_state(
+    session_maker: sessionmaker, event_id: int, booking_ids: list[int]
+) -> tuple[int, list[BookingStatus]]:
+    async with session_maker() as session:
+        event = await session.get(Event, event_id)
+        statuses = [
+            (await session.get(Booking, booking_id)).status
+            for booking_id in booking_ids
+        ]
+    return event.available_tickets, statuses
+
+
+@pytest.mark.asyncio
+async def test_sweeper_releases_only_expired_holds(session_maker: sessionmaker):
+    user_id, event_id = await create_user_and_event(session_maker, 20)
+    other_user_id, other_event_id = await create_user_and_event(session_maker, 20)
+    expired = [
+        await hold_tickets(session_maker, event_id, user_id, 2, timedelta(0)),
+        await hold_tickets(session_maker, event_id, user_id, 3, timedelta(0)),
+    ]
+    other_expired = await hold_tickets(
+        session_maker, other_event_id, other_user_id, 4, timedelta(0)
+    )
+    live = await hold_tickets(session_maker, event_id, user_id, 5, timedelta(hours=1))
+    confirmed = await hold_tickets(session_maker, event_id, user_id, 1, timedelta(0))
+    async with session_maker() as session:
+        await booking_manager.end_hold(session, confirmed, BookingStatus.CONFIRMED)
+        await session.commit()
+
+    # Small batches: the sweeper keeps going until the backlog is gone
+    assert await HoldSweeper(session_maker, batch_size=1).sweep() >= 3
+
+    available, statuses = await get_state(
+        session_maker, event_id, [*expired, live, confirmed]
+    )
+    # 20 - (2 + 3 + 5 + 1) booked, the two expired holds credited back
+    assert available == 14
+    assert statuses == [
+        BookingStatus.RELEASED,
+        BookingStatus.RELEASED,
+        BookingStatus.HELD,
+        BookingStatus.CONFIRMED,
+    ]
+    assert (await get_state(session_maker, other_event_id, [other_expired])) == (
+        20,
+        [BookingStatus.RELEASED],
+    )
+
+
+@pytest.mark.asyncio
+async def test_concurrent_sweepers_credit_each_hold_once(
+    session_maker: sessionmaker,
+):
+    user_id, event_id = await create_user_and_event(session_maker, 50)
+    booking_ids = [
+        await hold_tickets(session_maker, event_id, user_id, 1, timedelta(0))
+        for _ in range(30)
+    ]
+
+    await asyncio.gather(
+        *(HoldSweeper(session_maker, batch_size=4).sweep() for _ in range(4))
+    )
+
+    available, statuses = await get_state(session_maker, event_id, booking_ids)
+    assert available == 50
+    assert set(statuses) == {BookingStatus.RELEASED}
+
+
+@pytest.mark.asyncio
+async def test_end_hold_releases_tickets_once(session_maker: sessionmaker):
+    user_id, event_id = await create_user_and_event(session_maker, 10)
+    booking_id = await hold_tickets(session_maker, event_id, user_id, 2, timedelta(0))
+    assert await HoldSweeper(session_maker, batch_size=10).sweep() >= 1
+
+    async with session_maker() as session:
+        # A late payment failure finds the hold already released
+        assert (
+            await booking_manager.end_hold(session, booking_id, BookingStatus.RELEASED)
+            is None
+        )
+
+
+async def pay_for_hold(
+    session_maker: sessionmaker, expires_in: timedelta
+) -> tuple[int, str]:
+    user_id, event_id = await create_user_and_event(session_maker, 10)
+    booking_id = await hold_tickets(session_maker, event_id, user_id, 2, expires_in)
+    transaction_id = f"pi_fake_{uuid.uuid4().hex}"
+    async with session_maker() as session:
+        session.add(
+            Payment(
+                booking_id=booking_id,
+                amount=200,
+                status=PaymentStatus.PENDING,
+                transaction_id=transaction_id,
+                idempotency_key=str(uuid.uuid4()),
+            )
+        )
+        await session.commit()
+    return booking_id, transaction_id
+
+
+@pytest.mark.asyncio
+async def test_payment_success_confirms_live_hold(
+    client: AsyncClient, session_maker: sessionmaker
+):
+    _, transaction_id = await pay_for_hold(session_maker, timedelta(hours=1))
+    gateway = FakePaymentGateway()
+    gateway.intents[transaction_id] = {"id": transaction_id}
+    app.dependency_overrides[get_payment_gateway] = lambda: gateway
+    try:
+        response = await client.post(
+            f"/payments/success?payment_intent_id={transaction_id}"
+        )
+    finally:
+        del app.dependency_overrides[get_payment_gateway]
+
+    assert response.status_code == 200
+    assert gateway.intents[transaction_id]["status"] == "succeeded"
+
+
+@pytest.mark.asyncio
+async def test_payment_success_rejects_expired_hold(
+    client: AsyncClient, session_maker: sessionmaker
+):
+    _, transaction_id = await pay_for_hold(session_maker, timedelta(0))
+    await HoldSweeper(session_maker, batch_size=100).sweep()
+    gateway = FakePaymentGateway()
+    app.dependency_overrides[get_payment_gateway] = lambda: gateway
+    try:
+        response = await client.post(
+            f"/payments/success?payment_intent_id={transaction_id}"
+        )
+    finally:
+        del app.dependency_overrides[get_payment_gateway]
+
+    assert response.status_code == 409
+    assert gateway.intents == {}
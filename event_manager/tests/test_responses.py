@@ -0,0 +1,104 @@
+import json
+import zlib
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import select
+from sqlalchemy.orm import sessionmaker
+from starlette.applications import Starlette
+from starlette.responses import PlainTextResponse, StreamingResponse
+from starlette.routing import Route
+
+from event_manager.api.compression import CompressionMiddleware
+from event_manager.api.responses import RowSerializer
+from event_manager.models import Booking, Event
+from event_manager.schemas.booking import Booking as BookingSchema
+from event_manager.schemas.event import Event as EventSchema
+from event_manager.tests.test_bookings import create_user_and_event
+from event_manager.tests.test_payments import book_with_pending_intent
+
+
+@pytest.mark.asyncio
+async def test_row_serializer_matches_response_model(session_maker: sessionmaker):
+    user_id, event_id = await create_user_and_event(session_maker, 10)
+    await book_with_pending_intent(session_maker, event_id, user_id)
+
+    for model, schema in [(Event, EventSchema), (Booking, BookingSchema)]:
+        rows_serializer = RowSerializer(schema)
+        columns = [getattr(model, column) for column in rows_serializer.columns]
+        async with session_maker() as session:
+            instances = (await session.scalars(select(model).limit(5))).all()
+            rows = (await session.execute(select(*columns).limit(5))).all()
+        expected = [
+            schema.model_validate(instance).model_dump(mode="json")
+            for instance in instances
+        ]
+
+        assert json.loads(rows_serializer.dump_json(rows)) == expected
+        assert json.loads(rows_serializer.dump_json(instances)) == expected
+
+
+async def large(request):
+    return PlainTextResponse("x" * 2048)
+
+
+async def small(request):
+    return PlainTextResponse("x" * 10)
+
+
+async def stream(request):
+    async def chunks():
+        for _ in range(3):
+            yield b'{"line": 1}\n'
+
+    return StreamingResponse(chunks(), media_type="application/x-ndjson")
+
+
+compressed_app = CompressionMiddleware(
+    Starlette(
+        routes=[
+            Route("/large", large),
+            Route("/small", small),
+            Route("/stream", stream),
+        ]
+    ),
+    minimum_size=1024,
+)
+
+
+@pytest.mark.asyncio
+async def test_compression_middleware():
+    async with AsyncClient(app=compressed_app, base_url="http://test") as client:
+        response = await client.get("/large", headers={"Accept-Encoding": "gzip"})
+        assert response.headers["Content-Encoding"] == "gzip"
+        assert response.headers["Vary"] == "Accept-Encoding"
+        assert int(response.headers["Content-Length"]) < 2048
+        assert response.text == "x" * 2048
+
+        response = await client.get("/small", headers={"Accept-Encoding": "gzip"})
+        assert "Content-Encoding" not in response.headers
+
+        response = await client.get("/large", headers={"Accept-Encoding": "identity"})
+        assert "Content-Encoding" not in response.headers
+
+        async with client.stream(
+            "GET", "/stream", headers={"Accept-Encoding": "gzip"}
+        ) as response:
+            assert response.headers["Content-Encoding"] == "gzip"
+            body = b"".join([chunk async for chunk in response.aiter_raw()])
+        assert zlib.decompress(body, zlib.MAX_WBITS | 16) == b'{"line": 1}\n' * 3
+
+
+@pytest.mark.asyncio
+async def test_event_list_is_compressed(
+    client: AsyncClient, session_maker: sessionmaker
+):
+    for _ in range(10):
+        await create_user_and_event(session_maker, 10)
+
+    response = await client.get(
+        "/events/?limit=10", headers={"Accept-Encoding": "gzip"}
+    )
+    assert response.status_code == 200
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert len(response.json()) == 10
@@ -0,0 +1,127 @@
+from datetime import date, time
+
+import pytest
+import pytest_asyncio
+import pytz
+from faker import Faker
+from httpx import AsyncClient
+from sqlalchemy.orm import sessionmaker
+
+from event_manager.dal.pagination import NEXT_CURSOR_HEADER
+from event_manager.main import app
+from event_manager.models.event import Event
+from event_manager.search import get_search_backend
+from event_manager.search.in_memory import InMemoryEventSearch
+from event_manager.search.postgres import PostgresEventSearch
+
+faker = Faker()
+
+
+@pytest_asyncio.fixture(params=[PostgresEventSearch, InMemoryEventSearch])
+async def search_backend(request, session_maker: sessionmaker):
+    backend = request.param()
+    async with session_maker() as session:
+        await backend.warm_up(session)
+    app.dependency_overrides[get_search_backend] = lambda: backend
+    yield backend
+    del app.dependency_overrides[get_search_backend]
+
+
+async def create_event(session_maker: sessionmaker, backend, name: str, venue: str):
+    async with session_maker() as session:
+        event = Event(
+            name=name,
+            event_date=date(2024, 6, 30),
+            event_time=time(11, 15, tzinfo=pytz.UTC),
+            venue=venue,
+            location_lat=float(faker.latitude()),
+            location_long=float(faker.longitude()),
+            available_tickets=100,
+            base_price=100,
+            surge_price=0,
+            surge_threshold=0,
+            version=0,
+        )
+        session.add(event)
+        await session.commit()
+        backend.index_event(event)
+        return event.id
+
+
+def random_word() -> str:
+    return faker.lexify("????????", letters="bcdfghjklmnpqrstvwxz")
+
+
+@pytest.mark.asyncio
+async def test_search_matches_word_prefixes(
+    client: AsyncClient, session_maker: sessionmaker, search_backend
+):
+    word = random_word()
+    event_id = await create_event(
+        session_maker, search_backend, f"{word} Live", "Town Hall"
+    )
+
+    response = await client.get(f"/events/search/?q={word[:4]} liv")
+    assert response.status_code == 200
+    assert [event["id"] for event in response.json()] == [event_id]
+
+
+@pytest.mark.asyncio
+async def test_search_tolerates_typos(
+    client: AsyncClient, session_maker: sessionmaker, search_backend
+):
+    word = random_word()
+    event_id = await create_event(session_maker, search_backend, word, "Town Hall")
+    typo = word[:-1] + ("a" if word[-1] != "a" else "e")
+
+    response = await client.get(f"/events/search/?q={typo}")
+    assert response.status_code == 200
+    assert event_id in [event["id"] for event in response.json()]
+
+
+@pytest.mark.asyncio
+async def test_search_ranks_name_above_venue_and_paginates(
+    client: AsyncClient, session_maker: sessionmaker, search_backend
+):
+    word = random_word()
+    venue_match = await create_event(
+        session_maker, search_backend, "Open Air", f"{word} Arena"
+    )
+    name_match = await create_event(
+        session_maker, search_backend, f"{word} Festival", "Town Hall"
+    )
+
+    response = await client.get(f"/events/search/?q={word}&limit=1")
+    assert response.status_code == 200
+    assert [event["id"] for event in response.json()] == [name_match]
+
+    cursor = response.headers[NEXT_CURSOR_HEADER]
+    response = await client.get(f"/events/search/?q={word}&limit=1&cursor={cursor}")
+    assert response.status_code == 200
+    assert [event["id"] for event in response.json()] == [venue_match]
+    assert NEXT_CURSOR_HEADER not in response.headers
+
+
+@pytest.mark.asyncio
+async def test_search_combines_text_with_filters(
+    client: AsyncClient, session_maker: sessionmaker, search_backend
+):
+    word = random_word()
+    await create_event(session_maker, search_backend, f"{word} Live", "Town Hall")
+    event_id = await create_event(
+        session_maker, search_backend, f"{word} Live", "Harbour Stage"
+    )
+
+    response = await client.get(f"/events/search/?q={word}&venue=harbour")
+    assert response.status_code == 200
+    assert [event["id"] for event in response.json()] == [event_id]
+
+
+@pytest.mark.asyncio
+async def test_in_memory_search_forgets_removed_events():
+    backend = InMemoryEventSearch()
+    backend.index_event(Event(id=1, name="Jazz Night", venue="Blue Room"))
+    backend.index_event(Event(id=2, name="Jazz Brunch", venue="Cafe"))
+    backend.remove_event(1)
+
+    assert [event_id for _, event_id in backend.rank("jaz")] == [2]
@@ -0,0 +1,348 @@
+import asyncio
+import json
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+import pytz
+from httpx import AsyncClient
+from sqlalchemy import select, text, update
+from sqlalchemy.orm import sessionmaker
+
+from event_manager.dal.booking import booking_manager
+from event_manager.dal.payment import payment_manager
+from event_manager.dal.webhook_inbox import webhook_inbox_manager
+from event_manager.main import app
+from event_manager.models import (
+    Booking,
+    BookingStatus,
+    Event,
+    Payment,
+    PaymentStatus,
+    WebhookInbox,
+)
+from event_manager.payment_gateway import get_payment_gateway
+from event_manager.payment_gateway.fake_payment import FakePaymentGateway
+from event_manager.payment_gateway.webhooks import WebhookInboxWorker
+from event_manager.schemas.payment import WebhookEvent
+from event_manager.tests.test_bookings import create_user_and_event
+from event_manager.tests.test_reservations import hold_tickets
+
+
+def intent_event(event_type: str, intent_id: str) -> dict:
+    return {
+        "id": f"evt_{uuid.uuid4().hex}",
+        "type": event_type,
+        "data": {"object": {"id": intent_id, "object": "payment_intent"}},
+    }
+
+
+async def pending_payments(
+    session_maker: sessionmaker, count: int, available_tickets: int = 10
+) -> tuple[int, list[str]]:
+    user_id, event_id = await create_user_and_event(session_maker, available_tickets)
+    transaction_ids = []
+    for _ in range(count):
+        booking_id = await hold_tickets(
+            session_maker, event_id, user_id, 1, timedelta(hours=1)
+        )
+        transaction_ids.append(f"pi_fake_{uuid.uuid4().hex}")
+        async with session_maker() as session:
+            session.add(
+                Payment(
+                    booking_id=booking_id,
+                    amount=100,
+                    status=PaymentStatus.PENDING,
+                    transaction_id=transaction_ids[-1],
+                    idempotency_key=str(uuid.uuid4()),
+                )
+            )
+            await session.commit()
+    return event_id, transaction_ids
+
+
+async def receive(session_maker: sessionmaker, *events: dict) -> list[bool]:
+    gateway = FakePaymentGateway()
+    async with session_maker() as session:
+        stored = [
+            await webhook_inbox_manager.record(
+                session, gateway.parse_webhook_event(json.dumps(event), None)
+            )
+            for event in events
+        ]
+        await session.commit()
+    return stored
+
+
+async def payment_states(
+    session_maker: sessionmaker, transaction_ids: list[str]
+) -> list[tuple[PaymentStatus, BookingStatus]]:
+    async with session_maker() as session:
+        result = await session.execute(
+            select(Payment.transaction_id, Payment.status, Booking.status)
+            .join(Booking, Booking.id == Payment.booking_id)
+            .where(Payment.transaction_id.in_(transaction_ids))
+        )
+        states = {row[0]: (row[1], row[2]) for row in result.all()}
+    return [states[transaction_id] for transaction_id in transaction_ids]
+
+
+async def available_tickets(session_maker: sessionmaker, event_id: int) -> int:
+    async with session_maker() as session:
+        return (await session.get(Event, event_id)).available_tickets
+
+
+def make_worker(session_maker: sessionmaker, **kwargs) -> WebhookInboxWorker:
+    options = dict(
+        batch_size=100, workers=1, max_attempts=3, retry_backoff=2.0, max_age=60.0
+    )
+    options.update(kwargs)
+    return WebhookInboxWorker(
+        session_factory=session_maker, gateway=FakePaymentGateway(), **options
+    )
+
+
+@pytest.mark.asyncio
+async def test_webhook_is_acknowledged_without_applying_it(client: AsyncClient):
+    gateway = FakePaymentGateway()
+    app.dependency_overrides[get_payment_gateway] = lambda: gateway
+    try:
+        stored = await client.post(
+            "/payments/webhook",
+            content=json.dumps(intent_event("payment_intent.succeeded", "pi_x")),
+        )
+        invalid = await client.post("/payments/webhook", content=b"not json")
+    finally:
+        del app.dependency_overrides[get_payment_gateway]
+
+    assert stored.status_code == 200
+    assert invalid.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_redelivered_events_are_dropped(session_maker: sessionmaker):
+    event = intent_event("payment_intent.succeeded", "pi_redelivered")
+    assert await receive(session_maker, event, event) == [True, False]
+    assert await receive(session_maker, event) == [False]
+
+
+@pytest.mark.asyncio
+async def test_worker_applies_transitions_in_bulk(session_maker: sessionmaker):
+    event_id, (paid, failed, retried, untouched) = await pending_payments(
+        session_maker, 4
+    )
+    await receive(
+        session_maker,
+        intent_event("payment_intent.succeeded", paid),
+        intent_event("payment_intent.payment_failed", failed),
+        # The latest event for an intent wins within a batch
+        intent_event("payment_intent.payment_failed", retried),
+        intent_event("payment_intent.succeeded", retried),
+        intent_event("payment_intent.created", untouched),
+    )
+
+    assert await make_worker(session_maker).drain() >= 5
+
+    assert await payment_states(session_maker, [paid, failed, retried, untouched]) == [
+        (PaymentStatus.COMPLETED, BookingStatus.CONFIRMED),
+        (PaymentStatus.FAILED, BookingStatus.RELEASED),
+        (PaymentStatus.COMPLETED, BookingStatus.CONFIRMED),
+        (PaymentStatus.PENDING, BookingStatus.HELD),
+    ]
+    # 10 - 4 held, the failed payment's ticket came back
+    assert await available_tickets(session_maker, event_id) == 7
+    async with session_maker() as session:
+        assert not await session.scalar(
+            select(WebhookInbox.id).where(
+                WebhookInbox.processed_at.is_(None),
+                WebhookInbox.payment_intent_id.in_([paid, failed, retried, untouched]),
+            )
+        )
+
+    # A late failure for an already settled payment changes nothing
+    await receive(session_maker, intent_event("payment_intent.payment_failed", failed))
+    await make_worker(session_maker).drain()
+    assert await available_tickets(session_maker, event_id) == 7
+
+
+@pytest.mark.asyncio
+async def test_success_after_the_hold_lapsed_is_flagged_for_refund(
+    session_maker: sessionmaker,
+):
+    event_id, (lapsed, live) = await pending_payments(session_maker, 2)
+    async with session_maker() as session:
+        await session.execute(
+            update(Booking)
+            .where(
+                Booking.id
+                == select(Payment.booking_id)
+                .where(Payment.transaction_id == lapsed)
+                .scalar_subquery()
+            )
+            .values(expires_at=datetime.now(pytz.UTC) - timedelta(minutes=1))
+        )
+        assert await booking_manager.release_expired_holds(session, 10) == 1
+        await session.commit()
+    await receive(
+        session_maker,
+        intent_event("payment_intent.succeeded", lapsed),
+        intent_event("payment_intent.succeeded", live),
+    )
+
+    await make_worker(session_maker).drain()
+
+    assert await payment_states(session_maker, [lapsed, live]) == [
+        (PaymentStatus.REFUND_REQUIRED, BookingStatus.RELEASED),
+        (PaymentStatus.COMPLETED, BookingStatus.CONFIRMED),
+    ]
+    # The lapsed hold's ticket stays on sale
+    assert await available_tickets(session_maker, event_id) == 9
+
+
+@pytest.mark.asyncio
+async def test_success_route_before_the_webhook_keeps_the_payment(
+    session_maker: sessionmaker,
+):
+    _, (paid,) = await pending_payments(session_maker, 1)
+    async with session_maker() as session:
+        payment = await payment_manager.get_payment_by_transaction_id(session, paid)
+        assert await booking_manager.end_hold(
+            session, payment.booking_id, BookingStatus.CONFIRMED
+        )
+        await session.commit()
+    await receive(session_maker, intent_event("payment_intent.succeeded", paid))
+
+    await make_worker(session_maker).drain()
+
+    assert await payment_states(session_maker, [paid]) == [
+        (PaymentStatus.COMPLETED, BookingStatus.CONFIRMED)
+    ]
+
+
+@pytest.mark.asyncio
+async def test_concurrent_workers_credit_each_failure_once(
+    session_maker: sessionmaker,
+):
+    event_id, transaction_ids = await pending_payments(
+        session_maker, 12, available_tickets=20
+    )
+    await receive(
+        session_maker,
+        *(
+            intent_event("payment_intent.payment_failed", transaction_id)
+            for transaction_id in transaction_ids
+        ),
+    )
+    worker = make_worker(session_maker, batch_size=3)
+
+    await asyncio.gather(*(worker.drain() for _ in range(4)))
+
+    assert await available_tickets(session_maker, event_id) == 20
+    assert {
+        state for state in await payment_states(session_maker, transaction_ids)
+    } == {(PaymentStatus.FAILED, BookingStatus.RELEASED)}
+
+
+@pytest.mark.asyncio
+async def test_failing_intent_is_retried_then_parked(
+    session_maker: sessionmaker, monkeypatch: pytest.MonkeyPatch
+):
+    _, (poison, paid) = await pending_payments(session_maker, 2)
+    settle = payment_manager.settle
+
+    async def failing_settle(db, transaction_ids, status):
+        if poison in transaction_ids:
+            await db.execute(text("SELECT 1 / 0"))
+        return await settle(db, transaction_ids, status)
+
+    monkeypatch.setattr(payment_manager, "settle", failing_settle)
+    await receive(
+        session_maker,
+        intent_event("payment_intent.succeeded", poison),
+        intent_event("payment_intent.succeeded", paid),
+    )
+    worker = make_worker(session_maker, max_attempts=2, retry_backoff=0)
+
+    assert await worker.drain() == 2
+    # The rest of the batch went through
+    assert await payment_states(session_maker, [poison, paid]) == [
+        (PaymentStatus.PENDING, BookingStatus.HELD),
+        (PaymentStatus.COMPLETED, BookingStatus.CONFIRMED),
+    ]
+    assert await worker.drain() == 1
+    assert await worker.drain() == 0
+
+    async with session_maker() as session:
+        parked = (
+            await session.execute(
+                select(WebhookInbox).where(WebhookInbox.payment_intent_id == poison)
+            )
+        ).scalar_one()
+    assert parked.attempts == 2 and parked.parked_at is not None
+    assert parked.processed_at is None and "DivisionByZero" in parked.last_error
+
+
+@pytest.mark.asyncio
+async def test_events_wait_for_their_payment(session_maker: sessionmaker):
+    event_id, (paid,) = await pending_payments(session_maker, 1)
+    early, unknown = f"pi_fake_{uuid.uuid4().hex}", f"pi_fake_{uuid.uuid4().hex}"
+    await receive(
+        session_maker,
+        intent_event("payment_intent.succeeded", early),
+        intent_event("payment_intent.succeeded", paid),
+        intent_event("payment_intent.created", unknown),
+    )
+
+    await make_worker(session_maker, retry_backoff=0).drain()
+
+    async with session_maker() as session:
+        rows = (
+            await session.execute(
+                select(WebhookInbox).where(
+                    WebhookInbox.payment_intent_id.in_([early, paid, unknown])
+                )
+            )
+        ).scalars()
+        inbox = {row.payment_intent_id: row for row in rows}
+    assert inbox[paid].processed_at and inbox[unknown].processed_at
+    assert inbox[early].processed_at is None and inbox[early].attempts == 1
+
+    # The outbox records the payment for the intent
+    async with session_maker() as session:
+        await session.execute(
+            update(Payment)
+            .where(Payment.transaction_id == paid)
+            .values(transaction_id=early, status=PaymentStatus.PENDING)
+        )
+        await session.execute(
+            update(Booking)
+            .where(Booking.event_id == event_id)
+            .values(status=BookingStatus.HELD)
+        )
+        await session.commit()
+    await make_worker(session_maker, retry_backoff=0).drain()
+    assert await payment_states(session_maker, [early]) == [
+        (PaymentStatus.COMPLETED, BookingStatus.CONFIRMED)
+    ]
+
+    # Gives up on an intent no payment shows up for
+    await receive(session_maker, intent_event("payment_intent.succeeded", unknown))
+    await make_worker(session_maker, max_age=0).drain()
+    async with session_maker() as session:
+        assert await session.scalar(
+            select(WebhookInbox.parked_at).where(
+                WebhookInbox.payment_intent_id == unknown,
+                WebhookInbox.event_type == "payment_intent.succeeded",
+            )
+        )
+
+
+def test_stripe_shaped_payload_is_parsed():
+    event = intent_event("payment_intent.succeeded", "pi_parsed")
+    parsed = FakePaymentGateway().parse_webhook_event(json.dumps(event), None)
+    assert parsed == WebhookEvent(
+        event_id=event["id"],
+        event_type="payment_intent.succeeded",
+        payment_intent_id="pi_parsed",
+        payload=event,
+    )
@@ -11,3 +11,7 @@ GRANT ALL PRIVILEGES ON DATABASE keycloak TO postgres;
 -- Connect to test_db database and grant privileges
 \c test_db
 GRANT ALL PRIVILEGES ON DATABASE test_db TO postgres;
+
+-- Event search relies on trigram indexes and earthdistance
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+CREATE EXTENSION IF NOT EXISTS earthdistance CASCADE;